@@ -4,6 +4,10 @@ Merge pcprocess output files into a single CSV for XATbackend portal.
 
 Portal expects:
 timestamp,cpu_user,cpu_system,cpu_idle,cpu_iowait,cpu_steal,mem_total_kb,mem_used_kb,mem_free_kb,mem_cached_kb,disk_read_bytes,disk_write_bytes,net_rx_bytes,net_tx_bytes
+
+The portal CSV keeps one disk and one interface only. For reports, pass the
+pcprocess output directory to scripts/generate_analysis_report.py directly
+so every CPU, device and interface is kept.
 """
 
 import csv
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Compact archive format for raw pcc captures
+
+A pcc_collection.json is one JSON object per sample and subsystem, and its
+text is almost all repetition: the same /proc layouts every few seconds,
+the intr line's hundreds of zeros, counters that move by a little or not at
+all between samples. The archive separates the two:
+
+    templates  each distinct line with its numbers cut out, stored once
+    counters   for every template, one integer stream per number position
+               (a counter), stored as delta-of-delta values (Gorilla-style):
+               first value, first delta, then the change of the delta
+
+Numbers that never change within a template (the intr zeros, device
+numbers) are folded back into its text, and regular counters (timestamps
+every 5s, idle ticks) become streams of zeros. Each stream is packed with the narrowest integer width that holds
+it and the whole archive is lzma-compressed. Decoding is a pair of
+cumulative sums per template plus one string format per line, so it runs
+at numpy speed; the result is byte-for-byte the original file. Numbers are
+taken from the raw text, so nothing depends on how the JSON was
+formatted.
+
+File layout (.pcca):
+    b'PCCA' | version (1 byte) | lzma stream of:
+        header length (4 bytes LE) | JSON header (templates, shapes, widths, line count)
+        template id per line (uint8/16/32) | counter streams, per template grouped by width
+
+Usage:
+    python capture_archive.py pack Azure/results/*/pcc_collection.json        # writes <file>.pcca
+    python capture_archive.py unpack Azure/results/20260107_191006/pcc_collection.json.pcca -o restored.json
+    python capture_archive.py verify OCI/results/*/host_collection.json       # ratio, speed, exact round trip
+"""
+
+import os
+import re
+import sys
+import json
+import lzma
+import time
+import struct
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+MAGIC = b'PCCA'
+VERSION = 1
+SUFFIX = '.pcca'
+
+# Numbers as they appear in the text: 0 on its own (so leading zeros survive
+# as separate zeros) or up to 18 digits (so every value fits in int64)
+NUMBER = re.compile(r'[1-9]\d{0,17}|0')
+SLOT = '\x00'
+WIDTHS = [(np.int8, 1), (np.int16, 2), (np.int32, 4), (np.int64, 8)] if np is not None else []
+
+
+def _narrowest(column):
+    """Smallest signed width (bytes) that holds every value of column."""
+    low, high = int(column.min()), int(column.max())
+    for dtype, size in WIDTHS:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return size
+    return 8
+
+
+def _dtype(size):
+    return {1: np.int8, 2: np.int16, 4: np.int32, 8: np.int64}[size]
+
+
+def encode(text):
+    """Archive bytes for a capture's text."""
+    lines = text.split('\n')
+    templates = {}
+    ids = np.empty(len(lines), dtype=np.int64)
+    rows = []
+    for i, line in enumerate(lines):
+        numbers = NUMBER.findall(line)
+        template = NUMBER.sub(SLOT, line)
+        t = templates.get(template)
+        if t is None:
+            t = templates[template] = len(templates)
+            rows.append([])
+        ids[i] = t
+        rows[t].append(numbers)
+
+    texts, shapes, widths, blocks = [], [], [], []
+    for template, values in zip(templates, rows):
+        matrix = np.array(values, dtype=np.int64).reshape(len(values), -1)
+        # Numbers that never change in this template become part of its text
+        constant = (matrix == matrix[0]).all(axis=0)
+        pieces = template.split(SLOT)
+        text = pieces[0]
+        for k, piece in enumerate(pieces[1:]):
+            text += (str(matrix[0, k]) if constant[k] else SLOT) + piece
+        matrix = matrix[:, ~constant]
+
+        # First row as is, then deltas, then deltas of deltas (int64 wrap-around is undone on decode)
+        packed = matrix.copy()
+        if len(matrix) > 1:
+            packed[1:] = np.diff(matrix, axis=0)
+        if len(matrix) > 2:
+            packed[2:] = np.diff(packed[1:], axis=0)
+        sizes = [_narrowest(packed[:, k]) for k in range(matrix.shape[1])]
+        texts.append(text)
+        shapes.append(matrix.shape)
+        widths.append(sizes)
+        # Counters of one width are stored together, each as a contiguous stream
+        for size in (1, 2, 4, 8):
+            chosen = [k for k, width in enumerate(sizes) if width == size]
+            if chosen:
+                blocks.append(np.ascontiguousarray(packed[:, chosen].T).astype(_dtype(size)).tobytes())
+
+    id_size = 1 if len(templates) <= 256 else 2 if len(templates) <= 65536 else 4
+    header = json.dumps({'lines': len(lines), 'templates': texts, 'shapes': shapes,
+                         'widths': widths, 'id_size': id_size}, separators=(',', ':')).encode('utf-8')
+    id_dtype = {1: np.uint8, 2: np.uint16, 4: np.uint32}[id_size]
+    body = b''.join([struct.pack('<I', len(header)), header, ids.astype(id_dtype).tobytes(), *blocks])
+    return MAGIC + bytes([VERSION]) + lzma.compress(body, preset=9 | lzma.PRESET_EXTREME)
+
+
+def decode(data):
+    """The exact capture text an archive was made from."""
+    if data[:4] != MAGIC:
+        raise ValueError('not a capture archive')
+    if data[4] != VERSION:
+        raise ValueError(f'unsupported archive version {data[4]}')
+    body = lzma.decompress(data[5:])
+    (size,) = struct.unpack_from('<I', body)
+    header = json.loads(body[4:4 + size])
+    offset = 4 + size
+    id_dtype = {1: np.uint8, 2: np.uint16, 4: np.uint32}[header['id_size']]
+    ids = np.frombuffer(body, dtype=id_dtype, count=header['lines'], offset=offset)
+    offset += ids.nbytes
+
+    rendered = np.empty(header['lines'], dtype=object)
+    for t, (template, (n, k), sizes) in enumerate(zip(header['templates'], header['shapes'], header['widths'])):
+        fmt = template.replace('%', '%%').replace(SLOT, '%d')
+        if not k:
+            rendered[ids == t] = fmt
+            continue
+        packed = np.empty((n, k), dtype=np.int64)
+        sizes = np.array(sizes)
+        for width in (1, 2, 4, 8):
+            chosen = np.flatnonzero(sizes == width)
+            if len(chosen):
+                block = np.frombuffer(body, dtype=_dtype(width), count=n * len(chosen), offset=offset)
+                packed[:, chosen] = block.reshape(len(chosen), n).T
+                offset += block.nbytes
+        if n > 2:
+            packed[1:] = np.cumsum(packed[1:], axis=0)
+        if n > 1:
+            packed = np.cumsum(packed, axis=0)
+        rendered[ids == t] = [fmt % tuple(row) for row in packed.tolist()]
+    return '\n'.join(rendered.tolist())
+
+
+def read_text(path):
+    """A capture's text, from the original file or its archive."""
+    if str(path).endswith(SUFFIX):
+        with open(path, 'rb') as f:
+            return decode(f.read())
+    with open(path, encoding='utf-8', errors='surrogateescape', newline='') as f:
+        return f.read()
+
+
+def pack(path, output=None):
+    """Archive one capture; returns (original bytes, archive bytes, archive path)."""
+    with open(path, encoding='utf-8', errors='surrogateescape', newline='') as f:
+        text = f.read()
+    data = encode(text)
+    if decode(data) != text:
+        raise ValueError(f"{path}: archive does not reproduce the original")
+    output = Path(output or f"{path}{SUFFIX}")
+    partial = output.with_name(output.name + '.partial')
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, output)
+    return os.path.getsize(path), len(data), output
+
+
+def unpack(path, output=None):
+    text = read_text(path)
+    if output in (None, '-'):
+        sys.stdout.write(text)
+        return
+    with open(output, 'w', encoding='utf-8', errors='surrogateescape', newline='') as f:
+        f.write(text)
+
+
+def verify(path, repeat=3):
+    """Ratio, encode and decode speed (MB/s of original text) and whether the round trip is exact."""
+    with open(path, encoding='utf-8', errors='surrogateescape', newline='') as f:
+        text = f.read()
+    original = len(text.encode('utf-8', errors='surrogateescape'))
+    started = time.perf_counter()
+    data = encode(text)
+    encode_s = time.perf_counter() - started
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        restored = decode(data)
+        best = min(best, time.perf_counter() - started)
+    return {'path': str(path), 'original': original, 'archive': len(data), 'ratio': original / len(data),
+            'encode_mb_s': original / encode_s / 1e6, 'decode_mb_s': original / best / 1e6,
+            'exact': restored == text}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack raw pcc captures into compact delta-of-delta archives')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    pack_cmd = sub.add_parser('pack', help='Archive captures as <file>.pcca')
+    pack_cmd.add_argument('paths', nargs='+')
+    pack_cmd.add_argument('-o', '--output', default=None, help='Archive path (one input only)')
+    pack_cmd.add_argument('--remove', action='store_true', help='Delete each original once its archive is verified')
+
+    unpack_cmd = sub.add_parser('unpack', help='Restore the original capture text')
+    unpack_cmd.add_argument('path')
+    unpack_cmd.add_argument('-o', '--output', default=None,
+                            help='Output file (default: the archive name without .pcca; - for stdout)')
+
+    verify_cmd = sub.add_parser('verify', help='Report size ratio, speed and exact round trip without writing')
+    verify_cmd.add_argument('paths', nargs='+')
+
+    args = parser.parse_args()
+    if np is None:
+        parser.error('capture_archive.py requires numpy (pip install numpy)')
+
+    try:
+        if args.command == 'pack':
+            if args.output and len(args.paths) > 1:
+                parser.error('--output takes a single input')
+            total_in = total_out = 0
+            for path in args.paths:
+                original, archived, output = pack(path, args.output)
+                total_in += original
+                total_out += archived
+                print(f"✓ {path} -> {output} ({original / 1024:,.0f} KB -> {archived / 1024:,.1f} KB, "
+                      f"{original / archived:.1f}x)")
+                if args.remove:
+                    os.remove(path)
+            if len(args.paths) > 1:
+                print(f"\nTotal: {total_in / 1024 / 1024:,.1f} MB -> {total_out / 1024 / 1024:,.2f} MB "
+                      f"({total_in / total_out:.1f}x)")
+
+        elif args.command == 'unpack':
+            output = args.output
+            if output is None:
+                output = args.path[:-len(SUFFIX)] if args.path.endswith(SUFFIX) else args.path + '.json'
+                if os.path.exists(output):
+                    print(f"❌ {output} exists; pass -o to choose where to write", file=sys.stderr)
+                    sys.exit(1)
+            unpack(args.path, output)
+            if output != '-':
+                print(f"✓ {args.path} -> {output}")
+
+        else:
+            print(f"\n{'='*100}")
+            print(f"{'Capture':<60} {'Original':>9} {'Archive':>9} {'Ratio':>7} {'Enc MB/s':>9} {'Dec MB/s':>9}  Exact")
+            print(f"{'='*100}")
+            failed = False
+            for path in args.paths:
+                r = verify(path)
+                failed |= not r['exact']
+                name = path if len(path) <= 60 else '...' + path[-57:]
+                print(f"{name:<60} {r['original'] / 1024:>8,.0f}K {r['archive'] / 1024:>8,.1f}K {r['ratio']:>6.1f}x "
+                      f"{r['encode_mb_s']:>9.1f} {r['decode_mb_s']:>9.1f}  {'✓' if r['exact'] else '❌'}")
+            print(f"{'='*100}\n")
+            if failed:
+                sys.exit(1)
+    except (OSError, ValueError, lzma.LZMAError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
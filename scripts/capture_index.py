@@ -0,0 +1,708 @@
+#!/usr/bin/env python3
+"""
+Capture catalog and time-range index
+
+Records every performance capture under the results trees in one SQLite
+index, so "all captures for host X in January" or "which runs have
+container data" is a query instead of a find across Azure/results,
+OCI/results and Benchmark Automation/Sysbench/results. Three kinds of
+capture are recognised:
+
+    pcc         JSON lines written by pcc/pcc-collector (pcc_collection.json,
+                host_collection.json, container_collection.json, ...)
+    merged      merged performance CSVs (timestamp,cpu_user,...,net_tx_bytes),
+                and containers.csv exports of container collections
+    processed   pcc-processor output directories (proc/stat, proc/diskstats,
+                proc/net/dev, proc/meminfo, statfs_ALL)
+
+For each capture the index keeps host, cloud and VM shape, first and last
+sample time, sample count and interval, row count, file size, the
+subsystems present (cpu, memory, disk, network, filesystem, cpuinfo,
+containers) with their row counts, and the devices seen (disks, network
+interfaces, mount points, containers). Host, cloud and shape come from the
+capture itself where it says (hostname column, system_info.json), then from
+the path; the label command overrides them.
+
+The index is updated incrementally: captures whose size and mtime are
+unchanged are skipped, changed ones are re-read and vanished ones dropped.
+Queries only touch the index - no capture file is opened.
+
+Times on the command line are UTC and may be partial: --from 2026-01 --to
+2026-01 selects every capture that overlaps January 2026.
+
+Environment:
+    PERFANALYSIS_CAPTURE_DB    index path (default ~/.cache/perfanalysis/captures.db)
+
+Usage:
+    python capture_index.py update                          # scan the repository's results trees
+    python capture_index.py update OCI/results /data/captures --full
+    python capture_index.py query --host pcc-test-01 --from 2026-01 --to 2026-01
+    python capture_index.py query --cloud OCI --subsystem containers --format csv
+    python capture_index.py query --device sda --from 2026-01-07T09:00 --to 2026-01-07T12:00
+    python capture_index.py show Azure/results/20260107_191006/pcc_collection.json
+    python capture_index.py label OCI/results/loadtest1 --host suse-bench-3 --shape VM.Standard.E5.Flex
+    python capture_index.py summary
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+import argparse
+import statistics
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sysbench_results import STAMP, SKIP_DIRS, path_info, display_path, write_records
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = Path.home() / ".cache" / "perfanalysis" / "captures.db"
+DEFAULT_ROOTS = ['Azure/results', 'OCI/results', 'Benchmark Automation/Sysbench/results']
+SCHEMA_VERSION = 1
+
+# pcc subsystem (or processed file) -> catalog subsystem
+SUBSYSTEMS = {
+    '/proc/stat': 'cpu',
+    '/proc/meminfo': 'memory',
+    '/proc/diskstats': 'disk',
+    '/proc/net/dev': 'network',
+    'statfs[*]': 'filesystem',
+    '/proc/cpuinfo': 'cpuinfo',
+    'proc/stat': 'cpu',
+    'proc/meminfo': 'memory',
+    'proc/diskstats': 'disk',
+    'proc/net/dev': 'network',
+    'statfs_ALL': 'filesystem',
+}
+# Merged CSV column prefix -> catalog subsystem
+CSV_SUBSYSTEMS = [('cpu_', 'cpu'), ('mem_', 'memory'), ('disk_', 'disk'), ('net_', 'network')]
+
+# File name parts that say what a capture is rather than whose it is
+NAME_SUFFIXES = re.compile(r'([_-](pcc|host|container|containers|collection|performance|sync|portal|format|'
+                           r'source|replay|processed|csv))+$', re.I)
+# Azure VM sizes inside names (pcc_f2s_v2.json)
+SIZE_PART = re.compile(r'(?i)(?:^|[_-])(?:standard_)?[a-z]{1,3}\d+[a-z]*_v\d+(?=$|[_-])')
+# Run directories named after their start date (20260107_191006, 20260108_f2s_v2)
+RUN_DIR = re.compile(r'^20\d{6}')
+GENERIC_NAMES = {'', 'pcc', 'host', 'container', 'containers', 'collection', 'source', 'replay', 'processed',
+                 'results', 'csv', 'csv_sync', 'host-csv'}
+
+CAPTURE_COLUMNS = ['path', 'format', 'size', 'mtime', 'cloud', 'shape', 'host', 'cpu_model', 'cpus',
+                   'start_ts', 'end_ts', 'samples', 'interval_s', 'rows', 'indexed_at']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    format TEXT,
+    size INTEGER,
+    mtime REAL,
+    cloud TEXT,
+    shape TEXT,
+    host TEXT,
+    cpu_model TEXT,
+    cpus INTEGER,
+    start_ts REAL,
+    end_ts REAL,
+    samples INTEGER,
+    interval_s REAL,
+    rows INTEGER,
+    indexed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS subsystems (
+    capture_id INTEGER NOT NULL REFERENCES captures(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    source TEXT,
+    rows INTEGER
+);
+CREATE TABLE IF NOT EXISTS devices (
+    capture_id INTEGER NOT NULL REFERENCES captures(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ignored (path TEXT PRIMARY KEY, size INTEGER, mtime REAL);
+CREATE TABLE IF NOT EXISTS labels (prefix TEXT PRIMARY KEY, cloud TEXT, shape TEXT, host TEXT);
+CREATE INDEX IF NOT EXISTS captures_host ON captures(host);
+CREATE INDEX IF NOT EXISTS captures_time ON captures(start_ts, end_ts);
+CREATE INDEX IF NOT EXISTS subsystems_capture ON subsystems(capture_id);
+CREATE INDEX IF NOT EXISTS subsystems_name ON subsystems(name);
+CREATE INDEX IF NOT EXISTS devices_capture ON devices(capture_id);
+CREATE INDEX IF NOT EXISTS devices_name ON devices(name);
+CREATE VIEW IF NOT EXISTS catalog AS
+    SELECT c.*,
+           datetime(c.start_ts, 'unixepoch') AS start,
+           datetime(c.end_ts, 'unixepoch') AS end,
+           c.end_ts - c.start_ts AS duration_s,
+           (SELECT group_concat(name, ',') FROM (SELECT DISTINCT name FROM subsystems s
+                                                  WHERE s.capture_id = c.id ORDER BY name)) AS subsystem_list
+    FROM captures c;
+"""
+
+
+# ---------------------------------------------------------------- reading
+
+class Summary:
+    """What one pass over a capture learns: time range, subsystems and devices."""
+
+    def __init__(self, fmt):
+        self.format = fmt
+        self.timestamps = set()
+        self.rows = 0
+        self.subsystems = {}
+        self.devices = set()
+        self.info = {}
+
+    def add(self, subsystem, source, timestamp, rows=1):
+        self.timestamps.add(timestamp)
+        self.rows += rows
+        key = (subsystem, source)
+        self.subsystems[key] = self.subsystems.get(key, 0) + rows
+
+    def fields(self):
+        stamps = sorted(self.timestamps)
+        gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+        return {
+            'format': self.format,
+            'start_ts': stamps[0] if stamps else None,
+            'end_ts': stamps[-1] if stamps else None,
+            'samples': len(stamps),
+            'interval_s': statistics.median(gaps) if gaps else None,
+            'rows': self.rows,
+            **self.info,
+        }
+
+
+def whole_disks(names):
+    """Disk names without partitions, loop and ram devices."""
+    return {name for name in names
+            if not name.startswith(('loop', 'ram'))
+            and not any(name != other and name.startswith(other) for other in names)}
+
+
+def read_pcc(path):
+    """Summary of a pcc JSON-lines capture."""
+    summary = Summary('pcc')
+    disks = set()
+    containers = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            subsystem = record.get('subsystem', '')
+            timestamp = record.get('timestamp')
+            measurement = record.get('measurement', '')
+            if subsystem.startswith('container/'):
+                summary.add('containers', subsystem.rsplit('/', 1)[0], timestamp)
+                runtime, _, cid = subsystem.partition('/')[2].partition('/')
+                try:
+                    name = json.loads(measurement).get('container_name')
+                except (ValueError, AttributeError):
+                    name = None
+                containers[cid] = name or containers.get(cid)
+                summary.devices.add(('runtime', runtime))
+                continue
+            summary.add(SUBSYSTEMS.get(subsystem, subsystem), subsystem, timestamp)
+            if subsystem == '/proc/stat' and 'cpus' not in summary.info:
+                summary.info['cpus'] = sum(1 for l in measurement.splitlines()
+                                           if l.startswith('cpu') and not l.startswith('cpu '))
+            elif subsystem == '/proc/cpuinfo' and 'cpu_model' not in summary.info:
+                match = re.search(r'^model name\s*:\s*(.+?)\s*$', measurement, re.M)
+                if match:
+                    summary.info['cpu_model'] = match.group(1)
+            elif subsystem == '/proc/diskstats':
+                disks.update(fields[2] for fields in map(str.split, measurement.splitlines()) if len(fields) > 2)
+            elif subsystem == '/proc/net/dev':
+                for l in measurement.splitlines():
+                    name, sep, _ = l.partition(':')
+                    if sep and '|' not in l:
+                        summary.devices.add(('interface', name.strip()))
+            elif subsystem == 'statfs[*]':
+                for l in measurement.splitlines():
+                    try:
+                        summary.devices.add(('mount', json.loads(l)['mount_point']))
+                    except (ValueError, KeyError, TypeError):
+                        pass
+    summary.devices.update(('disk', name) for name in whole_disks(disks))
+    names = container_names(Path(path).parent)
+    summary.devices.update(('container', names.get(cid) or name or cid[:12]) for cid, name in containers.items())
+    return summary
+
+
+def read_csv(path):
+    """Summary of a merged performance CSV or a containers.csv export."""
+    with open(path) as f:
+        header = f.readline().strip().split(',')
+        if 'container_id' in header:
+            summary = Summary('merged')
+            name_at = header.index('container_name')
+            runtime_at = header.index('runtime') if 'runtime' in header else None
+            for line in f:
+                fields = line.rstrip('\n').split(',')
+                if len(fields) <= name_at:
+                    continue
+                summary.add('containers', 'containers.csv', float(fields[0]))
+                summary.devices.add(('container', fields[name_at] or fields[1][:12]))
+                if runtime_at is not None and fields[runtime_at]:
+                    summary.devices.add(('runtime', fields[runtime_at]))
+            return summary
+
+        summary = Summary('merged')
+        present = [name for prefix, name in CSV_SUBSYSTEMS if any(c.startswith(prefix) for c in header)]
+        host_at = header.index('hostname') if 'hostname' in header else None
+        for line in f:
+            if not line.strip():
+                continue
+            fields = line.split(',', (host_at or 0) + 1)
+            summary.timestamps.add(float(fields[0]))
+            summary.rows += 1
+            if host_at is not None and 'host' not in summary.info:
+                summary.info['host'] = fields[host_at].strip() or None
+        for name in present:
+            summary.subsystems[(name, 'merged csv')] = summary.rows
+        return summary
+
+
+def read_processed(directory):
+    """Summary of a pcc-processor output directory."""
+    summary = Summary('processed')
+    for source, key in (('proc/stat', 'CPU'), ('proc/meminfo', None), ('proc/diskstats', 'DEV'),
+                        ('proc/net/dev', 'IFACE'), ('statfs_ALL', 'mount')):
+        path = directory / source
+        if not path.is_file():
+            continue
+        with open(path) as f:
+            header = f.readline().lstrip('#').strip().split(',')
+            at = header.index(key) if key in header else None
+            names = set()
+            rows = 0
+            for line in f:
+                fields = line.rstrip('\n').split(',')
+                if len(fields) < 2:
+                    continue
+                summary.timestamps.add(float(fields[0]))
+                rows += 1
+                if at is not None:
+                    names.add(fields[at])
+        summary.subsystems[(SUBSYSTEMS[source], source)] = rows
+        summary.rows += rows
+        if key == 'CPU':
+            summary.info['cpus'] = len(names - {'-1', 'all'}) or None
+        elif key == 'DEV':
+            summary.devices.update(('disk', name) for name in whole_disks(names))
+        elif key == 'IFACE':
+            summary.devices.update(('interface', name) for name in names)
+        elif key == 'mount':
+            summary.devices.update(('mount', name) for name in names)
+    return summary
+
+
+def container_names(directory):
+    """Container id -> name from a container_names.json next to a container capture."""
+    try:
+        with open(directory / 'container_names.json') as f:
+            names = json.load(f)
+        return {**{cid[:12]: name for cid, name in names.items()}, **names}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def sniff(path):
+    """Format of a capture file, or None for anything else (system_info.json, reports, ...)."""
+    try:
+        with open(path, errors='replace') as f:
+            line = f.readline()
+            while line and not line.strip():
+                line = f.readline()
+    except OSError:
+        return None
+    if path.suffix == '.json':
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        return 'pcc' if isinstance(record, dict) and 'subsystem' in record and 'timestamp' in record else None
+    if path.suffix == '.csv':
+        header = line.strip().split(',')
+        if header[:1] == ['timestamp'] and ('cpu_idle' in header or 'container_id' in header):
+            return 'merged'
+    return None
+
+
+def processed_signature(directory):
+    """Total size and latest mtime of a processed directory's subsystem files."""
+    size, mtime = 0, 0.0
+    for source in ('proc/stat', 'proc/meminfo', 'proc/diskstats', 'proc/net/dev', 'statfs_ALL'):
+        try:
+            stat = (directory / source).stat()
+        except OSError:
+            continue
+        size += stat.st_size
+        mtime = max(mtime, stat.st_mtime)
+    return size, mtime
+
+
+def find_captures(roots):
+    """(path, is_directory) for candidate capture files and processed directories under roots."""
+    for root in roots:
+        root = Path(root)
+        if root.is_file():
+            yield root.resolve(), False
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            if os.path.isfile(os.path.join(dirpath, 'proc', 'stat')):
+                yield Path(dirpath).resolve(), True
+                dirnames.remove('proc')
+            for name in sorted(filenames):
+                if name.endswith(('.json', '.csv')):
+                    yield (Path(dirpath) / name).resolve(), False
+
+
+# ------------------------------------------------------------------ naming
+
+def capture_host(path):
+    """Host a capture belongs to, as far as its name or directory tells."""
+    stem = SIZE_PART.sub('', STAMP.sub('', path.stem if path.suffix else path.name)).strip('_-')
+    stem = NAME_SUFFIXES.sub('', stem)
+    stem = re.sub(r'^(azure|oci)[_-]', '', stem, flags=re.I)
+    if stem.lower() not in GENERIC_NAMES:
+        return stem
+    for parent in path.parents:
+        name = parent.name
+        if name.lower() in GENERIC_NAMES:
+            continue
+        if RUN_DIR.match(name) or name.lower() in ('azure', 'oci', 'sysbench'):
+            return None
+        return name
+    return None
+
+
+def directory_info(directory):
+    """CPU model and count from a system_info.json saved with the capture."""
+    for candidate in (directory / 'system_info.json', directory / 'system_info' / 'system_info.json',
+                      directory / 'csv' / 'system_info.json'):
+        try:
+            with open(candidate) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        info = {'cpu_model': data.get('model_name'), 'cpus': data.get('total_cpus')}
+        return {key: value for key, value in info.items() if value}
+    return {}
+
+
+# ---------------------------------------------------------------- index
+
+def parse_time(text, end=False):
+    """
+    Epoch seconds from an epoch number or a (partial) UTC date/time. With
+    end, a partial value means the end of that period: 2026-01 -> start of
+    February 2026.
+    """
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    for fmt, step in (('%Y-%m-%dT%H:%M:%S', None), ('%Y-%m-%d %H:%M:%S', None), ('%Y-%m-%dT%H:%M', 'minute'),
+                      ('%Y-%m-%d %H:%M', 'minute'), ('%Y-%m-%dT%H', 'hour'), ('%Y-%m-%d', 'day'),
+                      ('%Y-%m', 'month'), ('%Y', 'year')):
+        try:
+            moment = datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        seconds = moment.timestamp()
+        if end and step:
+            if step == 'month':
+                following = moment.replace(year=moment.year + moment.month // 12, month=moment.month % 12 + 1)
+                return following.timestamp()
+            if step == 'year':
+                return moment.replace(year=moment.year + 1).timestamp()
+            seconds += {'minute': 60, 'hour': 3600, 'day': 86400}[step]
+        elif end:
+            seconds += 1
+        return seconds
+    raise ValueError(f"not a time: {text!r} (use epoch seconds or YYYY[-MM[-DD[THH[:MM[:SS]]]]])")
+
+
+class CaptureIndex:
+    """SQLite index of captures, their subsystems and devices."""
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or os.environ.get('PERFANALYSIS_CAPTURE_DB') or DEFAULT_DB)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.db_path))
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA foreign_keys = ON')
+        version = self._schema_version()
+        if version not in (None, SCHEMA_VERSION):
+            # Derived data only: rebuild rather than migrate (labels are kept)
+            self.db.executescript('DROP VIEW IF EXISTS catalog; DROP TABLE IF EXISTS devices; '
+                                  'DROP TABLE IF EXISTS subsystems; DROP TABLE IF EXISTS captures; '
+                                  'DROP TABLE IF EXISTS ignored; DROP TABLE IF EXISTS meta;')
+        self.db.executescript(SCHEMA)
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        self.db.commit()
+
+    def _schema_version(self):
+        try:
+            row = self.db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return int(row[0]) if row else None
+
+    def close(self):
+        self.db.close()
+
+    def labels_for(self, path):
+        """Label overrides for a path, longest matching prefix last so it wins."""
+        info = {}
+        for row in self.db.execute('SELECT * FROM labels ORDER BY length(prefix)').fetchall():
+            if str(path) == row['prefix'] or str(path).startswith(row['prefix'].rstrip('/') + '/'):
+                info.update({key: row[key] for key in ('cloud', 'shape', 'host') if row[key]})
+        return info
+
+    def add_capture(self, path, size, mtime, is_directory):
+        """Read one capture and (re)place its rows; returns False if it is not a capture."""
+        if is_directory:
+            summary = read_processed(path)
+        else:
+            fmt = sniff(path)
+            if fmt is None:
+                self.db.execute('INSERT OR REPLACE INTO ignored VALUES (?, ?, ?)', (str(path), size, mtime))
+                return False
+            summary = read_pcc(path) if fmt == 'pcc' else read_csv(path)
+
+        found = summary.fields()
+        info = {key: value for key, value in path_info(path).items() if key in ('cloud', 'shape')}
+        info['host'] = capture_host(path)
+        info.update(directory_info(path if is_directory else path.parent))
+        info.update({key: value for key, value in found.items() if value is not None})
+        info.update(self.labels_for(path))
+        info.update(path=str(path), size=size, mtime=mtime, indexed_at=datetime.now().isoformat(timespec='seconds'))
+
+        self.db.execute('DELETE FROM ignored WHERE path = ?', (str(path),))
+        self.db.execute('DELETE FROM captures WHERE path = ?', (str(path),))
+        cursor = self.db.execute(
+            f"INSERT INTO captures ({', '.join(CAPTURE_COLUMNS)}) VALUES ({', '.join('?' * len(CAPTURE_COLUMNS))})",
+            [info.get(key) for key in CAPTURE_COLUMNS])
+        capture_id = cursor.lastrowid
+        self.db.executemany('INSERT INTO subsystems VALUES (?, ?, ?, ?)',
+                            [(capture_id, name, source, rows) for (name, source), rows in sorted(summary.subsystems.items())])
+        self.db.executemany('INSERT INTO devices VALUES (?, ?, ?)',
+                            [(capture_id, kind, name) for kind, name in sorted(summary.devices)])
+        return True
+
+    def update(self, roots, full=False):
+        """Index new and changed captures under roots; drop indexed ones that no longer exist there."""
+        known = {row['path']: (row['size'], row['mtime'])
+                 for row in self.db.execute('SELECT path, size, mtime FROM captures UNION ALL '
+                                            'SELECT path, size, mtime FROM ignored')}
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'ignored': 0}
+        seen = set()
+        for path, is_directory in find_captures(roots):
+            seen.add(str(path))
+            if is_directory:
+                size, mtime = processed_signature(path)
+            else:
+                stat = path.stat()
+                size, mtime = stat.st_size, stat.st_mtime
+            previous = known.get(str(path))
+            if previous == (size, mtime) and not full:
+                counts['unchanged'] += 1
+                continue
+            try:
+                added = self.add_capture(path, size, mtime, is_directory)
+            except (OSError, ValueError, IndexError) as e:
+                print(f"⚠️  Skipping {display_path(path)}: {e}", file=sys.stderr)
+                continue
+            if not added:
+                counts['ignored'] += 1
+            else:
+                counts['updated' if previous else 'added'] += 1
+
+        scanned = [str(Path(root).resolve()) for root in roots]
+        for path in known:
+            under = any(path == root or path.startswith(root.rstrip('/') + '/') for root in scanned)
+            if under and path not in seen:
+                self.db.execute('DELETE FROM captures WHERE path = ?', (path,))
+                self.db.execute('DELETE FROM ignored WHERE path = ?', (path,))
+                counts['removed'] += 1
+        self.db.commit()
+        return counts
+
+    def label(self, prefix, cloud=None, shape=None, host=None):
+        """Attach cloud/shape/host to every capture under prefix, now and on later updates."""
+        prefix = str(Path(prefix).resolve())
+        self.db.execute('INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)', (prefix, cloud, shape, host))
+        values = {key: value for key, value in (('cloud', cloud), ('shape', shape), ('host', host)) if value}
+        if not values:
+            return 0
+        cursor = self.db.execute(
+            f"UPDATE captures SET {', '.join(f'{key} = ?' for key in values)} "
+            f"WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+            [*values.values(), prefix, prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '/%'])
+        self.db.commit()
+        return cursor.rowcount
+
+    def find(self, host=None, cloud=None, shape=None, since=None, until=None, subsystem=None,
+             device=None, fmt=None, path=None):
+        """
+        Captures matching every given filter. Text filters match
+        case-insensitively as substrings; since/until (epoch seconds) select
+        captures whose time range overlaps [since, until].
+        """
+        where, params = [], []
+        for column, value in (('host', host), ('cloud', cloud), ('shape', shape), ('path', path)):
+            if value:
+                where.append(f"{column} LIKE ?")
+                params.append(f"%{value}%")
+        if fmt:
+            where.append('format = ?')
+            params.append(fmt)
+        if since is not None:
+            where.append('end_ts >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('start_ts < ?')
+            params.append(until)
+        if subsystem:
+            where.append('id IN (SELECT capture_id FROM subsystems WHERE name = ? OR source = ?)')
+            params += [subsystem, subsystem]
+        if device:
+            where.append('id IN (SELECT capture_id FROM devices WHERE name LIKE ?)')
+            params.append(f"%{device}%")
+        sql = 'SELECT * FROM catalog'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        return self.db.execute(sql + ' ORDER BY start_ts, path', params).fetchall()
+
+    def details(self, path):
+        """The catalog row of one capture with its subsystems and devices, or None."""
+        row = self.db.execute('SELECT * FROM catalog WHERE path = ?', (str(Path(path).resolve()),)).fetchone()
+        if row is None:
+            return None
+        subsystems = self.db.execute('SELECT name, source, rows FROM subsystems WHERE capture_id = ? '
+                                     'ORDER BY name, source', (row['id'],)).fetchall()
+        devices = self.db.execute('SELECT kind, name FROM devices WHERE capture_id = ? ORDER BY kind, name',
+                                  (row['id'],)).fetchall()
+        return row, subsystems, devices
+
+    def summary(self):
+        return self.db.execute(
+            "SELECT coalesce(cloud, '?') AS cloud, coalesce(host, '?') AS host, count(*) AS captures, "
+            "datetime(min(start_ts), 'unixepoch') AS first, datetime(max(end_ts), 'unixepoch') AS last, "
+            "sum(rows) AS rows, sum(size) AS bytes FROM captures GROUP BY 1, 2 ORDER BY 1, 2"
+        ).fetchall()
+
+
+def _size(value):
+    for suffix, scale in (('G', 2**30), ('M', 2**20), ('K', 2**10)):
+        if value >= scale:
+            return f"{value / scale:.1f}{suffix}"
+    return str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index performance captures by host, time and subsystem')
+    parser.add_argument('--db', default=None, help=f'Index path (default: $PERFANALYSIS_CAPTURE_DB or {DEFAULT_DB})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    update = sub.add_parser('update', help='Index new and changed captures')
+    update.add_argument('roots', nargs='*',
+                        help=f"Files or directories to scan (default: {', '.join(DEFAULT_ROOTS)})")
+    update.add_argument('--full', action='store_true', help='Re-read every capture, changed or not')
+
+    label = sub.add_parser('label', help='Set cloud/shape/host for every capture under a path')
+    label.add_argument('prefix', help='File or directory')
+    label.add_argument('--cloud')
+    label.add_argument('--shape')
+    label.add_argument('--host')
+
+    query = sub.add_parser('query', help='List captures')
+    query.add_argument('--host', help='Substring of the host name')
+    query.add_argument('--cloud', help='Azure or OCI')
+    query.add_argument('--shape', help='Substring of the VM size/shape')
+    query.add_argument('--from', dest='since', help='Captures still running at or after this UTC time')
+    query.add_argument('--to', dest='until', help='Captures started before the end of this UTC time')
+    query.add_argument('--subsystem', help='cpu, memory, disk, network, filesystem, cpuinfo, containers '
+                                           '(or a pcc name such as /proc/diskstats)')
+    query.add_argument('--device', help='Substring of a disk, interface, mount point or container name')
+    query.add_argument('--kind', choices=['pcc', 'merged', 'processed'], help='Capture format')
+    query.add_argument('--path', help='Substring of the capture path')
+    query.add_argument('--format', choices=['table', 'csv', 'json'], default='table')
+
+    show = sub.add_parser('show', help='Subsystems and devices of one capture')
+    show.add_argument('path')
+
+    sub.add_parser('summary', help='Captures per cloud and host')
+
+    args = parser.parse_args()
+    index = CaptureIndex(args.db)
+    try:
+        if args.command == 'update':
+            roots = args.roots or [str(REPO_ROOT / root) for root in DEFAULT_ROOTS if (REPO_ROOT / root).exists()]
+            counts = index.update(roots, full=args.full)
+            print(f"✓ {counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged, "
+                  f"{counts['removed']} removed, {counts['ignored']} not captures -> {index.db_path}")
+
+        elif args.command == 'label':
+            if not (args.cloud or args.shape or args.host):
+                parser.error('label needs at least one of --cloud, --shape, --host')
+            changed = index.label(args.prefix, args.cloud, args.shape, args.host)
+            print(f"✓ Labelled {changed} indexed captures under {args.prefix}")
+
+        elif args.command == 'query':
+            try:
+                since = parse_time(args.since) if args.since else None
+                until = parse_time(args.until, end=True) if args.until else None
+            except ValueError as e:
+                parser.error(str(e))
+            rows = index.find(args.host, args.cloud, args.shape, since, until, args.subsystem, args.device,
+                              args.kind, args.path)
+            if args.format == 'table':
+                records = [{**dict(row), 'path': display_path(row['path']), 'size': _size(row['size'])}
+                           for row in rows]
+            else:
+                records = [dict(row) for row in rows]
+            columns = ['path', 'host', 'cloud', 'start', 'end', 'samples', 'interval_s', 'subsystem_list', 'size']
+            write_records(records, columns, args.format, empty="No matching captures")
+
+        elif args.command == 'show':
+            found = index.details(args.path)
+            if found is None:
+                print(f"❌ {args.path} is not in the index (run update first)", file=sys.stderr)
+                sys.exit(1)
+            row, subsystems, devices = found
+            print(f"\n{'='*70}")
+            print(display_path(row['path']))
+            print(f"{'='*70}")
+            for key in ('format', 'host', 'cloud', 'shape', 'cpu_model', 'cpus', 'start', 'end', 'duration_s',
+                        'samples', 'interval_s', 'rows'):
+                print(f"  {key:<12} {row[key] if row[key] is not None else '-'}")
+            print(f"  {'size':<12} {_size(row['size'])}")
+            print("\nSubsystems:")
+            for s in subsystems:
+                print(f"  {s['name']:<12} {s['rows']:>10,} rows  ({s['source']})")
+            kinds = {}
+            for d in devices:
+                kinds.setdefault(d['kind'], []).append(d['name'])
+            if kinds:
+                print("\nDevices:")
+                for kind, names in kinds.items():
+                    print(f"  {kind:<12} {', '.join(names)}")
+            print()
+
+        else:
+            records = [{**dict(row), 'bytes': _size(row['bytes'] or 0)} for row in index.summary()]
+            write_records(records, ['cloud', 'host', 'captures', 'first', 'last', 'rows', 'bytes'], 'table',
+                          empty="No captures indexed (run update first)")
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
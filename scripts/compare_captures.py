@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+A/B comparison of performance captures
+
+Loads two or more captures - merged performance CSVs or raw
+pcc_collection.json files - aligns them by time since their first sample
+and compares every metric's distribution against the first capture (the
+baseline):
+
+    cpu_busy, cpu_user, cpu_system, cpu_iowait, cpu_steal   percent of capacity
+    mem_used_pct                                             percent of used + free + cache
+    disk_read_bps, disk_write_bps, net_rx_bps, net_tx_bps    bytes per second
+
+For each metric it reports the baseline and candidate median, mean and p95,
+the difference in means and in medians with bootstrap confidence
+intervals, and Cliff's delta (the probability that a candidate sample is
+larger than a baseline sample minus the reverse) with its interval and
+magnitude (negligible < 0.147 <= small < 0.33 <= medium < 0.474 <= large).
+A metric counts as changed when the delta interval excludes zero and the
+effect is at least small: with millions of samples almost any difference
+is significant, the effect size says whether it matters. The summary also
+shows the median difference per phase of the run (--segments), which tells
+a steady shift from one confined to start-up or a burst.
+
+Samples of a capture are correlated in time, so the bootstrap resamples
+blocks rather than single samples (moving-block bootstrap). It is fully
+vectorised: each capture is reduced once to per-block sums and per-block
+histograms over shared quantile bins, and every resample is a multinomial
+weight vector over the blocks, so resampled means, quantiles and deltas are
+matrix products whose size does not depend on the capture length.
+
+Parsed captures are cached as .npz (keyed by path, size and mtime), so a
+repeated comparison of multi-million-row CSVs loads in milliseconds.
+
+Environment:
+    PERFANALYSIS_CAPTURE_CACHE   parsed-capture cache (default ~/.cache/perfanalysis/captures)
+
+Usage:
+    python compare_captures.py Azure/results/20260107_191006/azure_pcc-test-01_performance.csv \\
+        Azure/results/20260107_234339_suse/suse-perf-01_performance.csv
+    python compare_captures.py Azure/results/20260107_191006/pcc_collection.json \\
+        OCI/results/20260107_094154/vm01_pcc_collection.json --skip 60 --duration 600
+    python compare_captures.py base.csv cand1.csv cand2.csv --label azure --label suse --label oci \\
+        --output diff.md
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+
+import sysbench_windows
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "perfanalysis" / "captures"
+# Bump when the parsed representation changes
+LOADER_VERSION = 2
+
+# (name, unit) in report order
+METRICS = [
+    ('cpu_busy', '%'),
+    ('cpu_user', '%'),
+    ('cpu_system', '%'),
+    ('cpu_iowait', '%'),
+    ('cpu_steal', '%'),
+    ('mem_used_pct', '%'),
+    ('disk_read_bps', 'B/s'),
+    ('disk_write_bps', 'B/s'),
+    ('net_rx_bps', 'B/s'),
+    ('net_tx_bps', 'B/s'),
+]
+
+# Merged CSV columns read per metric (hostname and other text columns are skipped)
+CSV_COLUMNS = ['timestamp', 'cpu_user', 'cpu_system', 'cpu_idle', 'cpu_iowait', 'cpu_steal',
+               'mem_used_kb', 'mem_free_kb', 'mem_cached_kb', 'disk_read_bytes', 'disk_write_bytes',
+               'net_rx_bytes', 'net_tx_bytes']
+
+# Cliff's delta magnitude thresholds (Romano et al.)
+MAGNITUDES = [(0.474, 'large'), (0.33, 'medium'), (0.147, 'small'), (0.0, 'negligible')]
+
+BOOTSTRAP_RESAMPLES = 1000
+# Blocks per capture for the bootstrap; samples per block grow with the capture
+MAX_BLOCKS = 2000
+HISTOGRAM_BINS = 512
+
+
+class Capture:
+    """Per-interval metric values of one capture, with time relative to its first sample."""
+
+    def __init__(self, path, label, timestamps, metrics):
+        self.path = str(path)
+        self.label = label
+        self.timestamps = timestamps
+        self.metrics = metrics
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1] - self.timestamps[0]) if len(self.timestamps) else 0.0
+
+    def window(self, skip, duration):
+        """Metric arrays for samples between skip and skip + duration seconds into the capture."""
+        relative = self.timestamps - self.timestamps[0]
+        keep = (relative >= skip) & (relative <= skip + duration)
+        return relative[keep] - skip, {name: values[keep] for name, values in self.metrics.items()}
+
+
+# ----------------------------------------------------------------- loading
+
+def read_merged_csv(path):
+    with open(path) as f:
+        header = f.readline().strip().split(',')
+    missing = [c for c in ('timestamp', 'cpu_idle') if c not in header]
+    if missing:
+        raise ValueError(f"{path}: not a merged performance CSV (no {', '.join(missing)} column)")
+    present = [c for c in CSV_COLUMNS if c in header]
+    data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2,
+                      usecols=[header.index(c) for c in present], dtype=np.float64)
+    column = lambda name: data[:, present.index(name)] if name in present else np.zeros(len(data))
+    order = np.argsort(column('timestamp'), kind='stable')
+    metrics = {
+        'cpu_busy': 100.0 - column('cpu_idle'),
+        'cpu_user': column('cpu_user'),
+        'cpu_system': column('cpu_system'),
+        'cpu_iowait': column('cpu_iowait'),
+        'cpu_steal': column('cpu_steal'),
+        'mem_used_pct': sysbench_windows.mem_used_pct(column('mem_used_kb'), column('mem_free_kb'),
+                                                      column('mem_cached_kb')),
+        'disk_read_bps': column('disk_read_bytes'),
+        'disk_write_bps': column('disk_write_bytes'),
+        'net_rx_bps': column('net_rx_bytes'),
+        'net_tx_bps': column('net_tx_bytes'),
+    }
+    return column('timestamp')[order], {name: values[order] for name, values in metrics.items()}
+
+
+def read_pcc(path):
+    """Per-interval rates from raw counters; each interval is stamped with its end."""
+    stamps, ticks, mem, disk, net, cpus = sysbench_windows.read_pcc_samples(path)
+    dt = np.maximum(np.diff(stamps), 1e-9)
+    delta = np.clip(np.diff(ticks, axis=0), 0, None)
+    total = np.maximum(delta.sum(axis=1), 1e-9)
+    pct = lambda *fields: delta[:, list(fields)].sum(axis=1) / total * 100
+    rate = lambda values: np.clip(np.diff(values), 0, None) / dt
+    metrics = {
+        'cpu_busy': 100.0 - pct(3),
+        'cpu_user': pct(0, 1),
+        'cpu_system': pct(2, 5, 6),
+        'cpu_iowait': pct(4),
+        'cpu_steal': pct(7),
+        'mem_used_pct': mem[1:],
+        'disk_read_bps': rate(disk[:, 0]),
+        'disk_write_bps': rate(disk[:, 1]),
+        'net_rx_bps': rate(net[:, 0]),
+        'net_tx_bps': rate(net[:, 1]),
+    }
+    return stamps[1:], metrics
+
+
+def cache_path(path, cache_dir):
+    stat = os.stat(path)
+    key = f"{Path(path).resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{LOADER_VERSION}"
+    return Path(cache_dir) / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.npz"
+
+
+def load_capture(path, label=None, cache_dir=None):
+    """Capture from a merged CSV or pcc_collection.json, through the .npz cache when cache_dir is set."""
+    cached = cache_path(path, cache_dir) if cache_dir else None
+    if cached is not None and cached.exists():
+        with np.load(cached) as data:
+            metrics = {name: data[name] for name, _ in METRICS}
+            timestamps = data['timestamps']
+    else:
+        reader = read_merged_csv if str(path).endswith('.csv') else read_pcc
+        timestamps, metrics = reader(path)
+        if cached is not None:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so an interrupted run never leaves a truncated entry
+            partial = cached.with_suffix('.partial.npz')
+            np.savez(partial, timestamps=timestamps, **metrics)
+            os.replace(partial, cached)
+    if len(timestamps) < 2:
+        raise ValueError(f"{path}: fewer than two samples")
+    return Capture(path, label or default_label(path), timestamps, metrics)
+
+
+def default_label(path):
+    path = Path(path)
+    return path.stem if path.stem not in ('pcc_collection',) else path.parent.name
+
+
+# --------------------------------------------------------------- statistics
+
+class Resampler:
+    """
+    Moving-block bootstrap of one sample series, reduced to per-block sums
+    and histograms so that resampling costs O(blocks x bins) whatever the
+    series length.
+    """
+
+    def __init__(self, values, edges, rng, resamples):
+        n = len(values)
+        self.blocks = max(1, min(MAX_BLOCKS, n // max(1, int(np.ceil(n ** (1 / 3))))))
+        block = np.minimum(np.arange(n) * self.blocks // max(n, 1), self.blocks - 1)
+        bins = len(edges) - 1
+        slot = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, bins - 1)
+        self.sums = np.bincount(block, weights=values, minlength=self.blocks)
+        self.counts = np.bincount(block, minlength=self.blocks).astype(np.float64)
+        self.histograms = np.bincount(block * bins + slot, minlength=self.blocks * bins
+                                      ).reshape(self.blocks, bins).astype(np.float64)
+        # Multinomial block counts per resample, drawn as block indices and counted per row
+        picks = rng.integers(0, self.blocks, size=(resamples, self.blocks))
+        picks += np.arange(resamples)[:, None] * self.blocks
+        self.weights = np.bincount(picks.ravel(), minlength=resamples * self.blocks
+                                   ).reshape(resamples, self.blocks).astype(np.float64)
+
+    def means(self):
+        return (self.weights @ self.sums) / np.maximum(self.weights @ self.counts, 1e-12)
+
+    def distributions(self):
+        """Resampled histograms, each normalised to 1 (resamples x bins)."""
+        h = self.weights @ self.histograms
+        return h / np.maximum(h.sum(axis=1, keepdims=True), 1e-12)
+
+    def full(self):
+        h = self.histograms.sum(axis=0)
+        return h / max(h.sum(), 1e-12)
+
+
+def binned_quantile(p, edges, q):
+    """q-quantile of histogram(s) p over edges, linear within the bin (rows of p vectorised)."""
+    p = np.atleast_2d(p)
+    cumulative = np.cumsum(p, axis=1)
+    j = np.minimum((cumulative < q).sum(axis=1), p.shape[1] - 1)
+    rows = np.arange(p.shape[0])
+    below = np.where(j > 0, cumulative[rows, j - 1], 0.0)
+    inside = np.where(p[rows, j] > 0, (q - below) / np.maximum(p[rows, j], 1e-12), 0.0)
+    return edges[j] + np.clip(inside, 0, 1) * (edges[j + 1] - edges[j])
+
+
+def binned_delta(pa, pb):
+    """Cliff's delta between histogram rows over the same bins (ties within a bin count as ties)."""
+    pa, pb = np.atleast_2d(pa), np.atleast_2d(pb)
+    below = np.cumsum(pa, axis=1) - pa
+    above = 1.0 - below - pa
+    return (pb * (below - above)).sum(axis=1)
+
+
+def cliffs_delta(a, b):
+    """
+    Exact Cliff's delta P(b > a) - P(b < a) of two sorted arrays, by binary
+    search of b's distinct values in a (metrics are often coarsely rounded,
+    so there are far fewer distinct values than samples).
+    """
+    first = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    values, counts = b[first], np.diff(np.r_[first, len(b)])
+    smaller = np.searchsorted(a, values, side='left')
+    larger = len(a) - np.searchsorted(a, values, side='right')
+    return float(((smaller - larger) * counts).sum() / (len(a) * len(b)))
+
+
+def sorted_quantile(values, q):
+    """Linear-interpolated q-quantile of an already sorted array (numpy's default method)."""
+    position = q * (len(values) - 1)
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return float(values[low] + (values[high] - values[low]) * (position - low))
+
+
+def magnitude(delta):
+    for threshold, name in MAGNITUDES:
+        if abs(delta) >= threshold:
+            return name
+    return 'negligible'
+
+
+def compare_metric(a, b, rng, resamples=BOOTSTRAP_RESAMPLES, alpha=0.05, bins=HISTOGRAM_BINS):
+    a = a[np.isfinite(a)]
+    b = b[np.isfinite(b)]
+    if len(a) < 2 or len(b) < 2:
+        return None
+    pooled = np.concatenate([a[:: max(1, len(a) // 50000)], b[:: max(1, len(b) // 50000)]])
+    edges = np.unique(np.quantile(pooled, np.linspace(0, 1, bins + 1)))
+    if len(edges) < 2:
+        edges = np.array([pooled[0] - 0.5, pooled[0] + 0.5])
+    edges[0] = min(edges[0], a.min(), b.min())
+    edges[-1] = max(edges[-1], a.max(), b.max()) + 1e-9
+
+    ra = Resampler(a, edges, rng, resamples)
+    rb = Resampler(b, edges, rng, resamples)
+    a, b = np.sort(a), np.sort(b)
+    lo, hi = alpha / 2, 1 - alpha / 2
+
+    mean_diff = float(b.mean() - a.mean())
+    mean_boot = rb.means() - ra.means()
+
+    da, db = ra.distributions(), rb.distributions()
+    fa, fb = ra.full(), rb.full()
+    median_a, median_b = sorted_quantile(a, 0.5), sorted_quantile(b, 0.5)
+    # Binned resamples, re-centred on the exact estimate (basic shift)
+    median_boot = binned_quantile(db, edges, 0.5) - binned_quantile(da, edges, 0.5)
+    median_center = (binned_quantile(fb, edges, 0.5) - binned_quantile(fa, edges, 0.5))[0]
+
+    delta = cliffs_delta(a, b)
+    delta_boot = binned_delta(da, db)
+    delta_center = binned_delta(fa, fb)[0]
+    delta_ci = np.clip(delta + np.quantile(delta_boot, [lo, hi]) - delta_center, -1, 1)
+
+    pooled_sd = np.sqrt(((len(a) - 1) * a.var(ddof=1) + (len(b) - 1) * b.var(ddof=1)) / (len(a) + len(b) - 2))
+    changed = (delta_ci[0] > 0 or delta_ci[1] < 0) and magnitude(delta) != 'negligible'
+    return {
+        'n_a': len(a), 'n_b': len(b),
+        'mean_a': float(a.mean()), 'mean_b': float(b.mean()),
+        'median_a': median_a, 'median_b': median_b,
+        'p95_a': sorted_quantile(a, 0.95), 'p95_b': sorted_quantile(b, 0.95),
+        'mean_diff': mean_diff,
+        'mean_diff_ci': [float(v) for v in np.quantile(mean_boot, [lo, hi])],
+        'mean_change_pct': mean_diff / abs(a.mean()) * 100 if a.mean() else None,
+        'median_diff': median_b - median_a,
+        'median_diff_ci': [float(median_b - median_a + v - median_center)
+                           for v in np.quantile(median_boot, [lo, hi])],
+        'cohens_d': mean_diff / pooled_sd if pooled_sd > 0 else 0.0,
+        'cliffs_delta': delta,
+        'cliffs_delta_ci': [float(v) for v in delta_ci],
+        'magnitude': magnitude(delta),
+        'changed': bool(changed),
+    }
+
+
+def phase_medians(relative, values, span, segments):
+    """Median per equal slice of the aligned span."""
+    slot = np.minimum((relative / max(span, 1e-9) * segments).astype(int), segments - 1)
+    return [float(np.nanmedian(values[slot == k])) if np.any(slot == k) else None for k in range(segments)]
+
+
+def compare(captures, skip=0.0, duration=None, segments=4, resamples=BOOTSTRAP_RESAMPLES,
+            alpha=0.05, seed=0):
+    """Each capture after the first against the first, over the same span of relative run time."""
+    span = duration or min(c.duration for c in captures) - skip
+    if span <= 0:
+        raise ValueError(f"--skip {skip:g}s leaves nothing of the shortest capture "
+                         f"({min(c.duration for c in captures):.0f}s)")
+    rng = np.random.default_rng(seed)
+    baseline = captures[0]
+    base_relative, base_values = baseline.window(skip, span)
+    report = {'baseline': baseline.label, 'span_s': span, 'skip_s': skip, 'alpha': alpha,
+              'resamples': resamples, 'comparisons': []}
+    for candidate in captures[1:]:
+        relative, values = candidate.window(skip, span)
+        metrics = {}
+        for name, unit in METRICS:
+            result = compare_metric(base_values[name], values[name], rng, resamples, alpha)
+            if result is None:
+                continue
+            base_phases = phase_medians(base_relative, base_values[name], span, segments)
+            cand_phases = phase_medians(relative, values[name], span, segments)
+            result['unit'] = unit
+            result['phase_median_diff'] = [None if a is None or b is None else b - a
+                                           for a, b in zip(base_phases, cand_phases)]
+            metrics[name] = result
+        report['comparisons'].append({'candidate': candidate.label, 'path': candidate.path,
+                                      'samples': len(relative), 'metrics': metrics})
+    return report
+
+
+# ------------------------------------------------------------------ output
+
+def human(value, unit):
+    if value is None:
+        return '-'
+    if unit == 'B/s':
+        for suffix, scale in (('G', 2**30), ('M', 2**20), ('K', 2**10)):
+            if abs(value) >= scale:
+                return f"{value / scale:.1f}{suffix}"
+        return f"{value:.0f}"
+    return f"{value:.2f}"
+
+
+def summary_rows(report):
+    for comparison in report['comparisons']:
+        for name, unit in METRICS:
+            m = comparison['metrics'].get(name)
+            if m is not None:
+                yield comparison, name, unit, m
+
+
+def print_report(report, captures):
+    print(f"\n{'='*100}")
+    print("CAPTURE COMPARISON")
+    print(f"{'='*100}")
+    width = max(len(capture.label) for capture in captures)
+    for capture in captures:
+        print(f"  {capture.label:<{width}} {len(capture.timestamps):>10,} samples  {capture.duration:>10,.0f}s  {capture.path}")
+    print(f"Aligned span: {report['span_s']:,.0f}s of relative run time"
+          + (f" after skipping {report['skip_s']:g}s" if report['skip_s'] else "")
+          + f"; {1 - report['alpha']:.0%} intervals from {report['resamples']} block-bootstrap resamples")
+
+    for comparison in report['comparisons']:
+        print(f"\n{comparison['candidate']} vs {report['baseline']}:")
+        print(f"  {'Metric':<15} {'Median A':>9} {'Median B':>9} {'Δ mean [CI]':>26} {'Δ%':>7} "
+              f"{'Cliff δ [CI]':>22} {'Effect':<10}")
+        for name, unit in METRICS:
+            m = comparison['metrics'].get(name)
+            if m is None:
+                continue
+            lo, hi = m['mean_diff_ci']
+            dlo, dhi = m['cliffs_delta_ci']
+            pct = f"{m['mean_change_pct']:+.1f}" if m['mean_change_pct'] is not None else '-'
+            mark = ' *' if m['changed'] else ''
+            print(f"  {name:<15} {human(m['median_a'], unit):>9} {human(m['median_b'], unit):>9} "
+                  f"{human(m['mean_diff'], unit):>8} [{human(lo, unit)}, {human(hi, unit)}]".ljust(59)
+                  + f" {pct:>7} {m['cliffs_delta']:+.3f} [{dlo:+.2f}, {dhi:+.2f}]  {m['magnitude']:<10}{mark}")
+        changed = [(name, unit, comparison['metrics'][name]) for name, unit in METRICS
+                   if name in comparison['metrics'] and comparison['metrics'][name]['changed']]
+        if changed:
+            print("  Δ median by phase of the run:")
+            for name, unit, m in changed:
+                print(f"    {name:<15} " + "  ".join(human(v, unit) for v in m['phase_median_diff']))
+        else:
+            print("  ✓ No metric changed by more than a negligible effect")
+    print(f"{'='*100}\n")
+
+
+def write_report(report, path):
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+    elif path.endswith('.md'):
+        with open(path, 'w') as f:
+            f.write(f"# Capture comparison (baseline: {report['baseline']})\n\n")
+            f.write(f"Aligned span {report['span_s']:,.0f}s; {1 - report['alpha']:.0%} block-bootstrap intervals.\n")
+            for comparison in report['comparisons']:
+                f.write(f"\n## {comparison['candidate']}\n\n")
+                f.write("| Metric | Median A | Median B | Δ mean [CI] | Δ% | Cliff's δ [CI] | Effect |\n")
+                f.write("|---|---:|---:|---:|---:|---:|---|\n")
+                for name, unit in METRICS:
+                    m = comparison['metrics'].get(name)
+                    if m is None:
+                        continue
+                    lo, hi = m['mean_diff_ci']
+                    dlo, dhi = m['cliffs_delta_ci']
+                    pct = f"{m['mean_change_pct']:+.1f}" if m['mean_change_pct'] is not None else '-'
+                    effect = f"**{m['magnitude']}**" if m['changed'] else m['magnitude']
+                    f.write(f"| {name} | {human(m['median_a'], unit)} | {human(m['median_b'], unit)} | "
+                            f"{human(m['mean_diff'], unit)} [{human(lo, unit)}, {human(hi, unit)}] | {pct} | "
+                            f"{m['cliffs_delta']:+.3f} [{dlo:+.2f}, {dhi:+.2f}] | {effect} |\n")
+    else:
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['baseline', 'candidate', 'metric', 'median_a', 'median_b', 'mean_a', 'mean_b',
+                             'mean_diff', 'mean_diff_lo', 'mean_diff_hi', 'median_diff', 'median_diff_lo',
+                             'median_diff_hi', 'cohens_d', 'cliffs_delta', 'cliffs_delta_lo', 'cliffs_delta_hi',
+                             'magnitude', 'changed'])
+            for comparison, name, unit, m in summary_rows(report):
+                writer.writerow([report['baseline'], comparison['candidate'], name, m['median_a'], m['median_b'],
+                                 m['mean_a'], m['mean_b'], m['mean_diff'], *m['mean_diff_ci'], m['median_diff'],
+                                 *m['median_diff_ci'], m['cohens_d'], m['cliffs_delta'], *m['cliffs_delta_ci'],
+                                 m['magnitude'], m['changed']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare captures metric by metric with effect sizes')
+    parser.add_argument('captures', nargs='+', help='Merged performance CSVs or pcc_collection.json; the first is the baseline')
+    parser.add_argument('--label', action='append', default=[], help='Name per capture, in order (repeatable)')
+    parser.add_argument('--skip', type=float, default=0.0, help='Seconds to drop at the start of every capture (warm-up)')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Seconds of relative run time to compare (default: the shortest capture)')
+    parser.add_argument('--segments', type=int, default=4, help='Phases of the run for the per-phase medians (default: 4)')
+    parser.add_argument('--resamples', type=int, default=BOOTSTRAP_RESAMPLES,
+                        help=f'Bootstrap resamples (default: {BOOTSTRAP_RESAMPLES})')
+    parser.add_argument('--alpha', type=float, default=0.05, help='1 - confidence level of the intervals (default: 0.05)')
+    parser.add_argument('--seed', type=int, default=0, help='Bootstrap seed (default: 0)')
+    parser.add_argument('--output', default=None, help='Write the diff summary here (.json, .md or .csv)')
+    parser.add_argument('--no-cache', action='store_true', help='Parse every capture again instead of using the cache')
+    args = parser.parse_args()
+
+    if np is None:
+        parser.error('compare_captures.py requires numpy (pip install numpy)')
+    if len(args.captures) < 2:
+        parser.error('give a baseline and at least one capture to compare with it')
+    if args.label and len(args.label) != len(args.captures):
+        parser.error(f"{len(args.label)} --label for {len(args.captures)} captures")
+
+    cache_dir = None if args.no_cache else (os.environ.get('PERFANALYSIS_CAPTURE_CACHE') or DEFAULT_CACHE_DIR)
+    started = time.time()
+    try:
+        captures = [load_capture(path, args.label[i] if args.label else None, cache_dir)
+                    for i, path in enumerate(args.captures)]
+        loaded = time.time()
+        report = compare(captures, args.skip, args.duration, args.segments, args.resamples, args.alpha, args.seed)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_report(report, captures)
+    print(f"Loaded in {loaded - started:.2f}s, compared in {time.time() - loaded:.2f}s")
+    if args.output:
+        write_report(report, args.output)
+        print(f"✓ Diff summary written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
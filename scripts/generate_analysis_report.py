@@ -3,26 +3,54 @@
 Generate Analysis Report using automated-Reporting R code
 
 This script:
-1. Takes an uploaded CSV file from XATbackend
+1. Takes an uploaded CSV file from XATbackend, or the original pcprocess
+   proc/* CSV tree of a capture
 2. Converts it to /proc format expected by automated-Reporting
-3. Runs the R markdown report generation in r-dev container
+   (a proc tree only gets the site/host columns added - every CPU, device
+   and interface is kept; the portal CSV path rebuilds single-device files
+   and is the fallback when the original tree is not available)
+3. Runs the R markdown report generation in r-dev container (or locally
+   with --executor local, see report_executor.py)
 4. Returns the PDF report path
 
+With --format html the R step is replaced by a self-contained HTML report
+(charts plus summary table) built from the precomputed aggregates in about
+a second, for instant previews; see report_html.py.
+
+Rendered PDFs are cached by content (input CSV, customised Rmd, renderer
+version), so re-running over an unchanged analysis returns the cached PDF
+without converting or rendering anything. See report_cache.py.
+
+Each run writes report_trace.json next to the PDF with wall time, CPU time,
+bytes and peak RSS for the cache lookup, convert, stage-in, render and stage-out stages.
+See report_trace.py.
+
 Usage:
-    python generate_analysis_report.py <csv_file_path> <output_dir>
+    python generate_analysis_report.py <csv_file_path|capture_dir> <output_dir> [--no-cache] [--cache-dir DIR]
+        [--hostname NAME] [--disk DEV] [--iface IFACE]
+        [--executor docker|local] [--rscript PATH] [--render-cmd CMD] [--template RMD]
+        [--format pdf|html] [--plot-points N]
 """
 
 import sys
 import os
 import csv
-import subprocess
-import shutil
+import argparse
 from pathlib import Path
 from datetime import datetime
-import tempfile
 
+from report_aggregates import DEFAULT_PLOT_POINTS, SIDECAR_DIRNAME, write_aggregates_sidecar
+from report_cache import ReportCache, report_cache_key
+from report_executor import DockerExecutor, LocalExecutor
+from report_html import HTML_RENDERER_VERSION, render_html_report
+from report_trace import StageTrace
+
+
+# Bump when the R render script or container toolchain changes so cached PDFs are invalidated
+RENDERER_VERSION = os.environ.get('PERFANALYSIS_RENDERER_VERSION', 'r-dev/rmarkdown-1')
 
-def convert_csv_to_proc_format(csv_file, output_dir):
+
+def convert_csv_to_proc_format(csv_file, output_dir, plot_points=DEFAULT_PLOT_POINTS):
     """
     Convert perfcollector2 CSV to sar/iostat-style format expected by automated-Reporting
 
@@ -39,6 +67,10 @@ def convert_csv_to_proc_format(csv_file, output_dir):
         - meminfo: Memory metrics (#site,host,timestamp,kbmemfree,kbavail,kbmemused,%memused,...)
         - diskstats: Disk I/O rates (#site,host,timestamp,DEV,tps,rtps,wtps,dtps,bread/s,bwrtn/s,...)
         - net/dev: Network throughput (#site,host,timestamp,IFACE,rxpck/s,txpck/s,rxkB/s,txkB/s,...)
+
+    Also writes the precomputed aggregates sidecar (proc/aggregates/, see
+    report_aggregates.py) with per-metric summaries and plot_points-sized
+    min/mean/max series, so the report need not scan the full-resolution files.
     """
 
     proc_dir = Path(output_dir) / "proc"
@@ -57,6 +89,15 @@ def convert_csv_to_proc_format(csv_file, output_dir):
     hostname = rows[0].get('hostname', 'unknown')
     site_id = 1
 
+    # Values as written below, collected for the aggregates sidecar
+    timestamps = [int(row['timestamp']) for row in rows]
+    series = {name: [] for name in (
+        'cpu_usr', 'cpu_system', 'cpu_iowait', 'cpu_idle',
+        'mem_used_kb', 'mem_used_pct', 'mem_cached_kb',
+        'disk_tps', 'disk_bread_s', 'disk_bwrtn_s',
+        'net_rxkB_s', 'net_txkB_s',
+    )}
+
     # Create stat file (CPU percentages in sar format)
     # Format: #site,host,timestamp,CPU,%usr,%nice,%system,%iowait,%steal,%idle
     with open(proc_dir / "stat", 'w') as f:
@@ -68,6 +109,10 @@ def convert_csv_to_proc_format(csv_file, output_dir):
             cpu_iowait = float(row.get('cpu_iowait', 0))
 
             f.write(f"{site_id},{hostname},{row['timestamp']},-1,{cpu_user},0,{cpu_system},{cpu_iowait},0,{cpu_idle}\n")
+            series['cpu_usr'].append(cpu_user)
+            series['cpu_system'].append(cpu_system)
+            series['cpu_iowait'].append(cpu_iowait)
+            series['cpu_idle'].append(cpu_idle)
 
     # Create meminfo file (memory metrics in sar format)
     # Format: #site,host,timestamp,kbmemfree,kbavail,kbmemused,%memused,kbbuffers,kbcached,kbcommit,%commit,kbactive,kbinact,kbdirty
@@ -83,6 +128,9 @@ def convert_csv_to_proc_format(csv_file, output_dir):
             pct_commit = 0  # Not available in perfcollector2
 
             f.write(f"{site_id},{hostname},{row['timestamp']},{mem_free},{mem_free},{mem_used},{pct_memused},0,{mem_cached},0,{pct_commit},0,0,0\n")
+            series['mem_used_kb'].append(mem_used)
+            series['mem_used_pct'].append(pct_memused)
+            series['mem_cached_kb'].append(mem_cached)
 
     # Create diskstats file (disk I/O in iostat format)
     # Format: #site,host,timestamp,DEV,tps,rtps,wtps,dtps,bread/s,bwrtn/s,bdscd/s
@@ -110,6 +158,9 @@ def convert_csv_to_proc_format(csv_file, output_dir):
             tps = (bread_rate + bwrtn_rate) / 2 if (bread_rate + bwrtn_rate) > 0 else 0
 
             f.write(f"{site_id},{hostname},{row['timestamp']},sda,{tps},0,0,0,{bread_rate},{bwrtn_rate},0\n")
+            series['disk_tps'].append(tps)
+            series['disk_bread_s'].append(bread_rate)
+            series['disk_bwrtn_s'].append(bwrtn_rate)
 
     # Create net/dev file (network throughput in sar format)
     # Format: #site,host,timestamp,IFACE,rxpck/s,txpck/s,rxkB/s,txkB/s,rxcmp/s,txcmp/s,rxmcst/s,%ifutil
@@ -134,246 +185,459 @@ def convert_csv_to_proc_format(csv_file, output_dir):
                     txkB_rate = 0
 
             f.write(f"{site_id},{hostname},{row['timestamp']},eth0,0,0,{rxkB_rate},{txkB_rate},0,0,0,0\n")
+            series['net_rxkB_s'].append(rxkB_rate)
+            series['net_txkB_s'].append(txkB_rate)
 
     print(f"✓ Converted CSV to sar/iostat format in {proc_dir}")
+
+    sidecar_dir = write_aggregates_sidecar(proc_dir, timestamps, series, plot_points)
+    print(f"✓ Wrote precomputed aggregates to {sidecar_dir}")
     return proc_dir
 
 
-def generate_r_report(proc_dir, machine_name, uuid, output_dir):
+# pcprocess output subsystems the report reads, relative to the proc root
+PROC_TREE_FILES = ['stat', 'meminfo', 'diskstats', 'net/dev']
+
+# Devices and interfaces never chosen as the report's primary disk / NIC
+IGNORED_DEVICE_PREFIXES = ('loop', 'ram', 'zram', 'sr', 'dm-')
+IGNORED_IFACE_PREFIXES = ('lo', 'veth', 'docker', 'br-', 'virbr')
+
+# Directory names that say nothing about the host when inferring it from a path
+GENERIC_CAPTURE_DIRS = {'csv', 'csv_sync', 'processed', 'proc'}
+
+
+def find_proc_root(input_path):
+    """Return the proc/ directory of a pcprocess CSV tree, or None if input_path isn't one."""
+    path = Path(input_path)
+    if not path.is_dir():
+        return None
+    for candidate in (path / 'proc', path):
+        if (candidate / 'stat').is_file() and (candidate / 'meminfo').is_file():
+            return candidate
+    return None
+
+
+def infer_hostname(input_path):
+    """Host name for a capture directory, skipping generic names like csv/ and processed/."""
+    path = Path(input_path).resolve()
+    while path.name in GENERIC_CAPTURE_DIRS and path.parent != path:
+        path = path.parent
+    return path.name or 'unknown'
+
+
+def pick_busiest(totals, ignored_prefixes):
+    """Name with the most traffic, skipping virtual devices; ties go to the shorter (whole-disk) name."""
+    candidates = [(total, -len(name), name) for name, total in totals.items()
+                  if not name.startswith(ignored_prefixes)]
+    if not candidates:
+        return None
+    return max(candidates)[2]
+
+
+def primary_devices(src_root, disk=None, iface=None):
     """
-    Generate R markdown report using automated-Reporting in r-dev container
+    The report's primary disk and interface (storeVol/netIface): the given
+    ones, else the busiest in diskstats / net/dev, else sda / eth0.
     """
+    for rel, name, rates, ignored in (('diskstats', 'DEV', ('bread/s', 'bwrtn/s'), IGNORED_DEVICE_PREFIXES),
+                                      ('net/dev', 'IFACE', ('rxkB/s', 'txkB/s'), IGNORED_IFACE_PREFIXES)):
+        chosen = disk if rel == 'diskstats' else iface
+        path = Path(src_root) / rel
+        if chosen or not path.is_file():
+            continue
+        totals = {}
+        with open(path, 'r') as f:
+            columns = f.readline().rstrip('\n').lstrip('#').split(',')
+            key, first, second = (columns.index(c) for c in (name,) + rates)
+            for line in f:
+                if not line.strip():
+                    continue
+                fields = line.rstrip('\n').split(',')
+                totals[fields[key]] = totals.get(fields[key], 0.0) + float(fields[first]) + float(fields[second])
+        chosen = pick_busiest(totals, ignored)
+        if rel == 'diskstats':
+            disk = chosen
+        else:
+            iface = chosen
+    return disk or 'sda', iface or 'eth0'
+
+
+def stage_proc_tree(input_dir, output_dir, hostname, plot_points=DEFAULT_PLOT_POINTS, disk=None, iface=None):
+    """
+    Stage an original pcprocess proc/* CSV tree for automated-Reporting
 
-    # The r-dev container mounts ./automated-Reporting at /workspace
-    # We need to copy the proc data directory to r-dev container
-    container_proc_dir = f"/workspace/temp_data/{uuid}/proc"
+    pcprocess already writes sar/iostat-style CSVs; automated-Reporting only
+    additionally expects leading #site,host columns. Each line is streamed
+    through with that prefix - values are not re-parsed or re-serialised and
+    every CPU, disk and interface is kept.
 
-    try:
-        # Copy proc directory to r-dev container
-        print(f"✓ Copying proc data to r-dev container...")
-
-        # Create temp_data directory in r-dev container
-        mkdir_result = subprocess.run(
-            ['docker', 'exec', 'perfanalysis-r-dev', 'mkdir', '-p', f'/workspace/temp_data/{uuid}'],
-            capture_output=True,
-            text=True
-        )
-
-        if mkdir_result.returncode != 0:
-            raise RuntimeError(f"Failed to create temp directory: {mkdir_result.stderr}")
-
-        # Copy the entire proc directory
-        cp_proc_result = subprocess.run(
-            ['docker', 'cp', str(proc_dir), f'perfanalysis-r-dev:/workspace/temp_data/{uuid}/'],
-            capture_output=True,
-            text=True
-        )
-
-        if cp_proc_result.returncode != 0:
-            raise RuntimeError(f"Failed to copy proc data to container: {cp_proc_result.stderr}")
-
-        print(f"✓ Proc data copied successfully")
-
-        # Read the original reporting.Rmd file from container and customize it
-        print(f"✓ Creating customized reporting.Rmd...")
-
-        # Read original Rmd from container
-        read_rmd_result = subprocess.run(
-            ['docker', 'exec', 'perfanalysis-r-dev', 'cat', '/workspace/reporting.Rmd'],
-            capture_output=True,
-            text=True
-        )
-
-        if read_rmd_result.returncode != 0:
-            raise RuntimeError(f"Failed to read reporting.Rmd: {read_rmd_result.stderr}")
-
-        original_rmd = read_rmd_result.stdout
-
-        # Replace hardcoded values with our actual values
-        # The original has these hardcoded values in the selectTheElements chunk:
-        # storeVol <- "sda"
-        # netIface <- "ens33"
-        # machName <- "machine001"
-        # UUID <- "0001-001-002"
-        # loc <- ("testData/proc/")
-
-        # Replace hardcoded values with our actual values
-        # Note: We keep machName as "machine001" to avoid breaking variable name dependencies
-        # The R markdown creates variables like "machine001_utilLegend" based on machName
-        customized_rmd = original_rmd.replace(
-            'storeVol <- "sda"',
-            'storeVol <- "sda"  # Customized for current analysis'
-        ).replace(
-            'netIface <- "ens33"',
-            'netIface <- "eth0"  # Customized for current analysis'
-        ).replace(
-            'UUID <- "0001-001-002"',
-            f'UUID <- "{uuid}"  # Customized for current analysis'
-        ).replace(
-            'loc <- ("testData/proc/")',
-            f'loc <- ("{container_proc_dir}/")'
-        )
-
-        # DON'T replace machName - keep it as "machine001" to avoid breaking variable name dependencies
-        # The R code creates dynamic variable names like {machName}_utilLegend which breaks if we change it
-
-        # Write customized Rmd to temp file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.Rmd', delete=False) as f:
-            f.write(customized_rmd)
-            temp_rmd_file = f.name
-
-        # Copy customized Rmd to container
-        cp_rmd_result = subprocess.run(
-            ['docker', 'cp', temp_rmd_file, f'perfanalysis-r-dev:/tmp/reporting_custom_{uuid}.Rmd'],
-            capture_output=True,
-            text=True
-        )
-
-        if cp_rmd_result.returncode != 0:
-            raise RuntimeError(f"Failed to copy customized Rmd: {cp_rmd_result.stderr}")
-
-        print(f"✓ Customized Rmd created with uuid={uuid}")
-        print(f"✓ Data location: {container_proc_dir}/")
-        print(f"✓ Note: machName kept as 'machine001' to preserve R variable naming")
-
-        # Create R script content (simplified - just render the customized Rmd)
-        r_script = f"""
-# Set working directory
-setwd("/workspace")
-
-# Activate renv environment (rmarkdown is installed there)
-if (file.exists("renv/activate.R")) {{
-    source("renv/activate.R")
-}}
-
-# Load required libraries
-library(rmarkdown)
-
-# Render the customized report
-tryCatch({{
-    render(
-        "/tmp/reporting_custom_{uuid}.Rmd",
-        output_file = "/tmp/report.pdf"
+    The primary disk and interface for the report (storeVol/netIface) are the
+    busiest ones in the data unless disk/iface are given.
+
+    Returns (proc_dir, disk, iface).
+    """
+    src_root = find_proc_root(input_dir)
+    if src_root is None:
+        raise ValueError(f"No proc/stat and proc/meminfo found under {input_dir}")
+
+    proc_dir = Path(output_dir) / "proc"
+    # Staging rewrites every file it reads, so it must never write into the capture itself
+    if proc_dir.resolve() == src_root.resolve() or src_root.resolve() in proc_dir.resolve().parents:
+        raise ValueError(f"Output directory {output_dir} would overwrite the capture's proc tree; "
+                         f"choose a directory outside {src_root}")
+    disk, iface = primary_devices(src_root, disk, iface)
+    site_id = 1
+    prefix = f"{site_id},{hostname},"
+
+    # Values collected for the aggregates sidecar, keyed by timestamp
+    cpu = {}
+    mem = {}
+    disk_rows = {}
+    net_rows = {}
+    indexes = {}
+
+    for rel in PROC_TREE_FILES:
+        src = src_root / rel
+        if not src.is_file():
+            print(f"Warning: {src} not found")
+            continue
+
+        dst = proc_dir / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(src, 'r') as fin, open(dst, 'w') as fout:
+            header = fin.readline().rstrip('\n')
+            columns = header.lstrip('#').split(',')
+            fout.write(f"#site,host,{header.lstrip('#')}\n")
+            idx = {name: i for i, name in enumerate(columns)}
+
+            for line in fin:
+                if not line.strip():
+                    continue
+                fout.write(prefix + line)
+
+                fields = line.rstrip('\n').split(',')
+                ts = int(fields[0])
+                if rel == 'stat':
+                    if fields[idx['CPU']] == '-1':
+                        cpu[ts] = fields
+                elif rel == 'meminfo':
+                    mem[ts] = fields
+                elif rel == 'diskstats':
+                    dev = fields[idx['DEV']]
+                    disk_rows.setdefault(dev, {})[ts] = fields
+                elif rel == 'net/dev':
+                    name = fields[idx['IFACE']]
+                    net_rows.setdefault(name, {})[ts] = fields
+
+        indexes[rel] = idx
+
+    print(f"✓ Staged proc tree from {src_root} (disk={disk}, iface={iface})")
+
+    timestamps = sorted(set(cpu) & set(mem))
+    if not timestamps:
+        raise ValueError(f"No matching stat/meminfo timestamps under {src_root}")
+
+    def column(rows, rel, name):
+        index = indexes[rel][name]
+        return [float(rows[ts][index]) if ts in rows else 0.0 for ts in timestamps]
+
+    disk_series = disk_rows.get(disk, {})
+    net_series = net_rows.get(iface, {})
+    series = {
+        'cpu_usr': column(cpu, 'stat', '%usr'),
+        'cpu_system': column(cpu, 'stat', '%system'),
+        'cpu_iowait': column(cpu, 'stat', '%iowait'),
+        'cpu_steal': column(cpu, 'stat', '%steal'),
+        'cpu_idle': column(cpu, 'stat', '%idle'),
+        'mem_used_kb': column(mem, 'meminfo', 'kbmemused'),
+        'mem_used_pct': column(mem, 'meminfo', '%memused'),
+        'mem_cached_kb': column(mem, 'meminfo', 'kbcached'),
+    }
+    if disk_series:
+        series['disk_tps'] = column(disk_series, 'diskstats', 'tps')
+        series['disk_bread_s'] = column(disk_series, 'diskstats', 'bread/s')
+        series['disk_bwrtn_s'] = column(disk_series, 'diskstats', 'bwrtn/s')
+    if net_series:
+        series['net_rxkB_s'] = column(net_series, 'net/dev', 'rxkB/s')
+        series['net_txkB_s'] = column(net_series, 'net/dev', 'txkB/s')
+
+    sidecar_dir = write_aggregates_sidecar(proc_dir, timestamps, series, plot_points)
+    print(f"✓ Wrote precomputed aggregates to {sidecar_dir}")
+    return proc_dir, disk, iface
+
+
+def input_size(input_path):
+    """Total bytes of a CSV file or a proc tree."""
+    path = Path(input_path)
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+    return path.stat().st_size
+
+
+def customize_rmd(original_rmd, uuid, data_dir, store_vol='sda', net_iface='eth0'):
+    """
+    Replace the hardcoded values in reporting.Rmd with our actual values
+
+    The original has these hardcoded values in the selectTheElements chunk:
+        storeVol <- "sda"
+        netIface <- "ens33"
+        machName <- "machine001"
+        UUID <- "0001-001-002"
+        loc <- ("testData/proc/")
+
+    aggLoc is added after loc so the report can read the precomputed
+    aggregates sidecar instead of the full-resolution files.
+    """
+    # Note: We keep machName as "machine001" to avoid breaking variable name dependencies
+    # The R markdown creates variables like "machine001_utilLegend" based on machName
+    return original_rmd.replace(
+        'storeVol <- "sda"',
+        f'storeVol <- "{store_vol}"  # Customized for current analysis'
+    ).replace(
+        'netIface <- "ens33"',
+        f'netIface <- "{net_iface}"  # Customized for current analysis'
+    ).replace(
+        'UUID <- "0001-001-002"',
+        f'UUID <- "{uuid}"  # Customized for current analysis'
+    ).replace(
+        'loc <- ("testData/proc/")',
+        f'loc <- ("{data_dir}/")\naggLoc <- ("{data_dir}/{SIDECAR_DIRNAME}/")  # Precomputed summaries and plot series'
     )
-    cat("SUCCESS: Report generated\\n")
-}}, error = function(e) {{
-    cat("ERROR:", conditionMessage(e), "\\n")
-    quit(status = 1)
-}})
-"""
 
-        # Write R script to temp file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.R', delete=False) as f:
-            f.write(r_script)
-            temp_r_script = f.name
-
-        # Copy the R script to r-dev container
-        print(f"✓ Running R report generation in r-dev container...")
-
-        cp_script_result = subprocess.run(
-            ['docker', 'cp', temp_r_script, 'perfanalysis-r-dev:/tmp/generate_report.R'],
-            capture_output=True,
-            text=True
-        )
-
-        if cp_script_result.returncode != 0:
-            raise RuntimeError(f"Failed to copy R script to container: {cp_script_result.stderr}")
-
-        # Execute R script in r-dev container with PATH set for TinyTeX
-        # Use bash -c to set PATH before running Rscript
-        result = subprocess.run(
-            ['docker', 'exec', 'perfanalysis-r-dev', 'bash', '-c', 'export PATH=/root/bin:$PATH && Rscript /tmp/generate_report.R'],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
-
-        if result.returncode != 0:
-            print(f"R script stderr: {result.stderr}")
-            print(f"R script stdout: {result.stdout}")
-            raise RuntimeError(f"R report generation failed: {result.stderr}")
-
-        print(f"✓ R report generated successfully")
-        print(f"R output: {result.stdout}")
-
-        # Copy the generated PDF from r-dev container to output directory
-        pdf_path = Path(output_dir) / "report.pdf"
-
-        cp_pdf_result = subprocess.run(
-            ['docker', 'cp', 'perfanalysis-r-dev:/tmp/report.pdf', str(pdf_path)],
-            capture_output=True,
-            text=True
-        )
-
-        if cp_pdf_result.returncode != 0:
-            raise RuntimeError(f"Failed to copy PDF from container: {cp_pdf_result.stderr}")
-
-        if not pdf_path.exists():
-            raise FileNotFoundError(f"Generated PDF not found at {pdf_path}")
-
-        print(f"✓ PDF copied to {pdf_path}")
-        return pdf_path
-
-    finally:
-        # Clean up temp files on host
-        if 'temp_r_script' in locals() and os.path.exists(temp_r_script):
-            os.unlink(temp_r_script)
-        if 'temp_rmd_file' in locals() and os.path.exists(temp_rmd_file):
-            os.unlink(temp_rmd_file)
-
-        # Clean up files in r-dev container
-        subprocess.run(
-            ['docker', 'exec', 'perfanalysis-r-dev', 'rm', '-rf', f'/workspace/temp_data/{uuid}'],
-            capture_output=True
-        )
-        subprocess.run(
-            ['docker', 'exec', 'perfanalysis-r-dev', 'rm', '-f', '/tmp/generate_report.R', '/tmp/report.pdf', f'/tmp/reporting_custom_{uuid}.Rmd'],
-            capture_output=True
-        )
 
+def _cache_input(input_path):
+    """What to hash for an input: the proc CSVs stage_proc_tree reads, or the CSV file itself."""
+    proc_root = find_proc_root(input_path)
+    if proc_root is not None:
+        return proc_root, PROC_TREE_FILES
+    return input_path, None
 
-def main():
-    if len(sys.argv) < 3:
-        print("Usage: python generate_analysis_report.py <csv_file_path> <output_dir>")
-        sys.exit(1)
 
-    csv_file = sys.argv[1]
-    output_dir = sys.argv[2]
+def report_cache_key_for(input_path, original_rmd, executor, machine_name, store_vol='sda', net_iface='eth0',
+                         plot_points=DEFAULT_PLOT_POINTS):
+    """
+    Cache key for a report: input data contents, customised Rmd, renderer version and host name.
+
+    The uuid and data location differ on every run, so they are left as
+    placeholders when customising the Rmd for the key; the resolved
+    disk/interface go in as they will be rendered. The host name is written
+    into every staged row. The executor is part of the renderer version so a
+    stub render never satisfies a real one.
+    """
+    rmd_text = customize_rmd(original_rmd, '{uuid}', '{data_dir}', store_vol, net_iface)
+    path, files = _cache_input(input_path)
+    return report_cache_key(path, rmd_text, f"{RENDERER_VERSION}/{executor.version}/plot{plot_points}",
+                            files, [machine_name])
+
+
+def html_cache_key_for(input_path, machine_name, plot_points=DEFAULT_PLOT_POINTS):
+    """Cache key for an HTML report: input data contents, HTML renderer version and host name (the title)."""
+    path, files = _cache_input(input_path)
+    return report_cache_key(path, '', f"{HTML_RENDERER_VERSION}/plot{plot_points}", files, [machine_name])
+
+
+def generate_html_report(proc_dir, machine_name, output_dir, trace=None):
+    """
+    Generate the self-contained HTML report from the aggregates sidecar
+
+    No container, R or LaTeX is involved; see report_html.py.
+    """
+    if trace is None:
+        trace = StageTrace()
+
+    html_path = Path(output_dir) / "report.html"
+    with trace.stage('render'):
+        render_html_report(proc_dir, html_path, f"Performance Analysis: {machine_name}")
+    trace.add_bytes('render', html_path.stat().st_size)
+
+    print(f"✓ HTML report generated at {html_path}")
+    return html_path
+
+
+def generate_r_report(proc_dir, machine_name, uuid, output_dir, original_rmd=None, executor=None, trace=None,
+                      store_vol='sda', net_iface='eth0'):
+    """
+    Generate R markdown report using automated-Reporting
+
+    Rendering is delegated to a report executor (see report_executor.py);
+    by default the r-dev container.
+    """
+    if executor is None:
+        executor = DockerExecutor()
+
+    print(f"✓ Creating customized reporting.Rmd...")
+
+    if original_rmd is None:
+        original_rmd = executor.read_template()
+
+    data_dir = executor.data_location(uuid, proc_dir)
+    customized_rmd = customize_rmd(original_rmd, uuid, data_dir, store_vol, net_iface)
+
+    # DON'T replace machName - keep it as "machine001" to avoid breaking variable name dependencies
+    # The R code creates dynamic variable names like {machName}_utilLegend which breaks if we change it
+    print(f"✓ Customized Rmd created with uuid={uuid}")
+    print(f"✓ Data location: {data_dir}/")
+    print(f"✓ Note: machName kept as 'machine001' to preserve R variable naming")
+
+    pdf_path = Path(output_dir) / "report.pdf"
+    executor.render(uuid, proc_dir, customized_rmd, pdf_path, trace)
+
+    if not pdf_path.exists():
+        raise FileNotFoundError(f"Generated PDF not found at {pdf_path}")
+
+    print(f"✓ R report generated successfully ({executor.name})")
+    print(f"✓ PDF copied to {pdf_path}")
+    return pdf_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate analysis report using automated-Reporting')
+    parser.add_argument('csv_file', metavar='input',
+                        help='Uploaded performance CSV, or a capture directory with the original pcprocess proc/* CSVs')
+    parser.add_argument('output_dir', help='Directory to write report.pdf into')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always render, bypassing the report cache')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Report cache directory (default: $PERFANALYSIS_REPORT_CACHE or ~/.cache/perfanalysis/reports)')
+    parser.add_argument('--format', choices=['pdf', 'html'], default='pdf',
+                        help='pdf renders with R (minutes); html is a self-contained preview in about a second '
+                             '(default: pdf)')
+    parser.add_argument('--hostname', default=None,
+                        help='Host name for a proc tree input (default: inferred from the capture directory)')
+    parser.add_argument('--disk', default=None,
+                        help='Primary disk for a proc tree input (default: busiest device)')
+    parser.add_argument('--iface', default=None,
+                        help='Primary interface for a proc tree input (default: busiest interface)')
+    parser.add_argument('--plot-points', type=int, default=DEFAULT_PLOT_POINTS,
+                        help=f'Buckets in the precomputed plot series (default: {DEFAULT_PLOT_POINTS})')
+    parser.add_argument('--executor', choices=['docker', 'local'], default='docker',
+                        help='Where to render: r-dev container or local Rscript (default: docker)')
+    parser.add_argument('--reporting-dir', default=None,
+                        help='automated-Reporting checkout for --executor local '
+                             '(default: $PERFANALYSIS_REPORTING_DIR or ./automated-Reporting)')
+    parser.add_argument('--rscript', default='Rscript',
+                        help='Rscript binary for --executor local (default: Rscript)')
+    parser.add_argument('--render-cmd', default=None,
+                        help='Stub renderer for --executor local, run as "<cmd> <rmd> <pdf>" instead of Rscript')
+    parser.add_argument('--template', default=None,
+                        help='reporting.Rmd to customise for --executor local (default: <reporting-dir>/reporting.Rmd)')
+
+    args = parser.parse_args()
+
+    csv_file = args.csv_file
+    output_dir = args.output_dir
 
     # Validate inputs
     if not os.path.exists(csv_file):
         print(f"Error: CSV file not found: {csv_file}")
         sys.exit(1)
 
+    # A capture directory goes straight to the renderer; the portal CSV is the fallback
+    proc_root = find_proc_root(csv_file)
+    if os.path.isdir(csv_file) and proc_root is None:
+        print(f"Error: no proc/stat and proc/meminfo found under {csv_file}")
+        sys.exit(1)
+
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
     # Extract machine name and generate UUID
-    machine_name = Path(csv_file).stem
+    if proc_root is not None:
+        machine_name = args.hostname or infer_hostname(csv_file)
+    else:
+        machine_name = Path(csv_file).stem
     uuid = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     print(f"Generating analysis report for {machine_name}")
-    print(f"Input CSV: {csv_file}")
+    print(f"Input {'proc tree' if proc_root is not None else 'CSV'}: {csv_file}")
     print(f"Output directory: {output_dir}")
 
-    # Step 1: Convert CSV to /proc format
+    if args.executor == 'local':
+        executor = LocalExecutor(args.reporting_dir, args.rscript, args.render_cmd, args.template)
+    else:
+        executor = DockerExecutor()
+
+    report_name = f"report.{args.format}"
+    trace = StageTrace(uuid=uuid, input=os.path.abspath(csv_file), input_bytes=input_size(csv_file),
+                       format=args.format,
+                       executor=executor.version if args.format == 'pdf' else HTML_RENDERER_VERSION,
+                       cache_hit=False)
+
+    # The primary disk and interface are part of the report, so choose them before the cache lookup
+    store_vol, net_iface = 'sda', 'eth0'
+    if proc_root is not None:
+        store_vol, net_iface = primary_devices(proc_root, args.disk, args.iface)
+
+    # Step 0: Return the cached report if neither the data nor the report template changed
+    cache = None
+    cache_key = None
+    original_rmd = None
+    if not args.no_cache:
+        with trace.stage('cache'):
+            try:
+                cache = ReportCache(args.cache_dir)
+                if args.format == 'html':
+                    cache_key = html_cache_key_for(csv_file, machine_name, args.plot_points)
+                else:
+                    original_rmd = executor.read_template()
+                    cache_key = report_cache_key_for(csv_file, original_rmd, executor, machine_name,
+                                                     store_vol, net_iface, args.plot_points)
+            except Exception as e:
+                print(f"Warning: report cache unavailable, rendering without it: {e}")
+                cache = None
+
+            report_path = None
+            if cache is not None:
+                report_path = cache.get(cache_key, Path(output_dir) / report_name, f".{args.format}")
+
+        if report_path is not None:
+            trace.info['cache_hit'] = True
+            trace.write(output_dir)
+            print(f"✓ Report cache hit ({cache_key[:12]})")
+            print(f"✓ Report successfully generated: {report_path}")
+            print(str(report_path))  # Output path for parent process
+            return
+
+    # Step 1: Convert CSV (or stage the original proc tree) to /proc format
     try:
-        proc_dir = convert_csv_to_proc_format(csv_file, output_dir)
+        with trace.stage('convert'):
+            if proc_root is not None:
+                proc_dir, store_vol, net_iface = stage_proc_tree(
+                    csv_file, output_dir, machine_name, args.plot_points, store_vol, net_iface
+                )
+            else:
+                proc_dir = convert_csv_to_proc_format(csv_file, output_dir, args.plot_points)
+        trace.add_bytes('convert', sum(f.stat().st_size for f in proc_dir.rglob('*') if f.is_file()))
     except Exception as e:
         print(f"Error converting CSV: {e}")
         sys.exit(1)
 
-    # Step 2: Generate R report
+    # Step 2: Generate the HTML preview or the R report
     try:
-        pdf_path = generate_r_report(proc_dir, machine_name, uuid, output_dir)
-        print(f"✓ Report successfully generated: {pdf_path}")
-        print(str(pdf_path))  # Output path for parent process
+        if args.format == 'html':
+            report_path = generate_html_report(proc_dir, machine_name, output_dir, trace)
+        else:
+            report_path = generate_r_report(proc_dir, machine_name, uuid, output_dir, original_rmd, executor, trace,
+                                            store_vol, net_iface)
     except Exception as e:
-        print(f"Error generating R report: {e}")
+        print(f"Error generating {args.format} report: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
 
+    if cache is not None:
+        try:
+            cache.put(cache_key, report_path, f".{args.format}")
+            print(f"✓ Report cached ({cache_key[:12]})")
+        except OSError as e:
+            print(f"Warning: failed to cache report: {e}")
+
+    trace_path = trace.write(output_dir)
+    print(f"✓ Stage trace written to {trace_path}")
+    print(f"✓ Report successfully generated: {report_path}")
+    print(str(report_path))  # Output path for parent process
+
 
 if __name__ == "__main__":
     main()
@@ -2,6 +2,21 @@
 """
 Generate synthetic performance data for testing PerfAnalysis
 Works on any platform (macOS, Linux, Windows)
+
+--bulk generates whole columns per chunk with a seeded NumPy RNG and
+streams CSV or JSON-lines straight to disk, for benchmark fixtures of
+millions of samples in fixed memory (requires numpy).
+
+--hosts N --days D generates a whole fleet: hosts are split across a
+process pool, each host gets its own seed derived from (--seed, host index)
+and its own file, and a manifest lists every file with its checksum.
+Output is byte-for-byte identical for any --workers value.
+
+--fixture pcc|container|proc-csv writes the collector wire formats instead
+of the portal CSV (pcc_collection.json with raw /proc text,
+container_collection.json, or a pcprocess proc/* CSV tree; see
+pcc_fixtures.py), sized by --samples/--duration or --target-size, with
+--cpus/--disks/--ifaces/--containers controlling the width of each sample.
 """
 import csv
 import json
@@ -10,7 +25,39 @@ import time
 import argparse
 from datetime import datetime, timedelta
 import os
+import hashlib
 import platform
+from concurrent.futures import ProcessPoolExecutor
+
+import pcc_fixtures
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for --bulk
+    np = None
+
+
+# Base CPU user % and its variation per load scenario
+SCENARIOS = {
+    'normal': {'cpu_base': 25, 'cpu_var': 10},
+    'light': {'cpu_base': 15, 'cpu_var': 5},
+    'medium': {'cpu_base': 40, 'cpu_var': 15},
+    'heavy': {'cpu_base': 70, 'cpu_var': 20},
+    'stress': {'cpu_base': 95, 'cpu_var': 5}
+}
+
+CSV_FIELDNAMES = [
+    'timestamp', 'hostname',
+    'cpu_user', 'cpu_system', 'cpu_idle', 'cpu_iowait',
+    'mem_total_kb', 'mem_used_kb', 'mem_free_kb', 'mem_cached_kb',
+    'disk_read_bytes', 'disk_write_bytes',
+    'net_rx_bytes', 'net_tx_bytes'
+]
+
+# Samples generated per chunk in --bulk mode; bounds memory regardless of total size
+DEFAULT_CHUNK_SIZE = 100000
+
+SIZE_UNITS = {'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4}
 
 
 def generate_cpu_metrics(base_user=25, base_system=10, variation=15):
@@ -75,15 +122,7 @@ def generate_network_metrics():
 def generate_sample(timestamp, hostname, scenario='normal'):
     """Generate a complete performance sample."""
     # Adjust base values based on scenario
-    scenarios = {
-        'normal': {'cpu_base': 25, 'cpu_var': 10},
-        'light': {'cpu_base': 15, 'cpu_var': 5},
-        'medium': {'cpu_base': 40, 'cpu_var': 15},
-        'heavy': {'cpu_base': 70, 'cpu_var': 20},
-        'stress': {'cpu_base': 95, 'cpu_var': 5}
-    }
-
-    config = scenarios.get(scenario, scenarios['normal'])
+    config = SCENARIOS.get(scenario, SCENARIOS['normal'])
 
     cpu = generate_cpu_metrics(config['cpu_base'], 10, config['cpu_var'])
     memory = generate_memory_metrics()
@@ -103,15 +142,7 @@ def generate_sample(timestamp, hostname, scenario='normal'):
 def export_to_csv(samples, filename):
     """Export samples to CSV format (XATbackend compatible)."""
     with open(filename, 'w', newline='') as f:
-        fieldnames = [
-            'timestamp', 'hostname',
-            'cpu_user', 'cpu_system', 'cpu_idle', 'cpu_iowait',
-            'mem_total_kb', 'mem_used_kb', 'mem_free_kb', 'mem_cached_kb',
-            'disk_read_bytes', 'disk_write_bytes',
-            'net_rx_bytes', 'net_tx_bytes'
-        ]
-
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
         writer.writeheader()
 
         for sample in samples:
@@ -144,6 +175,103 @@ def export_to_json(samples, filename):
     return filename
 
 
+def generate_columns(rng, timestamps, scenario='normal', total_mb=16384):
+    """
+    Generate one chunk of samples as NumPy columns.
+
+    Same distributions as generate_sample(), drawn for the whole chunk at once.
+    """
+    n = len(timestamps)
+    config = SCENARIOS.get(scenario, SCENARIOS['normal'])
+    base_user, base_system, variation = config['cpu_base'], 10, config['cpu_var']
+
+    cpu_user = np.clip(base_user + rng.uniform(-variation, variation, n), 0, 100).round(2)
+    cpu_system = np.clip(base_system + rng.uniform(-variation/2, variation/2, n), 0, 100).round(2)
+    cpu_idle = np.maximum(0, 100 - cpu_user - cpu_system).round(2)
+    cpu_iowait = rng.uniform(0, 5, n).round(2)
+
+    total_kb = total_mb * 1024
+    used_kb = (total_kb * rng.uniform(0.4, 0.8, n)).astype(np.int64)
+
+    return {
+        'timestamp': timestamps,
+        'cpu_user': cpu_user,
+        'cpu_system': cpu_system,
+        'cpu_idle': cpu_idle,
+        'cpu_iowait': cpu_iowait,
+        'mem_total_kb': np.full(n, total_kb, dtype=np.int64),
+        'mem_used_kb': used_kb,
+        'mem_free_kb': total_kb - used_kb,
+        'mem_cached_kb': (total_kb * rng.uniform(0.1, 0.3, n)).astype(np.int64),
+        'disk_read_bytes': rng.integers(1000000, 10000000, n, endpoint=True),
+        'disk_write_bytes': rng.integers(500000, 5000000, n, endpoint=True),
+        'read_ops': rng.integers(100, 1000, n, endpoint=True),
+        'write_ops': rng.integers(50, 500, n, endpoint=True),
+        'net_rx_bytes': rng.integers(1000000, 50000000, n, endpoint=True),
+        'net_tx_bytes': rng.integers(500000, 25000000, n, endpoint=True),
+        'rx_packets': rng.integers(1000, 50000, n, endpoint=True),
+        'tx_packets': rng.integers(500, 25000, n, endpoint=True),
+        'rx_errors': rng.integers(0, 10, n, endpoint=True),
+        'tx_errors': rng.integers(0, 5, n, endpoint=True),
+    }
+
+
+def _row_template(hostname, fmt):
+    """%-format template for one output line and the column order it consumes."""
+    host = hostname.replace('%', '%%')
+    if fmt == 'csv':
+        columns = [c for c in CSV_FIELDNAMES if c != 'hostname']
+        template = '%d,' + host + ',%.2f,%.2f,%.2f,%.2f,%d,%d,%d,%d,%d,%d,%d,%d'
+        return template, columns
+
+    # JSON-lines with the same nested layout as generate_sample()
+    host_json = json.dumps(hostname).replace('%', '%%')
+    columns = ['timestamp', 'cpu_user', 'cpu_system', 'cpu_idle', 'cpu_iowait',
+               'mem_total_kb', 'mem_used_kb', 'mem_free_kb', 'mem_cached_kb',
+               'disk_read_bytes', 'disk_write_bytes', 'read_ops', 'write_ops',
+               'net_rx_bytes', 'net_tx_bytes', 'rx_packets', 'tx_packets', 'rx_errors', 'tx_errors']
+    template = (
+        '{"timestamp":%d,"hostname":' + host_json + ','
+        '"cpu":{"user":%.2f,"system":%.2f,"idle":%.2f,"iowait":%.2f},'
+        '"memory":{"total_kb":%d,"used_kb":%d,"free_kb":%d,"cached_kb":%d},'
+        '"disks":[{"device":"sda","read_bytes":%d,"write_bytes":%d,"read_ops":%d,"write_ops":%d}],'
+        '"network":[{"interface":"eth0","rx_bytes":%d,"tx_bytes":%d,"rx_packets":%d,"tx_packets":%d,'
+        '"rx_errors":%d,"tx_errors":%d}]}'
+    )
+    return template, columns
+
+
+def export_bulk(filename, fmt, num_samples, start_time, interval, hostname,
+                scenario='normal', seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream num_samples synthetic samples to filename as CSV or JSON-lines.
+
+    Columns are generated chunk_size samples at a time from a seeded RNG, so
+    memory stays flat and the same seed, chunk size and start time always
+    produce the same file.
+    """
+    if np is None:
+        raise RuntimeError("--bulk requires numpy (pip install numpy)")
+
+    rng = np.random.default_rng(seed)
+    template, columns = _row_template(hostname, fmt)
+
+    with open(filename, 'w', newline='') as f:
+        if fmt == 'csv':
+            f.write(','.join(CSV_FIELDNAMES) + '\n')
+
+        for start in range(0, num_samples, chunk_size):
+            count = min(chunk_size, num_samples - start)
+            timestamps = start_time + (np.arange(start, start + count, dtype=np.int64) * interval)
+            chunk = generate_columns(rng, timestamps, scenario)
+
+            rows = zip(*[chunk[c].tolist() for c in columns])
+            f.write('\n'.join(map(template.__mod__, rows)))
+            f.write('\n')
+
+    return filename
+
+
 def print_statistics(samples):
     """Print statistics about generated data."""
     if not samples:
@@ -170,6 +298,199 @@ def print_statistics(samples):
     print("="*60 + "\n")
 
 
+def run_bulk(args, hostname):
+    """Generate --bulk output files and report the achieved rate."""
+    num_samples = args.samples if args.samples is not None else args.duration // args.interval
+    if args.start_time is not None:
+        start_time = args.start_time
+    else:
+        start_time = int(time.time()) - num_samples * args.interval
+    timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    print(f"\nBulk generating {num_samples:,} samples...")
+    print(f"  Scenario:       {args.scenario}")
+    print(f"  Interval:       {args.interval}s")
+    print(f"  Hostname:       {hostname}")
+    print(f"  Seed:           {args.seed}")
+    print(f"  Chunk size:     {args.chunk_size:,}")
+
+    outputs = []
+    if args.format in ['csv', 'both']:
+        outputs.append(('csv', os.path.join(args.output_dir, f'performance_data_{timestamp_str}.csv')))
+    if args.format in ['json', 'both']:
+        outputs.append(('json', os.path.join(args.output_dir, f'performance_data_{timestamp_str}.jsonl')))
+
+    for fmt, filename in outputs:
+        started = time.perf_counter()
+        export_bulk(filename, fmt, num_samples, start_time, args.interval, hostname,
+                    args.scenario, args.seed, args.chunk_size)
+        elapsed = time.perf_counter() - started
+        rate = num_samples / elapsed if elapsed > 0 else 0
+        print(f"✓ {fmt.upper()} exported: {filename} ({os.path.getsize(filename)} bytes, "
+              f"{elapsed:.2f}s, {rate:,.0f} samples/s)")
+
+
+def _fleet_host(task):
+    """Worker: generate one fleet host's file and return its manifest entry."""
+    (index, hostname, path, fmt, num_samples, start_time, interval,
+     scenario, base_seed, chunk_size) = task
+
+    # Seed depends only on the base seed and host index, never on worker assignment
+    seed = np.random.SeedSequence([base_seed, index])
+    export_bulk(path, fmt, num_samples, start_time, interval, hostname, scenario, seed, chunk_size)
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+
+    return {
+        'index': index,
+        'hostname': hostname,
+        'file': os.path.basename(path),
+        'samples': num_samples,
+        'bytes': os.path.getsize(path),
+        'sha256': digest.hexdigest(),
+    }
+
+
+def run_fleet(args):
+    """Generate one file per host for --hosts/--days across a process pool, plus a manifest."""
+    if np is None:
+        raise RuntimeError("--hosts requires numpy (pip install numpy)")
+
+    fmt = 'json' if args.format == 'json' else 'csv'
+    ext = 'jsonl' if fmt == 'json' else 'csv'
+    samples_per_host = args.days * 86400 // args.interval
+    base_seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % (2**63))
+    if args.start_time is not None:
+        start_time = args.start_time
+    else:
+        # Midnight UTC, so a rerun the same day with the same seed reproduces the fleet
+        start_time = (int(time.time()) // 86400 - args.days) * 86400
+    prefix = args.hostname or 'fleet-host'
+    width = max(5, len(str(args.hosts - 1)))
+
+    hosts_dir = os.path.join(args.output_dir, 'hosts')
+    os.makedirs(hosts_dir, exist_ok=True)
+
+    tasks = []
+    for index in range(args.hosts):
+        hostname = f"{prefix}-{index:0{width}d}"
+        path = os.path.join(hosts_dir, f"{hostname}.{ext}")
+        tasks.append((index, hostname, path, fmt, samples_per_host, start_time, args.interval,
+                      args.scenario, base_seed, args.chunk_size))
+
+    workers = args.workers or os.cpu_count() or 1
+    total_samples = samples_per_host * args.hosts
+
+    print(f"\nFleet generating {args.hosts:,} hosts x {args.days} days "
+          f"({samples_per_host:,} samples/host, {total_samples:,} total)...")
+    print(f"  Scenario:       {args.scenario}")
+    print(f"  Interval:       {args.interval}s")
+    print(f"  Format:         {ext}")
+    print(f"  Seed:           {base_seed}")
+    print(f"  Workers:        {workers}")
+
+    started = time.perf_counter()
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, entry in enumerate(pool.map(_fleet_host, tasks, chunksize=max(1, len(tasks) // (workers * 8)))):
+            entries.append(entry)
+            if (i + 1) % 100 == 0 or (i + 1) == len(tasks):
+                print(f"  Generated {i + 1}/{len(tasks)} hosts... ({(i+1)/len(tasks)*100:.1f}%)")
+    elapsed = time.perf_counter() - started
+
+    # Everything in the manifest is derived from the arguments, so it is reproducible too
+    manifest = {
+        'hosts': args.hosts,
+        'days': args.days,
+        'interval': args.interval,
+        'scenario': args.scenario,
+        'format': ext,
+        'seed': base_seed,
+        'start_time': start_time,
+        'chunk_size': args.chunk_size,
+        'samples_per_host': samples_per_host,
+        'total_samples': total_samples,
+        'total_bytes': sum(e['bytes'] for e in entries),
+        'files': entries,
+    }
+    manifest_path = os.path.join(args.output_dir, 'manifest.json')
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+
+    rate = total_samples / elapsed if elapsed > 0 else 0
+    print(f"✓ Fleet written to {hosts_dir} ({manifest['total_bytes']:,} bytes, "
+          f"{elapsed:.2f}s, {rate:,.0f} samples/s)")
+    print(f"✓ Manifest: {manifest_path}")
+
+
+def parse_size(text):
+    """Parse a byte size like 500M or 10G (binary units) for --target-size."""
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def run_fixture(args, hostname):
+    """Generate a --fixture wire-format capture under <output-dir>/<hostname>/."""
+    if np is None:
+        raise RuntimeError("--fixture requires numpy (pip install numpy)")
+
+    target_bytes = parse_size(args.target_size) if args.target_size else None
+    if target_bytes is not None and args.samples is None:
+        num_samples = None
+        span = 0
+    else:
+        num_samples = args.samples if args.samples is not None else args.duration // args.interval
+        span = num_samples * args.interval
+    start_time = args.start_time if args.start_time is not None else int(time.time()) - span
+    scenario = SCENARIOS[args.scenario]
+    rng = np.random.default_rng(args.seed)
+
+    capture_dir = os.path.join(args.output_dir, hostname)
+    os.makedirs(capture_dir, exist_ok=True)
+
+    limit = f"{num_samples:,} samples" if num_samples is not None else "unbounded"
+    if target_bytes is not None:
+        limit += f", up to {target_bytes:,} bytes"
+    print(f"\nGenerating {args.fixture} fixture ({limit})...")
+    print(f"  Scenario:       {args.scenario}")
+    print(f"  Interval:       {args.interval}s")
+    print(f"  Hostname:       {hostname}")
+    print(f"  Seed:           {args.seed}")
+    if args.fixture == 'container':
+        print(f"  Containers:     {args.containers}")
+    else:
+        print(f"  CPUs/disks/NICs: {args.cpus}/{args.disks}/{args.ifaces}")
+
+    started = time.perf_counter()
+    if args.fixture == 'container':
+        model = pcc_fixtures.ContainerModel(rng, args.containers, args.interval, scenario)
+        output = os.path.join(capture_dir, 'container_collection.json')
+        samples, written = pcc_fixtures.write_container_collection(
+            output, model, num_samples, start_time, target_bytes, args.chunk_size)
+    else:
+        model = pcc_fixtures.HostModel(rng, args.cpus, args.disks, args.ifaces, args.interval,
+                                       scenario, start_time)
+        if args.fixture == 'pcc':
+            output = os.path.join(capture_dir, 'pcc_collection.json')
+            samples, written = pcc_fixtures.write_pcc_collection(
+                output, model, num_samples, start_time, target_bytes, args.chunk_size)
+        else:
+            output = capture_dir
+            samples, written = pcc_fixtures.write_proc_tree(
+                output, model, num_samples, start_time, target_bytes, args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    mb_rate = written / 1048576 / elapsed if elapsed > 0 else 0
+    print(f"✓ {args.fixture} fixture written: {output} ({samples:,} samples, {written:,} bytes, "
+          f"{elapsed:.2f}s, {mb_rate:,.1f} MB/s)")
+
+
 def main():
     parser = argparse.ArgumentParser(description='Generate synthetic performance data')
     parser.add_argument('--duration', type=int, default=300,
@@ -186,15 +507,56 @@ def main():
                         default='both', help='Output format (default: both)')
     parser.add_argument('--realtime', action='store_true',
                         help='Generate in real-time instead of all at once')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Vectorised generation streamed to disk in chunks (json becomes JSON-lines; requires numpy)')
+    parser.add_argument('--samples', type=int, default=None,
+                        help='Number of samples for --bulk (default: duration / interval)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='RNG seed for --bulk, for reproducible fixtures')
+    parser.add_argument('--start-time', type=int, default=None,
+                        help='Epoch of the first --bulk sample (default: now minus the generated span)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Samples per chunk for --bulk (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--hosts', type=int, default=None,
+                        help='Fleet mode: number of hosts, one file each (--hostname is the name prefix; requires numpy)')
+    parser.add_argument('--days', type=int, default=1,
+                        help='Fleet mode: days of samples per host (default: 1)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Fleet mode: worker processes (default: CPU count; output is identical for any value)')
+    parser.add_argument('--fixture', choices=['pcc', 'container', 'proc-csv'], default=None,
+                        help='Write a collector wire-format fixture instead of portal CSV (requires numpy)')
+    parser.add_argument('--target-size', type=str, default=None,
+                        help='Fixture mode: stop once output reaches this size, e.g. 500M or 10G '
+                             '(unbounded by samples unless --samples is given)')
+    parser.add_argument('--cpus', type=int, default=4,
+                        help='Fixture mode: logical CPUs per host (default: 4)')
+    parser.add_argument('--disks', type=int, default=2,
+                        help='Fixture mode: block devices per host (default: 2)')
+    parser.add_argument('--ifaces', type=int, default=1,
+                        help='Fixture mode: network interfaces besides lo (default: 1)')
+    parser.add_argument('--containers', type=int, default=4,
+                        help='Fixture mode: containers for --fixture container (default: 4)')
 
     args = parser.parse_args()
 
     # Create output directory
     os.makedirs(args.output_dir, exist_ok=True)
 
+    if args.hosts:
+        run_fleet(args)
+        return
+
     # Get hostname
     hostname = args.hostname or platform.node() or 'test-server-01'
 
+    if args.fixture:
+        run_fixture(args, hostname)
+        return
+
+    if args.bulk:
+        run_bulk(args, hostname)
+        return
+
     # Generate samples
     samples = []
     num_samples = args.duration // args.interval
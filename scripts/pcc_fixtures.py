@@ -0,0 +1,651 @@
+#!/usr/bin/env python3
+"""
+Wire-format fixtures for the pcc collection pipeline
+
+generate_test_data.py --fixture uses these writers to produce inputs for
+the heavy parsing stages instead of the final portal CSV:
+
+    pcc        pcc_collection.json - one JSON line per subsystem per sample
+               with the raw text of /proc/cpuinfo, /proc/stat, /proc/meminfo,
+               /proc/net/dev, /proc/diskstats and the statfs[*] JSON lines,
+               exactly as the collector writes them. Counters (jiffies, IRQs,
+               context switches, sectors, bytes, packets) increase
+               monotonically from a plausible uptime.
+
+    container  container_collection.json - one line per container per
+               sample with the nested measurement JSON of pcc-container
+               (cumulative cpu/io counters, memory and pid gauges).
+
+    proc-csv   a pcprocess-style tree: proc/stat, proc/meminfo,
+               proc/diskstats, proc/net/dev and statfs_ALL, with one row per
+               CPU/device/interface/mount per sample.
+
+A HostModel draws per-interval deltas for a whole chunk of samples with
+NumPy and carries the running totals across chunks, so the pcc counters and
+the proc-csv rates describe the same host. Lines are produced by applying a
+%-template (built once from the CPU/device/interface counts) to one row of
+an integer matrix, and the run can be bounded by sample count or by output
+size, which keeps 10 GB fixtures in fixed memory.
+"""
+
+import json
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # Checked by the writers
+    np = None
+
+
+USER_HZ = 100
+
+# Upper bound on matrix cells per chunk; keeps memory flat for hosts with many CPUs/devices
+CHUNK_CELLS = 1000000
+
+CPU_FIELDS = ['user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal']
+SOFTIRQ_KINDS = 10
+IRQ_LINES = 64
+
+# /proc/diskstats counters after the device name (kernel 5.5+ layout, 17 fields)
+DISK_FIELDS = ['reads', 'reads_merged', 'sectors_read', 'ms_reading',
+               'writes', 'writes_merged', 'sectors_written', 'ms_writing',
+               'in_flight', 'ms_io', 'ms_weighted',
+               'discards', 'discards_merged', 'sectors_discarded', 'ms_discarding',
+               'flushes', 'ms_flushing']
+
+NET_FIELDS = ['rx_bytes', 'rx_packets', 'rx_errs', 'rx_drop', 'rx_multicast',
+              'tx_bytes', 'tx_packets', 'tx_errs', 'tx_drop']
+
+# (name, block_size, blocks_total) for the root/boot mounts; one /data mount is added per extra disk
+BASE_MOUNTS = [('/', 4096, 7344928), ('/boot', 4096, 225380), ('/boot/efi', 512, 213663), ('/mnt', 4096, 8211396)]
+
+# /proc/meminfo keys in kernel order; None marks keys driven by the model, ints are constant
+MEMINFO_LAYOUT = [
+    ('MemTotal', None), ('MemFree', None), ('MemAvailable', None), ('Buffers', None),
+    ('Cached', None), ('SwapCached', 0), ('Active', None), ('Inactive', None),
+    ('Active(anon)', None), ('Inactive(anon)', None), ('Active(file)', None), ('Inactive(file)', None),
+    ('Unevictable', 30368), ('Mlocked', 27296), ('SwapTotal', 0), ('SwapFree', 0),
+    ('Zswap', 0), ('Zswapped', 0), ('Dirty', None), ('Writeback', 0),
+    ('AnonPages', None), ('Mapped', None), ('Shmem', 4404), ('KReclaimable', 160200),
+    ('Slab', 252192), ('SReclaimable', 160200), ('SUnreclaim', 91992), ('KernelStack', 3984),
+    ('PageTables', 4656), ('SecPageTables', 0), ('NFS_Unstable', 0), ('Bounce', 0),
+    ('WritebackTmp', 0), ('CommitLimit', None), ('Committed_AS', None), ('VmallocTotal', 34359738367),
+    ('VmallocUsed', 32348), ('VmallocChunk', 0), ('Percpu', 4464), ('HardwareCorrupted', 0),
+    ('AnonHugePages', 112640), ('ShmemHugePages', 0), ('ShmemPmdMapped', 0), ('FileHugePages', 0),
+    ('FilePmdMapped', 0), ('Unaccepted', 0), ('HugePages_Total', 0), ('HugePages_Free', 0),
+    ('HugePages_Rsvd', 0), ('HugePages_Surp', 0), ('Hugepagesize', 2048), ('Hugetlb', 0),
+    ('DirectMap4k', 109736), ('DirectMap2M', 2983936), ('DirectMap1G', 15728640),
+]
+MEMINFO_NO_UNIT = {'HugePages_Total', 'HugePages_Free', 'HugePages_Rsvd', 'HugePages_Surp'}
+MEMINFO_MODEL_KEYS = [k for k, v in MEMINFO_LAYOUT if v is None]
+
+# pcprocess column layouts
+PROC_CSV_HEADERS = {
+    'stat': '#timestamp,CPU,%usr,%nice,%system,%iowait,%steal,%idle',
+    'meminfo': '#timestamp,kbmemfree,kbavail,kbmemused,%memused,kbbuffers,kbcached,kbcommit,%commit,kbactive,kbinact,kbdirty',
+    'diskstats': '#timestamp,DEV,tps,rtps,wtps,dtps,bread/s,bwrtn/s,bdscd/s',
+    'net/dev': '#timestamp,IFACE,rxpck/s,txpck/s,rxkB/s,txkB/s,rxcmp/s,txcmp/s,rxmcst/s,%ifutil',
+    'statfs_ALL': '#timestamp,mount,blocksize,blockstotal,blocksavail,use',
+}
+
+NIC_SPEED_MBPS = 10000
+
+CONTAINER_QUOTAS = [50000, 100000, 200000]
+CONTAINER_MEMORY_MAX = [536870912, 1073741824, 2147483648]
+
+
+def _samples_per_chunk(chunk_size, cells_per_sample):
+    """Samples per chunk so that samples x cells stays under CHUNK_CELLS."""
+    return max(1, min(chunk_size, CHUNK_CELLS // max(cells_per_sample, 1)))
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("--fixture requires numpy (pip install numpy)")
+
+
+def disk_name(index):
+    """sda..sdz, sdaa..sdzz - the kernel's naming order for SCSI disks."""
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord('a') + rem) + letters
+    return f"sd{letters}"
+
+
+def disk_numbers(index):
+    """(major, minor) for the index-th sd disk: 16 disks per major, majors 8 then 65.."""
+    major = 8 if index < 16 else 65 + (index - 16) // 16
+    return major, (index % 16) * 16
+
+
+def _escape(text):
+    return str(text).replace('%', '%%')
+
+
+def cpuinfo_text(cpus):
+    """Static /proc/cpuinfo for a host with the given number of logical CPUs."""
+    blocks = []
+    cores = max(1, cpus // 2)
+    for i in range(cpus):
+        blocks.append(
+            f"processor\t: {i}\nvendor_id\t: GenuineIntel\ncpu family\t: 6\nmodel\t\t: 85\n"
+            f"model name\t: Intel(R) Xeon(R) Platinum 8272CL CPU @ 2.60GHz\nstepping\t: 7\n"
+            f"microcode\t: 0xffffffff\ncpu MHz\t\t: 2600.000\ncache size\t: 36608 KB\n"
+            f"physical id\t: 0\nsiblings\t: {cpus}\ncore id\t\t: {i // 2}\ncpu cores\t: {cores}\n"
+            f"apicid\t\t: {i}\ninitial apicid\t: {i}\nfpu\t\t: yes\nfpu_exception\t: yes\n"
+            f"cpuid level\t: 22\nwp\t\t: yes\n"
+            f"flags\t\t: fpu vme de pse tsc msr pae mce cx8 apic sep mtrr pge mca cmov pat pse36 "
+            f"clflush mmx fxsr sse sse2 ss ht syscall nx pdpe1gb rdtscp lm constant_tsc rep_good nopl "
+            f"xtopology tsc_reliable nonstop_tsc cpuid aperfmperf pni pclmulqdq ssse3 fma cx16 pcid "
+            f"sse4_1 sse4_2 movbe popcnt aes xsave avx f16c rdrand hypervisor lahf_lm abm avx2 avx512f\n"
+            f"bugs\t\t: spectre_v1 spectre_v2 spec_store_bypass swapgs taa mmio_stale_data retbleed\n"
+            f"bogomips\t: 5187.81\nclflush size\t: 64\ncache_alignment\t: 64\n"
+            f"address sizes\t: 46 bits physical, 48 bits virtual\npower management:\n\n"
+        )
+    return ''.join(blocks)
+
+
+class HostModel:
+    """
+    Per-interval deltas and gauges for one synthetic host, drawn a chunk at a time.
+
+    Counter totals are carried between chunks so consecutive chunks continue
+    the same monotonic series.
+    """
+
+    def __init__(self, rng, cpus=4, disks=2, ifaces=1, interval=5, scenario=None,
+                 start_time=0, total_mb=16384):
+        self.rng = rng
+        self.cpus = cpus
+        self.disks = [disk_name(i) for i in range(disks)]
+        self.ifaces = ['lo'] + [f"eth{i}" for i in range(ifaces)]
+        self.interval = interval
+        self.cpu_base = (scenario or {}).get('cpu_base', 25)
+        self.cpu_var = (scenario or {}).get('cpu_var', 10)
+        self.total_kb = total_mb * 1024
+        self.mounts = BASE_MOUNTS + [(f"/data{i}", 4096, 268435456) for i in range(1, disks)]
+
+        # Pretend the host booted about two days before the first sample, and
+        # start every counter at the total its average rate would reach by then
+        uptime = int(rng.integers(86400, 3 * 86400))
+        self.btime = start_time - uptime
+        self.cpu_totals = np.zeros((cpus, len(CPU_FIELDS)), dtype=np.int64)
+        self.stat_totals = np.zeros(3, dtype=np.int64)
+        self.softirq_totals = np.zeros(SOFTIRQ_KINDS, dtype=np.int64)
+        self.disk_totals = np.zeros((disks, len(DISK_FIELDS)), dtype=np.int64)
+        self.net_totals = np.zeros((len(self.ifaces), len(NET_FIELDS)), dtype=np.int64)
+        self.statfs_free = np.zeros(len(self.mounts), dtype=np.int64)
+        warmup = 64
+        self.next_chunk(warmup)
+        scale = uptime / (warmup * interval)
+        for name in ('cpu_totals', 'stat_totals', 'softirq_totals', 'disk_totals', 'net_totals'):
+            setattr(self, name, (getattr(self, name) * scale).astype(np.int64))
+        self.disk_totals[:, DISK_FIELDS.index('in_flight')] = 0
+        self.statfs_free = np.array([int(total * rng.uniform(0.5, 0.9)) for _, _, total in self.mounts],
+                                    dtype=np.int64)
+
+    def next_chunk(self, n):
+        """
+        Draw n samples.
+
+        Returns a dict of int64 arrays: '*_delta' arrays are per-interval
+        increments, '*_total' arrays the running counters after each sample,
+        the rest are gauges.
+        """
+        rng = self.rng
+        cpus = self.cpus
+        jiffies = self.interval * USER_HZ
+
+        # CPU time split per CPU and sample; idle takes whatever the other states leave
+        frac = np.empty((n, cpus, len(CPU_FIELDS)))
+        frac[..., 0] = np.clip(self.cpu_base + rng.uniform(-self.cpu_var, self.cpu_var, (n, cpus)), 0, 100) / 100
+        frac[..., 1] = rng.uniform(0, 0.005, (n, cpus))
+        frac[..., 2] = np.clip(10 + rng.uniform(-self.cpu_var / 2, self.cpu_var / 2, (n, cpus)), 0, 100) / 100
+        frac[..., 4] = rng.uniform(0, 0.05, (n, cpus))
+        frac[..., 5] = rng.uniform(0, 0.005, (n, cpus))
+        frac[..., 6] = rng.uniform(0, 0.01, (n, cpus))
+        frac[..., 7] = rng.uniform(0, 0.01, (n, cpus))
+        frac[..., 3] = 0
+        busy = frac.sum(axis=2)
+        frac /= np.maximum(busy, 1.0)[..., None]
+        cpu_delta = (frac * jiffies).astype(np.int64)
+        cpu_delta[..., 3] = jiffies - cpu_delta.sum(axis=2)
+        cpu_total = self.cpu_totals + np.cumsum(cpu_delta, axis=0)
+        self.cpu_totals = cpu_total[-1]
+
+        # intr, ctxt, processes
+        load = cpu_delta[..., [0, 2]].sum(axis=(1, 2)) / (jiffies * cpus)
+        stat_delta = np.stack([
+            (rng.integers(200, 800, n) * cpus * self.interval * (0.5 + load)).astype(np.int64),
+            (rng.integers(300, 1500, n) * cpus * self.interval * (0.5 + load)).astype(np.int64),
+            rng.integers(0, 20, n),
+        ], axis=1).astype(np.int64)
+        stat_total = self.stat_totals + np.cumsum(stat_delta, axis=0)
+        self.stat_totals = stat_total[-1]
+        softirq_delta = rng.integers(0, 200 * self.interval, (n, SOFTIRQ_KINDS)) * cpus
+        softirq_total = self.softirq_totals + np.cumsum(softirq_delta, axis=0)
+        self.softirq_totals = softirq_total[-1]
+        procs = np.stack([rng.integers(1, cpus + 3, n), rng.integers(0, 3, n)], axis=1)
+
+        # Memory gauges (kB)
+        total_kb = self.total_kb
+        free = (total_kb * rng.uniform(0.2, 0.6, n)).astype(np.int64)
+        used = total_kb - free
+        cached = (used * rng.uniform(0.2, 0.5, n)).astype(np.int64)
+        buffers = (total_kb * rng.uniform(0.004, 0.008, n)).astype(np.int64)
+        anon = np.maximum(used - cached - buffers, 0)
+        memory = {
+            'MemTotal': np.full(n, total_kb, dtype=np.int64),
+            'MemFree': free,
+            'MemAvailable': free + (cached * 9) // 10 + buffers,
+            'Buffers': buffers,
+            'Cached': cached,
+            'Active': (anon * 6) // 10 + (cached * 3) // 10,
+            'Inactive': (anon * 4) // 10 + (cached * 7) // 10,
+            'Active(anon)': (anon * 6) // 10,
+            'Inactive(anon)': (anon * 4) // 10,
+            'Active(file)': (cached * 3) // 10,
+            'Inactive(file)': (cached * 7) // 10,
+            'Dirty': rng.integers(0, 8192, n),
+            'AnonPages': anon,
+            'Mapped': cached // 10,
+            'CommitLimit': np.full(n, total_kb // 2, dtype=np.int64),
+            'Committed_AS': (anon * 3) // 2,
+        }
+
+        # Disks: ops per interval, sectors and time derived from ops
+        d = len(self.disks)
+        disk_delta = np.zeros((n, d, len(DISK_FIELDS)), dtype=np.int64)
+        reads = rng.integers(0, 200 * self.interval, (n, d))
+        writes = rng.integers(0, 400 * self.interval, (n, d))
+        disk_delta[..., 0] = reads
+        disk_delta[..., 1] = reads // rng.integers(4, 20, (n, d))
+        disk_delta[..., 2] = reads * rng.integers(8, 256, (n, d))
+        disk_delta[..., 3] = (reads * rng.uniform(0.1, 2.0, (n, d))).astype(np.int64)
+        disk_delta[..., 4] = writes
+        disk_delta[..., 5] = writes // rng.integers(2, 10, (n, d))
+        disk_delta[..., 6] = writes * rng.integers(8, 512, (n, d))
+        disk_delta[..., 7] = (writes * rng.uniform(0.2, 5.0, (n, d))).astype(np.int64)
+        disk_delta[..., 9] = np.minimum(disk_delta[..., 3] + disk_delta[..., 7], self.interval * 1000)
+        disk_delta[..., 10] = disk_delta[..., 3] + disk_delta[..., 7]
+        disk_delta[..., 15] = writes // 50
+        disk_delta[..., 16] = disk_delta[..., 15] * 2
+        disk_total = self.disk_totals + np.cumsum(disk_delta, axis=0)
+        disk_total[..., DISK_FIELDS.index('in_flight')] = rng.integers(0, 4, (n, d))
+        self.disk_totals = disk_total[-1]
+
+        # Interfaces: lo is light, ethN carry the traffic
+        k = len(self.ifaces)
+        net_delta = np.zeros((n, k, len(NET_FIELDS)), dtype=np.int64)
+        scale = np.array([0.01] + [1.0] * (k - 1))
+        rx_bytes = (rng.integers(1000, 2000000, (n, k)) * self.interval * scale).astype(np.int64)
+        tx_bytes = (rng.integers(1000, 1000000, (n, k)) * self.interval * scale).astype(np.int64)
+        net_delta[..., 0] = rx_bytes
+        net_delta[..., 1] = rx_bytes // rng.integers(200, 1400, (n, k)) + 1
+        net_delta[..., 3] = rng.integers(0, 1000, (n, k)) // 999
+        net_delta[..., 4] = rng.integers(0, 3, (n, k))
+        net_delta[..., 5] = tx_bytes
+        net_delta[..., 6] = tx_bytes // rng.integers(200, 1400, (n, k)) + 1
+        net_total = self.net_totals + np.cumsum(net_delta, axis=0)
+        self.net_totals = net_total[-1]
+
+        # Filesystems fill slowly
+        statfs_free = np.maximum(self.statfs_free - np.cumsum(rng.integers(0, 64, (n, len(self.mounts))), axis=0), 0)
+        self.statfs_free = statfs_free[-1]
+        reserved = np.array([total // 20 for _, _, total in self.mounts], dtype=np.int64)
+
+        return {
+            'cpu_delta': cpu_delta, 'cpu_total': cpu_total,
+            'stat_total': stat_total, 'softirq_total': softirq_total, 'procs': procs,
+            'memory': memory,
+            'disk_delta': disk_delta, 'disk_total': disk_total,
+            'net_delta': net_delta, 'net_total': net_total,
+            'statfs_free': statfs_free, 'statfs_avail': np.maximum(statfs_free - reserved, 0),
+        }
+
+
+# ---------------------------------------------------------------------------
+# pcc_collection.json
+# ---------------------------------------------------------------------------
+
+def _pcc_line(subsystem, measurement_template):
+    """JSON line template; json.dumps leaves the %d placeholders untouched."""
+    return ('{"timestamp":%d,"subsystem":' + json.dumps(subsystem)
+            + ',"measurement":' + json.dumps(measurement_template) + '}')
+
+
+def pcc_template(model):
+    """%-template for all subsystem lines of one sample, and its field count."""
+    cpus = model.cpus
+    cpu_line = ' %d' * len(CPU_FIELDS) + ' 0 0\n'
+    stat = ['cpu ' + cpu_line]
+    stat += [f'cpu{i}' + cpu_line for i in range(cpus)]
+    stat.append('intr %d' + ' 0' * IRQ_LINES + '\n')
+    stat.append('ctxt %d\n')
+    stat.append(f'btime {model.btime}\n')
+    stat.append('processes %d\nprocs_running %d\nprocs_blocked %d\n')
+    stat.append('softirq %d' + ' %d' * SOFTIRQ_KINDS + '\n')
+
+    meminfo = []
+    for key, value in MEMINFO_LAYOUT:
+        unit = '' if key in MEMINFO_NO_UNIT else ' kB'
+        label = f"{key + ':':<16}"
+        if value is None:
+            meminfo.append(f"{_escape(label)}%8d{unit}\n")
+        else:
+            meminfo.append(f"{_escape(label)}{value:>8}{unit}\n")
+
+    netdev = [
+        "Inter-|   Receive                                                |  Transmit\n",
+        " face |bytes    packets errs drop fifo frame compressed multicast"
+        "|bytes    packets errs drop fifo colls carrier compressed\n",
+    ]
+    for iface in model.ifaces:
+        netdev.append(f"{iface:>6}:" + "%8d %7d %4d %4d    0     0          0 %9d "
+                      "%8d %7d %4d %4d    0     0       0          0\n")
+
+    diskstats = []
+    for i, name in enumerate(model.disks):
+        major, minor = disk_numbers(i)
+        diskstats.append(f"{major:>4} {minor:>7} {name}" + ' %d' * len(DISK_FIELDS) + '\n')
+
+    statfs = []
+    for mount, block_size, total in model.mounts:
+        statfs.append('{"mount_point":' + json.dumps(_escape(mount)) + f',"block_size":{block_size},'
+                      f'"blocks_total":{total},"blocks_free":%d,"blocks_available":%d}}\n')
+
+    lines = [
+        _pcc_line('/proc/cpuinfo', _escape(cpuinfo_text(cpus))),
+        _pcc_line('/proc/stat', ''.join(stat)),
+        _pcc_line('/proc/meminfo', ''.join(meminfo)),
+        _pcc_line('/proc/net/dev', ''.join(netdev)),
+        _pcc_line('/proc/diskstats', ''.join(diskstats)),
+        _pcc_line('statfs[*]', ''.join(statfs)),
+    ]
+    template = '\n'.join(lines) + '\n'
+    fields = template.count('%d')
+    return template, fields
+
+
+def pcc_matrix(timestamps, chunk):
+    """Integer matrix whose rows fill pcc_template() in order."""
+    n = len(timestamps)
+    ts = timestamps[:, None]
+    cpu_total = chunk['cpu_total']
+    stat_total = chunk['stat_total']
+    softirq_total = chunk['softirq_total']
+    parts = [
+        ts,                                                   # cpuinfo
+        ts, cpu_total.sum(axis=1), cpu_total.reshape(n, -1),  # stat
+        stat_total[:, 0:1], stat_total[:, 1:2], stat_total[:, 2:3], chunk['procs'],
+        softirq_total.sum(axis=1, keepdims=True), softirq_total,
+        ts, np.stack([chunk['memory'][k] for k in MEMINFO_MODEL_KEYS], axis=1),
+        ts, chunk['net_total'].reshape(n, -1),
+        ts, chunk['disk_total'].reshape(n, -1),
+        ts, np.stack([chunk['statfs_free'], chunk['statfs_avail']], axis=2).reshape(n, -1),
+    ]
+    return np.concatenate([np.asarray(p, dtype=np.int64).reshape(n, -1) for p in parts], axis=1)
+
+
+def write_pcc_collection(path, model, num_samples, start_time, target_bytes=None, chunk_size=100000):
+    """
+    Write pcc_collection.json for model.
+
+    Stops after num_samples samples or, when target_bytes is set, at the
+    first sample that takes the file past target_bytes. Returns
+    (samples, bytes) written.
+    """
+    _require_numpy()
+    template, fields = pcc_template(model)
+    per_chunk = _samples_per_chunk(chunk_size, fields)
+    fmt = template.__mod__
+    return _write_chunks(path, model, num_samples, start_time, target_bytes, per_chunk,
+                         lambda ts, chunk: map(fmt, map(tuple, pcc_matrix(ts, chunk).tolist())))
+
+
+# ---------------------------------------------------------------------------
+# pcprocess proc/* CSV tree
+# ---------------------------------------------------------------------------
+
+def _pct(part, whole):
+    return part * 100.0 / np.maximum(whole, 1)
+
+
+def _rows_text(timestamps, labels, row_format, values):
+    """
+    Format values (samples, labels, columns) as '<timestamp>,<label>,<row_format>'
+    lines; one %-template covers every row of a sample.
+    """
+    n = len(timestamps)
+    template = ''.join(f"%d,{_escape(label)},{row_format}\n" for label in labels)
+    ts = np.broadcast_to(timestamps[:, None, None], (n, len(labels), 1))
+    matrix = np.concatenate([ts, values], axis=2).reshape(n, -1)
+    return ''.join(map(template.__mod__, map(tuple, matrix.tolist())))
+
+
+def proc_csv_chunk(timestamps, chunk, model):
+    """Text for each pcprocess file for one chunk: {relative path: str}."""
+    interval = model.interval
+    n = len(timestamps)
+    out = {}
+
+    # stat: CPU -1 (all) followed by each CPU, as pcprocess emits them
+    cpu_delta = chunk['cpu_delta']
+    per_cpu = np.concatenate([cpu_delta.sum(axis=1, keepdims=True), cpu_delta], axis=1)
+    whole = per_cpu.sum(axis=2)
+    cols = [_pct(per_cpu[..., CPU_FIELDS.index(f)], whole) for f in ('user', 'nice', 'system', 'iowait', 'steal', 'idle')]
+    labels = ['-1'] + [str(i) for i in range(model.cpus)]
+    out['stat'] = _rows_text(timestamps, labels, ','.join(['%.6g'] * 6), np.stack(cols, axis=2))
+
+    # meminfo: sar -r columns, one row per sample
+    m = chunk['memory']
+    memused = m['MemTotal'] - m['MemFree'] - m['Buffers'] - m['Cached']
+    commit = m['Committed_AS']
+    matrix = np.stack([timestamps, m['MemFree'], m['MemAvailable'], memused, _pct(memused, m['MemTotal']),
+                       m['Buffers'], m['Cached'], commit, _pct(commit, m['MemTotal']), m['Active'],
+                       m['Inactive'], m['Dirty']], axis=1)
+    template = "%d,%d,%d,%d,%.6g,%d,%d,%d,%.6g,%d,%d,%d\n"
+    out['meminfo'] = ''.join(map(template.__mod__, map(tuple, matrix.tolist())))
+
+    # diskstats: per-device rates
+    dd = chunk['disk_delta'] / interval
+    rtps, wtps = dd[..., 0], dd[..., 4]
+    dtps = dd[..., DISK_FIELDS.index('discards')]
+    disk = np.stack([rtps + wtps + dtps, rtps, wtps, dtps, dd[..., 2], dd[..., 6],
+                     dd[..., DISK_FIELDS.index('sectors_discarded')]], axis=2)
+    out['diskstats'] = _rows_text(timestamps, model.disks, ','.join(['%.6g'] * 7), disk)
+
+    # net/dev: per-interface rates
+    nd = chunk['net_delta'] / interval
+    rx_kb, tx_kb = nd[..., 0] / 1024, nd[..., 5] / 1024
+    ifutil = np.maximum(rx_kb, tx_kb) * 8 * 1024 / (NIC_SPEED_MBPS * 1e6) * 100
+    ifutil[:, 0] = 0  # loopback has no link speed
+    zeros = np.zeros((n, len(model.ifaces)))
+    net = np.stack([nd[..., 1], nd[..., 6], rx_kb, tx_kb, zeros, zeros, nd[..., 4], ifutil], axis=2)
+    out['net/dev'] = _rows_text(timestamps, model.ifaces, ','.join(['%.6g'] * 8), net)
+
+    # statfs_ALL: available blocks and use %; block size and total are part of the label
+    totals = np.array([total for _, _, total in model.mounts], dtype=np.int64)
+    use = np.rint(_pct(totals - chunk['statfs_free'], totals))
+    labels = [f"{mount},{block_size},{total}" for mount, block_size, total in model.mounts]
+    out['statfs_ALL'] = _rows_text(timestamps, labels, '%d,%d', np.stack([chunk['statfs_avail'], use], axis=2))
+    return out
+
+
+def write_proc_tree(output_dir, model, num_samples, start_time, target_bytes=None, chunk_size=100000):
+    """
+    Write a pcprocess-style tree (proc/stat, proc/meminfo, proc/diskstats,
+    proc/net/dev, statfs_ALL) under output_dir.
+
+    Bounded like write_pcc_collection(), except that target_bytes applies
+    to the sum of all files and is checked after each chunk. Returns
+    (samples, bytes) written.
+    """
+    _require_numpy()
+    root = Path(output_dir)
+    paths = {rel: root / ('proc/' + rel if rel != 'statfs_ALL' else rel) for rel in PROC_CSV_HEADERS}
+    for path in paths.values():
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows_per_sample = 2 + model.cpus + len(model.disks) + len(model.ifaces) + len(model.mounts)
+    per_chunk = _samples_per_chunk(chunk_size, rows_per_sample * 8)
+
+    files = {rel: open(path, 'w') for rel, path in paths.items()}
+    try:
+        written = 0
+        for rel, f in files.items():
+            header = PROC_CSV_HEADERS[rel] + '\n'
+            f.write(header)
+            written += len(header)
+
+        samples = 0
+        for timestamps, chunk in _chunks(model, num_samples, start_time, per_chunk):
+            texts = proc_csv_chunk(timestamps, chunk, model)
+            for rel, text in texts.items():
+                files[rel].write(text)
+                written += len(text)
+            samples += len(timestamps)
+            if target_bytes is not None and written >= target_bytes:
+                break
+    finally:
+        for f in files.values():
+            f.close()
+
+    return samples, written
+
+
+# ---------------------------------------------------------------------------
+# container_collection.json
+# ---------------------------------------------------------------------------
+
+# Measurement keys in the order pcc-container writes them (sorted)
+CONTAINER_KEYS = ['container_id', 'container_name', 'cpu_period', 'cpu_periods', 'cpu_quota',
+                  'cpu_system_usec', 'cpu_throttled', 'cpu_throttled_usec', 'cpu_usage_usec',
+                  'cpu_user_usec', 'io_read_bytes', 'io_read_ops', 'io_write_bytes', 'io_write_ops',
+                  'memory_anon', 'memory_current', 'memory_file', 'memory_kernel', 'memory_max',
+                  'memory_slab', 'pids_current', 'pids_max', 'runtime']
+CONTAINER_COUNTERS = ['cpu_periods', 'cpu_system_usec', 'cpu_throttled', 'cpu_throttled_usec',
+                      'cpu_usage_usec', 'cpu_user_usec', 'io_read_bytes', 'io_read_ops',
+                      'io_write_bytes', 'io_write_ops']
+CONTAINER_GAUGES = ['memory_anon', 'memory_current', 'memory_file', 'memory_kernel', 'memory_slab',
+                    'pids_current']
+CPU_PERIOD_USEC = 100000
+
+
+class ContainerModel:
+    """Cumulative cgroup counters and gauges for a set of containers on one host."""
+
+    def __init__(self, rng, containers=4, interval=5, scenario=None):
+        self.rng = rng
+        self.interval = interval
+        self.cpu_base = (scenario or {}).get('cpu_base', 25)
+        self.ids = [rng.bytes(32).hex() for _ in range(containers)]
+        self.quota = rng.choice(CONTAINER_QUOTAS, containers)
+        self.memory_max = rng.choice(CONTAINER_MEMORY_MAX, containers)
+        self.totals = np.zeros((containers, len(CONTAINER_COUNTERS)), dtype=np.int64)
+
+    def template(self):
+        """%-template for one sample of all containers, and its field count."""
+        lines = []
+        for i, cid in enumerate(self.ids):
+            static = {'container_id': cid, 'container_name': '', 'cpu_period': CPU_PERIOD_USEC,
+                      'cpu_quota': int(self.quota[i]), 'memory_max': int(self.memory_max[i]),
+                      'pids_max': 4580, 'runtime': 'docker'}
+            parts = []
+            for key in CONTAINER_KEYS:
+                if key in static:
+                    parts.append(f'"{key}":{json.dumps(static[key])}')
+                else:
+                    parts.append(f'"{key}":%d')
+            lines.append(_pcc_line(f"container/docker/{cid[:12]}", '{' + ','.join(parts) + '}'))
+        template = '\n'.join(lines) + '\n'
+        return template, template.count('%d')
+
+    def next_chunk(self, n):
+        """n samples as an int64 array (n, containers, measurement %d fields in key order)."""
+        rng = self.rng
+        c = len(self.ids)
+        wall_usec = self.interval * 1000000
+        cores = self.quota / CPU_PERIOD_USEC
+
+        demand = np.clip(self.cpu_base + rng.uniform(-20, 40, (n, c)), 1, 150) / 100
+        usage = (np.minimum(demand, 1.0) * cores * wall_usec).astype(np.int64)
+        user = (usage * rng.uniform(0.75, 0.9, (n, c))).astype(np.int64)
+        periods = np.full((n, c), wall_usec // CPU_PERIOD_USEC, dtype=np.int64)
+        throttled = np.where(demand > 1.0, (periods * (demand - 1.0)).astype(np.int64), 0)
+        read_ops = rng.integers(0, 50, (n, c))
+        write_ops = rng.integers(0, 20, (n, c))
+
+        delta = np.stack([
+            periods, usage - user, throttled, throttled * rng.integers(5000, 50000, (n, c)),
+            usage, user,
+            read_ops * rng.integers(4096, 262144, (n, c)), read_ops,
+            write_ops * rng.integers(4096, 131072, (n, c)), write_ops,
+        ], axis=2)
+        totals = self.totals + np.cumsum(delta, axis=0)
+        self.totals = totals[-1]
+
+        current = (self.memory_max * rng.uniform(0.05, 0.6, (n, c))).astype(np.int64)
+        anon = (current * rng.uniform(0.01, 0.4, (n, c))).astype(np.int64)
+        kernel = current // 50
+        gauges = {
+            'memory_anon': anon,
+            'memory_current': current,
+            'memory_file': np.maximum(current - anon - kernel, 0),
+            'memory_kernel': kernel,
+            'memory_slab': (kernel * 9) // 10,
+            'pids_current': rng.integers(1, 40, (n, c)),
+        }
+
+        columns = {name: totals[..., i] for i, name in enumerate(CONTAINER_COUNTERS)}
+        columns.update(gauges)
+        order = [k for k in CONTAINER_KEYS if k in columns]
+        return np.stack([columns[k] for k in order], axis=2)
+
+
+def write_container_collection(path, model, num_samples, start_time, target_bytes=None, chunk_size=100000):
+    """Write container_collection.json; bounded like write_pcc_collection()."""
+    _require_numpy()
+    template, fields = model.template()
+    per_chunk = _samples_per_chunk(chunk_size, fields)
+    fmt = template.__mod__
+    containers = len(model.ids)
+
+    def lines(timestamps, values):
+        n = len(timestamps)
+        ts = np.repeat(timestamps[:, None], containers, axis=1)[..., None]
+        matrix = np.concatenate([ts, values], axis=2).reshape(n, -1)
+        return map(fmt, map(tuple, matrix.tolist()))
+
+    return _write_chunks(path, model, num_samples, start_time, target_bytes, per_chunk, lines)
+
+
+# ---------------------------------------------------------------------------
+# Shared chunk loop
+# ---------------------------------------------------------------------------
+
+def _chunks(model, num_samples, start_time, per_chunk):
+    """Yield (timestamps, chunk) until num_samples samples (forever if None)."""
+    start = 0
+    while num_samples is None or start < num_samples:
+        count = per_chunk if num_samples is None else min(per_chunk, num_samples - start)
+        timestamps = start_time + np.arange(start, start + count, dtype=np.int64) * model.interval
+        yield timestamps, model.next_chunk(count)
+        start += count
+
+
+def _write_chunks(path, model, num_samples, start_time, target_bytes, per_chunk, render):
+    """Write rendered lines per sample; stop at num_samples or once target_bytes is reached."""
+    samples = 0
+    written = 0
+    with open(path, 'w') as f:
+        for timestamps, chunk in _chunks(model, num_samples, start_time, per_chunk):
+            for text in render(timestamps, chunk):
+                f.write(text)
+                written += len(text)
+                samples += 1
+                if target_bytes is not None and written >= target_bytes:
+                    return samples, written
+    return samples, written
@@ -5,6 +5,17 @@
 # This script runs on the host machine and generates PDF reports using
 # the R markdown system in automated-Reporting for all analyses in the database.
 #
+# Rendered PDFs are cached by content (see scripts/report_cache.py). When a
+# report comes back from the cache and the analysis already has a report
+# attached, the database upload is skipped too, so a repeated run over
+# unchanged analyses finishes in seconds. Set NO_CACHE=1 to force a render.
+#
+# REPORT_EXECUTOR=local renders with Rscript on the host instead of the
+# r-dev container (see scripts/report_executor.py).
+#
+# Every report writes a stage trace (scripts/report_trace.py); a per-stage
+# breakdown across all reports is printed at the end.
+#
 
 set -e
 
@@ -26,7 +37,8 @@ for a in analyses:
         'owner': a.owner.username,
         'collector': a.collected.collector.machinename,
         'csv_file': a.collected.file.path,
-        'description': a.collected.description
+        'description': a.collected.description,
+        'has_report': bool(a.report)
     })
 print(json.dumps(result))
 " 2>/dev/null | grep '^\[')
@@ -39,6 +51,9 @@ fi
 echo "Found $(echo "$ANALYSES" | jq '. | length') analyses"
 echo ""
 
+# Stage traces are collected here and summarised once all reports are done
+TRACE_DIR=$(mktemp -d)
+
 # Process each analysis
 echo "$ANALYSES" | jq -c '.[]' | while read -r analysis; do
     ANALYSIS_ID=$(echo "$analysis" | jq -r '.id')
@@ -46,6 +61,7 @@ echo "$ANALYSES" | jq -c '.[]' | while read -r analysis; do
     COLLECTOR=$(echo "$analysis" | jq -r '.collector')
     CSV_FILE=$(echo "$analysis" | jq -r '.csv_file')
     DESCRIPTION=$(echo "$analysis" | jq -r '.description')
+    HAS_REPORT=$(echo "$analysis" | jq -r '.has_report')
 
     echo "----------------------------------------------------------------"
     echo "Processing Analysis ID: $ANALYSIS_ID"
@@ -72,10 +88,24 @@ echo "$ANALYSES" | jq -c '.[]' | while read -r analysis; do
 
     # Run the report generation script
     echo "  Generating report..."
-    if python3 scripts/generate_analysis_report.py "$HOST_CSV" "$TEMP_DIR"; then
+    GEN_ARGS=(--executor "${REPORT_EXECUTOR:-docker}")
+    if [ "${NO_CACHE:-0}" = "1" ]; then
+        GEN_ARGS+=(--no-cache)
+    fi
+    python3 scripts/generate_analysis_report.py "$HOST_CSV" "$TEMP_DIR" "${GEN_ARGS[@]}" 2>&1 | tee "$TEMP_DIR/generate.log"
+    GEN_STATUS=${PIPESTATUS[0]}
+    CACHE_HIT=false
+    if [ -f "$TEMP_DIR/report_trace.json" ]; then
+        cp "$TEMP_DIR/report_trace.json" "$TRACE_DIR/analysis_${ANALYSIS_ID}.json"
+        CACHE_HIT=$(jq -r '.cache_hit == true' "$TEMP_DIR/report_trace.json" 2>/dev/null || echo false)
+    fi
+
+    if [ "$GEN_STATUS" -eq 0 ]; then
         REPORT_PDF="$TEMP_DIR/report.pdf"
 
-        if [ -f "$REPORT_PDF" ]; then
+        if [ -f "$REPORT_PDF" ] && [ "$HAS_REPORT" = "true" ] && [ "$CACHE_HIT" = "true" ]; then
+            echo "  ✓ Report unchanged (cache hit) - keeping existing report"
+        elif [ -f "$REPORT_PDF" ]; then
             echo "  ✓ Report generated successfully"
 
             # Copy PDF into container and save to database
@@ -119,3 +149,9 @@ done
 echo "================================================================"
 echo "Report regeneration complete!"
 echo "================================================================"
+
+if ls "$TRACE_DIR"/*.json >/dev/null 2>&1; then
+    echo ""
+    python3 scripts/report_trace.py summarize "$TRACE_DIR"/*.json
+fi
+rm -rf "$TRACE_DIR"
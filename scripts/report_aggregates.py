@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Precomputed aggregates sidecar for automated-Reporting
+
+convert_csv_to_proc_format() writes full-resolution sar-format files, and
+the R report used to recompute every summary statistic and plot series
+from them on each render. Render time therefore grew with capture length.
+
+This module writes a compact sidecar next to those files:
+
+    proc/aggregates/summary.csv
+        #metric,count,min,mean,p50,p95,p99,max
+        one row per metric over the whole capture
+
+    proc/aggregates/series.csv
+        #bucket,ts_start,ts_end,samples,<metric>_min,<metric>_mean,<metric>_max,...
+        the capture split into at most plot_points equal-count buckets,
+        with min/mean/max per metric so spikes survive downsampling
+
+Both files are bounded by the number of metrics and plot_points, not by
+the number of samples, so the Rmd can load them in constant time.
+"""
+
+import os
+import math
+from pathlib import Path
+
+
+# Roughly the horizontal resolution of a full-width plot in the PDF
+DEFAULT_PLOT_POINTS = int(os.environ.get('PERFANALYSIS_PLOT_POINTS', 800))
+
+SIDECAR_DIRNAME = 'aggregates'
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = math.floor(k)
+    hi = math.ceil(k)
+    if lo == hi:
+        return sorted_values[int(k)]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize_metric(values):
+    """Summary statistics for one metric."""
+    if not values:
+        return {'count': 0, 'min': 0.0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'min': ordered[0],
+        'mean': sum(ordered) / len(ordered),
+        'p50': percentile(ordered, 50),
+        'p95': percentile(ordered, 95),
+        'p99': percentile(ordered, 99),
+        'max': ordered[-1],
+    }
+
+
+def bucket_bounds(n, plot_points):
+    """Yield (start, end) index ranges splitting n samples into at most plot_points buckets."""
+    buckets = min(n, plot_points)
+    for b in range(buckets):
+        yield (b * n) // buckets, ((b + 1) * n) // buckets
+
+
+def minmax_buckets(timestamps, series, plot_points=DEFAULT_PLOT_POINTS):
+    """
+    Downsample aligned series to min/mean/max per bucket.
+
+    Returns a list of rows: (ts_start, ts_end, samples, {metric: (min, mean, max)}).
+    """
+    rows = []
+    for start, end in bucket_bounds(len(timestamps), plot_points):
+        stats = {}
+        for metric, values in series.items():
+            chunk = values[start:end]
+            stats[metric] = (min(chunk), sum(chunk) / len(chunk), max(chunk))
+        rows.append((timestamps[start], timestamps[end - 1], end - start, stats))
+    return rows
+
+
+def write_aggregates_sidecar(proc_dir, timestamps, series, plot_points=DEFAULT_PLOT_POINTS):
+    """
+    Write summary.csv and series.csv for the given per-metric series.
+
+    series maps metric name to a list of floats aligned with timestamps.
+    """
+    sidecar_dir = Path(proc_dir) / SIDECAR_DIRNAME
+    sidecar_dir.mkdir(parents=True, exist_ok=True)
+    metrics = list(series.keys())
+
+    with open(sidecar_dir / "summary.csv", 'w') as f:
+        f.write("#metric,count,min,mean,p50,p95,p99,max\n")
+        for metric in metrics:
+            s = summarize_metric(series[metric])
+            f.write(f"{metric},{s['count']},{s['min']},{s['mean']},{s['p50']},{s['p95']},{s['p99']},{s['max']}\n")
+
+    with open(sidecar_dir / "series.csv", 'w') as f:
+        columns = [f"{m}_{agg}" for m in metrics for agg in ('min', 'mean', 'max')]
+        f.write("#bucket,ts_start,ts_end,samples," + ",".join(columns) + "\n")
+        for i, (ts_start, ts_end, samples, stats) in enumerate(minmax_buckets(timestamps, series, plot_points)):
+            values = ",".join(f"{v}" for m in metrics for v in stats[m])
+            f.write(f"{i},{ts_start},{ts_end},{samples},{values}\n")
+
+    return sidecar_dir
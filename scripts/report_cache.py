@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for rendered analysis reports
+
+A rendered PDF depends only on the input data (portal CSV or the proc/*
+CSVs a report reads), the customised reporting.Rmd, the renderer that
+produced it and the report settings. The cache key is a SHA-256 over those
+inputs, so an unchanged analysis maps to the same key on every run and
+the previously rendered PDF can be returned without starting R.
+
+Entries live in a flat directory as <key>.pdf. The directory is bounded in
+size; when it grows past the limit the least recently used entries (by
+mtime, which is refreshed on every hit) are evicted first.
+
+Environment:
+    PERFANALYSIS_REPORT_CACHE      cache directory (default ~/.cache/perfanalysis/reports)
+    PERFANALYSIS_REPORT_CACHE_MB   size bound in MiB (default 512)
+"""
+
+import os
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "perfanalysis" / "reports"
+DEFAULT_CACHE_MB = 512
+
+# Read inputs in 1 MiB chunks so multi-day captures are never held in memory
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _hash_file(path, digest):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+
+def hash_input(input_path, files=None):
+    """
+    Digest of a report input: a single CSV file, or the given files (paths
+    relative to input_path) of a proc/* CSV tree. Paths are part of the
+    digest, and a missing file is recorded as absent, so nothing else that
+    happens to live in the capture directory changes the key.
+    """
+    input_path = Path(input_path)
+    digest = hashlib.sha256()
+
+    if input_path.is_dir():
+        for rel in sorted(files or []):
+            path = input_path / rel
+            name = rel.encode('utf-8')
+            digest.update(len(name).to_bytes(8, 'big'))
+            digest.update(name)
+            if not path.is_file():
+                digest.update(b'\0')
+                continue
+            file_digest = hashlib.sha256()
+            _hash_file(path, file_digest)
+            digest.update(b'\1' + file_digest.digest())
+    else:
+        _hash_file(input_path, digest)
+
+    return digest.digest()
+
+
+def report_cache_key(input_path, rmd_text, renderer_version, files=None, settings=()):
+    """
+    Compute the cache key for a report.
+
+    settings are any further values that change the rendered output (the
+    host name in the title, say). Each component is length-prefixed before
+    hashing so that content cannot shift from one field into the next and
+    produce the same digest.
+    """
+    digest = hashlib.sha256()
+
+    parts = [hash_input(input_path, files), rmd_text.encode('utf-8'), renderer_version.encode('utf-8')]
+    parts += [str(value).encode('utf-8') for value in settings]
+    for part in parts:
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """Size-bounded LRU directory of rendered reports keyed by content hash."""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        if cache_dir is None:
+            cache_dir = os.environ.get('PERFANALYSIS_REPORT_CACHE', DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('PERFANALYSIS_REPORT_CACHE_MB', DEFAULT_CACHE_MB)) * 1024 * 1024
+
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, key, suffix='.pdf'):
+        return self.cache_dir / f"{key}{suffix}"
+
+    def get(self, key, dest_path, suffix='.pdf'):
+        """
+        Copy the cached report for key to dest_path.
+
+        Returns dest_path on a hit, None on a miss. A hit refreshes the
+        entry's mtime so it becomes the most recently used.
+        """
+        entry = self._entry_path(key, suffix)
+        try:
+            shutil.copyfile(entry, dest_path)
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            # Evicted by a concurrent run between copy and touch - the copy is still valid
+            pass
+
+        return Path(dest_path)
+
+    def put(self, key, report_path, suffix='.pdf'):
+        """Store a rendered report under key and evict old entries if over the bound."""
+        entry = self._entry_path(key, suffix)
+
+        # Write to a temp file in the cache dir and rename so readers never see a partial PDF
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(report_path, tmp_path)
+            os.replace(tmp_path, entry)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        self.evict(keep=entry)
+        return entry
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.iterdir():
+            if path.suffix == '.tmp' or not path.is_file():
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        return removed
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Report executors for generate_analysis_report.py
+
+An executor takes the converted proc directory and the customised
+reporting.Rmd and turns them into a PDF. Two backends are provided:
+
+    DockerExecutor  - renders inside the perfanalysis-r-dev container. All
+                      inputs go in as one tar stream on stdin of a single
+                      `docker exec`, and the PDF comes back on stdout, so a
+                      report costs one docker CLI round trip instead of nine.
+
+    LocalExecutor   - runs Rscript (or any stub renderer command) directly on
+                      the host with no container, so the pipeline can be run
+                      and benchmarked offline.
+"""
+
+import io
+import os
+import shlex
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+from report_trace import StageTrace
+
+
+R_CONTAINER = 'perfanalysis-r-dev'
+R_TIMEOUT = 300  # 5 minute timeout
+
+# Marker the docker job prints to stderr with a timestamp at each stage boundary
+STAGE_MARK = '@@perfanalysis-stage'
+
+# Default automated-Reporting checkout for the local backend (the submodule next to scripts/)
+DEFAULT_REPORTING_DIR = Path(__file__).resolve().parent.parent / 'automated-Reporting'
+
+
+def build_render_script(workspace, rmd_path, pdf_path):
+    """Create R script content that renders the customized Rmd to pdf_path."""
+    return f"""
+# Set working directory
+setwd("{workspace}")
+
+# Activate renv environment (rmarkdown is installed there)
+if (file.exists("renv/activate.R")) {{
+    source("renv/activate.R")
+}}
+
+# Load required libraries
+library(rmarkdown)
+
+# Render the customized report
+tryCatch({{
+    render(
+        "{rmd_path}",
+        output_file = "{pdf_path}"
+    )
+    cat("SUCCESS: Report generated\\n")
+}}, error = function(e) {{
+    cat("ERROR:", conditionMessage(e), "\\n")
+    quit(status = 1)
+}})
+"""
+
+
+def _add_bytes(tar, name, data, mode=0o644):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = mode
+    tar.addfile(info, io.BytesIO(data))
+
+
+def build_job_tar(proc_dir, files):
+    """
+    Pack the proc directory and extra files into one in-memory tar stream.
+
+    files maps archive names to text content (the Rmd and R script).
+    """
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w') as tar:
+        tar.add(str(proc_dir), arcname='proc')
+        for name, content in files.items():
+            _add_bytes(tar, name, content.encode('utf-8'))
+    return buf.getvalue()
+
+
+def parse_stage_marks(log):
+    """Extract {mark: epoch_seconds} from STAGE_MARK lines in renderer output."""
+    marks = {}
+    for line in log.splitlines():
+        if line.startswith(STAGE_MARK):
+            parts = line.split()
+            try:
+                marks[parts[1]] = float(parts[2])
+            except (IndexError, ValueError):
+                continue
+    return marks
+
+
+class ReportExecutor:
+    """Base class for report executors."""
+
+    name = 'base'
+
+    @property
+    def version(self):
+        """Identifies the renderer for the report cache key."""
+        return self.name
+
+    def read_template(self):
+        """Return the stock reporting.Rmd text."""
+        raise NotImplementedError
+
+    def data_location(self, job_id, proc_dir):
+        """Path the customized Rmd should load the proc data from."""
+        raise NotImplementedError
+
+    def render(self, job_id, proc_dir, rmd_text, pdf_path, trace=None):
+        """
+        Render rmd_text against proc_dir and write the PDF to pdf_path.
+
+        Time and bytes are recorded on trace under the stage-in, render and
+        stage-out stages. Returns (bytes_sent, bytes_received) for the staged
+        inputs and the PDF.
+        """
+        raise NotImplementedError
+
+
+class DockerExecutor(ReportExecutor):
+    """Render inside the r-dev container in a single tar-in / PDF-out exec."""
+
+    name = 'docker'
+
+    def __init__(self, container=R_CONTAINER, workspace='/workspace'):
+        self.container = container
+        self.workspace = workspace
+
+    @property
+    def version(self):
+        return f"docker:{self.container}"
+
+    def _job_dir(self, job_id):
+        # The r-dev container mounts ./automated-Reporting at /workspace
+        return f"{self.workspace}/temp_data/{job_id}"
+
+    def read_template(self):
+        result = subprocess.run(
+            ['docker', 'exec', self.container, 'cat', f'{self.workspace}/reporting.Rmd'],
+            capture_output=True,
+            text=True
+        )
+
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to read reporting.Rmd: {result.stderr}")
+
+        return result.stdout
+
+    def data_location(self, job_id, proc_dir):
+        return f"{self._job_dir(job_id)}/proc"
+
+    def render(self, job_id, proc_dir, rmd_text, pdf_path, trace=None):
+        if trace is None:
+            trace = StageTrace()
+
+        job_dir = self._job_dir(job_id)
+        with trace.stage('stage-in'):
+            r_script = build_render_script(
+                self.workspace, f"{job_dir}/reporting_custom.Rmd", f"{job_dir}/report.pdf"
+            )
+            payload = build_job_tar(proc_dir, {
+                'reporting_custom.Rmd': rmd_text,
+                'generate_report.R': r_script,
+            })
+        trace.add_bytes('stage-in', len(payload))
+
+        # Unpack, render with TinyTeX on PATH, stream the PDF back on stdout and
+        # always remove the job directory. R output goes to stderr so stdout is only the PDF.
+        # The STAGE_MARK lines let the single exec be split into stage-in/render/stage-out.
+        remote = (
+            f"set -e; mkdir -p {shlex.quote(job_dir)}; "
+            f"trap 'rm -rf {shlex.quote(job_dir)}' EXIT; "
+            f"tar -x -C {shlex.quote(job_dir)}; "
+            f"echo \"{STAGE_MARK} staged $(date +%s.%N)\" >&2; "
+            f"export PATH=/root/bin:$PATH; "
+            f"Rscript {shlex.quote(job_dir + '/generate_report.R')} 1>&2; "
+            f"echo \"{STAGE_MARK} rendered $(date +%s.%N)\" >&2; "
+            f"cat {shlex.quote(job_dir + '/report.pdf')}"
+        )
+
+        print(f"✓ Sending {len(payload)} bytes to {self.container} and rendering...")
+        exec_start = time.time()
+        cpu_start = os.times()
+        result = subprocess.run(
+            ['docker', 'exec', '-i', self.container, 'bash', '-c', remote],
+            input=payload,
+            capture_output=True,
+            timeout=R_TIMEOUT
+        )
+        exec_end = time.time()
+        cpu_end = os.times()
+
+        log = result.stderr.decode('utf-8', errors='replace')
+        marks = parse_stage_marks(log)
+        exec_cpu = (cpu_end.children_user + cpu_end.children_system) - (cpu_start.children_user + cpu_start.children_system)
+        if 'staged' in marks and 'rendered' in marks:
+            trace.record('stage-in', marks['staged'] - exec_start)
+            trace.record('render', marks['rendered'] - marks['staged'], exec_cpu)
+            trace.record('stage-out', exec_end - marks['rendered'])
+        else:
+            trace.record('render', exec_end - exec_start, exec_cpu)
+
+        if result.returncode != 0:
+            print(f"R script output: {log}")
+            raise RuntimeError(f"R report generation failed: {log[-2000:]}")
+
+        if not result.stdout:
+            raise FileNotFoundError(f"No PDF returned from {self.container}")
+
+        print(f"R output: {log}")
+        with trace.stage('stage-out'):
+            Path(pdf_path).write_bytes(result.stdout)
+        trace.add_bytes('stage-out', len(result.stdout))
+        return len(payload), len(result.stdout)
+
+
+def resolve_command(program):
+    """
+    Absolute path for a command, since renderers run from a temporary job
+    directory: a path (./stub.sh) is taken relative to the current directory,
+    a bare name is looked up on PATH (and left as is if not found).
+    """
+    if os.sep in program or (os.altsep and os.altsep in program):
+        return os.path.abspath(program)
+    return shutil.which(program) or program
+
+
+class LocalExecutor(ReportExecutor):
+    """
+    Render on the host without a container.
+
+    By default runs Rscript against an automated-Reporting checkout. When
+    render_cmd is given it is run instead as `render_cmd <rmd> <pdf>` from the
+    job directory, which lets a stub renderer stand in for R when benchmarking.
+    """
+
+    name = 'local'
+
+    def __init__(self, workspace=None, rscript='Rscript', render_cmd=None, template=None):
+        self.workspace = Path(workspace or os.environ.get('PERFANALYSIS_REPORTING_DIR', DEFAULT_REPORTING_DIR))
+        self.rscript = resolve_command(rscript)
+        self.render_cmd = shlex.split(render_cmd) if render_cmd else None
+        if self.render_cmd:
+            self.render_cmd[0] = resolve_command(self.render_cmd[0])
+        self.template = Path(template) if template else self.workspace / 'reporting.Rmd'
+
+    @property
+    def version(self):
+        if self.render_cmd:
+            return f"local:{' '.join(self.render_cmd)}"
+        return f"local:{self.rscript}"
+
+    def read_template(self):
+        try:
+            return self.template.read_text()
+        except OSError as e:
+            raise RuntimeError(f"Failed to read reporting.Rmd: {e}")
+
+    def data_location(self, job_id, proc_dir):
+        # Rendered in place - no staging copy of the proc directory is needed
+        return str(Path(proc_dir).resolve())
+
+    def render(self, job_id, proc_dir, rmd_text, pdf_path, trace=None):
+        if trace is None:
+            trace = StageTrace()
+
+        job_dir = Path(tempfile.mkdtemp(prefix=f'perfanalysis_{job_id}_'))
+        try:
+            rmd_path = job_dir / 'reporting_custom.Rmd'
+            out_pdf = job_dir / 'report.pdf'
+            with trace.stage('stage-in'):
+                rmd_path.write_text(rmd_text)
+
+                if self.render_cmd:
+                    cmd = self.render_cmd + [str(rmd_path), str(out_pdf)]
+                else:
+                    r_script = job_dir / 'generate_report.R'
+                    r_script.write_text(build_render_script(self.workspace, rmd_path, out_pdf))
+                    cmd = [self.rscript, str(r_script)]
+            trace.add_bytes('stage-in', len(rmd_text))
+
+            print(f"✓ Running local renderer: {' '.join(cmd)}")
+            with trace.stage('render'):
+                result = subprocess.run(
+                    cmd,
+                    cwd=job_dir,
+                    capture_output=True,
+                    text=True,
+                    timeout=R_TIMEOUT
+                )
+
+            if result.returncode != 0:
+                print(f"Renderer stderr: {result.stderr}")
+                print(f"Renderer stdout: {result.stdout}")
+                raise RuntimeError(f"Local report generation failed: {result.stderr}")
+
+            if not out_pdf.exists():
+                raise FileNotFoundError(f"Renderer did not produce {out_pdf}")
+
+            print(f"R output: {result.stdout}")
+            with trace.stage('stage-out'):
+                shutil.copyfile(out_pdf, pdf_path)
+            pdf_size = out_pdf.stat().st_size
+            trace.add_bytes('stage-out', pdf_size)
+            return len(rmd_text), pdf_size
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
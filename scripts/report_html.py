@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Fast self-contained HTML report
+
+An alternative to the R/LaTeX PDF for instant previews. It is built from
+the precomputed aggregates sidecar that the convert step already writes
+(proc/aggregates/, see report_aggregates.py), so render cost depends on the
+plot width and number of metrics, not on capture length, and the numbers
+match what the PDF report is given.
+
+The page has no external assets: the bucketed series are embedded once as
+a compact JSON block (column arrays, values rounded to 4 significant
+digits) and drawn on <canvas> by a few lines of inline JavaScript. Each
+chart shows the per-bucket min/max band with the mean line on top.
+"""
+
+import csv
+import html
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from report_aggregates import SIDECAR_DIRNAME
+
+
+HTML_RENDERER_VERSION = 'html-1'
+
+# (chart title, unit, [(metric, label), ...]) - metrics missing from the sidecar are skipped
+CHARTS = [
+    ('CPU Utilization', '%', [('cpu_usr', 'user'), ('cpu_system', 'system'),
+                              ('cpu_iowait', 'iowait'), ('cpu_steal', 'steal')]),
+    ('Memory Used', 'KiB', [('mem_used_kb', 'used'), ('mem_cached_kb', 'cached')]),
+    ('Disk Throughput', 'blocks/s', [('disk_bread_s', 'read'), ('disk_bwrtn_s', 'write')]),
+    ('Network Throughput', 'kB/s', [('net_rxkB_s', 'rx'), ('net_txkB_s', 'tx')]),
+]
+
+COLORS = ['#1f77b4', '#d62728', '#2ca02c', '#ff7f0e']
+
+
+def _round(value):
+    return float(f"{value:.4g}")
+
+
+def load_sidecar(proc_dir):
+    """Read summary.csv and series.csv from the aggregates sidecar."""
+    sidecar_dir = Path(proc_dir) / SIDECAR_DIRNAME
+
+    summary = {}
+    with open(sidecar_dir / "summary.csv", 'r') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        for row in reader:
+            summary[row[0]] = {name.lstrip('#'): float(v) for name, v in zip(header[1:], row[1:])}
+
+    with open(sidecar_dir / "series.csv", 'r') as f:
+        reader = csv.reader(f)
+        header = [h.lstrip('#') for h in next(reader)]
+        columns = {name: [] for name in header}
+        for row in reader:
+            for name, value in zip(header, row):
+                columns[name].append(float(value))
+
+    return summary, columns
+
+
+def build_payload(summary, columns):
+    """Compact column-oriented chart data for embedding in the page."""
+    payload = {'t': [int(t) for t in columns['ts_start']], 'charts': []}
+    for title, unit, metrics in CHARTS:
+        lines = []
+        for metric, label in metrics:
+            if f"{metric}_mean" not in columns:
+                continue
+            lines.append({
+                'label': label,
+                'min': [_round(v) for v in columns[f"{metric}_min"]],
+                'mean': [_round(v) for v in columns[f"{metric}_mean"]],
+                'max': [_round(v) for v in columns[f"{metric}_max"]],
+            })
+        if lines:
+            payload['charts'].append({'title': title, 'unit': unit, 'lines': lines})
+    return payload
+
+
+def summary_table(summary):
+    rows = []
+    for metric, s in summary.items():
+        cells = ''.join(f"<td>{s[k]:,.2f}</td>" for k in ('min', 'mean', 'p50', 'p95', 'p99', 'max'))
+        rows.append(f"<tr><th>{html.escape(metric)}</th><td>{int(s['count']):,}</td>{cells}</tr>")
+    return (
+        "<table><thead><tr><th>Metric</th><th>Samples</th><th>Min</th><th>Mean</th>"
+        "<th>P50</th><th>P95</th><th>P99</th><th>Max</th></tr></thead><tbody>"
+        + ''.join(rows) + "</tbody></table>"
+    )
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<title>{title}</title>
+<style>
+body{{font-family:-apple-system,Segoe UI,Helvetica,Arial,sans-serif;margin:24px;color:#222}}
+h1{{font-size:20px;margin:0 0 4px}} .meta{{color:#666;font-size:13px;margin-bottom:16px}}
+.grid{{display:grid;grid-template-columns:repeat(auto-fit,minmax(520px,1fr));gap:16px}}
+.chart{{border:1px solid #ddd;border-radius:4px;padding:8px}} .chart h2{{font-size:14px;margin:0 0 6px}}
+canvas{{width:100%;height:220px}} .legend span{{margin-right:12px;font-size:12px}}
+table{{border-collapse:collapse;margin-top:20px;font-size:13px}}
+th,td{{border:1px solid #ddd;padding:4px 8px;text-align:right}} th:first-child{{text-align:left}}
+</style></head><body>
+<h1>{title}</h1>
+<div class="meta">{meta}</div>
+<div class="grid" id="charts"></div>
+{table}
+<script id="data" type="application/json">{data}</script>
+<script>
+(function(){{
+var D=JSON.parse(document.getElementById('data').textContent),C={colors};
+function draw(c,el){{
+  var box=document.createElement('div');box.className='chart';
+  box.innerHTML='<h2>'+c.title+' ('+c.unit+')</h2><canvas></canvas><div class="legend"></div>';
+  el.appendChild(box);
+  var cv=box.querySelector('canvas'),r=window.devicePixelRatio||1;
+  cv.width=cv.clientWidth*r;cv.height=cv.clientHeight*r;
+  var g=cv.getContext('2d'),W=cv.width,H=cv.height,P=40*r,t=D.t,n=t.length,hi=0;
+  c.lines.forEach(function(l){{l.max.forEach(function(v){{if(v>hi)hi=v;}});}});
+  hi=hi||1;
+  function x(i){{return P+(n>1?(t[i]-t[0])/(t[n-1]-t[0]):0)*(W-P-8*r);}}
+  function y(v){{return H-P/2-(v/hi)*(H-P);}}
+  g.strokeStyle='#eee';g.fillStyle='#666';g.font=(10*r)+'px sans-serif';
+  for(var k=0;k<=4;k++){{var yy=y(hi*k/4);g.beginPath();g.moveTo(P,yy);g.lineTo(W,yy);g.stroke();
+    g.fillText((hi*k/4).toPrecision(3),2,yy+3*r);}}
+  c.lines.forEach(function(l,j){{
+    var col=C[j%C.length];
+    g.fillStyle=col;g.globalAlpha=0.18;g.beginPath();
+    for(var i=0;i<n;i++)g.lineTo(x(i),y(l.max[i]));
+    for(i=n-1;i>=0;i--)g.lineTo(x(i),y(l.min[i]));
+    g.fill();g.globalAlpha=1;g.strokeStyle=col;g.lineWidth=1.2*r;g.beginPath();
+    for(i=0;i<n;i++)g.lineTo(x(i),y(l.mean[i]));
+    g.stroke();
+    box.querySelector('.legend').innerHTML+='<span style="color:'+col+'">&#9632; '+l.label+'</span>';
+  }});
+}}
+var el=document.getElementById('charts');D.charts.forEach(function(c){{draw(c,el);}});
+}})();
+</script>
+</body></html>
+"""
+
+
+def render_html_report(proc_dir, output_path, title):
+    """Build report.html from the aggregates sidecar under proc_dir."""
+    summary, columns = load_sidecar(proc_dir)
+    payload = build_payload(summary, columns)
+
+    if payload['t']:
+        start = datetime.fromtimestamp(payload['t'][0], tz=timezone.utc)
+        end = datetime.fromtimestamp(int(columns['ts_end'][-1]), tz=timezone.utc)
+        samples = int(sum(columns['samples']))
+        meta = (f"{start:%Y-%m-%d %H:%M:%S} to {end:%Y-%m-%d %H:%M:%S} UTC &middot; "
+                f"{samples:,} samples in {len(payload['t'])} buckets")
+    else:
+        meta = "No samples"
+
+    # </ must not appear inside the JSON script block
+    data = json.dumps(payload, separators=(',', ':')).replace('</', '<\\/')
+
+    page = PAGE_TEMPLATE.format(
+        title=html.escape(title),
+        meta=meta,
+        table=summary_table(summary),
+        data=data,
+        colors=json.dumps(COLORS),
+    )
+
+    output_path = Path(output_path)
+    output_path.write_text(page)
+    return output_path
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Stage timing and resource trace for the report pipeline
+
+generate_analysis_report.py records one entry per pipeline stage:
+
+    cache      - reading the template, hashing inputs and the cache lookup
+    convert    - portal CSV to sar-format proc files
+    stage-in   - packing and delivering inputs to the renderer
+    render     - R markdown knit, pandoc and LaTeX pass
+    stage-out  - getting the PDF back to the output directory
+
+Each stage records wall time, CPU time (this process plus reaped children),
+bytes transferred and the peak RSS high-water mark (KiB) at the end of the
+stage. The trace is written as report_trace.json next to the PDF.
+
+For the docker executor the CPU and RSS of the R process itself live in the
+container and are not visible here; only the docker CLI is a child of this
+process. The local executor runs Rscript as a direct child, so its CPU and
+RSS are included.
+
+Usage (aggregate traces from many reports):
+    python report_trace.py summarize <trace.json> [<trace.json> ...]
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+from contextlib import contextmanager
+
+
+STAGES = ['cache', 'convert', 'stage-in', 'render', 'stage-out']
+
+TRACE_FILENAME = 'report_trace.json'
+
+
+def _cpu_seconds():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def _peak_rss_kb():
+    # ru_maxrss is KiB on Linux; children reports the largest reaped child
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+class StageTrace:
+    """Accumulates per-stage wall/CPU/bytes/RSS for a single report."""
+
+    def __init__(self, **info):
+        self.info = info
+        self.stages = {}
+        self.start_time = time.time()
+
+    def _entry(self, name):
+        if name not in self.stages:
+            self.stages[name] = {'wall_s': 0.0, 'cpu_s': 0.0, 'bytes': 0, 'peak_rss_kb': 0}
+        return self.stages[name]
+
+    def record(self, name, wall_s=0.0, cpu_s=0.0, nbytes=0):
+        """Add externally measured time or bytes to a stage."""
+        entry = self._entry(name)
+        entry['wall_s'] += max(wall_s, 0.0)
+        entry['cpu_s'] += max(cpu_s, 0.0)
+        entry['bytes'] += nbytes
+        entry['peak_rss_kb'] = max(entry['peak_rss_kb'], _peak_rss_kb())
+        return entry
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block of work as (part of) a stage."""
+        wall0 = time.perf_counter()
+        cpu0 = _cpu_seconds()
+        try:
+            yield self._entry(name)
+        finally:
+            self.record(name, time.perf_counter() - wall0, _cpu_seconds() - cpu0)
+
+    def add_bytes(self, name, nbytes):
+        self._entry(name)['bytes'] += nbytes
+
+    def to_dict(self):
+        ordered = [s for s in STAGES if s in self.stages] + [s for s in self.stages if s not in STAGES]
+        return {
+            **self.info,
+            'started_at': self.start_time,
+            'total_wall_s': time.time() - self.start_time,
+            'stages': [{'name': name, **self.stages[name]} for name in ordered],
+        }
+
+    def write(self, output_dir):
+        path = os.path.join(output_dir, TRACE_FILENAME)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def summarize(trace_files):
+    """Aggregate per-stage totals across many report traces."""
+    totals = {}
+    reports = 0
+    cache_hits = 0
+    total_wall = 0.0
+
+    for path in trace_files:
+        try:
+            with open(path, 'r') as f:
+                trace = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Skipping {path}: {e}", file=sys.stderr)
+            continue
+
+        reports += 1
+        cache_hits += 1 if trace.get('cache_hit') else 0
+        total_wall += trace.get('total_wall_s', 0.0)
+
+        for stage in trace.get('stages', []):
+            t = totals.setdefault(stage['name'], {'count': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                                                  'bytes': 0, 'max_wall_s': 0.0, 'peak_rss_kb': 0})
+            t['count'] += 1
+            t['wall_s'] += stage.get('wall_s', 0.0)
+            t['cpu_s'] += stage.get('cpu_s', 0.0)
+            t['bytes'] += stage.get('bytes', 0)
+            t['max_wall_s'] = max(t['max_wall_s'], stage.get('wall_s', 0.0))
+            t['peak_rss_kb'] = max(t['peak_rss_kb'], stage.get('peak_rss_kb', 0))
+
+    return {'reports': reports, 'cache_hits': cache_hits, 'total_wall_s': total_wall, 'stages': totals}
+
+
+def print_summary(summary):
+    stages = summary['stages']
+    staged_wall = sum(t['wall_s'] for t in stages.values()) or 1.0
+    ordered = [s for s in STAGES if s in stages] + [s for s in stages if s not in STAGES]
+
+    print("="*78)
+    print(f"Report pipeline stage breakdown ({summary['reports']} reports, "
+          f"{summary['cache_hits']} cache hits, {summary['total_wall_s']:.1f}s total)")
+    print("="*78)
+    print(f"{'Stage':<11} {'Count':>5} {'Wall s':>9} {'Share':>6} {'Avg s':>8} {'Max s':>8} "
+          f"{'CPU s':>8} {'MiB':>8} {'Peak RSS':>9}")
+    for name in ordered:
+        t = stages[name]
+        print(f"{name:<11} {t['count']:>5} {t['wall_s']:>9.2f} {t['wall_s'] / staged_wall * 100:>5.1f}% "
+              f"{t['wall_s'] / t['count']:>8.2f} {t['max_wall_s']:>8.2f} {t['cpu_s']:>8.2f} "
+              f"{t['bytes'] / 1048576:>8.2f} {t['peak_rss_kb'] / 1024:>7.0f}Mi")
+    print("="*78)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report pipeline trace tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_sum = sub.add_parser('summarize', help='Aggregate per-stage breakdown across traces')
+    p_sum.add_argument('traces', nargs='+', help='report_trace.json files')
+    p_sum.add_argument('--json', action='store_true', help='Print the aggregate as JSON')
+
+    args = parser.parse_args()
+
+    if args.command == 'summarize':
+        summary = summarize(args.traces)
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print_summary(summary)
+
+
+if __name__ == '__main__':
+    main()
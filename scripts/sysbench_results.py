@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+Sysbench results warehouse
+
+Parses sysbench output (cpu, memory and fileio runs) found anywhere under
+the results trees - raw logs such as host_sysbench.log or sysbench_cpu.log
+and the wrapper reports written by the benchmark scripts
+(<host>_benchmark_<stamp>.txt, which hold several runs plus a system
+information header) - into one typed SQLite table, so runs can be compared
+with a query instead of by reading text.
+
+Each run becomes one row with: test, mode (e.g. seq-write, rndrw), threads,
+events/sec, total time and events, latency min/avg/max/p95 (ms), CPU prime
+limit, memory ops/sec and MiB/s, fileio reads/writes/fsyncs per second and
+read/written MiB/s. Each file becomes one source row with the metadata that
+could be recovered: cloud, VM shape, host, date, kernel, CPU model and
+count - from the wrapper header, a system_info/ directory next to the log,
+and finally the path itself (Azure/..., oci_source_sysbench.log,
+20260108_f2s_v2/...). Anything the files do not say can be attached with
+the label command.
+
+The catalog is updated incrementally: files whose size and mtime are
+unchanged are skipped, changed files are re-parsed and files that have
+disappeared are dropped.
+
+Environment:
+    PERFANALYSIS_BENCH_DB    catalog path (default ~/.cache/perfanalysis/benchmarks.db)
+
+Usage:
+    python sysbench_results.py update                     # scan the repository's results trees
+    python sysbench_results.py update OCI/results new_run/ --full
+    python sysbench_results.py label Azure/results/20260108_f2s_v2 --cloud Azure --shape Standard_F2s_v2
+    python sysbench_results.py query --test cpu --group-by cloud,shape
+    python sysbench_results.py query --test cpu --shape f2s_v2 --metric events_per_sec
+    python sysbench_results.py query --test memory --group-by cloud,mode --metric mib_per_sec --format csv
+    python sysbench_results.py sql "SELECT host, max(events_per_sec) FROM results WHERE test = 'cpu' GROUP BY host"
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import sqlite3
+import argparse
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = Path.home() / ".cache" / "perfanalysis" / "benchmarks.db"
+# Bump when the tables or the parsed values change; an older catalog is rebuilt
+SCHEMA_VERSION = 2
+
+# File names that hold sysbench output
+PATTERNS = ['*sysbench*.log', '*sysbench*.txt', '*_benchmark_*.txt']
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__', 'venv', '.venv'}
+
+ANSI = re.compile(r'\x1b\[[0-9;]*m')
+RUN_START = re.compile(r'^sysbench (\d+\.\d+[\w.-]*)', re.M)
+SECTION = re.compile(r'^--- (.+?) ---\s*$', re.M)
+# Azure sizes (F2s_v2, Standard_D4s_v5) and OCI shapes (VM.Standard.E5.Flex)
+SHAPE = re.compile(r'(?i)\b(VM\.Standard[\w.]*|(?:standard_)?[a-z]{1,3}\d+[a-z]*_v\d+|standard_[a-z]\d+[a-z]*)\b')
+STAMP = re.compile(r'(20\d{6})_(\d{6})')
+
+FILEIO_MODES = {
+    'sequential write (creation)': 'seqwr',
+    'sequential rewrite': 'seqrewr',
+    'sequential read': 'seqrd',
+    'random read': 'rndrd',
+    'random write': 'rndwr',
+    'random r/w': 'rndrw',
+}
+
+# (column, SQL type) of one parsed run, in table order
+RUN_COLUMNS = [
+    ('run_index', 'INTEGER'),
+    ('test', 'TEXT'),
+    ('mode', 'TEXT'),
+    ('threads', 'INTEGER'),
+    ('sysbench_version', 'TEXT'),
+    ('total_time_s', 'REAL'),
+    ('total_events', 'INTEGER'),
+    ('events_per_sec', 'REAL'),
+    ('lat_min_ms', 'REAL'),
+    ('lat_avg_ms', 'REAL'),
+    ('lat_max_ms', 'REAL'),
+    ('lat_p95_ms', 'REAL'),
+    ('lat_sum_ms', 'REAL'),
+    ('fairness_events_stddev', 'REAL'),
+    ('fairness_time_stddev', 'REAL'),
+    ('cpu_max_prime', 'INTEGER'),
+    ('mem_block_size', 'TEXT'),
+    ('mem_total_mib', 'REAL'),
+    ('mem_ops_per_sec', 'REAL'),
+    ('mib_per_sec', 'REAL'),
+    ('io_reads_per_sec', 'REAL'),
+    ('io_writes_per_sec', 'REAL'),
+    ('io_fsyncs_per_sec', 'REAL'),
+    ('io_read_mib_s', 'REAL'),
+    ('io_written_mib_s', 'REAL'),
+    ('io_file_total', 'TEXT'),
+    ('io_block_size', 'TEXT'),
+    ('fingerprint', 'TEXT'),
+]
+
+SOURCE_COLUMNS = ['path', 'size', 'mtime', 'cloud', 'shape', 'host', 'run_date', 'kernel',
+                  'cpu_model', 'cpus', 'parsed_at']
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    cloud TEXT,
+    shape TEXT,
+    host TEXT,
+    run_date TEXT,
+    kernel TEXT,
+    cpu_model TEXT,
+    cpus INTEGER,
+    parsed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL REFERENCES sources(id) ON DELETE CASCADE,
+    {', '.join(f'{name} {kind}' for name, kind in RUN_COLUMNS)}
+);
+CREATE TABLE IF NOT EXISTS labels (prefix TEXT PRIMARY KEY, cloud TEXT, shape TEXT, host TEXT);
+CREATE INDEX IF NOT EXISTS runs_source ON runs(source_id);
+CREATE INDEX IF NOT EXISTS runs_test ON runs(test, mode);
+CREATE INDEX IF NOT EXISTS sources_group ON sources(cloud, shape);
+CREATE VIEW IF NOT EXISTS results AS
+    SELECT s.path, s.cloud, s.shape, s.host, s.run_date, s.kernel, s.cpu_model, s.cpus, r.*
+    FROM runs r JOIN sources s ON s.id = r.source_id;
+"""
+
+
+# ---------------------------------------------------------------- parsing
+
+def _number(pattern, text, cast=float):
+    match = re.search(pattern, text, re.M)
+    return cast(match.group(1)) if match else None
+
+
+def parse_run(block, section=None):
+    """
+    One sysbench run (text from its version banner to the next one) as a
+    dict of RUN_COLUMNS, or None for output without results (prepare,
+    cleanup, a run that was interrupted before its statistics).
+
+    section is the wrapper's '--- Random Write ---' heading, the only place
+    the memory access mode is recorded besides sysbench's own 'access mode:'
+    line; with neither, the run used sysbench's default (seq).
+    """
+    if 'General statistics' not in block and 'File operations' not in block:
+        return None
+
+    run = {name: None for name, _ in RUN_COLUMNS}
+    run['sysbench_version'] = RUN_START.match(block).group(1)
+    run['threads'] = _number(r'Number of threads:\s*(\d+)', block, int)
+    run['total_time_s'] = _number(r'total time:\s*([\d.]+)s', block)
+    run['total_events'] = _number(r'total number of events:\s*(\d+)', block, int)
+    run['lat_min_ms'] = _number(r'^\s*min:\s*([\d.]+)', block)
+    run['lat_avg_ms'] = _number(r'^\s*avg:\s*([\d.]+)', block)
+    run['lat_max_ms'] = _number(r'^\s*max:\s*([\d.]+)', block)
+    run['lat_p95_ms'] = _number(r'^\s*95th percentile:\s*([\d.]+)', block)
+    run['lat_sum_ms'] = _number(r'^\s*sum:\s*([\d.]+)', block)
+    run['fairness_events_stddev'] = _number(r'events \(avg/stddev\):\s*[\d.]+/([\d.]+)', block)
+    run['fairness_time_stddev'] = _number(r'execution time \(avg/stddev\):\s*[\d.]+/([\d.]+)', block)
+
+    if 'Prime numbers limit' in block:
+        run['test'] = 'cpu'
+        run['cpu_max_prime'] = _number(r'Prime numbers limit:\s*(\d+)', block, int)
+        run['events_per_sec'] = _number(r'events per second:\s*([\d.]+)', block)
+    elif 'memory speed test' in block:
+        run['test'] = 'memory'
+        operation = _number(r'^\s*operation:\s*(\w+)', block, str)
+        access = _number(r'^\s*access mode:\s*(\w+)', block, str)
+        if access is None and section:
+            access = 'rnd' if 'random' in section.lower() else 'seq' if 'sequential' in section.lower() else None
+        if access is None:
+            # Nothing says otherwise, so sysbench ran with its default --memory-access-mode
+            access = 'seq'
+        run['mode'] = '-'.join(part for part in (access, operation) if part) or None
+        run['mem_block_size'] = _number(r'^\s*block size:\s*(\S+)', block, str)
+        run['mem_total_mib'] = _number(r'^\s*total size:\s*([\d.]+)MiB', block)
+        run['mem_ops_per_sec'] = _number(r'Total operations:\s*\d+\s*\(([\d.]+) per second\)', block)
+        run['mib_per_sec'] = _number(r'MiB transferred \(([\d.]+) MiB/sec\)', block)
+        run['events_per_sec'] = run['mem_ops_per_sec']
+    elif 'File operations' in block or 'Extra file open flags' in block:
+        run['test'] = 'fileio'
+        doing = _number(r'^Doing (.+?) test', block, str)
+        run['mode'] = FILEIO_MODES.get(doing, doing)
+        run['io_file_total'] = _number(r'^(\S+) total file size', block, str)
+        run['io_block_size'] = _number(r'^Block size (\S+)', block, str)
+        run['io_reads_per_sec'] = _number(r'reads/s:\s*([\d.]+)', block)
+        run['io_writes_per_sec'] = _number(r'writes/s:\s*([\d.]+)', block)
+        run['io_fsyncs_per_sec'] = _number(r'fsyncs/s:\s*([\d.]+)', block)
+        run['io_read_mib_s'] = _number(r'read, MiB/s:\s*([\d.]+)', block)
+        run['io_written_mib_s'] = _number(r'written, MiB/s:\s*([\d.]+)', block)
+        if run['io_read_mib_s'] is not None or run['io_written_mib_s'] is not None:
+            run['mib_per_sec'] = (run['io_read_mib_s'] or 0.0) + (run['io_written_mib_s'] or 0.0)
+    else:
+        run['test'] = 'other'
+
+    if run['events_per_sec'] is None and run['total_events'] and run['total_time_s']:
+        run['events_per_sec'] = run['total_events'] / run['total_time_s']
+    # The wrappers tee the same output into a run log and a report; identical runs share this
+    run['fingerprint'] = '|'.join(str(run[key]) for key in ('test', 'mode', 'threads', 'total_events',
+                                                           'total_time_s', 'lat_sum_ms'))
+    return run
+
+
+def parse_header(text):
+    """System information written by the benchmark wrapper scripts, if present."""
+    info = {}
+    info['host'] = _number(r'^Hostname:\s*(\S+)', text, str)
+    info['kernel'] = _number(r'^Kernel:\s*(\S+)', text, str)
+    info['cpu_model'] = _number(r'^Model name:\s*(.+?)\s*$', text, str)
+    info['cpus'] = _number(r'^CPU\(s\):\s*(\d+)', text, int)
+    date = _number(r'^Date:\s*(.+?)\s*$', text, str)
+    if date:
+        for fmt in ('%a %b %d %H:%M:%S %Z %Y', '%a %b %d %H:%M:%S %Y'):
+            try:
+                info['run_date'] = datetime.strptime(re.sub(r'\s+', ' ', date), fmt).isoformat()
+                break
+            except ValueError:
+                pass
+    size = re.search(r'^--- (?:Azure VM Size|OCI Shape).*---\s*\n\s*(\S+)', text, re.M)
+    if size:
+        info['shape'] = size.group(1)
+    return {key: value for key, value in info.items() if value is not None}
+
+
+def parse_text(text):
+    """Header info and the parsed runs of one file's text."""
+    text = ANSI.sub('', text)
+    starts = [m.start() for m in RUN_START.finditer(text)]
+    runs = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        sections = SECTION.findall(text, 0, start)
+        run = parse_run(text[start:end], sections[-1] if sections else None)
+        if run is not None:
+            run['run_index'] = len(runs)
+            runs.append(run)
+    return parse_header(text[:starts[0]] if starts else text), runs
+
+
+def system_info(directory):
+    """Kernel, CPU model and count from a system_info/ directory saved next to the logs."""
+    info = {}
+    base = directory / 'system_info'
+    try:
+        cpuinfo = (base / 'cpuinfo.txt').read_text(errors='replace')
+        info['cpu_model'] = _number(r'^model name\s*:\s*(.+?)\s*$', cpuinfo, str)
+        info['cpus'] = len(re.findall(r'^processor\s*:', cpuinfo, re.M)) or None
+    except OSError:
+        pass
+    try:
+        uname = (base / 'uname.txt').read_text(errors='replace').split()
+        if len(uname) > 2:
+            info['host'], info['kernel'] = uname[1], uname[2]
+    except OSError:
+        pass
+    return {key: value for key, value in info.items() if value is not None}
+
+
+def path_info(path):
+    """Cloud, shape, host and date as far as the path tells them."""
+    info = {}
+    # Azure/results/..., azure_vm_20260107/, oci_source_sysbench.log
+    for part in path.parts:
+        prefix = re.split(r'[_\-.]', part.lower())[0]
+        if prefix in ('azure', 'oci'):
+            info['cloud'] = 'Azure' if prefix == 'azure' else 'OCI'
+    for part in reversed(path.parts):
+        match = SHAPE.search(part)
+        if match:
+            info['shape'] = match.group(1)
+            break
+
+    stem = path.stem
+    for suffix in ('_sysbench_cpu', '_sysbench', '_benchmark'):
+        if suffix in stem:
+            host = stem.split(suffix)[0]
+            # host_sysbench.log is the VM itself, whose name comes from system_info/ if at all
+            if host.lower() not in ('azure', 'oci', 'host', '') and not STAMP.search(host):
+                info['host'] = host
+            break
+    for part in reversed(path.parts):
+        match = STAMP.search(part)
+        if match:
+            info['run_date'] = datetime.strptime(''.join(match.groups()), '%Y%m%d%H%M%S').isoformat()
+            break
+    return info
+
+
+def describe_source(path, text):
+    """Source metadata for one file: wrapper header, then system_info/, then the path."""
+    header, runs = parse_text(text)
+    info = {**system_info(path.parent), **path_info(path), **header}
+    if 'shape' in header and 'cloud' not in info:
+        info['cloud'] = 'OCI' if header['shape'].startswith('VM.') else 'Azure'
+    return info, runs
+
+
+# ---------------------------------------------------------------- catalog
+
+def find_logs(roots):
+    """Candidate sysbench files under the given files and directories."""
+    for root in roots:
+        root = Path(root)
+        if root.is_file():
+            yield root.resolve()
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for name in sorted(filenames):
+                if any(Path(name).match(pattern) for pattern in PATTERNS):
+                    yield (Path(dirpath) / name).resolve()
+
+
+class Catalog:
+    """SQLite catalog of parsed sysbench runs."""
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or os.environ.get('PERFANALYSIS_BENCH_DB') or DEFAULT_DB)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.db_path))
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA foreign_keys = ON')
+        version = self._schema_version()
+        if version not in (None, SCHEMA_VERSION):
+            # Derived data only: rebuild rather than migrate
+            self.db.executescript('DROP VIEW IF EXISTS results; DROP TABLE IF EXISTS runs; '
+                                  'DROP TABLE IF EXISTS sources; DROP TABLE IF EXISTS meta;')
+        self.db.executescript(SCHEMA)
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        self.db.commit()
+
+    def _schema_version(self):
+        try:
+            row = self.db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return int(row[0]) if row else None
+
+    def close(self):
+        self.db.close()
+
+    def labels_for(self, path):
+        """Label overrides for a path, longest matching prefix last so it wins."""
+        info = {}
+        rows = self.db.execute('SELECT * FROM labels ORDER BY length(prefix)').fetchall()
+        for row in rows:
+            if str(path) == row['prefix'] or str(path).startswith(row['prefix'].rstrip('/') + '/'):
+                info.update({key: row[key] for key in ('cloud', 'shape', 'host') if row[key]})
+        return info
+
+    def add_source(self, path, stat):
+        text = path.read_text(errors='replace')
+        info, runs = describe_source(path, text)
+        info.update(self.labels_for(path))
+        self.db.execute('DELETE FROM sources WHERE path = ?', (str(path),))
+        source = {key: info.get(key) for key in SOURCE_COLUMNS}
+        source.update(path=str(path), size=stat.st_size, mtime=stat.st_mtime,
+                      parsed_at=datetime.now().isoformat(timespec='seconds'))
+        cursor = self.db.execute(
+            f"INSERT INTO sources ({', '.join(SOURCE_COLUMNS)}) VALUES ({', '.join('?' * len(SOURCE_COLUMNS))})",
+            [source[key] for key in SOURCE_COLUMNS])
+        names = ['source_id'] + [name for name, _ in RUN_COLUMNS]
+        self.db.executemany(
+            f"INSERT INTO runs ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+            [[cursor.lastrowid] + [run[name] for name, _ in RUN_COLUMNS] for run in runs])
+        return len(runs)
+
+    def update(self, roots, full=False):
+        """Parse new and changed files under roots; drop catalogued files that no longer exist there."""
+        known = {row['path']: (row['size'], row['mtime'])
+                 for row in self.db.execute('SELECT path, size, mtime FROM sources')}
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'runs': 0}
+        seen = set()
+        for path in find_logs(roots):
+            seen.add(str(path))
+            stat = path.stat()
+            previous = known.get(str(path))
+            if previous == (stat.st_size, stat.st_mtime) and not full:
+                counts['unchanged'] += 1
+                continue
+            counts['runs'] += self.add_source(path, stat)
+            counts['updated' if previous else 'added'] += 1
+
+        scanned = [str(Path(root).resolve()) for root in roots]
+        for path in known:
+            under = any(path == root or path.startswith(root.rstrip('/') + '/') for root in scanned)
+            if under and path not in seen:
+                self.db.execute('DELETE FROM sources WHERE path = ?', (path,))
+                counts['removed'] += 1
+        self.db.commit()
+        return counts
+
+    def label(self, prefix, cloud=None, shape=None, host=None):
+        """Attach cloud/shape/host to every file under prefix, now and on later updates."""
+        prefix = str(Path(prefix).resolve())
+        self.db.execute('INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)', (prefix, cloud, shape, host))
+        values = {key: value for key, value in (('cloud', cloud), ('shape', shape), ('host', host)) if value}
+        if not values:
+            return 0
+        cursor = self.db.execute(
+            f"UPDATE sources SET {', '.join(f'{key} = ?' for key in values)} "
+            f"WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+            [*values.values(), prefix, prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '/%'])
+        self.db.commit()
+        return cursor.rowcount
+
+    def select(self, filters=None, columns='*', unique=True):
+        """
+        Rows of the results view matching {column: value}; text values match
+        case-insensitively as substrings. With unique, a run found in several
+        files (a run log and the report it was copied into) is returned once.
+        """
+        where, params = [], []
+        for column, value in (filters or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, str):
+                where.append(f"{column} LIKE ?")
+                params.append(f"%{value}%")
+            else:
+                where.append(f"{column} = ?")
+                params.append(value)
+        sql = f"SELECT {columns} FROM results"
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        rows = self.db.execute(sql + ' ORDER BY run_date, path, run_index', params).fetchall()
+        if not unique:
+            return rows
+        seen = set()
+        kept = []
+        for row in rows:
+            if row['fingerprint'] not in seen:
+                seen.add(row['fingerprint'])
+                kept.append(row)
+        return kept
+
+    def summary(self):
+        return self.db.execute(
+            'SELECT test, count(*) AS runs, count(DISTINCT source_id) AS files FROM runs GROUP BY test'
+        ).fetchall()
+
+
+def aggregate(rows, group_by, metric):
+    """n/mean/stdev/min/max of metric per group_by combination."""
+    groups = {}
+    for row in rows:
+        if row[metric] is None:
+            continue
+        key = tuple(row[column] if row[column] is not None else '?' for column in group_by)
+        groups.setdefault(key, []).append(row[metric])
+    result = []
+    for key in sorted(groups, key=lambda k: tuple(str(v) for v in k)):
+        values = groups[key]
+        result.append({
+            **dict(zip(group_by, key)),
+            'n': len(values),
+            'mean': statistics.fmean(values),
+            'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
+            'min': min(values),
+            'max': max(values),
+        })
+    return result
+
+
+def display_path(path):
+    try:
+        return os.path.relpath(path)
+    except ValueError:
+        return path
+
+
+def print_table(records, columns, empty="No matching runs"):
+    if not records:
+        print(empty)
+        return
+    cells = [[_format(record[c]) for c in columns] for record in records]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(columns)]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in cells:
+        print('  '.join(cell.rjust(w) if _numeric(cell) else cell.ljust(w) for cell, w in zip(row, widths)))
+
+
+def _format(value):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def _numeric(cell):
+    return bool(re.match(r'^-?[\d,]+(\.\d+)?$', cell))
+
+
+def write_records(records, columns, fmt, empty="No matching runs"):
+    if fmt == 'json':
+        json.dump([{c: record[c] for c in columns} for record in records], sys.stdout, indent=2)
+        print()
+    elif fmt == 'csv':
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        for record in records:
+            writer.writerow([record[c] for c in columns])
+    else:
+        print_table(records, columns, empty)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse sysbench logs into a queryable catalog')
+    parser.add_argument('--db', default=None, help=f'Catalog path (default: $PERFANALYSIS_BENCH_DB or {DEFAULT_DB})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    update = sub.add_parser('update', help='Parse new and changed sysbench logs')
+    update.add_argument('roots', nargs='*', help='Files or directories to scan (default: the repository)')
+    update.add_argument('--full', action='store_true', help='Re-parse every file, changed or not')
+
+    label = sub.add_parser('label', help='Set cloud/shape/host for every log under a path')
+    label.add_argument('prefix', help='File or directory')
+    label.add_argument('--cloud')
+    label.add_argument('--shape')
+    label.add_argument('--host')
+
+    query = sub.add_parser('query', help='List or aggregate runs')
+    query.add_argument('--test', choices=['cpu', 'memory', 'fileio'], help='Benchmark type')
+    query.add_argument('--mode', help='e.g. seq-write, rnd-read, rndrw, seqrd')
+    query.add_argument('--cloud', help='Azure or OCI')
+    query.add_argument('--shape', help='Substring of the VM size/shape, e.g. f2s_v2')
+    query.add_argument('--host', help='Substring of the host name')
+    query.add_argument('--path', help='Substring of the log path')
+    query.add_argument('--threads', type=int)
+    query.add_argument('--metric', default='events_per_sec',
+                       choices=[name for name, kind in RUN_COLUMNS if kind in ('REAL', 'INTEGER')
+                                and name != 'run_index'],
+                       help='Value to report (default: events_per_sec)')
+    query.add_argument('--group-by', default=None,
+                       help='Comma-separated columns to aggregate over, e.g. cloud,shape or host,test,mode')
+    query.add_argument('--all', action='store_true',
+                       help='Keep runs that appear in more than one file (default: count them once)')
+    query.add_argument('--format', choices=['table', 'csv', 'json'], default='table')
+
+    sql = sub.add_parser('sql', help="Run SQL against the catalog (tables: sources, runs; view: results)")
+    sql.add_argument('statement')
+    sql.add_argument('--format', choices=['table', 'csv', 'json'], default='table')
+
+    sub.add_parser('summary', help='Runs and files per test')
+
+    args = parser.parse_args()
+    catalog = Catalog(args.db)
+    try:
+        if args.command == 'update':
+            roots = args.roots or [str(REPO_ROOT)]
+            counts = catalog.update(roots, full=args.full)
+            print(f"✓ {counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged, "
+                  f"{counts['removed']} removed ({counts['runs']} runs parsed) -> {catalog.db_path}")
+
+        elif args.command == 'label':
+            if not (args.cloud or args.shape or args.host):
+                parser.error('label needs at least one of --cloud, --shape, --host')
+            changed = catalog.label(args.prefix, args.cloud, args.shape, args.host)
+            print(f"✓ Labelled {changed} catalogued files under {args.prefix}")
+
+        elif args.command == 'query':
+            filters = {'test': args.test, 'mode': args.mode, 'cloud': args.cloud, 'shape': args.shape,
+                       'host': args.host, 'path': args.path, 'threads': args.threads}
+            rows = catalog.select(filters, unique=not args.all)
+            if args.group_by:
+                group_by = [c.strip() for c in args.group_by.split(',') if c.strip()]
+                unknown = [c for c in group_by if rows and c not in rows[0].keys()]
+                if unknown:
+                    parser.error(f"unknown --group-by column(s): {', '.join(unknown)}")
+                records = aggregate(rows, group_by, args.metric)
+                columns = group_by + ['n', 'mean', 'stdev', 'min', 'max']
+                if args.format == 'table':
+                    print(f"{args.metric} by {', '.join(group_by)}\n")
+            else:
+                records = [{**dict(row), 'path': display_path(row['path'])} for row in rows]
+                columns = ['path', 'cloud', 'shape', 'host', 'test', 'mode', 'threads', args.metric]
+            write_records(records, columns, args.format)
+
+        elif args.command == 'sql':
+            try:
+                cursor = catalog.db.execute(args.statement)
+            except sqlite3.Error as e:
+                print(f"❌ {e}", file=sys.stderr)
+                sys.exit(1)
+            rows = cursor.fetchall()
+            columns = [d[0] for d in cursor.description or []]
+            write_records([dict(zip(columns, row)) for row in rows], columns, args.format)
+
+        else:
+            write_records([dict(row) for row in catalog.summary()], ['test', 'runs', 'files'], 'table')
+    finally:
+        catalog.close()
+
+
+if __name__ == '__main__':
+    main()
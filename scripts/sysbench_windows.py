@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+Line up sysbench runs with the pcc capture recorded alongside them
+
+A sysbench log says how long each run took and how many events it did,
+but not when it ran; the capture says what the machine was doing every few
+seconds, but not which benchmark was running. This tool places each run
+in the capture and reports resource usage per benchmark event:
+
+    window        the run's start and end, found by sliding a window of the
+                  run's own length (total time from the log) over the capture
+                  and taking the position with the most CPU work. Runs of one
+                  file are placed in order, each after the previous one, and
+                  not before the Date: of a benchmark report. When the work
+                  is flat over a range of positions (the capture hardly
+                  outlasts the run) the middle is used and half the range is
+                  reported as the uncertainty.
+    cpu           CPU-seconds used during the window, per event (us) and
+                  events per CPU-second; busy cores; user/system split. For
+                  a log run on the host while captured containers were busy,
+                  the containers' CPU is subtracted first
+    contention    steal and iowait as a share of the machine's capacity, and
+                  for container runs the cgroup's throttled time
+    io            disk read/write and network MiB during the window
+
+Captures: pcc_collection.json (raw /proc counters, exact CPU-seconds), the
+merged performance CSV (percentages; needs --cpus), and for container runs
+container_collection.json with container_names.json (cgroup counters),
+where steal comes from the host capture in the same directory.
+
+Every run is integrated against cumulative counters with np.interp, so
+placing and measuring any number of runs is a handful of array operations
+regardless of capture length (requires numpy).
+
+Pairing in a results directory: <name>_sysbench.log goes with the container
+called <name>, else <name>_collection.json or <name>_pcc_collection.json,
+else the directory's host_collection.json, pcc_collection.json or
+*_performance.csv.
+
+Usage:
+    python sysbench_windows.py Azure/results/pcc-test-vm-loadtest-3
+    python sysbench_windows.py Azure/results/20260107_191006 OCI/results/20260107_094154 --output efficiency.csv
+    python sysbench_windows.py --log run.log --capture pcc_collection.json --start 1768077310
+    python sysbench_windows.py --log run.log --capture merged_performance.csv --cpus 2 --format json
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+import calendar
+from datetime import datetime, timezone
+from pathlib import Path
+
+import sysbench_results
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# /proc/stat ticks per second
+USER_HZ = 100
+# Step of the sliding window search, seconds
+SEARCH_STEP = 1.0
+# Positions within this share of the best CPU work count as equally good
+PLATEAU = 0.002
+# Interfaces whose traffic is already counted on a physical interface
+VIRTUAL_IFACES = ('lo', 'docker', 'veth', 'br-', 'virbr', 'cni', 'flannel')
+
+OUTPUT_FIELDS = [
+    'log', 'source', 'host', 'test', 'mode', 'threads', 'start', 'end', 'duration_s', 'uncertainty_s',
+    'coverage_pct', 'events', 'events_per_sec', 'cpus', 'cpu_seconds', 'container_cpu_seconds', 'cpu_us_per_event',
+    'events_per_cpu_second', 'busy_cores', 'user_pct', 'system_pct', 'steal_pct', 'iowait_pct',
+    'throttled_pct', 'mem_used_pct', 'disk_read_mib', 'disk_write_mib', 'net_mib',
+]
+
+
+class Timeline:
+    """
+    One capture source as cumulative counters at the sample timestamps.
+
+    counters are running totals (CPU-seconds, bytes) made monotonic, so the
+    amount in any window is a difference of two interpolated values; gauges
+    (memory %) are averaged over a window the same way via their running
+    time integral.
+    """
+
+    def __init__(self, name, timestamps, counters, gauges=None, cpus=None):
+        order = np.argsort(timestamps, kind='stable')
+        self.name = name
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)[order]
+        self.cpus = cpus
+        self.counters = {}
+        for key, values in counters.items():
+            values = np.asarray(values, dtype=np.float64)[order]
+            # A reset (reboot, container restart) would read as negative work
+            steps = np.clip(np.diff(values), 0, None)
+            self.counters[key] = np.concatenate(([0.0], np.cumsum(steps)))
+        dt = np.diff(self.timestamps)
+        for key, values in (gauges or {}).items():
+            values = np.asarray(values, dtype=np.float64)[order]
+            self.counters[f"{key}_integral"] = np.concatenate(([0.0], np.cumsum(values[1:] * dt)))
+
+    @property
+    def start(self):
+        return float(self.timestamps[0])
+
+    @property
+    def end(self):
+        return float(self.timestamps[-1])
+
+    def amount(self, key, starts, ends):
+        """Counter increase over each [start, end] window (vectorised over windows)."""
+        cumulative = self.counters[key]
+        return np.interp(ends, self.timestamps, cumulative) - np.interp(starts, self.timestamps, cumulative)
+
+    def mean(self, key, starts, ends):
+        """Time-weighted mean of a gauge over each window."""
+        span = np.maximum(np.minimum(ends, self.end) - np.maximum(starts, self.start), 1e-9)
+        return self.amount(f"{key}_integral", starts, ends) / span
+
+    def coverage(self, starts, ends):
+        """Share of each window that lies inside the capture."""
+        inside = np.clip(np.minimum(ends, self.end) - np.maximum(starts, self.start), 0, None)
+        return inside / np.maximum(ends - starts, 1e-9)
+
+    def has(self, key):
+        return key in self.counters
+
+
+# ----------------------------------------------------------------- loaders
+
+def proc_cpu(text):
+    """Aggregate 'cpu ' fields (ticks) and the number of cpuN lines."""
+    total, cpus = None, 0
+    for line in text.splitlines():
+        if line.startswith('cpu '):
+            total = [int(v) for v in line.split()[1:9]]
+            total += [0] * (8 - len(total))
+        elif line.startswith('cpu'):
+            cpus += 1
+    return total, cpus
+
+
+def mem_used_pct(used_kb, free_kb, cached_kb):
+    """
+    Memory in use as a percentage of used + free + page cache, from sar's
+    kbmemused, kbmemfree and kbcached. Every capture format carries these
+    three the same way, while the merged CSVs' mem_total_kb is filled in
+    differently by each converter, so this is the one definition used for
+    both merged CSVs and raw captures.
+    """
+    used, free, cached = (np.asarray(v, dtype=np.float64) for v in (used_kb, free_kb, cached_kb))
+    total = used + free + cached
+    return np.where(total > 0, used / np.maximum(total, 1) * 100, np.nan)
+
+
+def proc_meminfo(text):
+    """mem_used_pct of one /proc/meminfo sample, with kbmemused worked out as sar does."""
+    values = {}
+    for line in text.splitlines():
+        key, _, rest = line.partition(':')
+        if key in ('MemTotal', 'MemFree', 'Buffers', 'Cached', 'Slab') and rest:
+            values[key] = int(rest.split()[0])
+    if not values.get('MemTotal'):
+        return np.nan
+    free, cached = values.get('MemFree', 0), values.get('Cached', 0)
+    used = values['MemTotal'] - free - values.get('Buffers', 0) - cached - values.get('Slab', 0)
+    return float(mem_used_pct(used, free, cached))
+
+
+def proc_diskstats(text):
+    """Bytes read and written over whole disks (partitions, loop and ram devices skipped)."""
+    devices = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) >= 10:
+            devices[fields[2]] = (int(fields[5]), int(fields[9]))
+    read = written = 0
+    for name, (sectors_read, sectors_written) in devices.items():
+        if name.startswith(('loop', 'ram')) or any(name != other and name.startswith(other) for other in devices):
+            continue
+        read += sectors_read * 512
+        written += sectors_written * 512
+    return read, written
+
+
+def proc_netdev(text):
+    """Bytes received and transmitted over physical interfaces."""
+    rx = tx = 0
+    for line in text.splitlines():
+        name, sep, rest = line.partition(':')
+        if not sep or '|' in line or name.strip().startswith(VIRTUAL_IFACES):
+            continue
+        fields = rest.split()
+        rx += int(fields[0])
+        tx += int(fields[8])
+    return rx, tx
+
+
+def read_pcc_samples(path):
+    """
+    Counters of every sample in a raw pcc_collection.json (JSON lines of
+    /proc text): timestamps, 'cpu ' ticks (n x 8: user nice system idle
+    iowait irq softirq steal), memory used %, disk read/write bytes and
+    network rx/tx bytes (n x 2 each), and the CPU count.
+    """
+    wanted = {'/proc/stat', '/proc/meminfo', '/proc/diskstats', '/proc/net/dev'}
+    samples = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('subsystem') in wanted:
+                samples.setdefault(record['timestamp'], {})[record['subsystem']] = record['measurement']
+
+    stamps, cpu, mem, disk, net = [], [], [], [], []
+    cpus = 0
+    for ts in sorted(samples):
+        sample = samples[ts]
+        ticks, count = proc_cpu(sample.get('/proc/stat', ''))
+        if ticks is None:
+            continue
+        cpus = max(cpus, count)
+        stamps.append(ts)
+        cpu.append(ticks)
+        mem.append(proc_meminfo(sample.get('/proc/meminfo', '')))
+        disk.append(proc_diskstats(sample.get('/proc/diskstats', '')))
+        net.append(proc_netdev(sample.get('/proc/net/dev', '')))
+    if len(stamps) < 2:
+        raise ValueError(f"{path}: fewer than two /proc/stat samples")
+    return (np.array(stamps, dtype=np.float64), np.array(cpu, dtype=np.float64), np.array(mem),
+            np.array(disk, dtype=np.float64), np.array(net, dtype=np.float64), cpus or None)
+
+
+def load_pcc(path):
+    """Host timeline from a raw pcc_collection.json."""
+    stamps, cpu, mem, disk, net, cpus = read_pcc_samples(path)
+    ticks = cpu / USER_HZ
+    user, nice, system, idle, iowait, irq, softirq, steal = ticks.T
+    return Timeline(str(path), stamps, {
+        'busy': user + nice + system + irq + softirq,
+        'user': user + nice,
+        'system': system + irq + softirq,
+        'iowait': iowait,
+        'steal': steal,
+        'disk_read': disk[:, 0],
+        'disk_write': disk[:, 1],
+        'net': net.sum(axis=1),
+    }, {'mem_used_pct': mem}, cpus)
+
+
+def load_merged_csv(path, cpus):
+    """Host timeline from the merged performance CSV (per-interval percentages and byte rates)."""
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    if len(rows) < 2:
+        raise ValueError(f"{path}: fewer than two samples")
+    column = lambda key: np.array([float(row.get(key) or 0) for row in rows])
+    stamps = column('timestamp')
+    order = np.argsort(stamps, kind='stable')
+    stamps = stamps[order]
+    dt = np.concatenate(([0.0], np.diff(stamps)))
+    capacity = (cpus or 1) * dt / 100.0
+    # Each row's percentages describe the interval ending at its timestamp
+    running = lambda values: np.cumsum(values[order] * capacity)
+    per_second = lambda values: np.cumsum(values[order] * dt)
+    mem = mem_used_pct(column('mem_used_kb'), column('mem_free_kb'), column('mem_cached_kb'))
+    return Timeline(str(path), stamps, {
+        'busy': running(100.0 - column('cpu_idle') - column('cpu_iowait') - column('cpu_steal')),
+        'user': running(column('cpu_user')),
+        'system': running(column('cpu_system')),
+        'iowait': running(column('cpu_iowait')),
+        'steal': running(column('cpu_steal')),
+        'disk_read': per_second(column('disk_read_bytes')),
+        'disk_write': per_second(column('disk_write_bytes')),
+        'net': per_second(column('net_rx_bytes') + column('net_tx_bytes')),
+    }, {'mem_used_pct': mem[order]}, cpus)
+
+
+def load_containers(path, names_path=None):
+    """Per-container timelines (keyed by name) from container_collection.json cgroup counters."""
+    names = {}
+    if names_path and os.path.exists(names_path):
+        with open(names_path) as f:
+            names = json.load(f)
+    series = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            data = record['measurement']
+            data = json.loads(data) if isinstance(data, str) else data
+            cid = data.get('container_id', record['subsystem'])
+            name = data.get('container_name') or names.get(cid) or cid[:12]
+            series.setdefault(name, []).append((record['timestamp'], data))
+
+    timelines = {}
+    for name, samples in series.items():
+        if len(samples) < 2:
+            continue
+        stamps = [ts for ts, _ in samples]
+        value = lambda key: np.array([float(d.get(key) or 0) for _, d in samples])
+        limit = value('memory_max')
+        timelines[name] = Timeline(f"{path}:{name}", stamps, {
+            'busy': value('cpu_usage_usec') / 1e6,
+            'user': value('cpu_user_usec') / 1e6,
+            'system': value('cpu_system_usec') / 1e6,
+            'throttled': value('cpu_throttled_usec') / 1e6,
+            'disk_read': value('io_read_bytes'),
+            'disk_write': value('io_write_bytes'),
+        }, {'mem_used_pct': np.where(limit > 0, value('memory_current') / np.maximum(limit, 1) * 100, np.nan)})
+    return timelines
+
+
+def load_capture(path, cpus=None):
+    path = str(path)
+    if path.endswith('.csv'):
+        if not cpus:
+            raise ValueError(f"{path}: a merged CSV holds percentages only; pass --cpus")
+        return load_merged_csv(path, cpus)
+    return load_pcc(path)
+
+
+# ------------------------------------------------------------------ pairing
+
+def log_prefix(path):
+    stem = Path(path).stem
+    for marker in ('_sysbench', '_benchmark'):
+        if marker in stem:
+            return stem.split(marker)[0]
+    return ''
+
+
+def host_capture(directory):
+    for name in ('host_collection.json', 'pcc_collection.json'):
+        if (directory / name).exists():
+            return directory / name
+    merged = sorted(directory.glob('*_performance.csv'))
+    return merged[0] if len(merged) == 1 else None
+
+
+def pair(log_path, cache, cpus=None):
+    """
+    (timeline, host timeline or None, label, containers) for a sysbench log,
+    or None if nothing was captured. containers are the timelines of
+    containers captured next to a log that ran on the host itself; their
+    CPU is in the host's /proc/stat and is taken out of the run's share.
+    """
+    log_path = Path(log_path)
+    directory = log_path.parent
+    prefix = log_prefix(log_path)
+
+    def cached(path, loader):
+        key = str(path)
+        if key not in cache:
+            cache[key] = loader()
+        return cache[key]
+
+    host = host_capture(directory)
+    for candidate in (f"{prefix}_collection.json", f"{prefix}_pcc_collection.json"):
+        if prefix and (directory / candidate).exists():
+            host = directory / candidate
+            break
+    host_timeline = cached(host, lambda: load_capture(host, cpus)) if host else None
+
+    containers = directory / 'container_collection.json'
+    timelines = {}
+    if containers.exists():
+        timelines = cached(containers, lambda: load_containers(containers, directory / 'container_names.json'))
+        if prefix in timelines:
+            return timelines[prefix], host_timeline, prefix, []
+    if host_timeline is None:
+        return None
+    return host_timeline, None, prefix or directory.name, list(timelines.values())
+
+
+# ------------------------------------------------------------------ windows
+
+def place_runs(timeline, durations, earliest=None, step=SEARCH_STEP):
+    """
+    Start time and uncertainty for consecutive runs of the given durations.
+
+    The runs are placed in order without overlapping so that the CPU work
+    inside all windows together is largest. Placing them one at a time would
+    let a short heavy run claim the first run's slot; instead a dynamic
+    programme over the start grid keeps, for every position, the best total
+    of the runs before it (a running maximum per run, so it stays linear in
+    the capture length). Each run is then centred on the range of starts
+    that do as well between its neighbours.
+    """
+    durations = np.asarray(durations, dtype=np.float64)
+    floor = max(timeline.start, earliest or timeline.start)
+    if floor + durations.sum() >= timeline.end:
+        # Longer than the capture: align with its start and let coverage show it
+        starts = floor + np.concatenate(([0.0], np.cumsum(durations)[:-1]))
+        return starts, np.zeros(len(durations))
+
+    grid = np.arange(floor, timeline.end + step, step)
+    scores = [np.where(grid + d <= timeline.end + 1e-9,
+                       timeline.amount('busy', grid, grid + d), -np.inf) for d in durations]
+
+    # total[k][i]: best work of runs 0..k with run k starting at grid[i]
+    index = np.arange(len(grid))
+    totals, links = [scores[0]], []
+    for k in range(1, len(durations)):
+        previous = totals[-1]
+        running = np.maximum.accumulate(previous)
+        arg = np.maximum.accumulate(np.where(previous >= running, index, 0))
+        shift = int(np.ceil(durations[k - 1] / step - 1e-9))
+        best_before = np.full(len(grid), -np.inf)
+        link = np.zeros(len(grid), dtype=np.int64)
+        if shift < len(grid):
+            best_before[shift:] = running[:len(grid) - shift]
+            link[shift:] = arg[:len(grid) - shift]
+        totals.append(scores[k] + best_before)
+        links.append(link)
+
+    chosen = [int(np.argmax(totals[-1]))]
+    for link in reversed(links):
+        chosen.append(int(link[chosen[-1]]))
+    starts = grid[chosen[::-1]].astype(np.float64)
+
+    uncertainty = np.zeros(len(durations))
+    for k, duration in enumerate(durations):
+        low = starts[k - 1] + durations[k - 1] if k else floor
+        high = starts[k + 1] - duration if k + 1 < len(durations) else timeline.end - duration
+        window = (grid >= low - 1e-9) & (grid <= high + 1e-9)
+        best = scores[k][chosen[::-1][k]]
+        if best <= 0 or not window.any():
+            continue
+        near = grid[window & (scores[k] >= best - abs(best) * PLATEAU)]
+        if len(near):
+            starts[k] = near[len(near) // 2]
+            uncertainty[k] = (near[-1] - near[0]) / 2
+    return starts, uncertainty
+
+
+def measure(runs, timeline, host, starts, uncertainty, concurrent=()):
+    """
+    Per-run resource usage and per-event metrics for windows
+    [starts, starts + duration]; CPU of the concurrent timelines is
+    subtracted from the run's.
+    """
+    durations = np.array([run['total_time_s'] or 0.0 for run in runs])
+    events = np.array([float(run['total_events'] or 0) for run in runs])
+    ends = starts + durations
+    span = np.maximum(durations, 1e-9)
+
+    busy = timeline.amount('busy', starts, ends)
+    user = timeline.amount('user', starts, ends)
+    system = timeline.amount('system', starts, ends)
+    others = np.zeros(len(runs))
+    for other in concurrent:
+        others += other.amount('busy', starts, ends)
+        user -= other.amount('user', starts, ends)
+        system -= other.amount('system', starts, ends)
+    busy = busy - others
+    machine = host if host is not None else timeline
+    cpus = machine.cpus
+    capacity = span * (cpus or np.nan)
+    mib = lambda t, key: t.amount(key, starts, ends) / 2**20 if t.has(key) else np.full(len(runs), np.nan)
+
+    columns = {
+        'start': starts,
+        'end': ends,
+        'duration_s': durations,
+        'uncertainty_s': uncertainty,
+        'coverage_pct': timeline.coverage(starts, ends) * 100,
+        'events': events,
+        'cpu_seconds': busy,
+        'container_cpu_seconds': others if concurrent else np.full(len(runs), np.nan),
+        'cpu_us_per_event': np.where(events > 0, busy / np.maximum(events, 1) * 1e6, np.nan),
+        'events_per_cpu_second': np.where(busy > 0, events / np.maximum(busy, 1e-9), np.nan),
+        'busy_cores': busy / span,
+        'user_pct': np.where(busy > 0, user / np.maximum(busy, 1e-9) * 100, np.nan),
+        'system_pct': np.where(busy > 0, system / np.maximum(busy, 1e-9) * 100, np.nan),
+        'steal_pct': machine.amount('steal', starts, ends) / capacity * 100,
+        'iowait_pct': machine.amount('iowait', starts, ends) / capacity * 100,
+        'throttled_pct': (timeline.amount('throttled', starts, ends) / span * 100
+                          if timeline.has('throttled') else np.full(len(runs), np.nan)),
+        'mem_used_pct': timeline.mean('mem_used_pct', starts, ends),
+        'disk_read_mib': mib(timeline, 'disk_read'),
+        'disk_write_mib': mib(timeline, 'disk_write'),
+        'net_mib': mib(machine, 'net'),
+    }
+    rows = []
+    for i, run in enumerate(runs):
+        row = {key: (None if np.isnan(values[i]) else float(values[i])) for key, values in columns.items()}
+        row.update(test=run['test'], mode=run['mode'], threads=run['threads'],
+                   events_per_sec=run['events_per_sec'], cpus=cpus)
+        row['start'] = datetime.fromtimestamp(row['start'], timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        row['end'] = datetime.fromtimestamp(row['end'], timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        rows.append(row)
+    return rows
+
+
+def analyse_log(log_path, timeline, host, label, start=None, clock_offset=0.0, concurrent=()):
+    """Place and measure every run of one sysbench log; start pins the first run."""
+    text = Path(log_path).read_text(errors='replace')
+    header, runs = sysbench_results.parse_text(text)
+    runs = [run for run in runs if run['total_time_s']]
+    if not runs:
+        return []
+    durations = np.array([run['total_time_s'] for run in runs])
+    if start is not None:
+        starts = float(start) - clock_offset + np.concatenate(([0.0], np.cumsum(durations)[:-1]))
+        uncertainty = np.zeros(len(runs))
+    else:
+        earliest = None
+        if header.get('run_date'):
+            # Benchmark reports print Date: just before their first run (in UTC)
+            earliest = calendar.timegm(datetime.fromisoformat(header['run_date']).timetuple()) - clock_offset - 5
+        starts, uncertainty = place_runs(timeline, durations, earliest)
+    rows = measure(runs, timeline, host, starts, uncertainty, concurrent)
+    for row in rows:
+        row['log'] = str(log_path)
+        row['source'] = timeline.name
+        row['host'] = header.get('host') or label
+    return rows
+
+
+# ------------------------------------------------------------------ output
+
+def _format(value, digits=2):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:,.{digits}f}"
+    return str(value)
+
+
+def print_rows(rows):
+    print(f"\n{'='*110}")
+    print("SYSBENCH RUNS IN THE CAPTURE: RESOURCES PER EVENT")
+    print(f"{'='*110}")
+    print(f"  {'Host':<22} {'Test':<14} {'Thr':>3} {'Start (UTC)':<20} {'Dur s':>7} {'±s':>5} "
+          f"{'Ev/s':>10} {'CPU us/ev':>10} {'Ev/CPU-s':>10} {'Cores':>6} {'Steal%':>7} {'Thrtl%':>7}")
+    for row in rows:
+        test = row['test'] + (f"/{row['mode']}" if row['mode'] else '')
+        print(f"  {row['host'][:22]:<22} {test[:14]:<14} {row['threads'] or 0:>3} {row['start']:<20} "
+              f"{_format(row['duration_s'], 0):>7} {_format(row['uncertainty_s'], 0):>5} "
+              f"{_format(row['events_per_sec']):>10} {_format(row['cpu_us_per_event']):>10} "
+              f"{_format(row['events_per_cpu_second'], 0):>10} {_format(row['busy_cores']):>6} "
+              f"{_format(row['steal_pct']):>7} {_format(row['throttled_pct']):>7}")
+    partial = [row for row in rows if row['coverage_pct'] is not None and row['coverage_pct'] < 99]
+    for row in partial:
+        print(f"  ⚠️  {row['host']} {row['test']}: only {row['coverage_pct']:.0f}% of the run is inside the capture")
+    print(f"{'='*110}\n")
+
+
+def write_rows(rows, path):
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump(rows, f, indent=2)
+        return
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: round(value, 6) if isinstance(value, float) else value
+                             for key, value in row.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Place sysbench runs in a pcc capture and report resources per event')
+    parser.add_argument('results', nargs='*', help='Results directories (sysbench logs next to their captures)')
+    parser.add_argument('--log', help='A single sysbench log (with --capture)')
+    parser.add_argument('--capture', help='pcc_collection.json or merged performance CSV for --log')
+    parser.add_argument('--container', help='With --capture container_collection.json: the container the log ran in')
+    parser.add_argument('--cpus', type=int, default=None, help='CPU count, required for merged CSV captures')
+    parser.add_argument('--start', type=float, default=None,
+                        help='Epoch seconds the first run of --log started, instead of searching for it')
+    parser.add_argument('--clock-offset', type=float, default=0.0,
+                        help='Capture clock minus benchmark clock in seconds (default: 0)')
+    parser.add_argument('--output', default=None, help='Write the per-run table here (.csv or .json)')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    if np is None:
+        parser.error('sysbench_windows.py requires numpy (pip install numpy)')
+    if not args.results and not args.log:
+        parser.error('give results directories, or --log with --capture')
+    if args.log and not args.capture:
+        parser.error('--log needs --capture')
+
+    rows = []
+    try:
+        if args.log:
+            if args.container:
+                names = Path(args.capture).parent / 'container_names.json'
+                timelines = load_containers(args.capture, names)
+                if args.container not in timelines:
+                    parser.error(f"no container {args.container!r} in {args.capture} "
+                                 f"(found: {', '.join(sorted(timelines))})")
+                timeline, host, label = timelines[args.container], None, args.container
+            else:
+                timeline, host, label = load_capture(args.capture, args.cpus), None, log_prefix(args.log)
+            rows += analyse_log(args.log, timeline, host, label or Path(args.log).parent.name,
+                                args.start, args.clock_offset)
+
+        cache = {}
+        for directory in args.results:
+            for log_path in sysbench_results.find_logs([directory]):
+                paired = pair(log_path, cache, args.cpus)
+                if paired is None:
+                    print(f"  - {os.path.relpath(log_path)}: no capture next to it, skipped", file=sys.stderr)
+                    continue
+                timeline, host, label, concurrent = paired
+                rows += analyse_log(log_path, timeline, host, label, clock_offset=args.clock_offset,
+                                    concurrent=concurrent)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not rows:
+        print("❌ No sysbench runs could be placed in a capture", file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == 'json':
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    else:
+        print_rows(rows)
+    if args.output:
+        write_rows(rows, args.output)
+        print(f"✓ {len(rows)} runs written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Bulk uploader for merged performance CSVs
+
+Uploads captures to XATbackend's collector upload form
+(/collectors/manage/upload/<collector>/) concurrently over one logged-in
+session: a single login (Django CSRF flow), one connection pool, and at
+most --concurrency uploads in flight. Bodies are streamed from disk and
+gzip-compressed (Content-Encoding: gzip). Django does not decode request
+bodies, so it turns a compressed upload down indirectly: 403 (the CSRF
+token is unreadable), 200 (the form is re-rendered), 415, or 400 saying the
+body could not be decoded. On any of these the file is sent once more
+uncompressed, before anything else is tried; if that goes through,
+compression stays off for the rest of the run.
+
+Failed uploads are retried with exponential backoff and jitter on
+connection errors, timeouts, 429 (honouring Retry-After) and 5xx. An
+expired session (redirect to the login page) or a CSRF rejection logs in
+again and retries.
+
+Every successful upload is appended to a journal (JSON lines) keyed by the
+SHA-256 of the file content, the collector and the server. Files already in
+the journal are skipped, so an interrupted backfill resumes where it
+stopped, and a capture copied under another name is never uploaded twice
+(a copy found while the first is still uploading goes back in the queue if
+that upload fails).
+
+Directories are searched recursively for merged performance CSVs
+(timestamp,cpu_user,...,net_tx_bytes); other files are left alone.
+
+Environment:
+    PERFANALYSIS_UPLOAD_JOURNAL   journal path (default ~/.cache/perfanalysis/upload_journal.jsonl)
+
+Usage:
+    python upload_captures.py Azure/results OCI/results --collector-id 3 --username u --password p
+    python upload_captures.py captures/ --collector-id 3 --map 'OCI/*=4' --map '*suse*=5' --concurrency 8
+    python upload_captures.py captures/ --collector-id 3 --dry-run
+"""
+
+import os
+import re
+import sys
+import json
+import zlib
+import time
+import random
+import asyncio
+import fnmatch
+import hashlib
+import secrets
+import tempfile
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+from yarl import URL
+
+
+DEFAULT_JOURNAL = Path.home() / ".cache" / "perfanalysis" / "upload_journal.jsonl"
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__', 'venv', '.venv'}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# A server that cannot decode a gzip body may also answer 400 with a message saying so
+DECODE_ERROR = re.compile(rb'gzip|content.encoding|decod|decompress', re.IGNORECASE)
+MAX_BACKOFF = 60.0
+# Request bodies are read, compressed and sent in pieces of this size
+CHUNK_SIZE = 1 << 20
+
+
+class UploadError(Exception):
+    """An upload that failed for good."""
+
+
+class Journal:
+    """Append-only record of uploaded content, one JSON object per line."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done = set()
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.done.add(self.key(entry['sha256'], entry['collector'], entry['url']))
+                    except (ValueError, KeyError, TypeError):
+                        # A line cut short by an interrupted run
+                        continue
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'a')
+
+    @staticmethod
+    def key(digest, collector, url):
+        return digest, str(collector), url.rstrip('/')
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def record(self, digest, collector, url, **details):
+        """Append an entry and force it to disk before the upload counts as done."""
+        entry = {'sha256': digest, 'collector': str(collector), 'url': url.rstrip('/'), **details,
+                 'uploaded_at': datetime.now().isoformat(timespec='seconds')}
+        self.file.write(json.dumps(entry) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.done.add(self.key(digest, collector, url))
+
+    def close(self):
+        self.file.close()
+
+
+def is_merged_csv(path):
+    try:
+        with open(path, errors='replace') as f:
+            header = f.readline().strip().split(',')
+    except OSError:
+        return False
+    return header[:1] == ['timestamp'] and 'cpu_idle' in header
+
+
+def find_captures(paths):
+    """Merged CSVs among the given files and under the given directories, in a stable order."""
+    for root in paths:
+        root = Path(root)
+        if root.is_file():
+            yield root
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for name in sorted(filenames):
+                path = Path(dirpath) / name
+                if name.endswith('.csv') and is_merged_csv(path):
+                    yield path
+
+
+def collector_for(path, default, mapping):
+    """Collector id for a file: the first --map pattern matching its path, else the default."""
+    text = str(path)
+    for pattern, collector in mapping:
+        if fnmatch.fnmatch(text, pattern) or fnmatch.fnmatch(path.name, pattern):
+            return collector
+    return default
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def multipart_frame(fields, filename):
+    """Bytes before and after the file content in a multipart/form-data body, and its Content-Type."""
+    boundary = f"----perfanalysis{secrets.token_hex(12)}"
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="uploaded_file"; filename="{filename}"\r\n'
+                 f'Content-Type: text/csv\r\n\r\n'.encode())
+    return b''.join(parts), f'\r\n--{boundary}--\r\n'.encode(), f'multipart/form-data; boundary={boundary}'
+
+
+def refused_encoding(status, body):
+    """Whether a response to a compressed upload may be the server failing to decode it."""
+    if status in (403, 415):
+        # Django's CSRF check runs first and cannot find the token in an undecoded body
+        return True
+    if status == 200:
+        # The upload form re-rendered: the fields (or the file) were not found
+        return True
+    return status == 400 and DECODE_ERROR.search(body) is not None
+
+
+class Uploader:
+    """Concurrent uploads over one authenticated session."""
+
+    def __init__(self, url, username, password, journal, concurrency=4, retries=5, backoff=1.0,
+                 timeout=300.0, compress=True, level=6):
+        self.url = url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.journal = journal
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.compress = compress
+        self.level = level
+        self.session = None
+        self.login_lock = asyncio.Lock()
+        self.generation = 0
+        self.queue = None
+        # Content key -> copies of it waiting on the upload in flight
+        self.in_flight = {}
+        self.counts = {'uploaded': 0, 'skipped': 0, 'duplicates': 0, 'failed': 0, 'retries': 0, 'logins': 0}
+        self.bytes_raw = 0
+        self.bytes_sent = 0
+
+    def csrf_token(self):
+        cookie = self.session.cookie_jar.filter_cookies(URL(self.url)).get('csrftoken')
+        return cookie.value if cookie else ''
+
+    async def login(self, seen_generation=None):
+        """
+        Log in with Django's CSRF flow. Workers that hit an expired session
+        pass the generation they used, so only the first of them logs in again.
+        """
+        async with self.login_lock:
+            if seen_generation is not None and seen_generation != self.generation:
+                return
+            login_url = f"{self.url}/auth/login/"
+            timeout = aiohttp.ClientTimeout(total=30)
+            async with self.session.get(login_url, timeout=timeout) as response:
+                await response.read()
+            form = {'username': self.username, 'password': self.password, 'csrfmiddlewaretoken': self.csrf_token()}
+            async with self.session.post(login_url, data=form, headers={'Referer': login_url},
+                                         allow_redirects=False, timeout=timeout) as response:
+                await response.read()
+                # Django redirects on success and re-renders the form on bad credentials
+                if response.status != 302:
+                    raise UploadError(f"login as {self.username!r} failed (HTTP {response.status})")
+            self.generation += 1
+            self.counts['logins'] += 1
+
+    def prepare(self, path, collector, token, compress):
+        """
+        Request body parts and headers for one file (runs in a worker thread).
+
+        Nothing is held in memory beyond a chunk: an uncompressed body is the
+        multipart frame around the open capture file, and a compressed one is
+        gzipped chunk by chunk into a temporary file, since Django needs a
+        Content-Length and the compressed size is only known at the end.
+        """
+        fields = {'csrfmiddlewaretoken': token, 'collector': collector, 'description': f'Backfill of {path.name}'}
+        head, tail, content_type = multipart_frame(fields, path.name)
+        headers = {'Content-Type': content_type, 'Referer': f"{self.url}/collectors/manage/"}
+        size = path.stat().st_size
+        source = open(path, 'rb')
+        if not compress:
+            parts, length = [head, source, tail], len(head) + size + len(tail)
+        else:
+            try:
+                spool = tempfile.TemporaryFile()
+                gz = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+                spool.write(gz.compress(head))
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                    spool.write(gz.compress(chunk))
+                spool.write(gz.compress(tail) + gz.flush())
+                length = spool.tell()
+                spool.seek(0)
+            finally:
+                source.close()
+            parts = [spool]
+            headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(length)
+        return parts, headers, length, size
+
+    @staticmethod
+    async def stream(parts):
+        """Yield a body's bytes, reading its files in a worker thread."""
+        loop = asyncio.get_running_loop()
+        for part in parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            while True:
+                chunk = await loop.run_in_executor(None, part.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def post(self, path, collector, compress):
+        """One attempt; returns the status, where it redirects to, Retry-After, size and the body."""
+        loop = asyncio.get_running_loop()
+        parts, headers, length, size = await loop.run_in_executor(None, self.prepare, path, collector,
+                                                                  self.csrf_token(), compress)
+        try:
+            async with self.session.post(f"{self.url}/collectors/manage/upload/{collector}/",
+                                         data=self.stream(parts), headers=headers, allow_redirects=False,
+                                         timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                text = await response.read()
+                self.bytes_sent += length
+                return (response.status, response.headers.get('Location', ''), response.headers.get('Retry-After'),
+                        size, text)
+        finally:
+            for part in parts:
+                if not isinstance(part, bytes):
+                    part.close()
+
+    async def attempt(self, path, collector, compress):
+        """post() with connection errors as a reason; returns (status, location, retry_after, size, body, reason)."""
+        try:
+            status, location, retry_after, size, text = await self.post(path, collector, compress)
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            return None, '', None, 0, b'', f"{type(e).__name__}: {e}"
+        return status, location, retry_after, size, text, f"HTTP {status}"
+
+    async def upload(self, path, collector):
+        """Upload one file, retrying transient failures; returns the raw size."""
+        attempt = 0
+        relogged = False
+        while True:
+            generation = self.generation
+            compress = self.compress
+            status, location, retry_after, size, text, reason = await self.attempt(path, collector, compress)
+            if status == 302 and '/auth/login' not in location:
+                return size
+
+            if compress and refused_encoding(status, text):
+                # Try the same file uncompressed first: to Django an undecodable body looks like a
+                # missing CSRF token or an empty form
+                refused = status
+                status, location, retry_after, size, text, reason = await self.attempt(path, collector, False)
+                if status == 302 and '/auth/login' not in location:
+                    if self.compress:
+                        self.compress = False
+                        print(f"⚠️  Server refused a gzip-encoded upload (HTTP {refused}); "
+                              f"sending uncompressed from now on")
+                    return size
+
+            if status == 302 or status == 403:
+                # Session expired or CSRF token rotated: log in again, once per file
+                if relogged:
+                    raise UploadError(f"{reason} after logging in again")
+                relogged = True
+                await self.login(generation)
+                continue
+            if status is not None and status not in RETRY_STATUSES:
+                raise UploadError(reason)
+            if attempt >= self.retries:
+                raise UploadError(f"{reason} after {attempt + 1} attempts")
+            delay = random.uniform(0, min(MAX_BACKOFF, self.backoff * 2 ** attempt))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            attempt += 1
+            self.counts['retries'] += 1
+            await asyncio.sleep(delay)
+
+    async def handle(self, path, collector, position, total):
+        loop = asyncio.get_running_loop()
+        digest = await loop.run_in_executor(None, file_digest, path)
+        key = Journal.key(digest, collector, self.url)
+        if key in self.journal:
+            self.counts['skipped'] += 1
+            return
+        if key in self.in_flight:
+            self.counts['duplicates'] += 1
+            self.in_flight[key].append((path, collector, position))
+            print(f"  = [{position}/{total}] {path} (same content as a file already being uploaded)")
+            return
+        self.in_flight[key] = []
+        started = time.time()
+        try:
+            size = await self.upload(path, collector)
+        except UploadError as e:
+            self.counts['failed'] += 1
+            print(f"  ❌ [{position}/{total}] {path}: {e}")
+            # The copies that waited on this upload get their own turn
+            for item in self.in_flight.pop(key):
+                self.counts['duplicates'] -= 1
+                self.queue.put_nowait(item)
+            return
+        self.in_flight.pop(key)
+        self.journal.record(digest, collector, self.url, path=str(path.resolve()), bytes=size)
+        self.counts['uploaded'] += 1
+        self.bytes_raw += size
+        print(f"  ✓ [{position}/{total}] {path} -> collector {collector} "
+              f"({size / 1024 / 1024:.1f} MB, {time.time() - started:.1f}s)")
+
+    async def worker(self, total):
+        while True:
+            item = await self.queue.get()
+            try:
+                await self.handle(*item, total)
+            finally:
+                self.queue.task_done()
+
+    async def run(self, jobs):
+        """Upload (path, collector) jobs; returns the counts."""
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+            self.session = session
+            await self.login()
+            self.queue = asyncio.Queue()
+            for position, (path, collector) in enumerate(jobs, 1):
+                self.queue.put_nowait((path, collector, position))
+            # Failed uploads can put waiting copies back, so run until the queue drains rather than to a sentinel
+            workers = [asyncio.create_task(self.worker(len(jobs))) for _ in range(self.concurrency)]
+            drained = asyncio.create_task(self.queue.join())
+            try:
+                # A worker only stops early on an unexpected error, which ends the run as before
+                await asyncio.wait([drained, *workers], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in [drained, *workers]:
+                    task.cancel()
+                results = await asyncio.gather(*workers, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return self.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Upload merged performance CSVs to XATbackend')
+    parser.add_argument('paths', nargs='+', help='CSV files or directories to search for merged CSVs')
+    parser.add_argument('--url', default='http://localhost:8000', help='XATbackend URL (default: http://localhost:8000)')
+    parser.add_argument('--username', default=os.environ.get('XATBACKEND_USERNAME'),
+                        help='Portal user (default: $XATBACKEND_USERNAME)')
+    parser.add_argument('--password', default=os.environ.get('XATBACKEND_PASSWORD'),
+                        help='Portal password (default: $XATBACKEND_PASSWORD)')
+    parser.add_argument('--collector-id', required=True, help='Collector to upload to')
+    parser.add_argument('--map', action='append', default=[], metavar='PATTERN=ID',
+                        help='Upload files whose path or name matches PATTERN to collector ID instead (repeatable)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Uploads in flight at once (default: 4)')
+    parser.add_argument('--retries', type=int, default=5, help='Retries per file on transient errors (default: 5)')
+    parser.add_argument('--backoff', type=float, default=1.0, help='Initial retry backoff in seconds (default: 1.0)')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Seconds per upload request (default: 300)')
+    parser.add_argument('--no-gzip', action='store_true', help='Send request bodies uncompressed')
+    parser.add_argument('--journal', default=os.environ.get('PERFANALYSIS_UPLOAD_JOURNAL') or str(DEFAULT_JOURNAL),
+                        help=f'Upload journal (default: $PERFANALYSIS_UPLOAD_JOURNAL or {DEFAULT_JOURNAL})')
+    parser.add_argument('--dry-run', action='store_true', help='List what would be uploaded and exit')
+    args = parser.parse_args()
+
+    mapping = []
+    for item in args.map:
+        pattern, sep, collector = item.rpartition('=')
+        if not sep or not pattern or not collector:
+            parser.error(f"--map expects PATTERN=ID, got {item!r}")
+        mapping.append((pattern, collector))
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+
+    jobs = [(path, collector_for(path, args.collector_id, mapping)) for path in find_captures(args.paths)]
+    if not jobs:
+        print("❌ No merged performance CSVs found")
+        sys.exit(1)
+    journal = Journal(args.journal)
+
+    if args.dry_run:
+        pending = 0
+        for path, collector in jobs:
+            done = Journal.key(file_digest(path), collector, args.url) in journal
+            pending += not done
+            print(f"  {'done   ' if done else 'pending'}  collector {collector:<6} {path}")
+        print(f"\n{pending} of {len(jobs)} files to upload")
+        journal.close()
+        return
+    if not (args.username and args.password):
+        parser.error('--username and --password (or XATBACKEND_USERNAME/XATBACKEND_PASSWORD) are required')
+
+    print(f"\n{'='*70}")
+    print("BULK UPLOAD")
+    print(f"{'='*70}")
+    print(f"Server: {args.url}")
+    print(f"Files: {len(jobs)}, {args.concurrency} at a time, gzip {'off' if args.no_gzip else 'on'}")
+    print(f"Journal: {args.journal}")
+    print(f"{'='*70}\n")
+
+    uploader = Uploader(args.url, args.username, args.password, journal, args.concurrency, args.retries,
+                        args.backoff, args.timeout, compress=not args.no_gzip)
+    started = time.time()
+    try:
+        counts = asyncio.run(uploader.run(jobs))
+    except UploadError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+        print(f"❌ Cannot reach {args.url}: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted - uploads recorded in the journal will be skipped next time")
+        sys.exit(130)
+    finally:
+        journal.close()
+
+    elapsed = time.time() - started
+    mb = uploader.bytes_raw / 1024 / 1024
+    print(f"\n{'='*70}")
+    print(f"✓ {counts['uploaded']} uploaded, {counts['skipped']} already in the journal, "
+          f"{counts['duplicates']} duplicates, {counts['failed']} failed")
+    print(f"  {mb:.1f} MB in {elapsed:.1f}s ({mb / elapsed if elapsed else 0:.1f} MB/s), "
+          f"{uploader.bytes_sent / 1024 / 1024:.1f} MB on the wire, "
+          f"{counts['retries']} retries, {counts['logins']} logins")
+    print(f"{'='*70}\n")
+    if counts['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Fixed-memory latency histograms for the load test tools
+
+LatencyHistogram records values in microseconds into log-linear buckets in
+the style of HdrHistogram: values below 256us get one bucket each, and
+every power of two above that is split into 128 equal sub-buckets, so any
+recorded value is reproduced to within 0.8%. Values up to an hour fit in
+about 3,300 counters whatever the number of samples, recording is a few
+integer operations, and two histograms merge by adding their counters,
+which is how per-worker and per-second results are combined.
+
+HistogramSet keys histograms by (endpoint, status class).
+TimeSeriesWriter appends one row per elapsed second to a CSV or JSON-lines
+file while the run is in progress.
+"""
+import csv
+import json
+import math
+import time
+from typing import Dict, List, Tuple
+
+
+SUB_BUCKET_BITS = 8
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS          # exact below this many microseconds
+HALF_BUCKETS = SUB_BUCKETS // 2             # sub-buckets per power of two above that
+MAX_SECONDS = 3600
+MAX_VALUE_US = MAX_SECONDS * 1000000
+
+
+def bucket_index(value_us: int) -> int:
+    if value_us < SUB_BUCKETS:
+        return max(value_us, 0)
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + ((value_us >> shift) - HALF_BUCKETS)
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """[low, high) range of microsecond values counted in a bucket."""
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = (index - SUB_BUCKETS) // HALF_BUCKETS + 1
+    mantissa = (index - SUB_BUCKETS) % HALF_BUCKETS + HALF_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+BUCKET_COUNT = bucket_index(MAX_VALUE_US) + 1
+
+
+def status_class(status) -> str:
+    """'2xx'..'5xx' for HTTP statuses, or the label itself ('timeout', 'error')."""
+    if isinstance(status, int) and 100 <= status < 600:
+        return f"{status // 100}xx"
+    return str(status)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with exact count, sum, min and max."""
+
+    __slots__ = ('counts', 'count', 'total_us', 'min_us', 'max_us')
+
+    def __init__(self):
+        self.counts: List[int] = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float):
+        value = min(max(int(seconds * 1000000), 0), MAX_VALUE_US)
+        self.counts[bucket_index(value)] += 1
+        if self.count == 0 or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+        self.count += 1
+        self.total_us += value
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        if other.count == 0:
+            return self
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        self.min_us = other.min_us if self.count == 0 else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        self.count += other.count
+        self.total_us += other.total_us
+        return self
+
+    def percentile(self, pct: float) -> float:
+        """Value in seconds at or below which pct percent of samples fall."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100.0 * self.count))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= rank:
+                    low, high = bucket_bounds(i)
+                    value = min(max((low + high - 1) // 2, self.min_us), self.max_us)
+                    return value / 1000000.0
+        return self.max_us / 1000000.0
+
+    @property
+    def mean(self) -> float:
+        return self.total_us / self.count / 1000000.0 if self.count else 0.0
+
+    @property
+    def min(self) -> float:
+        return self.min_us / 1000000.0
+
+    @property
+    def max(self) -> float:
+        return self.max_us / 1000000.0
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9),
+            'max': self.max,
+        }
+
+    def to_dict(self) -> Dict:
+        """Sparse, JSON-safe form for shipping between processes or saving with results."""
+        return {
+            'count': self.count,
+            'total_us': self.total_us,
+            'min_us': self.min_us,
+            'max_us': self.max_us,
+            'buckets': [[i, c] for i, c in enumerate(self.counts) if c],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyHistogram':
+        hist = cls()
+        hist.count = data['count']
+        hist.total_us = data['total_us']
+        hist.min_us = data['min_us']
+        hist.max_us = data['max_us']
+        for i, c in data['buckets']:
+            hist.counts[i] = c
+        return hist
+
+
+class HistogramSet:
+    """Histograms keyed by (endpoint, status class)."""
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+
+    def record(self, endpoint: str, status, seconds: float):
+        key = (endpoint, status_class(status))
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = LatencyHistogram()
+        hist.record(seconds)
+
+    def merge(self, other: 'HistogramSet') -> 'HistogramSet':
+        for key, hist in other.histograms.items():
+            self.histograms.setdefault(key, LatencyHistogram()).merge(hist)
+        return self
+
+    def combined(self, status_classes=None) -> LatencyHistogram:
+        """One histogram over all endpoints, optionally limited to some status classes."""
+        total = LatencyHistogram()
+        for (_, cls), hist in self.histograms.items():
+            if status_classes is None or cls in status_classes:
+                total.merge(hist)
+        return total
+
+    def to_dict(self) -> List[Dict]:
+        return [{'endpoint': e, 'status': c, **h.to_dict()} for (e, c), h in sorted(self.histograms.items())]
+
+    @classmethod
+    def from_dict(cls, data: List[Dict]) -> 'HistogramSet':
+        hset = cls()
+        for entry in data:
+            hset.histograms[(entry['endpoint'], entry['status'])] = LatencyHistogram.from_dict(entry)
+        return hset
+
+
+TIMESERIES_FIELDS = ['second', 'timestamp', 'requests', 'success', 'errors', 'timeouts',
+                     'p50', 'p95', 'p99', 'max', 'bytes']
+
+
+def timeseries_row(second: int, timestamp: int, hist: LatencyHistogram,
+                   success: int, errors: int, timeouts: int, nbytes: int) -> Dict:
+    return {
+        'second': second,
+        'timestamp': timestamp,
+        'requests': hist.count,
+        'success': success,
+        'errors': errors,
+        'timeouts': timeouts,
+        'p50': round(hist.percentile(50), 6),
+        'p95': round(hist.percentile(95), 6),
+        'p99': round(hist.percentile(99), 6),
+        'max': round(hist.max, 6),
+        'bytes': nbytes,
+    }
+
+
+def open_timeseries(path: str):
+    """(file, write_row) for a CSV or, for .json/.jsonl paths, JSON-lines time series."""
+    handle = open(path, 'w', newline='')
+    if path.endswith(('.json', '.jsonl')):
+        def write_row(row):
+            handle.write(json.dumps(row) + '\n')
+    else:
+        writer = csv.DictWriter(handle, fieldnames=TIMESERIES_FIELDS)
+        writer.writeheader()
+        write_row = writer.writerow
+    return handle, write_row
+
+
+def merge_timeseries(parts: List[Tuple[List[Dict], List[Dict]]]) -> List[Dict]:
+    """
+    Combine per-second series from several workers by timestamp.
+
+    Each part is (rows, histograms) as kept by TimeSeriesWriter with
+    keep_histograms=True; counts add up and percentiles are recomputed from
+    the merged histograms rather than averaged.
+    """
+    seconds: Dict[int, list] = {}
+    for rows, hists in parts:
+        for row, hist in zip(rows, hists):
+            entry = seconds.get(row['timestamp'])
+            if entry is None:
+                seconds[row['timestamp']] = [LatencyHistogram.from_dict(hist), row['success'],
+                                             row['errors'], row['timeouts'], row['bytes']]
+            else:
+                entry[0].merge(LatencyHistogram.from_dict(hist))
+                entry[1] += row['success']
+                entry[2] += row['errors']
+                entry[3] += row['timeouts']
+                entry[4] += row['bytes']
+    if not seconds:
+        return []
+    start = min(seconds)
+    return [timeseries_row(ts - start, ts, *seconds[ts]) for ts in sorted(seconds)]
+
+
+def write_timeseries(path: str, rows: List[Dict]):
+    handle, write_row = open_timeseries(path)
+    with handle:
+        for row in rows:
+            write_row(row)
+
+
+class TimeSeriesWriter:
+    """
+    Per-second rows written while the test runs.
+
+    Completions are accumulated for the current wall-clock second; when a
+    later second is seen, every finished second (including empty ones) is
+    written and flushed, so a live run can be tailed. The format follows
+    the file extension: .json/.jsonl give JSON lines, anything else CSV.
+    With keep_histograms, each second's histogram is also kept (sparse) so
+    series from several workers can be merged afterwards.
+    """
+
+    def __init__(self, path: str = None, start_time: float = None, keep_histograms: bool = False):
+        self.path = path
+        self.start_time = int(start_time if start_time is not None else time.time())
+        self.current = self.start_time
+        self.rows: List[Dict] = []
+        self.histograms: List[Dict] = []
+        self.keep_histograms = keep_histograms
+        self._reset()
+        self.file = None
+        self.write_row = None
+        if path:
+            self.file, self.write_row = open_timeseries(path)
+            self.file.flush()
+
+    def _reset(self):
+        self.hist = LatencyHistogram()
+        self.success = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.nbytes = 0
+
+    def record(self, seconds: float, outcome: str, nbytes: int = 0, now: float = None):
+        """outcome is 'success', 'error' or 'timeout'."""
+        self.advance(now if now is not None else time.time())
+        self.hist.record(seconds)
+        if outcome == 'success':
+            self.success += 1
+        elif outcome == 'timeout':
+            self.timeouts += 1
+        else:
+            self.errors += 1
+        self.nbytes += nbytes
+
+    def advance(self, now: float):
+        second = int(now)
+        while self.current < second:
+            self._emit()
+            self.current += 1
+
+    def _emit(self):
+        row = timeseries_row(self.current - self.start_time, self.current, self.hist,
+                             self.success, self.errors, self.timeouts, self.nbytes)
+        self.rows.append(row)
+        if self.keep_histograms:
+            self.histograms.append(self.hist.to_dict())
+        if self.file:
+            self.write_row(row)
+            self.file.flush()
+        self._reset()
+
+    def close(self, now: float = None):
+        """Write the last (partial) second and close the file."""
+        self.advance(now if now is not None else time.time())
+        if self.hist.count:
+            self._emit()
+        if self.file:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Step-load ramp for load_test.py: find the capacity of a deployment
+
+Raises the offered load in steps (arrival rate in open loop, or the number
+of closed-loop virtual users), holds each step until per-second p99 stops
+moving, and stops at the first step that breaks the p99 or error-rate
+limit or where throughput stops following the load. The result is the
+throughput vs latency curve and the maximum sustainable throughput: the
+best step that stayed within limits.
+
+Used through load_test.py:
+    python load_test.py --ramp rate --ramp-start 20 --ramp-step 20 --p99-limit 0.5
+    python load_test.py --ramp users --ramp-start 5 --ramp-step 5 --ramp-output ramp_d4s_v5.csv
+"""
+import asyncio
+import csv
+import json
+import random
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import aiohttp
+
+from latency_histogram import LatencyHistogram
+
+
+RAMP_FIELDS = ['step', 'offered', 'throughput', 'requests', 'error_rate', 'p50', 'p95', 'p99',
+               'seconds', 'settled', 'verdict']
+
+
+class StepRamp:
+    """Drive one LoadTester through increasing load levels until it saturates."""
+
+    # Rate mode: a step whose achieved rate is below this share of the offered rate is saturated
+    MIN_ACHIEVED = 0.9
+    # Users mode: throughput must grow by this share when users are added
+    MIN_GAIN = 0.05
+
+    def __init__(self, tester, by: str = 'rate', start: float = None, step: float = None,
+                 max_level: float = None, hold: int = 10, max_step_time: int = 60,
+                 settle_window: int = 3, settle_tolerance: float = 0.25,
+                 p99_limit: float = 1.0, error_limit: float = 1.0, arrival: str = 'poisson',
+                 max_in_flight: int = None, think_time: float = 0.0, users: int = 5, seed: int = None):
+        self.tester = tester
+        self.by = by
+        self.start = start or (10 if by == 'rate' else 5)
+        self.step = step or self.start
+        self.max_level = max_level
+        self.hold = max(hold, settle_window)
+        self.max_step_time = max(max_step_time, self.hold)
+        self.settle_window = settle_window
+        self.settle_tolerance = settle_tolerance
+        self.p99_limit = p99_limit
+        self.error_limit = error_limit
+        self.arrival = arrival
+        self.max_in_flight = max_in_flight
+        self.think_time = think_time
+        self.users = users
+        self.rng = random.Random(seed)
+        self.level = 0
+        self.running = False
+        self.steps: List[Dict] = []
+        self.stop_reason = ''
+
+    # ------------------------------------------------------------------ load
+
+    async def offer_rate(self, sessions: List[aiohttp.ClientSession]):
+        """Open-loop arrivals at the current level (req/s), re-read after every arrival."""
+        tester = self.tester
+        metrics = tester.metrics
+        slots = asyncio.Semaphore(self.max_in_flight) if self.max_in_flight else None
+        pending = set()
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        offset = 0.0
+        i = 0
+        while self.running:
+            delay = t0 + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if not self.running:
+                break
+            intended = metrics.start_time + offset
+            metrics.scheduled_count += 1
+            metrics.schedule_lag.record(time.time() - intended)
+            user = i % len(sessions)
+            task = asyncio.create_task(tester.open_loop_request(sessions[user], user, i, intended, slots))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            i += 1
+            offset += self.rng.expovariate(self.level) if self.arrival == 'poisson' else 1.0 / self.level
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def virtual_user(self, session: aiohttp.ClientSession, user_id: int):
+        """Closed-loop user: request, think, repeat while it is within the current level."""
+        tester = self.tester
+        owned = None
+        if tester.mode == 'upload':
+            owned = session = await tester.open_user_session(session.connector)
+            if session is None:
+                return
+        i = 0
+        while self.running and user_id < self.level:
+            if tester.mode == 'upload':
+                await tester.upload_request(session, user_id, i, time.time())
+            else:
+                await tester.browse_request(session, i, time.time())
+            i += 1
+            if self.think_time:
+                await asyncio.sleep(self.rng.expovariate(1.0 / self.think_time))
+        if owned is not None:
+            await owned.close()
+
+    # --------------------------------------------------------------- control
+
+    def settled(self, rows: List[Dict]) -> bool:
+        """Per-second p99 over the last settle_window seconds stays within the tolerance band."""
+        window = [row['p99'] for row in rows[-self.settle_window:] if row['requests']]
+        if len(window) < self.settle_window:
+            return False
+        return max(window) <= min(window) * (1 + self.settle_tolerance)
+
+    def measure(self, level: float, first: int) -> Dict:
+        """Statistics over the last `hold` seconds of the step that started at row `first`."""
+        series = self.tester.metrics.timeseries
+        rows = series.rows[first:][-self.hold:]
+        hists = series.histograms[first:][-self.hold:]
+        hist = LatencyHistogram()
+        for h in hists:
+            hist.merge(LatencyHistogram.from_dict(h))
+        seconds = len(rows) or 1
+        failed = sum(row['errors'] + row['timeouts'] for row in rows)
+        return {
+            'step': len(self.steps) + 1,
+            'offered': level,
+            'throughput': sum(row['success'] for row in rows) / seconds,
+            'requests': hist.count,
+            'error_rate': failed / hist.count * 100 if hist.count else 0.0,
+            'p50': hist.percentile(50),
+            'p95': hist.percentile(95),
+            'p99': hist.percentile(99),
+            'seconds': len(series.rows) - first,
+        }
+
+    def verdict(self, result: Dict) -> str:
+        """'ok', or why this step is past the knee."""
+        if result['requests'] == 0:
+            return 'no responses'
+        if result['p99'] > self.p99_limit:
+            return f"p99 {result['p99']:.3f}s > {self.p99_limit}s"
+        if result['error_rate'] > self.error_limit:
+            return f"errors {result['error_rate']:.1f}% > {self.error_limit}%"
+        if self.by == 'rate' and result['throughput'] < result['offered'] * self.MIN_ACHIEVED:
+            return f"achieved {result['throughput']:.1f} of {result['offered']:.1f} req/s"
+        passed = [s for s in self.steps if s['verdict'] == 'ok']
+        if self.by == 'users' and passed and result['throughput'] < passed[-1]['throughput'] * (1 + self.MIN_GAIN):
+            return f"throughput flat at {result['throughput']:.1f} req/s"
+        return 'ok'
+
+    async def hold_step(self, level: float) -> Dict:
+        series = self.tester.metrics.timeseries
+        series.advance(time.time())
+        first = len(series.rows) + 1      # skip the partial second the step starts in
+        started = time.time()
+        settled = False
+        while True:
+            await asyncio.sleep(1)
+            series.advance(time.time())
+            rows = series.rows[first:]
+            if len(rows) >= self.hold:
+                settled = self.settled(rows)
+                if settled or time.time() - started >= self.max_step_time:
+                    break
+        result = self.measure(level, first)
+        result['settled'] = settled
+        result['verdict'] = self.verdict(result)
+        return result
+
+    async def run(self):
+        tester = self.tester
+        unit = 'req/s' if self.by == 'rate' else 'users'
+        tester.print_header("Step-Load Ramp", [
+            f"Ramp: {self.by}, {self.start:g} {unit} +{self.step:g} per step"
+            + (f" up to {self.max_level:g}" if self.max_level else ""),
+            f"Each step: hold {self.hold}s, settle p99 within {self.settle_tolerance:.0%} over "
+            f"{self.settle_window}s, at most {self.max_step_time}s",
+            f"Stop at: p99 > {self.p99_limit}s or errors > {self.error_limit}%",
+        ])
+
+        limit = (self.max_in_flight or 0) if self.by == 'rate' else tester.connection_limit
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit)) as session:
+            print("Performing health check...")
+            if not await tester.health_check(session):
+                print("❌ Health check failed - XATbackend may not be running")
+                return
+            print("✓ Health check passed\n")
+
+            sessions = [session]
+            if self.by == 'rate' and tester.mode == 'upload':
+                opened = await asyncio.gather(*(tester.open_user_session(session.connector)
+                                                for _ in range(self.users)))
+                sessions = [s for s in opened if s is not None]
+                if not sessions:
+                    print(f"❌ {tester.metrics.login_failures} logins failed - check --username/--password")
+                    return
+
+            print(f"Starting ramp at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            tester.metrics.begin(tester.timeseries_path, keep_histograms=True)
+            self.running = True
+            self.level = self.start
+            users = []
+            load = asyncio.create_task(self.offer_rate(sessions)) if self.by == 'rate' else None
+
+            try:
+                while True:
+                    if self.by == 'users':
+                        while len(users) < int(self.level):
+                            users.append(asyncio.create_task(self.virtual_user(session, len(users))))
+                    result = await self.hold_step(self.level)
+                    self.steps.append(result)
+                    print(f"  step {result['step']:>2}: {self.level:>8g} {unit:<5} -> "
+                          f"{result['throughput']:>8.1f} req/s, p99 {result['p99']:.4f}s, "
+                          f"errors {result['error_rate']:.1f}%"
+                          f"{'' if result['settled'] else ' (not settled)'}"
+                          f"{'' if result['verdict'] == 'ok' else '  <- ' + result['verdict']}")
+                    if result['verdict'] != 'ok':
+                        self.stop_reason = result['verdict']
+                        break
+                    if self.max_level and self.level + self.step > self.max_level:
+                        self.stop_reason = f"reached --ramp-max {self.max_level:g} without saturating"
+                        break
+                    self.level += self.step
+            finally:
+                self.running = False
+                if load is not None:
+                    await load
+                if users:
+                    await asyncio.gather(*users)
+                tester.metrics.finish()
+                for s in sessions:
+                    if s is not session:
+                        await s.close()
+
+        self.print_results()
+
+    # ---------------------------------------------------------------- output
+
+    def max_sustainable(self) -> Dict:
+        passed = [s for s in self.steps if s['verdict'] == 'ok']
+        return max(passed, key=lambda s: s['throughput']) if passed else None
+
+    def write_curve(self, path: str):
+        """Throughput vs latency curve as CSV, or JSON for a .json path."""
+        if path.endswith('.json'):
+            best = self.max_sustainable()
+            with open(path, 'w') as f:
+                json.dump({'by': self.by, 'stop_reason': self.stop_reason,
+                           'max_sustainable_throughput': best['throughput'] if best else 0,
+                           'steps': self.steps}, f, indent=2)
+            return
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RAMP_FIELDS)
+            writer.writeheader()
+            for step in self.steps:
+                writer.writerow({k: round(v, 6) if isinstance(v, float) else v for k, v in step.items()})
+
+    def print_results(self):
+        unit = 'req/s' if self.by == 'rate' else 'users'
+        print(f"\n{'='*70}")
+        print("RAMP RESULTS: THROUGHPUT VS LATENCY")
+        print(f"{'='*70}")
+        print(f"  {'Step':>4} {'Offered':>10} {'Req/s':>10} {'Err %':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for s in self.steps:
+            mark = '' if s['verdict'] == 'ok' else '  x'
+            print(f"  {s['step']:>4} {s['offered']:>10g} {s['throughput']:>10.1f} {s['error_rate']:>7.2f} "
+                  f"{s['p50']:>8.4f} {s['p95']:>8.4f} {s['p99']:>8.4f}{mark}")
+
+        best = self.max_sustainable()
+        print()
+        if best:
+            print(f"Max Sustainable Throughput: {best['throughput']:,.1f} req/s "
+                  f"(at {best['offered']:g} {unit}, p99 {best['p99']:.4f}s)")
+        else:
+            print("Max Sustainable Throughput: none - the first step already exceeded the limits")
+        print(f"Stopped:                    {self.stop_reason}")
+        stats = self.tester.metrics.get_statistics()
+        if stats['total_requests']:
+            print(f"Client CPU:                 {stats['client_cpu_percent']:.0f}% of one core over the ramp")
+        if self.tester.timeseries_path:
+            print(f"Per-second time series:     {self.tester.timeseries_path}")
+        print(f"{'='*70}\n")
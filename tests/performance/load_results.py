@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Saved load test results and baseline regression checks
+
+load_test.py --save-results writes one JSON file per run containing the
+scenario and configuration, the git revision of this checkout, the client
+environment, the summary statistics, the full latency histograms (per
+endpoint and status class) and the per-second time series. Comparing two
+such files tells whether a release of XATbackend got slower:
+
+    latency     p50: Mann-Whitney U test on the two latency histograms
+                (ties handled per bucket); p95/p99: order-statistic
+                confidence intervals, significant when the candidate's
+                interval lies wholly above the baseline's
+    throughput  Welch's t-test on per-second completed requests
+    errors      two-proportion z-test on the error rate
+
+A check fails only when the change is both statistically significant
+(p < --alpha) and larger than its practical tolerance, so long runs do
+not fail on trivial differences and short noisy runs do not fail on luck.
+
+Usage:
+    python load_test.py --scenario medium --save-results results/ --label v2.3.0
+    python load_results.py results/baseline.json results/loadtest_medium_20261019-101500.json
+    python load_results.py baseline.json candidate.json --alpha 0.01 --latency-tolerance 10
+
+Exit status: 0 no regression, 1 regression, 2 the runs cannot be compared.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+from datetime import datetime
+from statistics import NormalDist
+from typing import Dict, List, Tuple
+
+from latency_histogram import HistogramSet, LatencyHistogram, bucket_bounds
+
+RESULT_VERSION = 1
+SUCCESS_CLASSES = ('2xx', '3xx')
+# Endpoint histograms smaller than this are reported but not tested
+MIN_SAMPLES = 100
+Z = NormalDist()
+
+
+# ---------------------------------------------------------------- saving
+
+def git_revision() -> Dict:
+    """Revision of the checkout this script lives in, or empty if git is unavailable."""
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=here, capture_output=True, text=True,
+                              timeout=10).stdout.strip()
+
+    try:
+        revision = git('rev-parse', 'HEAD')
+        if not revision:
+            return {}
+        return {
+            'revision': revision,
+            'branch': git('rev-parse', '--abbrev-ref', 'HEAD'),
+            'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        }
+    except (OSError, subprocess.SubprocessError):
+        return {}
+
+
+def environment() -> Dict:
+    try:
+        import aiohttp
+        aiohttp_version = aiohttp.__version__
+    except ImportError:
+        aiohttp_version = None
+    return {
+        'hostname': socket.gethostname(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'aiohttp': aiohttp_version,
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def build_result(tester, args: argparse.Namespace, kind: str, extra: Dict = None) -> Dict:
+    """Everything needed to compare this run later. Passwords are not stored."""
+    metrics = tester.metrics
+    config = {k: v for k, v in vars(args).items() if k not in ('password',)}
+    rows = tester.timeseries_rows
+    if rows is None:
+        rows = metrics.timeseries.rows if metrics.timeseries else []
+    result = {
+        'version': RESULT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'kind': kind,
+        'scenario': args.scenario,
+        'mode': args.mode,
+        'label': args.label,
+        'target': args.url,
+        'config': config,
+        'git': git_revision(),
+        'environment': environment(),
+        'statistics': metrics.get_statistics(),
+        'workers': tester.worker_stats,
+        'metrics': metrics.to_dict(),
+        'timeseries': rows,
+    }
+    result.update(extra or {})
+    return result
+
+
+def result_path(path: str, result: Dict) -> str:
+    """path itself for *.json, otherwise an auto-named file inside that directory."""
+    if path.endswith('.json'):
+        directory = os.path.dirname(path)
+    else:
+        directory = path
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(path, f"loadtest_{result['kind']}_{result['scenario']}_{stamp}.json")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return path
+
+
+def save_result(result: Dict, path: str) -> str:
+    path = result_path(path, result)
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=1)
+    return path
+
+
+def load_result(path: str) -> Dict:
+    with open(path) as f:
+        result = json.load(f)
+    if result.get('version') != RESULT_VERSION:
+        raise ValueError(f"{path}: unsupported result version {result.get('version')}")
+    return result
+
+
+# ------------------------------------------------------------ statistics
+
+def mann_whitney(base: LatencyHistogram, cand: LatencyHistogram) -> Tuple[float, float]:
+    """
+    (P(candidate > baseline) + ties/2, one-sided p-value that the candidate is slower).
+
+    Histogram buckets are tie groups: every value in a bucket gets the
+    bucket's midrank, and the variance uses the usual tie correction.
+    """
+    n1, n2 = base.count, cand.count
+    n = n1 + n2
+    below_base = 0
+    u = 0.0
+    ties = 0.0
+    for a, b in zip(base.counts, cand.counts):
+        if a or b:
+            u += b * (below_base + a / 2.0)
+            below_base += a
+            t = a + b
+            ties += t ** 3 - t
+    mean = n1 * n2 / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return u / (n1 * n2), 1.0
+    z = (u - mean) / math.sqrt(variance)
+    return u / (n1 * n2), 1 - Z.cdf(z)
+
+
+def value_at_rank(hist: LatencyHistogram, rank: int) -> float:
+    """Seconds of the rank-th smallest sample (1-based), to bucket precision."""
+    rank = min(max(rank, 1), hist.count)
+    seen = 0
+    for i, c in enumerate(hist.counts):
+        if c:
+            seen += c
+            if seen >= rank:
+                low, high = bucket_bounds(i)
+                return min(max((low + high - 1) // 2, hist.min_us), hist.max_us) / 1000000.0
+    return hist.max
+
+
+def percentile_interval(hist: LatencyHistogram, pct: float, alpha: float) -> Tuple[float, float]:
+    """Distribution-free confidence interval for a percentile from binomial order statistics."""
+    n, q = hist.count, pct / 100.0
+    spread = Z.inv_cdf(1 - alpha / 2) * math.sqrt(n * q * (1 - q))
+    return value_at_rank(hist, math.floor(n * q - spread)), value_at_rank(hist, math.ceil(n * q + spread) + 1)
+
+
+def betainc(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta I_x(a, b) by continued fraction."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1 - betainc(b, a, 1 - x)
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log(1 - x)) / a
+    tiny = 1e-300
+    f, c, d = 1.0, 1.0, 0.0
+    for i in range(200):
+        m = i // 2
+        if i == 0:
+            numerator = 1.0
+        elif i % 2 == 0:
+            numerator = m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m))
+        else:
+            numerator = -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))
+        d = 1 + numerator * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + numerator / (c if abs(c) > tiny else tiny)
+        f *= c * d
+        if abs(1 - c * d) < 1e-10:
+            break
+    return front * (f - 1)
+
+
+def welch(base: List[float], cand: List[float]) -> Tuple[float, float]:
+    """(t, one-sided p-value that the candidate mean is lower)."""
+    n1, n2 = len(base), len(cand)
+    m1, m2 = sum(base) / n1, sum(cand) / n2
+    v1 = sum((x - m1) ** 2 for x in base) / (n1 - 1)
+    v2 = sum((x - m2) ** 2 for x in cand) / (n2 - 1)
+    se2 = v1 / n1 + v2 / n2
+    if se2 == 0:
+        return 0.0, 0.0 if m2 < m1 else 1.0
+    t = (m2 - m1) / math.sqrt(se2)
+    df = se2 ** 2 / ((v1 / n1) ** 2 / (n1 - 1) + (v2 / n2) ** 2 / (n2 - 1))
+    tail = 0.5 * betainc(df / 2, 0.5, df / (df + t * t))
+    return t, tail if t < 0 else 1 - tail
+
+
+def proportion_test(failed1: int, n1: int, failed2: int, n2: int) -> float:
+    """One-sided p-value that the candidate error rate is higher."""
+    pooled = (failed1 + failed2) / (n1 + n2)
+    se = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    if se == 0:
+        return 1.0
+    return 1 - Z.cdf((failed2 / n2 - failed1 / n1) / se)
+
+
+# ------------------------------------------------------------ comparing
+
+class Check:
+    """One compared quantity and whether it regressed."""
+
+    def __init__(self, name: str, baseline: float, candidate: float, unit: str,
+                 p_value: float = None, regressed: bool = False, note: str = ''):
+        self.name = name
+        self.baseline = baseline
+        self.candidate = candidate
+        self.unit = unit
+        self.p_value = p_value
+        self.regressed = regressed
+        self.note = note
+
+    @property
+    def change(self) -> float:
+        return (self.candidate - self.baseline) / self.baseline * 100 if self.baseline else 0.0
+
+    def to_dict(self) -> Dict:
+        return {'name': self.name, 'baseline': self.baseline, 'candidate': self.candidate,
+                'change_percent': self.change, 'p_value': self.p_value,
+                'regressed': self.regressed, 'note': self.note}
+
+
+def steady_throughput(rows: List[Dict]) -> List[float]:
+    """Completed requests per second, without the partial first and last seconds."""
+    values = [row['requests'] for row in rows]
+    return values[1:-1] if len(values) > 3 else values
+
+
+def latency_checks(name: str, base: LatencyHistogram, cand: LatencyHistogram,
+                   alpha: float, tolerance: float) -> List[Check]:
+    if base.count < MIN_SAMPLES or cand.count < MIN_SAMPLES:
+        return [Check(f"{name} p50", base.percentile(50), cand.percentile(50), 's',
+                      note=f"not tested: fewer than {MIN_SAMPLES} samples")]
+
+    superiority, p_shift = mann_whitney(base, cand)
+    checks = []
+    for pct in (50, 95, 99):
+        b, c = base.percentile(pct), cand.percentile(pct)
+        b_low, b_high = percentile_interval(base, pct, alpha)
+        c_low, c_high = percentile_interval(cand, pct, alpha)
+        check = Check(f"{name} p{pct}", b, c, 's')
+        # The median is judged by the whole-distribution shift, the tails by their own intervals
+        significant = p_shift < alpha if pct == 50 else c_low > b_high
+        check.p_value = p_shift if pct == 50 else None
+        check.regressed = significant and check.change > tolerance
+        check.note = (f"P(slower)={superiority:.2f}" if pct == 50
+                      else f"CI {b_low:.4f}-{b_high:.4f} vs {c_low:.4f}-{c_high:.4f}")
+        checks.append(check)
+    return checks
+
+
+def compare_results(baseline: Dict, candidate: Dict, alpha: float = 0.01, latency_tolerance: float = 10.0,
+                    throughput_tolerance: float = 5.0, error_tolerance: float = 0.5) -> List[Check]:
+    base_hists = HistogramSet.from_dict(baseline['metrics']['latency'])
+    cand_hists = HistogramSet.from_dict(candidate['metrics']['latency'])
+
+    checks = latency_checks('latency', base_hists.combined(SUCCESS_CLASSES),
+                            cand_hists.combined(SUCCESS_CLASSES), alpha, latency_tolerance)
+    for key in sorted(set(base_hists.histograms) & set(cand_hists.histograms)):
+        endpoint, status = key
+        if status in SUCCESS_CLASSES:
+            checks.extend(latency_checks(f"{endpoint} [{status}]", base_hists.histograms[key],
+                                         cand_hists.histograms[key], alpha, latency_tolerance))
+
+    base_tp, cand_tp = steady_throughput(baseline['timeseries']), steady_throughput(candidate['timeseries'])
+    if len(base_tp) >= 3 and len(cand_tp) >= 3:
+        _, p = welch(base_tp, cand_tp)
+        check = Check('throughput', sum(base_tp) / len(base_tp), sum(cand_tp) / len(cand_tp), 'req/s', p)
+        check.regressed = p < alpha and -check.change > throughput_tolerance
+        checks.append(check)
+    else:
+        checks.append(Check('throughput', baseline['statistics'].get('requests_per_second', 0),
+                            candidate['statistics'].get('requests_per_second', 0), 'req/s',
+                            note='not tested: fewer than 3 steady seconds'))
+
+    b, c = baseline['statistics'], candidate['statistics']
+    b_failed = b.get('error_count', 0) + b.get('timeout_count', 0)
+    c_failed = c.get('error_count', 0) + c.get('timeout_count', 0)
+    if b.get('total_requests') and c.get('total_requests'):
+        b_rate = b_failed / b['total_requests'] * 100
+        c_rate = c_failed / c['total_requests'] * 100
+        p = proportion_test(b_failed, b['total_requests'], c_failed, c['total_requests'])
+        check = Check('error rate', b_rate, c_rate, '%', p)
+        check.regressed = p < alpha and c_rate - b_rate > error_tolerance
+        checks.append(check)
+    return checks
+
+
+def compatibility(baseline: Dict, candidate: Dict) -> List[str]:
+    """Reasons the two runs don't measure the same thing (empty if comparable)."""
+    problems = []
+    for key in ('kind', 'scenario', 'scenario_file', 'mode'):
+        if baseline.get(key) != candidate.get(key):
+            problems.append(f"{key}: {baseline.get(key)} vs {candidate.get(key)}")
+    for key in ('arrival_rate', 'duration', 'workers', 'csv_rows'):
+        b, c = baseline['config'].get(key), candidate['config'].get(key)
+        if b != c:
+            problems.append(f"{key}: {b} vs {c}")
+    return problems
+
+
+def describe(result: Dict) -> str:
+    git = result.get('git') or {}
+    revision = git.get('revision', 'unknown')[:10] + (' (dirty)' if git.get('dirty') else '')
+    label = f" [{result['label']}]" if result.get('label') else ''
+    return f"{result['created']} {result['kind']}/{result['scenario']} rev {revision}{label}"
+
+
+def print_comparison(baseline: Dict, candidate: Dict, checks: List[Check]):
+    print(f"\n{'='*70}")
+    print("LOAD TEST COMPARISON")
+    print(f"{'='*70}")
+    print(f"Baseline:  {describe(baseline)}")
+    print(f"Candidate: {describe(candidate)}")
+    print(f"\n  {'Check':<34} {'Baseline':>10} {'Candidate':>10} {'Change':>8} {'p':>8}")
+    for check in checks:
+        p = f"{check.p_value:.4f}" if check.p_value is not None else '-'
+        flag = '  ❌' if check.regressed else ''
+        print(f"  {check.name[:34]:<34} {check.baseline:>10.4f} {check.candidate:>10.4f} "
+              f"{check.change:>+7.1f}% {p:>8}{flag}")
+        if check.note:
+            print(f"  {'':<34} {check.note}")
+    regressions = [c for c in checks if c.regressed]
+    print()
+    if regressions:
+        print(f"❌ {len(regressions)} significant regression(s): " + ", ".join(c.name for c in regressions))
+    else:
+        print("✓ No significant regression")
+    print(f"{'='*70}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare a load test result against a baseline')
+    parser.add_argument('baseline', help='Baseline result JSON (from load_test.py --save-results)')
+    parser.add_argument('candidate', help='Result JSON to check')
+    parser.add_argument('--alpha', type=float, default=0.01, help='Significance level (default: 0.01)')
+    parser.add_argument('--latency-tolerance', type=float, default=10.0,
+                        help='Percent latency increase that counts as a regression (default: 10)')
+    parser.add_argument('--throughput-tolerance', type=float, default=5.0,
+                        help='Percent throughput drop that counts as a regression (default: 5)')
+    parser.add_argument('--error-tolerance', type=float, default=0.5,
+                        help='Error-rate increase in percentage points that counts (default: 0.5)')
+    parser.add_argument('--force', action='store_true', help='Compare even if scenario/config differ')
+    parser.add_argument('--json', default=None, help='Also write the checks to this JSON file')
+    args = parser.parse_args()
+
+    try:
+        baseline = load_result(args.baseline)
+        candidate = load_result(args.candidate)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    problems = compatibility(baseline, candidate)
+    if problems and not args.force:
+        print("❌ Runs are not comparable (use --force to compare anyway):")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(2)
+
+    checks = compare_results(baseline, candidate, args.alpha, args.latency_tolerance,
+                             args.throughput_tolerance, args.error_tolerance)
+    print_comparison(baseline, candidate, checks)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'baseline': args.baseline, 'candidate': args.candidate,
+                       'checks': [c.to_dict() for c in checks]}, f, indent=2)
+
+    sys.exit(1 if any(c.regressed for c in checks) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Scenario files for load_test.py: weighted endpoint mixes and user journeys
+
+A scenario file (JSON) describes what virtual users do instead of the
+fixed round robin over three pages:
+
+    {
+      "name": "portal",
+      "users": 20,                      optional, default: --scenario's users
+      "duration": 300,                  seconds, optional; --duration overrides it
+      "iterations": null,               or journeys per user instead of a duration
+      "ramp_up": 30,                    seconds over which users start
+      "think_time": "exp:2.0",          between steps (fixed:S, uniform:LOW:HIGH, exp:MEAN,
+                                        lognormal:MEDIAN:SIGMA, or a number of seconds)
+      "mix": [                          weighted endpoint mix used by "mix" steps
+        {"name": "collectors", "path": "/collectors/manage/", "weight": 6},
+        {"name": "dashboard", "path": "/dashboard/", "weight": 3},
+        {"name": "health", "path": "/health/", "weight": 1}
+      ],
+      "journeys": [                     each iteration picks one by weight
+        {"name": "analyst", "weight": 8, "steps": [
+          {"name": "login", "action": "login"},
+          {"name": "browse", "mix": 5}
+        ]},
+        {"name": "uploader", "weight": 2, "steps": [
+          {"name": "login", "action": "login"},
+          {"name": "list collectors", "path": "/collectors/manage/"},
+          {"name": "upload", "action": "upload", "think_time": "uniform:5:15"},
+          {"name": "view analysis", "path": "/api/dashboard/collectors/", "expect": [200]}
+        ]}
+      ]
+    }
+
+Request steps take "method" (GET), "path" (may use {collector_id}, {user},
+{iteration}), "expect" (statuses counted as success, default [200, 302]),
+"csrf" (send the CSRF token header on POSTs) and "data"/"json" bodies.
+Every step is accounted separately as "<journey>: <step>", and each
+journey's own time (think time excluded) is reported as completed or failed.
+
+With --arrival-rate, journeys start at that rate as new visitors (open
+loop) instead of looping over a fixed set of users. They are scheduled the
+way load_test.py schedules open-loop requests: --arrival poisson or fixed,
+--max-in-flight/--overflow capping the journeys in flight, and each
+journey (and its first step) timed from its scheduled start so queueing is
+counted rather than omitted. Closed-loop users think between journeys as
+well as between steps.
+"""
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from typing import Dict, Tuple
+
+import aiohttp
+
+from standin_server import parse_latency
+
+ACTIONS = ('login', 'upload')
+
+
+def think_sampler(spec):
+    """Sampler (rng -> seconds) from a latency-style spec or a plain number."""
+    if spec is None:
+        return lambda rng: 0.0
+    if isinstance(spec, (int, float)):
+        return parse_latency(f"fixed:{spec}")
+    return parse_latency(spec)
+
+
+class Step:
+    """One step of a journey, or one entry of the endpoint mix."""
+
+    def __init__(self, data: Dict, where: str):
+        if not isinstance(data, dict):
+            raise ValueError(f"{where}: expected an object, got {data!r}")
+        self.action = data.get('action')
+        self.mix = data.get('mix')
+        self.path = data.get('path')
+        if self.action is not None and self.action not in ACTIONS:
+            raise ValueError(f"{where}: unknown action {self.action!r} (expected {', '.join(ACTIONS)})")
+        if sum(x is not None for x in (self.action, self.mix, self.path)) != 1:
+            raise ValueError(f"{where}: a step needs exactly one of 'path', 'action' or 'mix'")
+        self.name = data.get('name') or self.action or self.path or 'mix'
+        self.method = data.get('method', 'GET').upper()
+        self.expect = tuple(data.get('expect', (200, 302)))
+        self.csrf = data.get('csrf', self.method != 'GET')
+        self.data = data.get('data')
+        self.json = data.get('json')
+        self.weight = float(data.get('weight', 1))
+        self.timeout = float(data.get('timeout', 60 if self.action == 'upload' else 10))
+        self.think = think_sampler(data['think_time']) if 'think_time' in data else None
+
+
+class Journey:
+    """Named, weighted sequence of steps."""
+
+    def __init__(self, data: Dict, where: str):
+        self.name = data.get('name') or where
+        self.weight = float(data.get('weight', 1))
+        self.abort_on_error = data.get('abort_on_error', True)
+        self.think = think_sampler(data['think_time']) if 'think_time' in data else None
+        steps = data.get('steps') or []
+        if not steps:
+            raise ValueError(f"{where}: journey {self.name!r} has no steps")
+        self.steps = [Step(step, f"{where}.steps[{i}]") for i, step in enumerate(steps)]
+
+
+class ScenarioFile:
+    """A validated scenario file."""
+
+    def __init__(self, data: Dict, path: str = '<scenario>'):
+        self.path = path
+        self.name = data.get('name', path)
+        self.description = data.get('description', '')
+        self.users = data.get('users')
+        self.duration = data.get('duration')
+        self.iterations = data.get('iterations')
+        self.ramp_up = float(data.get('ramp_up', 0))
+        self.think = think_sampler(data.get('think_time'))
+        self.mix = [Step(entry, f"mix[{i}]") for i, entry in enumerate(data.get('mix', []))]
+        for entry in self.mix:
+            if entry.path is None:
+                raise ValueError(f"mix entry {entry.name!r}: mix entries must be requests with a 'path'")
+        self.journeys = [Journey(j, f"journeys[{i}]") for i, j in enumerate(data.get('journeys', []))]
+        if not self.journeys:
+            if not self.mix:
+                raise ValueError("a scenario needs 'journeys', a 'mix', or both")
+            # A bare mix is one journey of one mixed request
+            self.journeys = [Journey({'name': 'mix', 'steps': [{'mix': 1}]}, 'mix')]
+        if any(step.mix for j in self.journeys for step in j.steps) and not self.mix:
+            raise ValueError("'mix' steps need a top-level 'mix'")
+
+    @classmethod
+    def load(cls, path: str) -> 'ScenarioFile':
+        with open(path) as f:
+            try:
+                data = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}")
+        return cls(data, path)
+
+    def uses(self, action: str) -> bool:
+        return any(step.action == action for j in self.journeys for step in j.steps)
+
+
+class JourneyRunner:
+    """Run a ScenarioFile's journeys with a LoadTester's requests and metrics."""
+
+    def __init__(self, tester, scenario: ScenarioFile, users: int, duration: float = None,
+                 arrival_rate: float = None, first_user: int = 0, seed: int = None,
+                 arrival: str = 'poisson', max_in_flight: int = None, overflow: str = 'queue'):
+        self.tester = tester
+        self.scenario = scenario
+        self.users = users
+        self.duration = duration if duration is not None else scenario.duration
+        self.iterations = scenario.iterations
+        self.arrival_rate = arrival_rate
+        self.arrival = arrival
+        self.max_in_flight = max_in_flight
+        self.overflow = overflow
+        self.first_user = first_user
+        self.rng = random.Random(seed)
+        self.deadline = 0.0
+        self.journey_weights = [j.weight for j in scenario.journeys]
+        self.mix_weights = [m.weight for m in scenario.mix]
+
+    def new_session(self, connector: aiohttp.BaseConnector) -> aiohttp.ClientSession:
+        """Per-user cookie jar over the shared connection pool."""
+        return aiohttp.ClientSession(connector=connector, connector_owner=False,
+                                     cookie_jar=aiohttp.CookieJar(unsafe=True))
+
+    async def run_request(self, session, step: Step, label: str, user_id: int, i: int, start: float = None) -> bool:
+        tester = self.tester
+        path = step.path.format(collector_id=tester.collector_id, user=user_id, iteration=i)
+        kwargs = {}
+        if step.csrf:
+            kwargs['headers'] = {'X-CSRFToken': tester.csrf_token(session) or '',
+                                 'Referer': f"{tester.xatbackend_url}{path}"}
+        if step.json is not None:
+            kwargs['json'] = step.json
+        elif step.data is not None:
+            kwargs['data'] = step.data
+        status = await tester.timed_request(session, step.method, path, start or time.time(), label,
+                                            step.expect, step.timeout, **kwargs)
+        return status in step.expect
+
+    async def run_step(self, session, journey: Journey, step: Step, user_id: int, i: int,
+                       start: float = None) -> Tuple[bool, float]:
+        """
+        Run one step; returns whether it succeeded and the think time spent inside it.
+
+        start is when the step was due (an open-loop journey's scheduled
+        start); latency is measured from it instead of from the send.
+        """
+        tester = self.tester
+        label = f"{journey.name}: {step.name}"
+        if step.action == 'login':
+            start = start or time.time()
+            ok = await tester.login(session)
+            if ok:
+                tester.metrics.record_success(time.time() - start, endpoint=label, status=302)
+            else:
+                tester.metrics.record_error(label, 'login failed', time.time() - start)
+            return ok, 0.0
+        if step.action == 'upload':
+            before = tester.metrics.upload_count
+            await tester.upload_request(session, user_id, i, start or time.time(), label)
+            return tester.metrics.upload_count > before, 0.0
+        if step.mix:
+            ok, thinking = True, 0.0
+            for n in range(int(step.mix)):
+                entry = self.rng.choices(self.scenario.mix, self.mix_weights)[0]
+                ok = await self.run_request(session, entry, f"{journey.name}: {entry.name}", user_id, i,
+                                            start if n == 0 else None) and ok
+                if n < step.mix - 1 and time.time() < self.deadline:
+                    thinking += await self.think(journey, step)
+            return ok, thinking
+        return await self.run_request(session, step, label, user_id, i, start), 0.0
+
+    async def think(self, journey: Journey, step: Step = None) -> float:
+        """Pause after a step, or between journeys when step is None."""
+        sampler = (step.think if step else None) or journey.think or self.scenario.think
+        delay = sampler(self.rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    async def run_journey(self, session, user_id: int, i: int, intended: float = None) -> Journey:
+        """Run one weighted-random journey; intended is its scheduled start in open loop."""
+        journey = self.rng.choices(self.scenario.journeys, self.journey_weights)[0]
+        started = intended or time.time()
+        thinking = 0.0
+        ok = True
+        for n, step in enumerate(journey.steps):
+            step_ok, paused = await self.run_step(session, journey, step, user_id, i, intended if n == 0 else None)
+            thinking += paused
+            if not step_ok:
+                ok = False
+                if journey.abort_on_error:
+                    break
+            if n < len(journey.steps) - 1 and time.time() < self.deadline:
+                thinking += await self.think(journey, step)
+        self.tester.metrics.journeys.record(journey.name, 'completed' if ok else 'failed',
+                                            time.time() - started - thinking)
+        return journey
+
+    async def virtual_user(self, connector, user_id: int, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+        async with self.new_session(connector) as session:
+            i = 0
+            while time.time() < self.deadline and (self.iterations is None or i < self.iterations):
+                journey = await self.run_journey(session, user_id, i)
+                i += 1
+                if time.time() < self.deadline and (self.iterations is None or i < self.iterations):
+                    await self.think(journey)
+
+    async def visitor(self, connector, user_id: int, intended: float, slots: asyncio.Semaphore):
+        """One open-loop journey: wait for an in-flight slot if capped, then run it from its scheduled start."""
+        metrics = self.tester.metrics
+        if slots is not None:
+            if slots.locked():
+                metrics.queued_count += 1
+            await slots.acquire()
+        metrics.queue_delay.record(time.time() - intended)
+
+        metrics.in_flight += 1
+        metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+        try:
+            async with self.new_session(connector) as session:
+                await self.run_journey(session, user_id, 0, intended)
+        finally:
+            metrics.in_flight -= 1
+            metrics.completed_count += 1
+            if slots is not None:
+                slots.release()
+
+    async def run(self):
+        tester = self.tester
+        scenario = self.scenario
+        if scenario.uses('upload') and not tester.payloads:
+            tester.build_payloads()
+        shape = (f"{self.arrival_rate:,.1f} journeys/s (open loop, {self.arrival}), "
+                 f"max in flight {self.max_in_flight or 'unbounded'} (overflow: {self.overflow})"
+                 if self.arrival_rate
+                 else f"{self.users} users" + (f", ramp-up {scenario.ramp_up:g}s" if scenario.ramp_up else ""))
+        length = (f"{self.iterations} journeys per user" if self.iterations and not self.arrival_rate
+                  else f"{self.duration:,.0f}s")
+        tester.print_header(f"Scenario File: {scenario.name}", [
+            *([f"Description: {scenario.description}"] if scenario.description else []),
+            f"Load: {shape}, {length}",
+            "Journeys: " + ", ".join(f"{j.name} ({j.weight:g})" for j in scenario.journeys),
+            *(["Mix: " + ", ".join(f"{m.name} ({m.weight:g})" for m in scenario.mix)] if scenario.mix else []),
+        ])
+
+        limit = (self.max_in_flight or 0) if self.arrival_rate else tester.connection_limit
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit)) as session:
+            print("Performing health check...")
+            if not await tester.health_check(session):
+                print("❌ Health check failed - XATbackend may not be running")
+                return
+            print("✓ Health check passed\n")
+            await tester.wait_for_start()
+
+            print(f"Starting load test at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            tester.metrics.begin(tester.timeseries_path, tester.keep_histograms)
+            self.deadline = time.time() + (self.duration if not self.iterations or self.arrival_rate
+                                           else float('inf'))
+
+            tasks = []
+            if self.arrival_rate:
+                # Same schedule, cap and overflow handling as LoadTester.run_open_loop, one journey per arrival
+                metrics = tester.metrics
+                cap, overflow = self.max_in_flight, self.overflow
+                slots = asyncio.Semaphore(cap) if cap and overflow == 'queue' else None
+                pending = set()
+                loop = asyncio.get_running_loop()
+                t0 = loop.time()
+                offset = 0.0
+                n = 0
+                while offset < self.duration:
+                    delay = t0 + offset - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    intended = metrics.start_time + offset
+                    metrics.scheduled_count += 1
+                    metrics.schedule_lag.record(time.time() - intended)
+                    metrics.sample_in_flight()
+                    if cap and overflow == 'drop' and len(pending) >= cap:
+                        metrics.dropped_count += 1
+                    else:
+                        task = asyncio.create_task(self.visitor(session.connector, self.first_user + n,
+                                                                intended, slots))
+                        pending.add(task)
+                        task.add_done_callback(pending.discard)
+                        tasks.append(task)
+                    n += 1
+                    offset += (self.rng.expovariate(self.arrival_rate) if self.arrival == 'poisson'
+                               else 1.0 / self.arrival_rate)
+                metrics.offered_rate = self.arrival_rate
+            else:
+                for k in range(self.users):
+                    delay = scenario.ramp_up * k / self.users if scenario.ramp_up else 0
+                    tasks.append(self.virtual_user(session.connector, self.first_user + k, delay))
+            await asyncio.gather(*tasks)
+
+            tester.metrics.finish()
+            tester.print_results()
@@ -8,19 +8,62 @@ Usage:
     python load_test.py --scenario medium
     python load_test.py --scenario heavy
     python load_test.py --scenario stress
+
+    # Authenticated CSV uploads (each virtual user logs in once)
+    python load_test.py --scenario medium --mode upload --collector-id 3 --csv-rows 5000
+    (credentials from --username/--password or LOADTEST_USERNAME/LOADTEST_PASSWORD)
+
+    # Open loop: 50 req/s Poisson arrivals for 2 minutes regardless of response time
+    python load_test.py --arrival-rate 50 --duration 120 --max-in-flight 200
+
+    # Spread the users (or arrival rate) over 4 client processes
+    python load_test.py --scenario stress --workers 4
+    python load_test.py --arrival-rate 2000 --duration 60 --workers 4
+
+    # Capacity: step the arrival rate (or users) up until p99/errors cross a limit
+    python load_test.py --ramp rate --ramp-start 20 --ramp-step 20 --p99-limit 0.5 --ramp-output ramp.csv
+
+    # Without the docker-compose stack: run standin_server.py first, then
+    python load_test.py --url http://127.0.0.1:8000 --mode upload --username u --password p --collector-id 1
+
+    # Per-second throughput/latency written while the run is in progress
+    python load_test.py --scenario heavy --timeseries heavy_timeseries.csv
+
+    # Join per-second client latency with the server's pcc capture for the same window
+    python load_test.py --scenario heavy --server-metrics pcc_collection.json --correlation-output timeline.csv
+
+    # Weighted endpoint mix and scripted journeys (login, list collectors, upload, view analysis)
+    python load_test.py --scenario-file scenarios/portal.json --collector-id 1 --timeseries portal.csv
+
+    # Keep results and fail (exit 1) on a significant regression against a baseline
+    python load_test.py --scenario medium --save-results results/ --label v2.3.0 --baseline results/v2.2.json
 """
 import argparse
 import asyncio
 import aiohttp
+import contextlib
+import multiprocessing
+import traceback
+import os
+import io
 import time
+import random
+import sys
 import json
 import csv
-import tempfile
-import statistics
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Tuple
 
+import load_results
+import server_correlation
+from load_ramp import StepRamp
+from load_scenarios import JourneyRunner, ScenarioFile
+from latency_histogram import HistogramSet, LatencyHistogram, TimeSeriesWriter, merge_timeseries, write_timeseries
+
+# Histogram key for uploads; the collector id in the URL would split them per collector
+UPLOAD_ENDPOINT = '/collectors/manage/upload/'
+
 
 class LoadTestConfig:
     """Configuration for different load scenarios."""
@@ -54,37 +97,158 @@ class LoadTestConfig:
 
 
 class PerformanceMetrics:
-    """Track performance metrics during load test."""
+    """
+    Track performance metrics during load test.
+
+    Latencies go into fixed-memory histograms keyed by endpoint and status
+    class (see latency_histogram.py) instead of a growing list, so memory
+    and reporting cost don't depend on the number of requests, and results
+    from several workers can be merged.
+    """
+
+    # Status classes that count as successful requests for the latency summary
+    SUCCESS_CLASSES = ('2xx', '3xx')
 
     def __init__(self):
-        self.response_times: List[float] = []
+        self.latency = HistogramSet()
+        # Scenario-file journeys: whole-journey time (think time excluded) by journey and outcome
+        self.journeys = HistogramSet()
         self.success_count: int = 0
         self.error_count: int = 0
         self.timeout_count: int = 0
         self.start_time: float = 0
         self.end_time: float = 0
+        self.timeseries: TimeSeriesWriter = None
+        # CPU seconds the load generator itself used during the run
+        self.client_cpu: float = 0
+        self._cpu_start: float = 0
+        # Upload mode: payload volume and login cost, kept apart from request latency
+        self.upload_count: int = 0
+        self.upload_bytes: int = 0
+        self.upload_rows: int = 0
+        self.upload_time: float = 0
+        self.login = LatencyHistogram()
+        self.login_failures: int = 0
+        # Open-loop mode: latency runs from the intended send time,
+        # service time from when the request actually went out
+        self.offered_rate: float = 0
+        self.service = LatencyHistogram()
+        self.scheduled_count: int = 0
+        # Arrivals (requests, or journeys with a scenario file) that finished
+        self.completed_count: int = 0
+        self.dropped_count: int = 0
+        self.queued_count: int = 0
+        self.queue_delay = LatencyHistogram()
+        self.schedule_lag = LatencyHistogram()
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+        self.in_flight_total: int = 0
+        self.in_flight_samples: int = 0
+
+    def begin(self, timeseries_path: str = None, keep_histograms: bool = False):
+        """Start the clock and, if a path is given, the per-second time series."""
+        self.start_time = time.time()
+        self._cpu_start = time.process_time()
+        self.timeseries = TimeSeriesWriter(timeseries_path, self.start_time, keep_histograms)
+
+    def finish(self):
+        self.end_time = time.time()
+        self.client_cpu = time.process_time() - self._cpu_start
+        if self.timeseries:
+            self.timeseries.close(self.end_time)
 
-    def record_success(self, response_time: float):
+    def _tick(self, response_time: float, outcome: str, nbytes: int = 0):
+        if self.timeseries:
+            self.timeseries.record(response_time, outcome, nbytes)
+
+    def record_success(self, response_time: float, service_time: float = None,
+                       endpoint: str = '', status: int = 200, nbytes: int = 0):
         """Record successful request."""
-        self.response_times.append(response_time)
+        self.latency.record(endpoint, status, response_time)
         self.success_count += 1
+        if service_time is not None:
+            self.service.record(service_time)
+        self._tick(response_time, 'success', nbytes)
 
-    def record_error(self):
+    def record_error(self, endpoint: str = '', status='error', response_time: float = None):
         """Record failed request."""
         self.error_count += 1
+        if response_time is not None:
+            self.latency.record(endpoint, status, response_time)
+            self._tick(response_time, 'error')
 
-    def record_timeout(self):
+    def record_timeout(self, endpoint: str = '', response_time: float = None):
         """Record timeout."""
         self.timeout_count += 1
+        if response_time is not None:
+            self.latency.record(endpoint, 'timeout', response_time)
+            self._tick(response_time, 'timeout')
+
+    def record_upload(self, response_time: float, nbytes: int, rows: int, service_time: float = None,
+                      endpoint: str = '', status: int = 200):
+        """Record a successful upload and the payload it carried."""
+        self.record_success(response_time, service_time, endpoint, status, nbytes)
+        self.upload_count += 1
+        self.upload_bytes += nbytes
+        self.upload_rows += rows
+        self.upload_time += service_time if service_time is not None else response_time
+
+    def sample_in_flight(self):
+        self.in_flight_total += self.in_flight
+        self.in_flight_samples += 1
+
+    def merge(self, other: 'PerformanceMetrics') -> 'PerformanceMetrics':
+        """Fold another worker's metrics into this one."""
+        self.latency.merge(other.latency)
+        self.journeys.merge(other.journeys)
+        for name in self.COUNTERS:
+            if name not in ('start_time', 'end_time', 'max_in_flight'):
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+        # Workers peak at different moments, so the peak stays a single worker's peak
+        self.max_in_flight = max(self.max_in_flight, other.max_in_flight)
+        for name in self.HISTOGRAMS:
+            getattr(self, name).merge(getattr(other, name))
+        if other.start_time and (not self.start_time or other.start_time < self.start_time):
+            self.start_time = other.start_time
+        self.end_time = max(self.end_time, other.end_time)
+        return self
+
+    COUNTERS = ('success_count', 'error_count', 'timeout_count', 'start_time', 'end_time',
+                'upload_count', 'upload_bytes', 'upload_rows', 'upload_time', 'login_failures',
+                'offered_rate', 'scheduled_count', 'completed_count', 'dropped_count', 'queued_count',
+                'max_in_flight', 'in_flight_total', 'in_flight_samples', 'client_cpu')
+    HISTOGRAMS = ('login', 'service', 'queue_delay', 'schedule_lag')
+
+    def to_dict(self) -> Dict:
+        """JSON-safe snapshot (counters plus sparse histograms) for merging or saving."""
+        data = {name: getattr(self, name) for name in self.COUNTERS}
+        data['latency'] = self.latency.to_dict()
+        data['journeys'] = self.journeys.to_dict()
+        for name in self.HISTOGRAMS:
+            data[name] = getattr(self, name).to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PerformanceMetrics':
+        metrics = cls()
+        for name in cls.COUNTERS:
+            setattr(metrics, name, data.get(name, 0))
+        metrics.latency = HistogramSet.from_dict(data.get('latency', []))
+        metrics.journeys = HistogramSet.from_dict(data.get('journeys', []))
+        for name in cls.HISTOGRAMS:
+            if name in data:
+                setattr(metrics, name, LatencyHistogram.from_dict(data[name]))
+        return metrics
 
     def get_statistics(self) -> Dict:
         """Calculate and return statistics."""
-        if not self.response_times:
+        ok = self.latency.combined(self.SUCCESS_CLASSES)
+        if not ok.count:
             return {
                 'total_requests': 0,
                 'success_count': 0,
-                'error_count': 0,
-                'timeout_count': 0
+                'error_count': self.error_count,
+                'timeout_count': self.timeout_count
             }
 
         duration = self.end_time - self.start_time
@@ -98,48 +262,155 @@ class PerformanceMetrics:
             'success_rate': (self.success_count / total_requests * 100) if total_requests > 0 else 0,
             'duration_seconds': duration,
             'requests_per_second': total_requests / duration if duration > 0 else 0,
-            'avg_response_time': statistics.mean(self.response_times),
-            'median_response_time': statistics.median(self.response_times),
-            'min_response_time': min(self.response_times),
-            'max_response_time': max(self.response_times),
-            'p95_response_time': statistics.quantiles(self.response_times, n=20)[18],  # 95th percentile
-            'p99_response_time': statistics.quantiles(self.response_times, n=100)[98],  # 99th percentile
+            'avg_response_time': ok.mean,
+            'median_response_time': ok.percentile(50),
+            'min_response_time': ok.min,
+            'max_response_time': ok.max,
+            'p95_response_time': ok.percentile(95),
+            'p99_response_time': ok.percentile(99),
+            'p999_response_time': ok.percentile(99.9),
+            'client_cpu_seconds': self.client_cpu,
+            'client_cpu_percent': self.client_cpu / duration * 100 if duration > 0 else 0,
+            'endpoints': [
+                {'endpoint': endpoint, 'status': cls, **hist.summary()}
+                for (endpoint, cls), hist in sorted(self.latency.histograms.items())
+            ],
+            'journeys': [
+                {'journey': name, 'outcome': outcome, **hist.summary()}
+                for (name, outcome), hist in sorted(self.journeys.histograms.items())
+            ],
+            **self.get_upload_statistics(duration),
+            **self.get_open_loop_statistics(duration),
+        }
+
+    def get_open_loop_statistics(self, duration: float) -> Dict:
+        """Offered vs achieved load, queueing and concurrency for open-loop runs."""
+        if not self.offered_rate:
+            return {}
+        # Results saved before completed_count existed counted requests
+        completed = self.completed_count or self.success_count + self.error_count + self.timeout_count
+
+        return {
+            'offered_rate': self.offered_rate,
+            'scheduled_count': self.scheduled_count,
+            'achieved_rate': completed / duration if duration > 0 else 0,
+            'dropped_count': self.dropped_count,
+            'queued_count': self.queued_count,
+            'p99_queue_delay': self.queue_delay.percentile(99),
+            'max_schedule_lag': self.schedule_lag.max,
+            'avg_in_flight': self.in_flight_total / self.in_flight_samples if self.in_flight_samples else 0,
+            'max_in_flight': self.max_in_flight,
+            'median_service_time': self.service.percentile(50),
+            'p99_service_time': self.service.percentile(99),
+        }
+
+    def get_upload_statistics(self, duration: float) -> Dict:
+        """Upload throughput over the whole run and per request in flight."""
+        if not self.upload_count:
+            return {}
+        mb = self.upload_bytes / (1024 * 1024)
+        return {
+            'upload_count': self.upload_count,
+            'upload_mb': mb,
+            'upload_rows': self.upload_rows,
+            'upload_mb_per_second': mb / duration if duration > 0 else 0,
+            'upload_rows_per_second': self.upload_rows / duration if duration > 0 else 0,
+            'per_request_mb_per_second': mb / self.upload_time if self.upload_time > 0 else 0,
+            'login_count': self.login.count,
+            'login_failures': self.login_failures,
+            'avg_login_time': self.login.mean,
         }
 
 
 class LoadTester:
     """Main load testing class."""
 
-    def __init__(self, xatbackend_url: str = 'http://localhost:8000'):
+    # Client CPU (percent of one core) above which the generator is the likely bottleneck
+    CLIENT_CPU_LIMIT = 80
+
+    def __init__(self, xatbackend_url: str = 'http://localhost:8000', mode: str = 'browse',
+                 username: str = None, password: str = None, collector_id: str = None,
+                 csv_rows: int = 1000, csv_variants: int = 4, timeseries_path: str = None,
+                 connection_limit: int = 100):
         self.xatbackend_url = xatbackend_url
+        self.timeseries_path = timeseries_path
+        self.connection_limit = connection_limit
+        # Set by a --workers coordinator: wait for the common start signal, keep per-second histograms
+        self.start_gate: 'WorkerGate' = None
+        self.keep_histograms = False
+        self.worker_stats: List[Dict] = []
+        # Merged per-second rows when the run was split over workers
+        self.timeseries_rows: List[Dict] = None
         self.metrics = PerformanceMetrics()
+        self.mode = mode
+        self.username = username
+        self.password = password
+        self.collector_id = collector_id
+        self.csv_rows = csv_rows
+        self.csv_variants = csv_variants
+        self.payloads: List[bytes] = []
 
-    def generate_sample_data(self) -> str:
-        """Generate sample CSV performance data."""
-        timestamp = int(time.time())
-        data = {
-            'timestamp': timestamp,
-            'hostname': f'loadtest-{timestamp}',
-            'cpu_user': 25.5,
-            'cpu_system': 10.2,
-            'cpu_idle': 64.3,
-            'mem_total': 16777216,
-            'mem_used': 8388608,
-            'mem_free': 8388608,
-            'disk_read_bytes': 1048576,
-            'disk_write_bytes': 2097152,
-            'net_rx_bytes': 4194304,
-            'net_tx_bytes': 2097152
-        }
+    def generate_sample_data(self, rows: int = 1, hostname: str = None, start: int = None) -> bytes:
+        """Generate sample CSV performance data as an in-memory payload."""
+        start = start if start is not None else int(time.time()) - rows
+        hostname = hostname or f'loadtest-{start}'
+        fieldnames = ['timestamp', 'hostname', 'cpu_user', 'cpu_system', 'cpu_idle',
+                      'mem_total', 'mem_used', 'mem_free', 'disk_read_bytes', 'disk_write_bytes',
+                      'net_rx_bytes', 'net_tx_bytes']
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(fieldnames)
+        for i in range(rows):
+            # Deterministic variation so rows aren't identical
+            user = 25.5 + (i % 40) * 0.5
+            system = 10.2 + (i % 7) * 0.3
+            used = 8388608 + (i % 100) * 4096
+            writer.writerow([start + i, hostname, f'{user:.1f}', f'{system:.1f}', f'{100 - user - system:.1f}',
+                             16777216, used, 16777216 - used, 1048576 + i % 1000, 2097152 + i % 2000,
+                             4194304 + i % 4000, 2097152 + i % 3000])
 
-        # Create temporary CSV file
-        tmpfile = tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False)
-        writer = csv.DictWriter(tmpfile, fieldnames=data.keys())
-        writer.writeheader()
-        writer.writerow(data)
-        tmpfile.close()
+        return buf.getvalue().encode('utf-8')
 
-        return tmpfile.name
+    def build_payloads(self):
+        """Build the upload CSVs once; users cycle through them as bytes buffers."""
+        base = int(time.time()) - self.csv_rows
+        self.payloads = [
+            self.generate_sample_data(self.csv_rows, f'loadtest-{i:02d}', base)
+            for i in range(max(1, self.csv_variants))
+        ]
+
+    def csrf_token(self, session: aiohttp.ClientSession) -> str:
+        cookie = session.cookie_jar.filter_cookies(self.xatbackend_url).get('csrftoken')
+        return cookie.value if cookie else ''
+
+    async def login(self, session: aiohttp.ClientSession) -> bool:
+        """Log in with Django's CSRF flow; the session keeps the auth cookies."""
+        login_url = f"{self.xatbackend_url}/auth/login/"
+        start_time = time.time()
+        try:
+            async with session.get(login_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                await response.read()
+
+            form = {
+                'username': self.username,
+                'password': self.password,
+                'csrfmiddlewaretoken': self.csrf_token(session),
+            }
+            async with session.post(login_url, data=form, headers={'Referer': login_url},
+                                    allow_redirects=False,
+                                    timeout=aiohttp.ClientTimeout(total=10)) as response:
+                await response.read()
+                # Django redirects on success and re-renders the form on bad credentials
+                if response.status != 302:
+                    self.metrics.login_failures += 1
+                    return False
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            self.metrics.login_failures += 1
+            return False
+
+        self.metrics.login.record(time.time() - start_time)
+        return True
 
     async def health_check(self, session: aiohttp.ClientSession) -> bool:
         """Check if XATbackend is healthy."""
@@ -149,6 +420,96 @@ class LoadTester:
         except Exception:
             return False
 
+    async def browse_request(self, session: aiohttp.ClientSession, i: int, start_time: float):
+        """
+        One GET from the page mix. Latency is measured from start_time, which
+        is the intended send time in open-loop mode.
+        """
+        # Simulate various endpoints
+        endpoints = [
+            '/health/',
+            '/collectors/manage',
+            '/auth/login/'
+        ]
+        await self.timed_request(session, 'GET', endpoints[i % len(endpoints)], start_time)
+
+    async def timed_request(self, session: aiohttp.ClientSession, method: str, path: str, start_time: float,
+                            label: str = None, expect=(200, 302), timeout: float = 10, **kwargs) -> int:
+        """
+        Send one request and record it under label (default: the path).
+
+        Statuses in expect count as successes. Returns the status, or None on
+        timeout or connection error.
+        """
+        label = label or path
+        sent = time.time()
+        try:
+            async with session.request(
+                method,
+                f"{self.xatbackend_url}{path}",
+                allow_redirects=False,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                **kwargs
+            ) as response:
+                await response.read()
+                now = time.time()
+
+                if response.status in expect:
+                    self.metrics.record_success(now - start_time, now - sent, label, response.status)
+                else:
+                    self.metrics.record_error(label, response.status, now - start_time)
+                return response.status
+
+        except asyncio.TimeoutError:
+            self.metrics.record_timeout(label, time.time() - start_time)
+        except Exception:
+            self.metrics.record_error(label, 'error', time.time() - start_time)
+        return None
+
+    async def upload_request(self, session: aiohttp.ClientSession, user_id: int, i: int, start_time: float,
+                             label: str = UPLOAD_ENDPOINT):
+        """One multipart CSV upload on a logged-in session; latency measured from start_time."""
+        upload_url = f"{self.xatbackend_url}/collectors/manage/upload/{self.collector_id}/"
+        payload = self.payloads[(user_id + i) % len(self.payloads)]
+        form = aiohttp.FormData()
+        form.add_field('csrfmiddlewaretoken', self.csrf_token(session))
+        form.add_field('collector', str(self.collector_id))
+        form.add_field('description', f'Load test upload {user_id}-{i}')
+        form.add_field('uploaded_file', payload, filename=f'loadtest_{user_id}_{i}.csv',
+                       content_type='text/csv')
+
+        sent = time.time()
+        try:
+            async with session.post(
+                upload_url,
+                data=form,
+                headers={'Referer': f"{self.xatbackend_url}/collectors/manage/"},
+                allow_redirects=False,
+                timeout=aiohttp.ClientTimeout(total=60)
+            ) as response:
+                await response.read()
+                now = time.time()
+
+                if response.status in [200, 302]:
+                    self.metrics.record_upload(now - start_time, len(payload), self.csv_rows, now - sent,
+                                               label, response.status)
+                else:
+                    self.metrics.record_error(label, response.status, now - start_time)
+
+        except asyncio.TimeoutError:
+            self.metrics.record_timeout(label, time.time() - start_time)
+        except Exception:
+            self.metrics.record_error(label, 'error', time.time() - start_time)
+
+    async def open_user_session(self, connector: aiohttp.BaseConnector):
+        """A logged-in session with its own cookie jar over the shared connection pool, or None."""
+        session = aiohttp.ClientSession(connector=connector, connector_owner=False,
+                                        cookie_jar=aiohttp.CookieJar(unsafe=True))
+        if await self.login(session):
+            return session
+        await session.close()
+        return None
+
     async def simulate_user_session(
         self,
         session: aiohttp.ClientSession,
@@ -158,53 +519,68 @@ class LoadTester:
     ):
         """Simulate a user session with multiple requests."""
         for i in range(num_requests):
-            start_time = time.time()
-
-            try:
-                # Simulate various endpoints
-                endpoints = [
-                    '/health/',
-                    '/collectors/manage',
-                    '/auth/login/'
-                ]
-                endpoint = endpoints[i % len(endpoints)]
-
-                async with session.get(
-                    f"{self.xatbackend_url}{endpoint}",
-                    allow_redirects=False,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    response_time = time.time() - start_time
-
-                    if response.status in [200, 302]:
-                        self.metrics.record_success(response_time)
-                    else:
-                        self.metrics.record_error()
-
-            except asyncio.TimeoutError:
-                self.metrics.record_timeout()
-            except Exception:
-                self.metrics.record_error()
+            await self.browse_request(session, i, time.time())
 
             # Wait before next request
             if i < num_requests - 1:
                 await asyncio.sleep(interval)
 
-    async def run_scenario(self, scenario_name: str):
-        """Run a specific load test scenario."""
+    async def simulate_upload_session(
+        self,
+        connector: aiohttp.BaseConnector,
+        user_id: int,
+        num_requests: int,
+        interval: float
+    ):
+        """Log in once, then upload CSV payloads for the rest of the session."""
+        session = await self.open_user_session(connector)
+        if session is None:
+            return
+
+        async with session:
+            for i in range(num_requests):
+                await self.upload_request(session, user_id, i, time.time())
+
+                # Wait before next request
+                if i < num_requests - 1:
+                    await asyncio.sleep(interval)
+
+    async def wait_for_start(self):
+        """Block until the coordinator's start time when running as one of several workers."""
+        if self.start_gate is not None:
+            await self.start_gate.wait()
+
+    def print_header(self, title: str, lines: List[str]):
+        print(f"\n{'='*70}")
+        print(title)
+        for line in lines:
+            print(line)
+        if self.mode == 'upload':
+            self.build_payloads()
+            print(f"Mode: upload ({self.csv_rows:,} rows, "
+                  f"{len(self.payloads[0]) / 1024:,.1f} KiB per CSV, {len(self.payloads)} payloads)")
+        print(f"{'='*70}\n")
+
+    async def run_scenario(self, scenario_name: str, users: int = None, first_user: int = 0):
+        """
+        Run a specific load test scenario.
+
+        users/first_user select a slice of the scenario's virtual users, which
+        is how --workers splits one scenario across processes.
+        """
         if scenario_name not in LoadTestConfig.SCENARIOS:
             raise ValueError(f"Unknown scenario: {scenario_name}")
 
         config = LoadTestConfig.SCENARIOS[scenario_name]
-        print(f"\n{'='*70}")
-        print(f"Load Test Scenario: {scenario_name.upper()}")
-        print(f"Description: {config['description']}")
-        print(f"Concurrent Users: {config['concurrent_users']}")
-        print(f"Requests per User: {config['requests_per_user']}")
-        print(f"{'='*70}\n")
+        users = config['concurrent_users'] if users is None else users
+        self.print_header(f"Load Test Scenario: {scenario_name.upper()}", [
+            f"Description: {config['description']}",
+            f"Concurrent Users: {users}",
+            f"Requests per User: {config['requests_per_user']}",
+        ])
 
         # Create session
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.connection_limit)) as session:
             # Health check
             print("Performing health check...")
             if not await self.health_check(session):
@@ -212,33 +588,147 @@ class LoadTester:
                 return
 
             print("✓ Health check passed\n")
+            await self.wait_for_start()
 
             # Start load test
             print(f"Starting load test at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            self.metrics.start_time = time.time()
+            self.metrics.begin(self.timeseries_path, self.keep_histograms)
 
             # Create tasks for concurrent users
             tasks = []
-            for user_id in range(config['concurrent_users']):
-                task = self.simulate_user_session(
-                    session,
-                    user_id,
-                    config['requests_per_user'],
-                    config['upload_interval']
-                )
+            for user_id in range(first_user, first_user + users):
+                if self.mode == 'upload':
+                    task = self.simulate_upload_session(
+                        session.connector,
+                        user_id,
+                        config['requests_per_user'],
+                        config['upload_interval']
+                    )
+                else:
+                    task = self.simulate_user_session(
+                        session,
+                        user_id,
+                        config['requests_per_user'],
+                        config['upload_interval']
+                    )
                 tasks.append(task)
 
             # Run all user sessions concurrently
             await asyncio.gather(*tasks)
 
-            self.metrics.end_time = time.time()
+            self.metrics.finish()
 
             # Print results
             self.print_results()
 
+    async def open_loop_request(self, session, user_id: int, i: int, intended: float,
+                                slots: asyncio.Semaphore):
+        """Wait for an in-flight slot if capped, then send; latency counts from intended."""
+        if slots is not None:
+            if slots.locked():
+                self.metrics.queued_count += 1
+            await slots.acquire()
+        self.metrics.queue_delay.record(time.time() - intended)
+
+        self.metrics.in_flight += 1
+        self.metrics.max_in_flight = max(self.metrics.max_in_flight, self.metrics.in_flight)
+        try:
+            if self.mode == 'upload':
+                await self.upload_request(session, user_id, i, intended)
+            else:
+                await self.browse_request(session, i, intended)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.completed_count += 1
+            if slots is not None:
+                slots.release()
+
+    async def run_open_loop(self, rate: float, duration: float, arrival: str = 'poisson',
+                            max_in_flight: int = None, overflow: str = 'queue',
+                            users: int = 1, seed: int = None):
+        """
+        Open-loop load: requests arrive at `rate` per second for `duration`
+        seconds whether or not earlier ones have completed.
+
+        Each request's latency is measured from its scheduled arrival time, so
+        time spent queued behind a slow server (or a saturated client) is
+        counted rather than silently omitted. With max_in_flight set, arrivals
+        that find every slot busy either wait for one (overflow='queue') or
+        are dropped and counted (overflow='drop').
+        """
+        rng = random.Random(seed)
+        self.print_header("Open-Loop Load Test", [
+            f"Arrival Rate: {rate:,.1f} req/s ({arrival})",
+            f"Duration: {duration:,.0f}s (~{int(rate * duration):,} requests)",
+            f"Max In-Flight: {max_in_flight or 'unbounded'} (overflow: {overflow})",
+        ])
+
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=max_in_flight or 0)) as session:
+            print("Performing health check...")
+            if not await self.health_check(session):
+                print("❌ Health check failed - XATbackend may not be running")
+                return
+            print("✓ Health check passed\n")
+
+            sessions = [session]
+            if self.mode == 'upload':
+                # Log in before the clock starts so logins don't distort the arrival schedule
+                opened = await asyncio.gather(*(self.open_user_session(session.connector) for _ in range(users)))
+                sessions = [s for s in opened if s is not None]
+                if not sessions:
+                    print(f"❌ {self.metrics.login_failures} logins failed - check --username/--password")
+                    return
+                print(f"✓ {len(sessions)} upload sessions logged in\n")
+
+            slots = asyncio.Semaphore(max_in_flight) if max_in_flight and overflow == 'queue' else None
+            pending = set()
+            await self.wait_for_start()
+
+            print(f"Starting load test at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            self.metrics.begin(self.timeseries_path, self.keep_histograms)
+            loop = asyncio.get_running_loop()
+            t0 = loop.time()
+            offset = 0.0
+            i = 0
+            while offset < duration:
+                delay = t0 + offset - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                intended = self.metrics.start_time + offset
+                self.metrics.scheduled_count += 1
+                self.metrics.schedule_lag.record(time.time() - intended)
+                self.metrics.sample_in_flight()
+
+                if max_in_flight and overflow == 'drop' and len(pending) >= max_in_flight:
+                    self.metrics.dropped_count += 1
+                else:
+                    user = i % len(sessions)
+                    task = asyncio.create_task(self.open_loop_request(sessions[user], user, i, intended, slots))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+
+                i += 1
+                offset += rng.expovariate(rate) if arrival == 'poisson' else 1.0 / rate
+
+            if pending:
+                await asyncio.gather(*pending)
+            self.metrics.finish()
+
+            for s in sessions:
+                if s is not session:
+                    await s.close()
+
+            self.metrics.offered_rate = rate
+            self.print_results()
+
     def print_results(self):
         """Print load test results."""
         stats = self.metrics.get_statistics()
+        if not stats['total_requests']:
+            print("\n❌ No requests completed")
+            if self.metrics.login_failures:
+                print(f"   {self.metrics.login_failures} logins failed - check --username/--password")
+            return
 
         print(f"\n{'='*70}")
         print("LOAD TEST RESULTS")
@@ -256,6 +746,50 @@ class LoadTester:
         print(f"  Max:                 {stats['max_response_time']:.4f}")
         print(f"  95th Percentile:     {stats['p95_response_time']:.4f}")
         print(f"  99th Percentile:     {stats['p99_response_time']:.4f}")
+        print(f"  99.9th Percentile:   {stats['p999_response_time']:.4f}")
+        print(f"\nBy Endpoint and Status:")
+        print(f"  {'Endpoint':<32} {'Status':<8} {'Count':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'Max':>8}")
+        for row in stats['endpoints']:
+            print(f"  {row['endpoint'][:32]:<32} {row['status']:<8} {row['count']:>8,} {row['p50']:>8.4f} "
+                  f"{row['p95']:>8.4f} {row['p99']:>8.4f} {row['max']:>8.4f}")
+        if stats['journeys']:
+            print(f"\nBy Journey (think time excluded):")
+            print(f"  {'Journey':<32} {'Outcome':<9} {'Count':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'Max':>8}")
+            for row in stats['journeys']:
+                print(f"  {row['journey'][:32]:<32} {row['outcome']:<9} {row['count']:>7,} {row['p50']:>8.4f} "
+                      f"{row['p95']:>8.4f} {row['p99']:>8.4f} {row['max']:>8.4f}")
+        if self.timeseries_path:
+            print(f"\nPer-second time series: {self.timeseries_path}")
+        if 'offered_rate' in stats:
+            print(f"\nOpen-Loop Arrivals (latency above is from intended send time):")
+            unit = 'journeys/s' if self.metrics.journeys.histograms else 'req/s'
+            print(f"  Offered Rate:        {stats['offered_rate']:,.2f} {unit} ({stats['scheduled_count']:,} scheduled)")
+            print(f"  Achieved Rate:       {stats['achieved_rate']:,.2f} {unit}")
+            print(f"  Dropped:             {stats['dropped_count']:,}")
+            print(f"  Queued:              {stats['queued_count']:,} (p99 wait {stats['p99_queue_delay']:.4f}s)")
+            per_worker = ' (per worker)' if self.worker_stats else ''
+            print(f"  In-Flight:           avg {stats['avg_in_flight']:.1f}, max {stats['max_in_flight']}{per_worker}")
+            print(f"  Service Time:        median {stats['median_service_time']:.4f}s, "
+                  f"p99 {stats['p99_service_time']:.4f}s (from actual send)")
+            print(f"  Max Schedule Lag:    {stats['max_schedule_lag']:.4f}s (client fell behind if large)")
+        if 'upload_count' in stats:
+            print(f"\nUpload Throughput:")
+            print(f"  Uploads:             {stats['upload_count']:,} ({stats['upload_mb']:,.2f} MB, "
+                  f"{stats['upload_rows']:,} rows)")
+            print(f"  MB/Second:           {stats['upload_mb_per_second']:,.2f}")
+            print(f"  Rows/Second:         {stats['upload_rows_per_second']:,.0f}")
+            print(f"  Per-Upload MB/s:     {stats['per_request_mb_per_second']:,.2f}")
+            print(f"  Logins:              {stats['login_count']:,} "
+                  f"({stats['login_failures']:,} failed, avg {stats['avg_login_time']:.4f}s)")
+        print(f"\nLoad Generator:")
+        print(f"  Client CPU:          {stats['client_cpu_seconds']:.2f}s "
+              f"({stats['client_cpu_percent']:.0f}% of one core)")
+        if self.worker_stats:
+            print(f"  {'Worker':<8} {'Requests':>10} {'Req/s':>10} {'p99':>8} {'CPU s':>8} {'CPU %':>7}")
+            for worker in self.worker_stats:
+                print(f"  {worker['worker']:<8} {worker['total_requests']:>10,} "
+                      f"{worker.get('requests_per_second', 0):>10.1f} {worker.get('p99_response_time', 0):>8.4f} "
+                      f"{worker.get('client_cpu_seconds', 0):>8.2f} {worker.get('client_cpu_percent', 0):>6.0f}%")
         print(f"{'='*70}\n")
 
         # Performance assessment
@@ -288,6 +822,17 @@ class LoadTester:
             issues.append(f"Low throughput: {stats['requests_per_second']:.2f} req/s")
             recommendations.append("Review application bottlenecks and consider async processing")
 
+        # Check the load generator itself: a saturated client loop inflates latency and caps throughput
+        busy = [(w['worker'], w.get('client_cpu_percent', 0)) for w in self.worker_stats] \
+            or [('client', stats['client_cpu_percent'])]
+        busy = [(name, pct) for name, pct in busy if pct > self.CLIENT_CPU_LIMIT]
+        if busy:
+            issues.append("Load generator CPU-bound: " +
+                          ", ".join(f"worker {name} at {pct:.0f}%" if name != 'client' else f"{pct:.0f}% of a core"
+                                    for name, pct in busy))
+            recommendations.append("Results measure the client, not the server: add --workers "
+                                   f"(this host has {os.cpu_count()} CPUs) or run clients on more hosts")
+
         if issues:
             print("⚠️  Issues Detected:")
             for issue in issues:
@@ -301,6 +846,160 @@ class LoadTester:
         print(f"{'='*70}\n")
 
 
+class WorkerGate:
+    """Start barrier shared by --workers processes: report ready, then wait for the common start time."""
+
+    def __init__(self, index: int, messages, start_event, start_at):
+        self.index = index
+        self.messages = messages
+        self.start_event = start_event
+        self.start_at = start_at
+
+    async def wait(self):
+        self.messages.put(('ready', self.index, None))
+        await asyncio.get_running_loop().run_in_executor(None, self.start_event.wait)
+        delay = self.start_at.value - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def build_tester(args: argparse.Namespace, timeseries_path: str = None) -> LoadTester:
+    return LoadTester(
+        xatbackend_url=args.url,
+        mode=args.mode,
+        username=args.username,
+        password=args.password,
+        collector_id=args.collector_id,
+        csv_rows=args.csv_rows,
+        csv_variants=args.csv_variants,
+        timeseries_path=timeseries_path,
+        connection_limit=args.connections
+    )
+
+
+def share(total: int, workers: int, index: int) -> int:
+    """Worker index's part of total when split as evenly as possible."""
+    return total // workers + (1 if index < total % workers else 0)
+
+
+async def run_load(tester: LoadTester, args: argparse.Namespace, workers: int = 1, index: int = 0):
+    """Run this process's share of the configured load (all of it when workers == 1)."""
+    users = LoadTestConfig.SCENARIOS[args.scenario]['concurrent_users']
+    if args.scenario_file:
+        scenario = ScenarioFile.load(args.scenario_file)
+        users = scenario.users or users
+        seed = args.seed + index if args.seed is not None else None
+        runner = JourneyRunner(tester, scenario, share(users, workers, index), args.duration,
+                               args.arrival_rate / workers if args.arrival_rate else None,
+                               sum(share(users, workers, w) for w in range(index)), seed, args.arrival,
+                               share(args.max_in_flight, workers, index) if args.max_in_flight else None,
+                               args.overflow)
+        await runner.run()
+    elif args.arrival_rate:
+        max_in_flight = share(args.max_in_flight, workers, index) if args.max_in_flight else None
+        seed = args.seed + index if args.seed is not None else None
+        await tester.run_open_loop(args.arrival_rate / workers, args.duration, args.arrival,
+                                   max_in_flight, args.overflow, max(1, share(users, workers, index)), seed)
+    else:
+        first_user = sum(share(users, workers, w) for w in range(index))
+        await tester.run_scenario(args.scenario, share(users, workers, index), first_user)
+
+
+def run_worker(index: int, workers: int, options: Dict, messages, start_event, start_at):
+    """
+    Entry point of one --workers process.
+
+    Output is captured rather than interleaved with the other workers; the
+    coordinator prints it only if the worker failed to start.
+    """
+    args = argparse.Namespace(**options)
+    output = io.StringIO()
+    result = {'index': index, 'metrics': None, 'timeseries': None, 'output': ''}
+    try:
+        with contextlib.redirect_stdout(output):
+            path = None
+            if args.timeseries:
+                root, ext = os.path.splitext(args.timeseries)
+                path = f"{root}.worker{index}{ext}"
+            tester = build_tester(args, path)
+            tester.start_gate = WorkerGate(index, messages, start_event, start_at)
+            tester.keep_histograms = True
+            asyncio.run(run_load(tester, args, workers, index))
+        if tester.metrics.start_time:
+            result['metrics'] = tester.metrics.to_dict()
+            series = tester.metrics.timeseries
+            result['timeseries'] = (series.rows, series.histograms)
+    except Exception:
+        output.write(traceback.format_exc())
+    result['output'] = output.getvalue()
+    messages.put(('done', index, result))
+
+
+def run_workers(args: argparse.Namespace, workers: int):
+    """
+    Coordinator for --workers: spread virtual users (or the arrival rate)
+    across processes, each with its own event loop, aiohttp session and
+    connection pool, start them together and merge their metrics.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    messages = ctx.Queue()
+    start_event = ctx.Event()
+    start_at = ctx.Value('d', 0.0)
+
+    reporter = build_tester(args, args.timeseries)
+    reporter.print_header(f"Multi-Process Load Test: {workers} workers", [
+        f"Scenario: {args.scenario_file or args.scenario}" + (f" (open loop, {args.arrival_rate:,.1f} req/s total)"
+                                        if args.arrival_rate else ""),
+        f"Client CPUs: {os.cpu_count()}" + ("  ⚠️  more workers than cores" if workers > (os.cpu_count() or 1) else ""),
+    ])
+
+    processes = [ctx.Process(target=run_worker, args=(i, workers, vars(args), messages, start_event, start_at),
+                             daemon=True) for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    # Workers report ready after their health check (and logins); those that fail report done instead
+    ready, results = set(), {}
+    while len(ready | set(results)) < workers:
+        kind, index, payload = messages.get()
+        if kind == 'ready':
+            ready.add(index)
+        else:
+            results[index] = payload
+    print(f"✓ {len(ready)}/{workers} workers ready")
+    print(f"Starting load test at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    start_at.value = time.time() + 0.5
+    start_event.set()
+
+    while len(results) < workers:
+        kind, index, payload = messages.get()
+        if kind == 'done':
+            results[index] = payload
+    for process in processes:
+        process.join()
+
+    merged = PerformanceMetrics()
+    series = []
+    for index in sorted(results):
+        result = results[index]
+        if result['metrics'] is None:
+            print(f"\n❌ Worker {index} did not run:")
+            print('\n'.join(f"   {line}" for line in result['output'].strip().splitlines()[-4:]))
+            continue
+        worker_metrics = PerformanceMetrics.from_dict(result['metrics'])
+        merged.merge(worker_metrics)
+        reporter.worker_stats.append({'worker': index, **worker_metrics.get_statistics()})
+        if result['timeseries']:
+            series.append(result['timeseries'])
+
+    reporter.timeseries_rows = merge_timeseries(series)
+    if args.timeseries and series:
+        write_timeseries(args.timeseries, reporter.timeseries_rows)
+    reporter.metrics = merged
+    reporter.print_results()
+    return reporter
+
+
 async def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description='PerfAnalysis Load Testing')
@@ -315,11 +1014,268 @@ async def main():
         default='http://localhost:8000',
         help='XATbackend URL'
     )
+    parser.add_argument(
+        '--mode',
+        choices=['browse', 'upload'],
+        default='browse',
+        help='browse: GET page mix; upload: authenticated CSV uploads'
+    )
+    parser.add_argument(
+        '--username',
+        default=os.environ.get('LOADTEST_USERNAME'),
+        help='Login for upload mode (default: $LOADTEST_USERNAME)'
+    )
+    parser.add_argument(
+        '--password',
+        default=os.environ.get('LOADTEST_PASSWORD'),
+        help='Password for upload mode (default: $LOADTEST_PASSWORD)'
+    )
+    parser.add_argument(
+        '--collector-id',
+        default=os.environ.get('LOADTEST_COLLECTOR_ID'),
+        help='Collector to upload to (default: $LOADTEST_COLLECTOR_ID)'
+    )
+    parser.add_argument(
+        '--csv-rows',
+        type=int,
+        default=1000,
+        help='Rows per uploaded CSV (default: 1000)'
+    )
+    parser.add_argument(
+        '--csv-variants',
+        type=int,
+        default=4,
+        help='Distinct in-memory CSV payloads users cycle through (default: 4)'
+    )
+
+    parser.add_argument(
+        '--arrival-rate',
+        type=float,
+        default=None,
+        help='Open-loop mode: target arrivals per second, independent of response times'
+    )
+    parser.add_argument(
+        '--arrival',
+        choices=['poisson', 'fixed'],
+        default='poisson',
+        help='Open-loop inter-arrival distribution (default: poisson)'
+    )
+    parser.add_argument(
+        '--duration',
+        type=float,
+        default=None,
+        help='Open-loop or scenario-file run length in seconds (default: the scenario file\'s duration, else 60)'
+    )
+    parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        default=None,
+        help='Open-loop cap on concurrent requests (default: unbounded)'
+    )
+    parser.add_argument(
+        '--overflow',
+        choices=['queue', 'drop'],
+        default='queue',
+        help='Open-loop: what arrivals do when --max-in-flight is reached (default: queue)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Seed for Poisson arrivals'
+    )
+    parser.add_argument(
+        '--timeseries',
+        default=None,
+        help='Write per-second throughput/latency rows here during the run (.csv, or .json/.jsonl for JSON lines)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Client processes to spread virtual users (or the arrival rate) across (default: 1)'
+    )
+    parser.add_argument(
+        '--ramp',
+        choices=['rate', 'users'],
+        default=None,
+        help='Step-load ramp: raise the arrival rate or closed-loop users until saturation'
+    )
+    parser.add_argument(
+        '--ramp-start',
+        type=float,
+        default=None,
+        help='First ramp level (default: 10 req/s or 5 users)'
+    )
+    parser.add_argument(
+        '--ramp-step',
+        type=float,
+        default=None,
+        help='Increase per ramp step (default: --ramp-start)'
+    )
+    parser.add_argument(
+        '--ramp-max',
+        type=float,
+        default=None,
+        help='Highest ramp level to try (default: until saturation)'
+    )
+    parser.add_argument(
+        '--step-hold',
+        type=int,
+        default=10,
+        help='Seconds measured at each ramp step once latency has settled (default: 10)'
+    )
+    parser.add_argument(
+        '--step-max',
+        type=int,
+        default=60,
+        help='Longest a ramp step waits for p99 to settle (default: 60)'
+    )
+    parser.add_argument(
+        '--p99-limit',
+        type=float,
+        default=1.0,
+        help='Ramp stops at the first step with p99 above this many seconds (default: 1.0)'
+    )
+    parser.add_argument(
+        '--error-limit',
+        type=float,
+        default=1.0,
+        help='Ramp stops at the first step with more than this percent errors (default: 1.0)'
+    )
+    parser.add_argument(
+        '--think-time',
+        type=float,
+        default=0.0,
+        help='Mean think time between requests of a ramp user (default: 0, back to back)'
+    )
+    parser.add_argument(
+        '--ramp-output',
+        default=None,
+        help='Write the throughput vs latency curve here (.csv or .json)'
+    )
+    parser.add_argument(
+        '--save-results',
+        default=None,
+        help='Save the run (config, git revision, histograms, time series) to this .json file or directory'
+    )
+    parser.add_argument(
+        '--label',
+        default=None,
+        help='Free-form label stored with saved results, e.g. the XATbackend release'
+    )
+    parser.add_argument(
+        '--baseline',
+        default=None,
+        help='Compare against this saved result and exit 1 on a significant regression'
+    )
+    parser.add_argument(
+        '--server-metrics',
+        default=None,
+        help="Server's merged performance CSV or pcc_collection.json to correlate with this run"
+    )
+    parser.add_argument(
+        '--clock-offset',
+        type=float,
+        default=0,
+        help='Server clock minus client clock in seconds, for --server-metrics (default: 0)'
+    )
+    parser.add_argument(
+        '--correlation-output',
+        default=None,
+        help='Write the joined client/server timeline here (.csv or .jsonl)'
+    )
+    parser.add_argument(
+        '--scenario-file',
+        default=None,
+        help='JSON scenario with a weighted endpoint mix and/or user journeys (see load_scenarios.py)'
+    )
+    parser.add_argument(
+        '--connections',
+        type=int,
+        default=100,
+        help='Connection pool limit per process for scenario runs (default: 100)'
+    )
 
     args = parser.parse_args()
 
-    tester = LoadTester(xatbackend_url=args.url)
-    await tester.run_scenario(args.scenario)
+    if args.mode == 'upload' and not (args.username and args.password and args.collector_id):
+        parser.error('--mode upload requires --username, --password and --collector-id')
+
+    if args.server_metrics and not os.path.exists(args.server_metrics):
+        parser.error(f"--server-metrics {args.server_metrics} not found")
+    if args.max_in_flight and args.max_in_flight < args.workers:
+        parser.error('--max-in-flight is split across workers; it must be at least --workers')
+    if args.ramp and args.workers > 1:
+        parser.error('--ramp runs in a single process; drop --workers')
+    if args.scenario_file:
+        if args.ramp:
+            parser.error('--ramp and --scenario-file cannot be combined')
+        try:
+            scenario = ScenarioFile.load(args.scenario_file)
+        except (OSError, ValueError) as e:
+            parser.error(f"--scenario-file: {e}")
+        if scenario.uses('login') and not (args.username and args.password):
+            parser.error(f"{args.scenario_file} logs in; set --username/--password")
+        if scenario.uses('upload') and not args.collector_id:
+            parser.error(f"{args.scenario_file} uploads; set --collector-id")
+    if args.duration is None:
+        # Resolved here so the saved config records the duration that actually ran
+        args.duration = (scenario.duration if args.scenario_file else None) or 60
+
+    extra = {}
+    if args.ramp:
+        kind = 'ramp'
+        tester = build_tester(args, args.timeseries)
+        ramp = StepRamp(tester, args.ramp, args.ramp_start, args.ramp_step,
+                        args.ramp_max, args.step_hold, args.step_max, p99_limit=args.p99_limit,
+                        error_limit=args.error_limit, arrival=args.arrival, max_in_flight=args.max_in_flight,
+                        think_time=args.think_time,
+                        users=LoadTestConfig.SCENARIOS[args.scenario]['concurrent_users'], seed=args.seed)
+        await ramp.run()
+        if args.ramp_output and ramp.steps:
+            ramp.write_curve(args.ramp_output)
+            print(f"✓ Ramp curve written to {args.ramp_output}")
+        best = ramp.max_sustainable()
+        extra['ramp'] = {'steps': ramp.steps, 'stop_reason': ramp.stop_reason,
+                         'max_sustainable_throughput': best['throughput'] if best else 0}
+    else:
+        kind = 'open-loop' if args.arrival_rate else 'closed-loop'
+        if args.scenario_file:
+            kind = 'journeys'
+            extra['scenario_file'] = args.scenario_file
+        if args.workers > 1:
+            tester = run_workers(args, args.workers)
+        else:
+            tester = build_tester(args, args.timeseries)
+            await run_load(tester, args)
+
+    if not tester.metrics.start_time:
+        # Nothing ran (health check or logins failed); a CI comparison must not pass silently
+        if args.save_results or args.baseline:
+            sys.exit(2)
+        return
+    if args.server_metrics:
+        rows = tester.timeseries_rows
+        if rows is None:
+            rows = tester.metrics.timeseries.rows
+        server_correlation.correlate(rows, args.server_metrics, args.clock_offset, args.correlation_output)
+
+    if args.save_results or args.baseline:
+        result = load_results.build_result(tester, args, kind, extra)
+    if args.save_results:
+        path = load_results.save_result(result, args.save_results)
+        print(f"✓ Results saved to {path}")
+    if args.baseline:
+        baseline = load_results.load_result(args.baseline)
+        problems = load_results.compatibility(baseline, result)
+        if problems:
+            print(f"❌ Baseline {args.baseline} is not comparable: " + "; ".join(problems))
+            sys.exit(2)
+        checks = load_results.compare_results(baseline, result)
+        load_results.print_comparison(baseline, result, checks)
+        if any(check.regressed for check in checks):
+            sys.exit(1)
 
 
 if __name__ == '__main__':
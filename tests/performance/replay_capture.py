@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Accelerated Capture Replay for PerfAnalysis
+Replays recorded pcc captures against a pcd/XATbackend ingest endpoint
+
+Each capture (pcc_collection.json, host_collection.json or
+container_collection.json - one {"timestamp","subsystem","measurement"}
+JSON object per line) is grouped into samples by timestamp. Every simulated
+host then posts one request per sample, keeping the capture's original
+inter-sample gaps divided by --speed. Hosts share one connection pool and
+run as asyncio tasks, with start times spread evenly over one sample
+interval so they don't all fire on the same tick.
+
+Request bodies:
+    trickle  {"identifier": "<host>", "measurements": [...]}  (pcd /v1/trickle)
+    jsonl    the sample's capture lines as application/x-ndjson
+
+A host sends its samples in order and waits for each response, like a real
+collector. If the endpoint can't keep up, hosts fall behind schedule: the
+report compares the achieved sample rate with the target rate and shows
+how late requests left (schedule lag), which is where the ingest ceiling is.
+
+Usage:
+    python replay_capture.py Azure/results/*/host_collection.json --hosts 50 --speed 10
+    python replay_capture.py capture.json --url http://localhost:8080 --speed 100 --loops 3
+    python replay_capture.py capture.json --format jsonl --path /api/v1/performance/upload
+"""
+import argparse
+import asyncio
+import aiohttp
+import time
+import json
+import statistics
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Tuple
+
+
+# Requests later than this fraction of the (accelerated) sample interval count as behind schedule
+LATE_FRACTION = 0.5
+
+
+class Capture:
+    """A capture file split into per-timestamp samples, pre-encoded for sending."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.name = self.path.parent.name or self.path.stem
+        self.samples: List[Tuple[int, List[bytes]]] = []
+        self.bytes = 0
+        self._load()
+
+    def _load(self):
+        groups: Dict[int, List[bytes]] = {}
+        with open(self.path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    timestamp = int(record['timestamp'])
+                    # Everything after the timestamp, so it can be re-stamped without re-encoding
+                    fragment = json.dumps({'subsystem': record['subsystem'],
+                                           'measurement': record['measurement']},
+                                          separators=(',', ':'))[1:]
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                    continue
+                groups.setdefault(timestamp, []).append(fragment.encode('utf-8'))
+                self.bytes += len(line)
+
+        self.samples = sorted(groups.items())
+        if not self.samples:
+            raise ValueError(f"No samples in {self.path}")
+
+    @property
+    def span(self) -> int:
+        return self.samples[-1][0] - self.samples[0][0]
+
+    @property
+    def interval(self) -> float:
+        """Median gap between samples in capture seconds."""
+        if len(self.samples) < 2:
+            return 1.0
+        gaps = [b[0] - a[0] for a, b in zip(self.samples, self.samples[1:])]
+        return max(statistics.median(gaps), 1)
+
+
+def encode_records(timestamp: int, fragments: List[bytes]) -> List[bytes]:
+    """Rebuild the capture records of one sample with the given timestamp."""
+    prefix = b'{"timestamp":' + str(timestamp).encode() + b','
+    return [prefix + fragment for fragment in fragments]
+
+
+class ReplayMetrics:
+    """Track throughput, latency and schedule lag during a replay."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.lags: List[float] = []
+        self.status_counts: Counter = Counter()
+        self.success_count: int = 0
+        self.error_count: int = 0
+        self.timeout_count: int = 0
+        self.late_count: int = 0
+        self.bytes_sent: int = 0
+        self.records_sent: int = 0
+        self.start_time: float = 0
+        self.end_time: float = 0
+
+    @property
+    def completed(self) -> int:
+        return self.success_count + self.error_count + self.timeout_count
+
+    def record(self, status: int, latency: float, lag: float, late: bool, nbytes: int, records: int):
+        self.status_counts[status] += 1
+        self.latencies.append(latency)
+        self.lags.append(lag)
+        self.late_count += 1 if late else 0
+        self.bytes_sent += nbytes
+        self.records_sent += records
+        if 200 <= status < 300:
+            self.success_count += 1
+        else:
+            self.error_count += 1
+
+    def record_timeout(self, lag: float, late: bool):
+        self.timeout_count += 1
+        self.lags.append(lag)
+        self.late_count += 1 if late else 0
+
+    def get_statistics(self, target_rate: float) -> Dict:
+        duration = self.end_time - self.start_time
+        achieved = self.completed / duration if duration > 0 else 0
+        stats = {
+            'total_requests': self.completed,
+            'success_count': self.success_count,
+            'error_count': self.error_count,
+            'timeout_count': self.timeout_count,
+            'status_counts': dict(sorted(self.status_counts.items())),
+            'duration_seconds': duration,
+            'target_rate': target_rate,
+            'achieved_rate': achieved,
+            'rate_ratio': achieved / target_rate if target_rate > 0 else 0,
+            'records_per_second': self.records_sent / duration if duration > 0 else 0,
+            'mb_per_second': self.bytes_sent / 1048576 / duration if duration > 0 else 0,
+            'late_count': self.late_count,
+            'late_percent': self.late_count / self.completed * 100 if self.completed else 0,
+        }
+        if len(self.latencies) >= 2:
+            stats.update({
+                'median_response_time': statistics.median(self.latencies),
+                'p95_response_time': statistics.quantiles(self.latencies, n=20)[18],
+                'p99_response_time': statistics.quantiles(self.latencies, n=100)[98],
+                'max_response_time': max(self.latencies),
+            })
+        if len(self.lags) >= 2:
+            stats.update({
+                'median_lag': statistics.median(self.lags),
+                'p99_lag': statistics.quantiles(self.lags, n=100)[98],
+                'max_lag': max(self.lags),
+            })
+        return stats
+
+
+class CaptureReplayer:
+    """Replays captures from many simulated hosts against one endpoint."""
+
+    def __init__(self, captures: List[Capture], url: str, path: str, body_format: str,
+                 hosts: int, speed: float, loops: int = 1, rebase_time: bool = True,
+                 api_key: str = None, timeout: float = 30.0, host_prefix: str = 'replay'):
+        self.captures = captures
+        self.endpoint = f"{url.rstrip('/')}{path}"
+        self.body_format = body_format
+        self.hosts = hosts
+        self.speed = speed
+        self.loops = loops
+        self.rebase_time = rebase_time
+        self.timeout = timeout
+        self.host_prefix = host_prefix
+        self.metrics = ReplayMetrics()
+
+        self.headers = {'Content-Type': 'application/json' if body_format == 'trickle'
+                        else 'application/x-ndjson'}
+        if api_key:
+            self.headers['Authorization'] = f"Bearer {api_key}"
+
+    def host_capture(self, index: int) -> Capture:
+        return self.captures[index % len(self.captures)]
+
+    def target_rate(self) -> float:
+        """Requests per second if every host stays on schedule."""
+        rate = 0.0
+        for index in range(self.hosts):
+            capture = self.host_capture(index)
+            if capture.span > 0:
+                rate += (len(capture.samples) - 1) / capture.span * self.speed
+        return rate
+
+    def build_body(self, identifier: bytes, records: List[bytes]) -> bytes:
+        if self.body_format == 'trickle':
+            return b'{"identifier":' + identifier + b',"measurements":[' + b','.join(records) + b']}'
+        return b'\n'.join(records) + b'\n'
+
+    async def replay_host(self, session: aiohttp.ClientSession, index: int, t0: float):
+        """Send one host's samples on the capture's schedule, scaled by speed."""
+        loop = asyncio.get_running_loop()
+        capture = self.host_capture(index)
+        identifier = json.dumps(f"{self.host_prefix}-{index:05d}").encode()
+        interval = capture.interval
+        base_ts = capture.samples[0][0]
+        loop_span = capture.span + interval
+
+        # Spread host start times evenly across one sample interval
+        offset = (index / self.hosts) * interval / self.speed
+        late_after = interval / self.speed * LATE_FRACTION
+        shift = (int(time.time()) - base_ts) if self.rebase_time else 0
+
+        for n in range(self.loops):
+            for ts, fragments in capture.samples:
+                capture_offset = n * loop_span + (ts - base_ts)
+                due = t0 + offset + capture_offset / self.speed
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                records = encode_records(int(ts + shift + n * loop_span), fragments)
+                body = self.build_body(identifier, records)
+                sent = loop.time()
+                lag = sent - due
+                try:
+                    async with session.post(self.endpoint, data=body, headers=self.headers,
+                                            timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                        await response.read()
+                        self.metrics.record(response.status, loop.time() - sent, lag,
+                                            lag > late_after, len(body), len(records))
+                except asyncio.TimeoutError:
+                    self.metrics.record_timeout(lag, lag > late_after)
+                except aiohttp.ClientError:
+                    self.metrics.record(0, loop.time() - sent, lag, lag > late_after, 0, 0)
+
+    async def report_progress(self, every: float, target_rate: float):
+        """Print achieved vs target rate over each reporting window."""
+        last_count = 0
+        last_time = time.time()
+        while True:
+            await asyncio.sleep(every)
+            now = time.time()
+            count = self.metrics.completed
+            rate = (count - last_count) / (now - last_time)
+            print(f"  [{now - self.metrics.start_time:7.1f}s] {count:,} requests, "
+                  f"{rate:,.1f}/s (target {target_rate:,.1f}/s), "
+                  f"{self.metrics.late_count:,} late, {self.metrics.error_count + self.metrics.timeout_count:,} failed")
+            last_count, last_time = count, now
+
+    async def run(self, connections: int = None, progress: float = 5.0):
+        target_rate = self.target_rate()
+        samples = sum(len(self.host_capture(i).samples) for i in range(self.hosts)) * self.loops
+        longest = max(self.host_capture(i).span + self.host_capture(i).interval for i in range(self.hosts))
+
+        print(f"\n{'='*70}")
+        print("Capture Replay")
+        print(f"Endpoint:              {self.endpoint} ({self.body_format})")
+        print(f"Captures:              {', '.join(c.name for c in self.captures)}")
+        print(f"Simulated Hosts:       {self.hosts}")
+        print(f"Speed:                 {self.speed:g}x")
+        print(f"Loops:                 {self.loops}")
+        print(f"Requests Scheduled:    {samples:,}")
+        print(f"Target Rate:           {target_rate:,.2f} req/s")
+        print(f"Expected Duration:     {longest * self.loops / self.speed:,.1f}s")
+        print(f"{'='*70}\n")
+
+        connector = aiohttp.TCPConnector(limit=connections or self.hosts)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            print(f"Starting replay at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            self.metrics.start_time = time.time()
+            t0 = asyncio.get_running_loop().time()
+
+            reporter = asyncio.create_task(self.report_progress(progress, target_rate))
+            try:
+                await asyncio.gather(*(self.replay_host(session, i, t0) for i in range(self.hosts)))
+            finally:
+                reporter.cancel()
+            self.metrics.end_time = time.time()
+
+        stats = self.metrics.get_statistics(target_rate)
+        self.print_results(stats)
+        return stats
+
+    def print_results(self, stats: Dict):
+        print(f"\n{'='*70}")
+        print("REPLAY RESULTS")
+        print(f"{'='*70}")
+        print(f"Total Requests:        {stats['total_requests']:,}")
+        print(f"Successful:            {stats['success_count']:,}")
+        print(f"Errors:                {stats['error_count']:,}")
+        print(f"Timeouts:              {stats['timeout_count']:,}")
+        print(f"Status Codes:          {', '.join(f'{k}: {v:,}' for k, v in stats['status_counts'].items()) or '-'}")
+        print(f"\nDuration:              {stats['duration_seconds']:.2f} seconds")
+        print(f"Target Rate:           {stats['target_rate']:,.2f} req/s")
+        print(f"Achieved Rate:         {stats['achieved_rate']:,.2f} req/s ({stats['rate_ratio'] * 100:.1f}% of target)")
+        print(f"Records/Second:        {stats['records_per_second']:,.1f}")
+        print(f"Throughput:            {stats['mb_per_second']:,.2f} MB/s")
+        if 'median_response_time' in stats:
+            print(f"\nResponse Time Statistics (seconds):")
+            print(f"  Median:              {stats['median_response_time']:.4f}")
+            print(f"  95th Percentile:     {stats['p95_response_time']:.4f}")
+            print(f"  99th Percentile:     {stats['p99_response_time']:.4f}")
+            print(f"  Max:                 {stats['max_response_time']:.4f}")
+        if 'median_lag' in stats:
+            print(f"\nSchedule Lag (seconds behind the replayed timeline):")
+            print(f"  Median:              {stats['median_lag']:.4f}")
+            print(f"  99th Percentile:     {stats['p99_lag']:.4f}")
+            print(f"  Max:                 {stats['max_lag']:.4f}")
+            print(f"  Late Requests:       {stats['late_count']:,} ({stats['late_percent']:.1f}%)")
+        print(f"{'='*70}\n")
+
+        if stats['rate_ratio'] < 0.95 or stats['late_percent'] > 5:
+            print("⚠️  Endpoint did not keep up with the replay - ingest ceiling is below the target rate")
+        else:
+            print("✓ Endpoint kept up with the replay schedule")
+        print("")
+
+
+async def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Replay pcc captures against an ingest endpoint')
+    parser.add_argument('captures', nargs='+', help='Capture files (JSON lines with timestamp/subsystem/measurement)')
+    parser.add_argument('--url', default='http://localhost:8080', help='pcd or XATbackend base URL')
+    parser.add_argument('--path', default='/v1/trickle', help='Ingest path (default: /v1/trickle)')
+    parser.add_argument('--format', choices=['trickle', 'jsonl'], default='trickle',
+                        help='Request body format (default: trickle)')
+    parser.add_argument('--hosts', type=int, default=1, help='Simulated hosts; captures are assigned round-robin')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay speed multiplier, e.g. 1, 10, 100')
+    parser.add_argument('--loops', type=int, default=1, help='Times to replay each capture back to back')
+    parser.add_argument('--keep-timestamps', action='store_true',
+                        help='Send the original timestamps instead of rebasing the capture to now')
+    parser.add_argument('--api-key', default=None, help='Sent as "Authorization: Bearer <key>"')
+    parser.add_argument('--host-prefix', default='replay', help='Identifier prefix for simulated hosts')
+    parser.add_argument('--connections', type=int, default=None,
+                        help='Connection pool size (default: one per host)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--progress', type=float, default=5.0, help='Seconds between progress lines')
+    parser.add_argument('--json', dest='json_out', default=None, help='Also write the results to this JSON file')
+
+    args = parser.parse_args()
+
+    captures = []
+    for path in args.captures:
+        try:
+            capture = Capture(path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Skipping {path}: {e}")
+            continue
+        captures.append(capture)
+        print(f"✓ Loaded {path}: {len(capture.samples):,} samples over {capture.span:,}s "
+              f"({capture.bytes / 1048576:.1f} MB)")
+    if not captures:
+        raise SystemExit("No usable captures")
+
+    replayer = CaptureReplayer(
+        captures, args.url, args.path, args.format, args.hosts, args.speed,
+        loops=args.loops, rebase_time=not args.keep_timestamps, api_key=args.api_key,
+        timeout=args.timeout, host_prefix=args.host_prefix,
+    )
+    stats = await replayer.run(connections=args.connections, progress=args.progress)
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(stats, f, indent=2)
+        print(f"✓ Results written to {args.json_out}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
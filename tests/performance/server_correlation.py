@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Line up a load test's per-second timeline with the server's pcc metrics
+
+Reads the client side from a load_test.py time series (--timeseries CSV or
+JSON lines) or a saved result (--save-results JSON), and the server side
+from either the merged performance CSV (timestamp, cpu_user, ..., cpu_steal,
+mem_*_kb, disk_*_bytes, net_*_bytes) or a raw pcc_collection.json, from
+which CPU, memory, disk and network rates are derived. Each client second
+is joined with the server sample whose interval covers it, giving one
+combined timeline, and the summary reports which server resource crossed
+its saturation threshold first relative to the moment client p99 degraded.
+
+Usage:
+    python server_correlation.py results/run.json Azure/results/20260107_191006/pcc_collection.json
+    python server_correlation.py heavy_timeseries.csv azure_pcc-test-01_performance.csv --output timeline.csv
+    python server_correlation.py run.json pcc_collection.json --clock-offset -2 --net-capacity-mbps 1000
+
+    # or straight after a run
+    python load_test.py --scenario heavy --server-metrics pcc_collection.json --correlation-output timeline.csv
+"""
+import argparse
+import bisect
+import csv
+import json
+import os
+import statistics
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+SERVER_FIELDS = ['cpu_busy', 'cpu_user', 'cpu_system', 'cpu_iowait', 'cpu_steal', 'mem_used_pct',
+                 'disk_read_bps', 'disk_write_bps', 'net_rx_bps', 'net_tx_bps']
+CLIENT_FIELDS = ['second', 'timestamp', 'requests', 'success', 'errors', 'timeouts', 'p50', 'p95', 'p99', 'max']
+TIMELINE_FIELDS = CLIENT_FIELDS + ['server_timestamp'] + [f"server_{f}" for f in SERVER_FIELDS]
+
+# Default saturation thresholds (percent)
+THRESHOLDS = {
+    'cpu_busy': 90.0,
+    'cpu_steal': 10.0,
+    'cpu_iowait': 20.0,
+    'mem_used_pct': 90.0,
+}
+CPU_FIELDS = ['user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal']
+
+
+# ------------------------------------------------------------ server side
+
+def mem_used_pct(used_kb: float, free_kb: float, cached_kb: float) -> float:
+    """
+    Memory in use as a percentage of used + free + page cache (sar's kbmemused,
+    kbmemfree, kbcached). The merged CSVs' mem_total_kb differs between
+    converters, so both inputs go through this one definition (the same as
+    scripts/sysbench_windows.mem_used_pct, which compare_captures uses).
+    """
+    total = used_kb + free_kb + cached_kb
+    return used_kb / total * 100 if total else 0.0
+
+
+def read_server_csv(path: str) -> List[Dict]:
+    """Merged performance CSV (as written by transform_pcc_to_xat.py); rates are per second."""
+    rows = []
+    with open(path) as f:
+        for row in csv.DictReader(f):
+            value = lambda key: float(row.get(key) or 0)
+            rows.append({
+                'timestamp': int(float(row['timestamp'])),
+                'cpu_busy': 100.0 - value('cpu_idle'),
+                'cpu_user': value('cpu_user'),
+                'cpu_system': value('cpu_system'),
+                'cpu_iowait': value('cpu_iowait'),
+                'cpu_steal': value('cpu_steal'),
+                'mem_used_pct': mem_used_pct(value('mem_used_kb'), value('mem_free_kb'), value('mem_cached_kb')),
+                'disk_read_bps': value('disk_read_bytes'),
+                'disk_write_bps': value('disk_write_bytes'),
+                'net_rx_bps': value('net_rx_bytes'),
+                'net_tx_bps': value('net_tx_bytes'),
+            })
+    return sorted(rows, key=lambda r: r['timestamp'])
+
+
+def parse_cpu(text: str) -> List[int]:
+    for line in text.splitlines():
+        if line.startswith('cpu '):
+            values = [int(v) for v in line.split()[1:9]]
+            return values + [0] * (8 - len(values))
+    return []
+
+
+def parse_meminfo(text: str) -> Dict[str, int]:
+    values = {}
+    for line in text.splitlines():
+        key, _, rest = line.partition(':')
+        if rest:
+            values[key] = int(rest.split()[0])
+    return values
+
+
+def parse_netdev(text: str) -> Tuple[int, int]:
+    """Received and transmitted bytes summed over all interfaces except lo."""
+    rx = tx = 0
+    for line in text.splitlines():
+        name, sep, rest = line.partition(':')
+        if not sep or name.strip() == 'lo' or '|' in line:
+            continue
+        fields = rest.split()
+        rx += int(fields[0])
+        tx += int(fields[8])
+    return rx, tx
+
+
+def parse_diskstats(text: str) -> Tuple[int, int]:
+    """Bytes read and written, summed over whole disks (no partitions, loop or ram devices)."""
+    devices = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) >= 10:
+            devices[fields[2]] = (int(fields[5]), int(fields[9]))
+    read = written = 0
+    for name, (sectors_read, sectors_written) in devices.items():
+        if name.startswith(('loop', 'ram')):
+            continue
+        if any(name != other and name.startswith(other) for other in devices):
+            continue
+        read += sectors_read * 512
+        written += sectors_written * 512
+    return read, written
+
+
+def read_pcc_collection(path: str) -> List[Dict]:
+    """Raw pcc_collection.json: counters per sample, turned into per-interval rates."""
+    samples: Dict[int, Dict[str, str]] = defaultdict(dict)
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                samples[record['timestamp']][record['subsystem']] = record['measurement']
+
+    rows = []
+    previous = None
+    for ts in sorted(samples):
+        sample = samples[ts]
+        current = {
+            'timestamp': ts,
+            'cpu': parse_cpu(sample.get('/proc/stat', '')),
+            'mem': parse_meminfo(sample.get('/proc/meminfo', '')),
+            'net': parse_netdev(sample.get('/proc/net/dev', '')),
+            'disk': parse_diskstats(sample.get('/proc/diskstats', '')),
+        }
+        if previous is not None:
+            dt = ts - previous['timestamp']
+            cpu = [max(a - b, 0) for a, b in zip(current['cpu'], previous['cpu'])]
+            ticks = sum(cpu) or 1
+            pct = {name: value / ticks * 100 for name, value in zip(CPU_FIELDS, cpu)}
+            mem = current['mem']
+            free, cached = mem.get('MemFree', 0), mem.get('Cached', 0)
+            # kbmemused as sar works it out
+            used = mem.get('MemTotal', 0) - free - mem.get('Buffers', 0) - cached - mem.get('Slab', 0)
+            rows.append({
+                'timestamp': ts,
+                'cpu_busy': 100.0 - pct.get('idle', 100.0),
+                'cpu_user': pct.get('user', 0) + pct.get('nice', 0),
+                'cpu_system': pct.get('system', 0) + pct.get('irq', 0) + pct.get('softirq', 0),
+                'cpu_iowait': pct.get('iowait', 0),
+                'cpu_steal': pct.get('steal', 0),
+                'mem_used_pct': mem_used_pct(used, free, cached) if mem.get('MemTotal') else 0.0,
+                'disk_read_bps': max(current['disk'][0] - previous['disk'][0], 0) / dt,
+                'disk_write_bps': max(current['disk'][1] - previous['disk'][1], 0) / dt,
+                'net_rx_bps': max(current['net'][0] - previous['net'][0], 0) / dt,
+                'net_tx_bps': max(current['net'][1] - previous['net'][1], 0) / dt,
+            })
+        previous = current
+    return rows
+
+
+def load_server_metrics(path: str) -> List[Dict]:
+    if path.endswith('.csv'):
+        return read_server_csv(path)
+    return read_pcc_collection(path)
+
+
+# ------------------------------------------------------------ client side
+
+def load_client_timeseries(path: str) -> List[Dict]:
+    """Per-second rows from a --timeseries CSV/JSON-lines file or a --save-results JSON."""
+    if path.endswith('.csv'):
+        with open(path) as f:
+            return [{k: float(v) if k in ('p50', 'p95', 'p99', 'max') else int(v) for k, v in row.items()}
+                    for row in csv.DictReader(f)]
+    with open(path) as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict) and 'timeseries' in data:
+            return data['timeseries']
+    except ValueError:
+        pass
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+# ------------------------------------------------------------ correlating
+
+def join_timelines(client: List[Dict], server: List[Dict], clock_offset: float = 0) -> List[Dict]:
+    """
+    One row per client second, with the server sample covering that second.
+
+    A pcc sample stamped T describes the interval since the previous sample,
+    so client second t maps to the first sample with T >= t + clock_offset.
+    Seconds outside the server capture are dropped.
+    """
+    stamps = [row['timestamp'] for row in server]
+    if not stamps:
+        return []
+    interval = statistics.median(b - a for a, b in zip(stamps, stamps[1:])) if len(stamps) > 1 else 1
+    timeline = []
+    for row in client:
+        at = row['timestamp'] + clock_offset
+        i = bisect.bisect_left(stamps, at)
+        if i == len(stamps) or stamps[i] - at >= interval:
+            continue
+        sample = server[i]
+        joined = {k: row.get(k) for k in CLIENT_FIELDS}
+        joined['server_timestamp'] = sample['timestamp']
+        for field in SERVER_FIELDS:
+            joined[f"server_{field}"] = round(sample[field], 3)
+        timeline.append(joined)
+    return timeline
+
+
+def latency_onset(timeline: List[Dict], factor: float = 3.0, sustain: int = 3) -> Tuple[int, float]:
+    """
+    (second, baseline p99) where p99 first stays above factor x its early
+    baseline for `sustain` seconds, or (None, baseline).
+    """
+    active = [row for row in timeline if row['requests']]
+    if not active:
+        return None, 0.0
+    early = active[:max(5, len(active) // 10)]
+    baseline = statistics.median(row['p99'] for row in early)
+    run = 0
+    for row in active[len(early):]:
+        run = run + 1 if row['p99'] > baseline * factor else 0
+        if run == sustain:
+            return row['second'] - sustain + 1, baseline
+    return None, baseline
+
+
+def saturation_summary(timeline: List[Dict], thresholds: Dict[str, float]) -> Dict:
+    """First second each server resource crossed its threshold, in order, and the p99 onset."""
+    onset, baseline = latency_onset(timeline)
+    crossings = []
+    for field, limit in thresholds.items():
+        key = f"server_{field}"
+        values = [row[key] for row in timeline]
+        if not values:
+            continue
+        first = next((row['second'] for row in timeline if row[key] >= limit), None)
+        crossings.append({'resource': field, 'threshold': limit, 'peak': max(values), 'first_second': first})
+    crossings.sort(key=lambda c: (c['first_second'] is None, c['first_second'] or 0))
+    saturated = [c for c in crossings if c['first_second'] is not None]
+    return {
+        'p99_baseline': baseline,
+        'p99_onset_second': onset,
+        'resources': crossings,
+        'first_saturated': saturated[0]['resource'] if saturated else None,
+    }
+
+
+def build_thresholds(net_capacity_mbps: float = None, disk_capacity_mbps: float = None,
+                     overrides: Dict[str, float] = None) -> Dict[str, float]:
+    thresholds = dict(THRESHOLDS)
+    thresholds.update(overrides or {})
+    if net_capacity_mbps:
+        # 90% of link capacity, in bytes per second, each direction
+        limit = net_capacity_mbps * 1000000 / 8 * 0.9
+        thresholds['net_rx_bps'] = limit
+        thresholds['net_tx_bps'] = limit
+    if disk_capacity_mbps:
+        limit = disk_capacity_mbps * 1024 * 1024 * 0.9
+        thresholds['disk_read_bps'] = limit
+        thresholds['disk_write_bps'] = limit
+    return thresholds
+
+
+def write_timeline(path: str, timeline: List[Dict]):
+    with open(path, 'w', newline='') as f:
+        if path.endswith(('.json', '.jsonl')):
+            for row in timeline:
+                f.write(json.dumps(row) + '\n')
+        else:
+            writer = csv.DictWriter(f, fieldnames=TIMELINE_FIELDS)
+            writer.writeheader()
+            writer.writerows(timeline)
+
+
+def print_summary(timeline: List[Dict], summary: Dict, client_rows: int):
+    print(f"\n{'='*70}")
+    print("CLIENT / SERVER CORRELATION")
+    print(f"{'='*70}")
+    print(f"Joined seconds:        {len(timeline):,} of {client_rows:,} client seconds")
+    if not timeline:
+        print("❌ No overlap between the load test and the server capture "
+              "(check the capture window or --clock-offset)")
+        print(f"{'='*70}\n")
+        return
+
+    onset = summary['p99_onset_second']
+    print(f"p99 baseline:          {summary['p99_baseline']:.4f}s")
+    print(f"p99 degraded at:       {f'+{onset}s' if onset is not None else 'never (3x baseline for 3s)'}")
+    print(f"\n  {'Resource':<16} {'Threshold':>14} {'Peak':>14} {'First crossed':>14}")
+    for c in summary['resources']:
+        scale, unit = (1 / (1024 * 1024), ' MB/s') if c['resource'].endswith('_bps') else (1, ' %')
+        first = f"+{c['first_second']}s" if c['first_second'] is not None else '-'
+        if c['first_second'] is not None and onset is not None:
+            lead = onset - c['first_second']
+            first += f" ({abs(lead)}s {'before' if lead >= 0 else 'after'} p99)"
+        print(f"  {c['resource']:<16} {c['threshold'] * scale:>12.1f}{unit:<2} {c['peak'] * scale:>12.1f}{unit:<2} "
+              f"{first:>14}")
+
+    print()
+    if summary['first_saturated']:
+        print(f"First to saturate:     {summary['first_saturated']}")
+    elif onset is not None:
+        print("⚠️  p99 degraded with no server resource past its threshold: look at the application "
+              "(DB pool, locks, workers) or the client")
+    else:
+        print("✓ No server resource saturated")
+    print(f"{'='*70}\n")
+
+
+def correlate(client_rows: List[Dict], server_path: str, clock_offset: float = 0, output: str = None,
+              thresholds: Dict[str, float] = None) -> Dict:
+    """Join, print the summary, optionally write the combined timeline; returns the summary."""
+    server = load_server_metrics(server_path)
+    timeline = join_timelines(client_rows, server, clock_offset)
+    summary = saturation_summary(timeline, thresholds or build_thresholds())
+    print_summary(timeline, summary, len(client_rows))
+    if output and timeline:
+        write_timeline(output, timeline)
+        print(f"✓ Combined timeline written to {output}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Correlate load test timelines with server pcc metrics')
+    parser.add_argument('client', help='load_test.py --timeseries file or --save-results JSON')
+    parser.add_argument('server', help='Merged performance CSV or raw pcc_collection.json from the server')
+    parser.add_argument('--output', default=None, help='Write the combined timeline here (.csv or .jsonl)')
+    parser.add_argument('--clock-offset', type=float, default=0,
+                        help='Server clock minus client clock in seconds (default: 0)')
+    parser.add_argument('--net-capacity-mbps', type=float, default=None,
+                        help='NIC bandwidth; network counts as saturated at 90%% of it')
+    parser.add_argument('--disk-capacity-mbps', type=float, default=None,
+                        help='Disk throughput limit in MB/s; disk counts as saturated at 90%% of it')
+    parser.add_argument('--cpu-threshold', type=float, default=THRESHOLDS['cpu_busy'])
+    parser.add_argument('--steal-threshold', type=float, default=THRESHOLDS['cpu_steal'])
+    parser.add_argument('--iowait-threshold', type=float, default=THRESHOLDS['cpu_iowait'])
+    parser.add_argument('--mem-threshold', type=float, default=THRESHOLDS['mem_used_pct'])
+    args = parser.parse_args()
+
+    for path in (args.client, args.server):
+        if not os.path.exists(path):
+            parser.error(f"{path} not found")
+
+    thresholds = build_thresholds(args.net_capacity_mbps, args.disk_capacity_mbps, {
+        'cpu_busy': args.cpu_threshold,
+        'cpu_steal': args.steal_threshold,
+        'cpu_iowait': args.iowait_threshold,
+        'mem_used_pct': args.mem_threshold,
+    })
+    correlate(load_client_timeseries(args.client), args.server, args.clock_offset, args.output, thresholds)
+
+
+if __name__ == '__main__':
+    main()
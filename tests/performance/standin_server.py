@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Stand-in server for the XATbackend and pcd endpoints
+
+Imitates just enough of the real services for the load generator, the
+uploaders and the capture replayer to run on a laptop without Postgres,
+Django, pcd or network access:
+
+    XATbackend  GET  /health/
+                GET  /auth/login/            (sets the csrftoken cookie)
+                POST /auth/login/            (CSRF + credentials -> 302 with sessionid)
+                GET  /collectors/manage      (200 when logged in, 302 to login otherwise)
+                POST /collectors/manage/upload/<collector>/   (multipart CSV, 302 on success)
+                GET  /dashboard/, /api/dashboard/collectors/   (analysis views, login required)
+    pcd         GET  /v1/ping
+                POST /v1/trickle, /v1/data   (JSON or JSON lines, optional Bearer API key)
+    stand-in    GET  /__standin__/stats      (per-endpoint counters as JSON)
+
+Every endpoint has a profile: a latency distribution, an injected error
+rate and status, and for bodies a bandwidth limit in MB/s. A server-wide
+capacity (concurrent requests being served) and queue limit (503 beyond
+it) give the saturation behaviour of a real worker pool, so throughput
+and knee measurements mean something.
+
+Latency specs: fixed:S, uniform:LOW:HIGH, exp:MEAN, lognormal:MEDIAN:SIGMA
+
+Usage:
+    python standin_server.py                            # XATbackend on :8000, pcd on :8080, 'typical'
+    python standin_server.py --preset saturated --username loadtest --password loadtest
+    python standin_server.py --profile slow_upload.json --api-key test-key
+
+    # In process, e.g. from a benchmark
+    async with StandInServer(Profile.preset('fast')) as server:
+        ... server.url ...
+
+Profile files are JSON:
+    {"capacity": 16, "queue_limit": 200,
+     "endpoints": {"upload": {"latency": "lognormal:0.05:0.5", "error_rate": 0.01,
+                              "error_status": 500, "mbps": 20}}}
+Endpoint names: health, login, manage, dashboard, upload, ping, ingest.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+import secrets
+import signal
+import time
+from collections import defaultdict
+from typing import Dict
+
+from aiohttp import web
+
+
+ENDPOINTS = ['health', 'login', 'manage', 'dashboard', 'upload', 'ping', 'ingest']
+
+
+def parse_latency(spec: str):
+    """Sampler (rng -> seconds) for a latency spec such as 'lognormal:0.02:0.4'."""
+    kind, _, rest = str(spec).partition(':')
+    params = [float(p) for p in rest.split(':') if p]
+    try:
+        if kind == 'fixed':
+            value = params[0] if params else 0.0
+            return lambda rng: value
+        if kind == 'uniform':
+            low, high = params
+            return lambda rng: rng.uniform(low, high)
+        if kind == 'exp':
+            mean = params[0]
+            return lambda rng: rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+        if kind == 'lognormal':
+            median, sigma = params
+            mu = math.log(median)
+            return lambda rng: rng.lognormvariate(mu, sigma)
+    except (ValueError, IndexError):
+        pass
+    raise ValueError(f"Invalid latency spec: {spec!r} (fixed:S, uniform:LOW:HIGH, exp:MEAN, lognormal:MEDIAN:SIGMA)")
+
+
+class EndpointProfile:
+    """Latency, error and bandwidth behaviour of one endpoint."""
+
+    def __init__(self, latency: str = 'fixed:0', error_rate: float = 0.0, error_status: int = 500,
+                 mbps: float = 0.0):
+        self.latency = latency
+        self.sample = parse_latency(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.mbps = mbps
+
+    def delay(self, rng: random.Random, nbytes: int) -> float:
+        transfer = nbytes / (self.mbps * 1024 * 1024) if self.mbps and nbytes else 0.0
+        return self.sample(rng) + transfer
+
+    def to_dict(self) -> Dict:
+        return {'latency': self.latency, 'error_rate': self.error_rate,
+                'error_status': self.error_status, 'mbps': self.mbps}
+
+
+class Profile:
+    """Per-endpoint profiles plus the server-wide capacity model."""
+
+    PRESETS = {
+        # No added latency: measures the client and the stand-in itself
+        'fast': {'capacity': 0, 'queue_limit': 0, 'endpoints': {}},
+        # Rough shape of a small Django deployment behind gunicorn
+        'typical': {
+            'capacity': 32,
+            'queue_limit': 0,
+            'endpoints': {
+                'health': {'latency': 'fixed:0.001'},
+                'login': {'latency': 'lognormal:0.08:0.3'},
+                'manage': {'latency': 'lognormal:0.02:0.4'},
+                'dashboard': {'latency': 'lognormal:0.04:0.5'},
+                'upload': {'latency': 'lognormal:0.05:0.5', 'mbps': 20},
+                'ping': {'latency': 'fixed:0.0005'},
+                'ingest': {'latency': 'lognormal:0.005:0.5', 'mbps': 50},
+            },
+        },
+        # Slow database: three times the latency and some server errors
+        'degraded': {
+            'capacity': 32,
+            'queue_limit': 0,
+            'endpoints': {
+                'health': {'latency': 'fixed:0.003'},
+                'login': {'latency': 'lognormal:0.25:0.5', 'error_rate': 0.01},
+                'manage': {'latency': 'lognormal:0.06:0.6', 'error_rate': 0.02},
+                'dashboard': {'latency': 'lognormal:0.12:0.7', 'error_rate': 0.02},
+                'upload': {'latency': 'lognormal:0.15:0.7', 'mbps': 5, 'error_rate': 0.02},
+                'ping': {'latency': 'fixed:0.001'},
+                'ingest': {'latency': 'lognormal:0.015:0.7', 'mbps': 10, 'error_rate': 0.01},
+            },
+        },
+        # Few workers and a bounded backlog: queues quickly, then sheds load with 503s
+        'saturated': {
+            'capacity': 4,
+            'queue_limit': 64,
+            'endpoints': {
+                'health': {'latency': 'fixed:0.001'},
+                'login': {'latency': 'lognormal:0.08:0.3'},
+                'manage': {'latency': 'lognormal:0.02:0.4'},
+                'dashboard': {'latency': 'lognormal:0.04:0.5'},
+                'upload': {'latency': 'lognormal:0.05:0.5', 'mbps': 20},
+                'ping': {'latency': 'fixed:0.0005'},
+                'ingest': {'latency': 'lognormal:0.005:0.5', 'mbps': 50},
+            },
+        },
+    }
+
+    def __init__(self, capacity: int = 0, queue_limit: int = 0, endpoints: Dict[str, Dict] = None):
+        self.capacity = capacity
+        self.queue_limit = queue_limit
+        self.endpoints: Dict[str, EndpointProfile] = {}
+        for name, settings in (endpoints or {}).items():
+            if name not in ENDPOINTS:
+                raise ValueError(f"Unknown endpoint {name!r}; expected one of {', '.join(ENDPOINTS)}")
+            self.endpoints[name] = EndpointProfile(**settings)
+        self.default = EndpointProfile()
+
+    def endpoint(self, name: str) -> EndpointProfile:
+        return self.endpoints.get(name, self.default)
+
+    @classmethod
+    def preset(cls, name: str) -> 'Profile':
+        if name not in cls.PRESETS:
+            raise ValueError(f"Unknown preset {name!r}; expected one of {', '.join(cls.PRESETS)}")
+        return cls(**cls.PRESETS[name])
+
+    @classmethod
+    def load(cls, path: str, base: str = None) -> 'Profile':
+        """Profile file on top of a preset: file settings replace the preset's per endpoint."""
+        with open(path) as f:
+            data = json.load(f)
+        merged = dict(cls.PRESETS[base]) if base else {'endpoints': {}}
+        merged['endpoints'] = {**merged.get('endpoints', {}), **data.get('endpoints', {})}
+        for key in ('capacity', 'queue_limit'):
+            if key in data:
+                merged[key] = data[key]
+        return cls(**merged)
+
+    def to_dict(self) -> Dict:
+        return {'capacity': self.capacity, 'queue_limit': self.queue_limit,
+                'endpoints': {name: ep.to_dict() for name, ep in self.endpoints.items()}}
+
+
+class StandInServer:
+    """aiohttp application imitating XATbackend and pcd under a Profile."""
+
+    def __init__(self, profile: Profile = None, host: str = '127.0.0.1', port: int = 0,
+                 pcd_port: int = None, username: str = None, password: str = None,
+                 api_key: str = None, seed: int = None):
+        self.profile = profile or Profile.preset('fast')
+        self.host = host
+        self.port = port
+        self.pcd_port = pcd_port
+        self.username = username
+        self.password = password
+        self.api_key = api_key
+        self.rng = random.Random(seed)
+        self.sessions = set()
+        self.slots = asyncio.Semaphore(self.profile.capacity) if self.profile.capacity else None
+        self.waiting = 0
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.started = 0.0
+        self.runner = None
+        self.url = None
+        self.pcd_url = None
+
+    # --------------------------------------------------------------- app
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.profile_middleware], client_max_size=1024 * 1024 * 1024)
+        app.router.add_get('/health/', self.health, name='health')
+        app.router.add_get('/auth/login/', self.login_form, name='login')
+        app.router.add_post('/auth/login/', self.login, name='login-post')
+        app.router.add_get('/collectors/manage', self.manage, name='manage')
+        app.router.add_get('/collectors/manage/', self.manage, name='manage-slash')
+        app.router.add_post('/collectors/manage/upload/{collector}/', self.upload, name='upload')
+        app.router.add_get('/dashboard/', self.dashboard, name='dashboard')
+        app.router.add_get('/api/dashboard/collectors/', self.dashboard_api, name='dashboard-api')
+        app.router.add_get('/v1/ping', self.ping, name='ping')
+        app.router.add_post('/v1/trickle', self.ingest, name='ingest')
+        app.router.add_post('/v1/data', self.ingest, name='ingest-data')
+        app.router.add_get('/__standin__/stats', self.stats_handler, name='stats')
+        return app
+
+    @web.middleware
+    async def profile_middleware(self, request: web.Request, handler):
+        route = request.match_info.route.name
+        if route is None or route == 'stats':
+            return await handler(request)
+        name = route.split('-')[0]
+        profile = self.profile.endpoint(name)
+        stats = self.stats[name]
+
+        if self.profile.queue_limit and self.slots is not None and self.waiting >= self.profile.queue_limit:
+            stats['rejected'] += 1
+            return web.Response(status=503, text='Service Unavailable (stand-in queue full)')
+
+        self.waiting += 1
+        async with self.slots if self.slots is not None else contextlib.nullcontext():
+            self.waiting -= 1
+            try:
+                response = await handler(request)
+            except web.HTTPException as redirect:
+                response = redirect
+            delay = profile.delay(self.rng, request.content_length or 0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if profile.error_rate and self.rng.random() < profile.error_rate:
+                stats['errors'] += 1
+                return web.Response(status=profile.error_status, text='Injected error')
+
+        stats['requests'] += 1
+        stats['bytes'] += request.content_length or 0
+        if isinstance(response, web.HTTPException):
+            raise response
+        return response
+
+    # --------------------------------------------------------- XATbackend
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'healthy'})
+
+    async def login_form(self, request: web.Request) -> web.Response:
+        response = web.Response(text='<form method="post"><input name="csrfmiddlewaretoken"></form>',
+                                content_type='text/html')
+        if 'csrftoken' not in request.cookies:
+            response.set_cookie('csrftoken', secrets.token_hex(16))
+        return response
+
+    async def login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        token = request.cookies.get('csrftoken')
+        if not token or form.get('csrfmiddlewaretoken') != token:
+            return web.Response(status=403, text='CSRF verification failed')
+
+        username, password = form.get('username'), form.get('password')
+        if self.username is not None:
+            valid = username == self.username and password == self.password
+        else:
+            valid = bool(username and password)
+        if not valid:
+            self.stats['login']['failures'] += 1
+            return web.Response(text='<form>Please enter a correct username and password.</form>',
+                                content_type='text/html')
+
+        session_id = secrets.token_hex(16)
+        self.sessions.add(session_id)
+        response = web.HTTPFound('/collectors/manage')
+        response.set_cookie('sessionid', session_id)
+        # Django rotates the CSRF token on login
+        response.set_cookie('csrftoken', secrets.token_hex(16))
+        raise response
+
+    async def manage(self, request: web.Request) -> web.Response:
+        if request.cookies.get('sessionid') not in self.sessions:
+            raise web.HTTPFound('/auth/login/?next=/collectors/manage')
+        return web.Response(text='<table class="collectors"></table>', content_type='text/html')
+
+    async def dashboard(self, request: web.Request) -> web.Response:
+        if request.cookies.get('sessionid') not in self.sessions:
+            raise web.HTTPFound('/auth/login/?next=/dashboard/')
+        return web.Response(text='<div id="dashboard"></div>', content_type='text/html')
+
+    async def dashboard_api(self, request: web.Request) -> web.Response:
+        if request.cookies.get('sessionid') not in self.sessions:
+            return web.json_response({'detail': 'Authentication credentials were not provided.'}, status=403)
+        return web.json_response({'collectors': [], 'files': self.stats.get('upload', {}).get('files', 0)})
+
+    async def upload(self, request: web.Request) -> web.Response:
+        if request.cookies.get('sessionid') not in self.sessions:
+            raise web.HTTPFound('/auth/login/?next=/collectors/manage/')
+        form = await request.post()
+        if form.get('csrfmiddlewaretoken') != request.cookies.get('csrftoken'):
+            return web.Response(status=403, text='CSRF verification failed')
+        upload = form.get('uploaded_file')
+        if not isinstance(upload, web.FileField):
+            return web.Response(status=400, text='uploaded_file is required')
+
+        data = upload.file.read()
+        stats = self.stats['upload']
+        stats['files'] += 1
+        stats['file_bytes'] += len(data)
+        stats['rows'] += max(data.count(b'\n') - 1, 0)
+        raise web.HTTPFound('/collectors/manage/')
+
+    # ---------------------------------------------------------------- pcd
+
+    async def ping(self, request: web.Request) -> web.Response:
+        return web.Response(text='pong')
+
+    async def ingest(self, request: web.Request) -> web.Response:
+        if self.api_key and request.headers.get('Authorization') != f"Bearer {self.api_key}":
+            return web.json_response({'error': 'unauthorized'}, status=401)
+        body = await request.read()
+        try:
+            if request.content_type == 'application/x-ndjson':
+                records = sum(1 for line in body.splitlines() if line.strip() and json.loads(line) is not None)
+            else:
+                payload = json.loads(body)
+                if not isinstance(payload, dict) or not isinstance(payload.get('measurements'), list):
+                    raise ValueError('expected {"identifier": ..., "measurements": [...]}')
+                records = len(payload['measurements'])
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        self.stats['ingest']['records'] += records
+        return web.json_response({'accepted': records})
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot())
+
+    def snapshot(self) -> Dict:
+        return {
+            'uptime': time.time() - self.started if self.started else 0,
+            'profile': self.profile.to_dict(),
+            'endpoints': {name: dict(values) for name, values in sorted(self.stats.items())},
+        }
+
+    # ---------------------------------------------------------- lifecycle
+
+    async def start(self) -> str:
+        self.runner = web.AppRunner(self.build_app(), access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        port = self.runner.addresses[0][1]
+        self.url = f"http://{self.host}:{port}"
+        self.pcd_url = self.url
+        if self.pcd_port is not None:
+            await web.TCPSite(self.runner, self.host, self.pcd_port).start()
+            self.pcd_url = f"http://{self.host}:{self.runner.addresses[-1][1]}"
+        self.started = time.time()
+        return self.url
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def __aenter__(self) -> 'StandInServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+def print_stats(snapshot: Dict):
+    print(f"\n{'='*70}")
+    print(f"STAND-IN SERVER STATISTICS ({snapshot['uptime']:.0f}s)")
+    print(f"{'='*70}")
+    print(f"  {'Endpoint':<10} {'Requests':>10} {'Errors':>8} {'Rejected':>9} {'MB in':>9}  Other")
+    for name, values in snapshot['endpoints'].items():
+        other = ', '.join(f"{k}={v:,}" for k, v in values.items()
+                          if k not in ('requests', 'errors', 'rejected', 'bytes'))
+        print(f"  {name:<10} {values.get('requests', 0):>10,} {values.get('errors', 0):>8,} "
+              f"{values.get('rejected', 0):>9,} {values.get('bytes', 0) / (1024 * 1024):>9.2f}  {other}")
+    print(f"{'='*70}\n")
+
+
+async def serve(args):
+    profile = Profile.load(args.profile, args.preset) if args.profile else Profile.preset(args.preset)
+    server = StandInServer(profile, args.host, args.port, args.pcd_port, args.username, args.password,
+                           args.api_key, args.seed)
+    await server.start()
+    print(f"✓ XATbackend stand-in: {server.url}")
+    print(f"✓ pcd stand-in:        {server.pcd_url}")
+    print(f"  Profile: {args.preset}{' + ' + args.profile if args.profile else ''} "
+          f"(capacity {profile.capacity or 'unbounded'}, queue limit {profile.queue_limit or 'none'})")
+    print("  Ctrl-C to stop")
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        snapshot = server.snapshot()
+        await server.stop()
+        print_stats(snapshot)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in XATbackend/pcd server for local load testing')
+    parser.add_argument('--host', default='127.0.0.1', help='Listen address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='XATbackend port (default: 8000)')
+    parser.add_argument('--pcd-port', type=int, default=8080,
+                        help='Also serve on this port for pcd clients (default: 8080, -1 to disable)')
+    parser.add_argument('--preset', choices=sorted(Profile.PRESETS), default='typical',
+                        help='Latency/error/capacity profile (default: typical)')
+    parser.add_argument('--profile', default=None, help='JSON profile file applied on top of --preset')
+    parser.add_argument('--username', default=None, help='Only accept this login (default: any non-empty)')
+    parser.add_argument('--password', default=None, help='Password for --username')
+    parser.add_argument('--api-key', default=None, help='Require "Authorization: Bearer <key>" on pcd ingest')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for latency and error sampling')
+    args = parser.parse_args()
+    if args.pcd_port is not None and args.pcd_port < 0:
+        args.pcd_port = None
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()